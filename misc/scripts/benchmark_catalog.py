@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of common operations on large, pick heavy catalogs.
+
+Creates a synthetic catalog in which each event has a number of picks, one
+origin with an arrival per pick and one magnitude and times copying,
+pickling, looking up the picks of the arrivals and reading/writing it as
+QuakeML. Optionally all picks and arrivals get creation information. Run with ``--profile`` to get the
+functions with the largest total time for each operation. The peak memory
+usage of the process is printed at the end.
+
+Usage::
+
+    python benchmark_catalog.py --events 100000 --picks 20
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import argparse
+import cProfile
+import io
+import pickle
+import pstats
+import sys
+import time
+
+from obspy import UTCDateTime, read_events
+from obspy.core.event import (Arrival, Catalog, CreationInfo, Event,
+                              Magnitude, Origin, Pick, WaveformStreamID)
+
+
+def create_catalog(events, picks, creation_info=False):
+    """
+    Creates a synthetic catalog with the given number of events and picks
+    per event.
+    """
+    def _creation_info(time):
+        if not creation_info:
+            return None
+        return CreationInfo(agency_id="XX", author="benchmark",
+                            creation_time=time)
+
+    cat = Catalog()
+    for _i in range(events):
+        time = UTCDateTime(2000, 1, 1) + _i * 60
+        event_picks = [
+            Pick(time=time + _j, phase_hint="P",
+                 waveform_id=WaveformStreamID("XX", "S%03i" % _j, "",
+                                              "HHZ"),
+                 creation_info=_creation_info(time))
+            for _j in range(picks)]
+        arrivals = [Arrival(pick_id=pick.resource_id, phase="P",
+                            time_residual=0.1,
+                            creation_info=_creation_info(time))
+                    for pick in event_picks]
+        origin = Origin(time=time, latitude=10.0, longitude=20.0,
+                        depth=1e4, arrivals=arrivals)
+        magnitude = Magnitude(mag=3.0, magnitude_type="ML",
+                              origin_id=origin.resource_id)
+        cat.append(Event(picks=event_picks, origins=[origin],
+                         magnitudes=[magnitude],
+                         preferred_origin_id=origin.resource_id,
+                         preferred_magnitude_id=magnitude.resource_id))
+    return cat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=10000,
+                        help="Number of events (default: 10000).")
+    parser.add_argument("--picks", type=int, default=20,
+                        help="Number of picks per event (default: 20).")
+    parser.add_argument("--creation-info", action="store_true",
+                        help="Add creation information to picks and "
+                             "arrivals.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print profiles of the benchmarked operations.")
+    args = parser.parse_args(argv)
+
+    def run(name, func):
+        profile = cProfile.Profile() if args.profile else None
+        start = time.time()
+        if profile is not None:
+            profile.enable()
+        result = func()
+        if profile is not None:
+            profile.disable()
+        print("%-20s %8.3f s" % (name, time.time() - start))
+        if profile is not None:
+            pstats.Stats(profile).sort_stats("tottime").print_stats(10)
+        return result
+
+    cat = run("create", lambda: create_catalog(args.events, args.picks,
+                                               args.creation_info))
+    run("Catalog.copy()", cat.copy)
+    data = run("pickle.dumps", lambda: pickle.dumps(cat, protocol=2))
+    unpickled = run("pickle.loads", lambda: pickle.loads(data))
+
+    def lookup():
+        # The resource ids of the events are scoped on the first lookup.
+        for event in unpickled:
+            for arrival in event.origins[0].arrivals:
+                arrival.pick_id.get_referred_object()
+
+    run("lookup picks", lookup)
+
+    def write():
+        buf = io.BytesIO()
+        cat.write(buf, format="QUAKEML")
+        return buf.getvalue()
+
+    xml = run("write QuakeML", write)
+    run("read_events", lambda: read_events(io.BytesIO(xml)))
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return
+    # Kilobytes on Linux, bytes on Mac OS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    print("%-20s %8.1f MB" % ("peak memory", peak / 1024.0 ** 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,10 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA @UnusedWildImport
 
 from fnmatch import fnmatch
+from multiprocessing.dummy import Pool as ThreadPool
 
 from obspy import Stream, UTCDateTime
-from .waveserver import get_menu, read_wave_server_v
+from .waveserver import ConnectionPool, get_menu, read_wave_server_v
 
 
 class Client(object):
@@ -34,8 +35,13 @@ class Client(object):
     :type debug: bool, optional
     :param debug: Enables verbose output of the connection handling (default is
         ``False``).
+    :type connection_pool_size: int, optional
+    :param connection_pool_size: Number of connections to the server that are
+        kept open for further requests. This is also the number of requests
+        :meth:`get_waveforms_bulk` runs in parallel (default is ``4``).
     """
-    def __init__(self, host, port, timeout=None, debug=False):
+    def __init__(self, host, port, timeout=None, debug=False,
+                 connection_pool_size=4):
         """
         Initializes a Earthworm Wave Server client.
 
@@ -45,6 +51,20 @@ class Client(object):
         self.port = port
         self.timeout = timeout
         self.debug = debug
+        self.connection_pool_size = connection_pool_size
+        self._connection_pool = ConnectionPool(connection_pool_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes all connections kept open for further requests.
+        """
+        self._connection_pool.clear()
 
     def get_waveforms(self, network, station, location, channel, starttime,
                       endtime, cleanup=True):
@@ -97,20 +117,16 @@ class Client(object):
         """
         # replace wildcards in last char of channel and fetch all 3 components
         if channel[-1] in "?*":
-            st = Stream()
-            for comp in ("Z", "N", "E"):
-                channel_new = channel[:-1] + comp
-                st += self.get_waveforms(network, station, location,
-                                         channel_new, starttime, endtime,
-                                         cleanup=cleanup)
-            return st
+            return self.get_waveforms_bulk(
+                [(network, station, location, channel, starttime, endtime)],
+                cleanup=cleanup)
         if location == '':
             location = '--'
         scnl = (station, channel, network, location)
         # fetch waveform
         tbl = read_wave_server_v(self.host, self.port, scnl, starttime,
                                  endtime, timeout=self.timeout,
-                                 cleanup=cleanup)
+                                 cleanup=cleanup, pool=self._connection_pool)
         # create new stream
         st = Stream()
         for tb in tbl:
@@ -120,6 +136,58 @@ class Client(object):
         st.trim(starttime, endtime)
         return st
 
+    def get_waveforms_bulk(self, bulk, cleanup=True):
+        """
+        Retrieves waveform data of multiple channels from Earthworm Wave
+        Server and returns an ObsPy Stream object.
+
+        Up to ``connection_pool_size`` requests are sent in parallel.
+
+        :type bulk: list of tuples
+        :param bulk: Information about the requested data, one tuple of
+            network, station, location, channel, start time and end time
+            per request, see :meth:`get_waveforms` for details.
+        :type cleanup: bool
+        :param cleanup: Specifies whether perfectly aligned traces should be
+            merged or not. See :meth:`obspy.core.stream.Stream.merge` for
+            ``method=-1``.
+        :return: ObsPy :class:`~obspy.core.stream.Stream` object with the
+            traces in the order of the requests.
+
+        .. rubric:: Example
+
+        >>> from obspy.clients.earthworm import Client
+        >>> client = Client("pubavo1.wr.usgs.gov", 16022)
+        >>> dt = UTCDateTime() - 2000  # now - 2000 seconds
+        >>> st = client.get_waveforms_bulk(
+        ...     [('AV', 'ACH', '', 'EH*', dt, dt + 10),
+        ...      ('AV', 'ACH', '', 'BHZ', dt, dt + 10)])  # doctest: +SKIP
+        """
+        requests = []
+        for network, station, location, channel, starttime, endtime in bulk:
+            # fetch all 3 components for wildcards in last char of channel
+            if channel[-1] in "?*":
+                channels = [channel[:-1] + comp for comp in ("Z", "N", "E")]
+            else:
+                channels = [channel]
+            for channel_new in channels:
+                requests.append((network, station, location, channel_new,
+                                 starttime, endtime))
+        st = Stream()
+        if not requests:
+            return st
+        pool = ThreadPool(processes=min(max(self.connection_pool_size, 1),
+                                        len(requests)))
+        try:
+            streams = pool.map(
+                lambda x: self.get_waveforms(*x, cleanup=cleanup), requests)
+        finally:
+            pool.close()
+            pool.join()
+        for _st in streams:
+            st += _st
+        return st
+
     def save_waveforms(self, filename, network, station, location, channel,
                        starttime, endtime, format="MSEED", cleanup=True):
         """
@@ -221,7 +289,8 @@ class Client(object):
         pattern = ".".join((network, station, location, channel))
         # get overview of all available data, winston wave servers can not
         # restrict the query via network, station etc. so we do that manually
-        response = get_menu(self.host, self.port, timeout=self.timeout)
+        response = get_menu(self.host, self.port, timeout=self.timeout,
+                            pool=self._connection_pool)
         # reorder items and convert time info to UTCDateTime
         response = [(x[3], x[1], x[4], x[2], UTCDateTime(x[5]),
                      UTCDateTime(x[6])) for x in response]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for an Earthworm Wave Server used by the offline tests.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA @UnusedWildImport
+from future.utils import PY2, native_str
+
+import struct
+import threading
+import time
+
+import numpy as np
+
+if PY2:
+    import SocketServer as socketserver
+else:
+    import socketserver
+
+
+def make_tracebuf2(network, station, location, channel, starttime,
+                   sampling_rate, data, datatype='s4', pinno=0):
+    """
+    Returns a TraceBuf2 packet with the given data as bytes.
+    """
+    endian = '>' if datatype[0] in 'ts' else '<'
+    data = np.require(data, dtype=native_str(endian + datatype[0].replace(
+        's', 'i').replace('t', 'f') + datatype[1]))
+    endtime = starttime + (len(data) - 1) / sampling_rate
+    head = struct.pack(
+        native_str(endian + '2i3d7s9s4s3s2s3s2s2s'), pinno, len(data),
+        starttime, endtime, sampling_rate, station.encode(),
+        network.encode(), channel.encode(), location.encode(), b'20',
+        datatype.encode(), b'\x00\x00', b'\x00\x00')
+    return head + data.tobytes()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn,
+                          socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.fake._handle(self)
+
+
+class FakeWaveServer(object):
+    """
+    Wave server stand-in running in a background thread.
+
+    Use as a context manager and add the packets to :attr:`tanks`.
+
+    :ivar tanks: Dictionary mapping ``(station, channel, network, location)``
+        to a list of TraceBuf2 packets as returned by
+        :func:`make_tracebuf2`.
+    :ivar connections: Number of accepted connections.
+    :ivar requests: List of all received request lines.
+    :ivar delay: Time in seconds each data request takes.
+    :ivar max_active: Maximum number of requests processed at the same time.
+    """
+    def __init__(self):
+        self.tanks = {}
+        self.connections = 0
+        self.requests = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.server = _ThreadingTCPServer(("127.0.0.1", 0), _RequestHandler)
+        self.server.fake = self
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.host, self.port = self.server.server_address
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _handle(self, handler):
+        with self._lock:
+            self.connections += 1
+        # Answer requests until the client closes the connection.
+        while True:
+            line = handler.rfile.readline()
+            if not line:
+                return
+            line = line.decode().strip()
+            with self._lock:
+                self.requests.append(line)
+            tokens = line.split()
+            if tokens[0] == "MENU:":
+                handler.wfile.write(self._menu(tokens[1]))
+            elif tokens[0] == "GETSCNLRAW:":
+                with self._lock:
+                    self.active += 1
+                    self.max_active = max(self.max_active, self.active)
+                try:
+                    if self.delay:
+                        time.sleep(self.delay)
+                    handler.wfile.write(self._data(tokens))
+                finally:
+                    with self._lock:
+                        self.active -= 1
+            handler.wfile.flush()
+
+    def _menu(self, rid):
+        entries = []
+        for pinno, (scnl, packets) in enumerate(sorted(self.tanks.items())):
+            entries.append("%i %s %s %s %s %f %f s4" % (
+                pinno, scnl[0], scnl[1], scnl[2], scnl[3],
+                self._times(packets[0])[0], self._times(packets[-1])[1]))
+        return ("%s %s \n" % (rid, "  ".join(entries))).encode()
+
+    def _data(self, tokens):
+        rid, scnl = tokens[1], tuple(tokens[2:6])
+        start, end = float(tokens[6]), float(tokens[7])
+        if scnl not in self.tanks:
+            return ("%s 0 %s FN\n" % (rid, " ".join(scnl))).encode()
+        packets = [p for p in self.tanks[scnl]
+                   if self._times(p)[1] >= start and self._times(p)[0] <= end]
+        body = b"".join(packets)
+        return ("%s 0 %s F s4 %f %f %i\n" % (
+            rid, " ".join(scnl), start, end, len(body))).encode() + body
+
+    @staticmethod
+    def _times(packet):
+        endian = '>' if packet[57:58] in (b't', b's') else '<'
+        return struct.unpack(native_str(endian + '2d'), packet[8:24])
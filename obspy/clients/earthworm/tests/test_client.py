@@ -8,11 +8,15 @@ from future.builtins import *  # NOQA @UnusedWildImport
 
 import unittest
 
+import numpy as np
+
 from obspy import read
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
 from obspy.core.util.decorator import skip_on_network_error
 from obspy.clients.earthworm import Client
+from obspy.clients.earthworm.tests.fake_wave_server import (
+    FakeWaveServer, make_tracebuf2)
 
 
 class ClientTestCase(unittest.TestCase):
@@ -116,9 +120,78 @@ class ClientTestCase(unittest.TestCase):
         self.assertIn('AV.ACH.--.EHZ', seeds)
 
 
+class FakeServerClientTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.clients.earthworm.client.Client with a local fake
+    wave server.
+    """
+    def setUp(self):
+        self.server = FakeWaveServer()
+        self.start = UTCDateTime(2018, 1, 1)
+        for sta in ('ACH', 'KAHG'):
+            for chan in ('EHZ', 'EHN', 'EHE'):
+                self.server.tanks[(sta, chan, 'AV', '--')] = [
+                    make_tracebuf2('AV', sta, '--', chan,
+                                   self.start.timestamp + i, 100.0,
+                                   np.arange(100) + i * 100)
+                    for i in range(10)]
+        self.server.__enter__()
+        self.client = Client(self.server.host, self.server.port, timeout=10)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__()
+
+    def test_get_waveforms(self):
+        st = self.client.get_waveforms('AV', 'ACH', '', 'EHE',
+                                       self.start + 1, self.start + 5)
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].id, 'AV.ACH..EHE')
+        self.assertEqual(st[0].stats.starttime, self.start + 1)
+        self.assertEqual(st[0].stats.endtime, self.start + 5)
+        np.testing.assert_array_equal(st[0].data, np.arange(100, 501))
+
+        st = self.client.get_waveforms('AV', 'ACH', '', 'EHE',
+                                       self.start + 1, self.start + 5,
+                                       cleanup=False)
+        self.assertEqual(len(st), 5)
+        # Both requests used the same connection.
+        self.assertEqual(self.server.connections, 1)
+
+        # Wildcarded component, the components are requested in parallel.
+        st = self.client.get_waveforms('AV', 'ACH', '', 'EH?',
+                                       self.start + 1, self.start + 5)
+        self.assertEqual([tr.stats.channel for tr in st],
+                         ['EHZ', 'EHN', 'EHE'])
+        self.assertLessEqual(self.server.connections, 3)
+
+    def test_get_waveforms_bulk(self):
+        self.server.delay = 0.05
+        bulk = [('AV', sta, '', 'EH*', self.start, self.start + 9.99)
+                for sta in ('ACH', 'KAHG')]
+        bulk.append(('AV', 'ACH', '', 'BHZ', self.start, self.start + 10))
+        st = self.client.get_waveforms_bulk(bulk)
+        self.assertEqual([tr.id for tr in st], [
+            'AV.ACH..EHZ', 'AV.ACH..EHN', 'AV.ACH..EHE',
+            'AV.KAHG..EHZ', 'AV.KAHG..EHN', 'AV.KAHG..EHE'])
+        for tr in st:
+            np.testing.assert_array_equal(tr.data, np.arange(1000))
+        # Limited by the size of the connection pool.
+        self.assertEqual(self.server.max_active, 4)
+        self.assertEqual(self.server.connections, 4)
+        self.assertEqual(len(self.client.get_waveforms_bulk([])), 0)
+
+    def test_availability(self):
+        data = self.client.get_availability('AV', 'ACH', channel='EH*')
+        self.assertEqual(data, [
+            ('AV', 'ACH', '--', chan, self.start, self.start + 9.99)
+            for chan in ('EHE', 'EHN', 'EHZ')])
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(FakeServerClientTestCase, 'test'))
     return suite
 
 
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.earthworm.waveserver test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA @UnusedWildImport
+
+import unittest
+
+import numpy as np
+
+from obspy.clients.earthworm.tests.fake_wave_server import (
+    FakeWaveServer, make_tracebuf2)
+from obspy.clients.earthworm.waveserver import (
+    ConnectionPool, TraceBuf2, get_menu, parse_tracebuf2_headers,
+    read_tracebuf2, read_wave_server_v)
+
+
+class WaveServerTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.clients.earthworm.waveserver.
+    """
+    def _packets(self, start=1.5e9, count=4, npts=100, rate=100.0,
+                 datatype='s4'):
+        return [make_tracebuf2('AV', 'ACH', '--', 'EHZ',
+                               start + i * npts / rate, rate,
+                               np.arange(i * npts, (i + 1) * npts),
+                               datatype=datatype)
+                for i in range(count)]
+
+    def test_parse_tracebuf2_headers(self):
+        packets = self._packets(datatype='s4') + \
+            self._packets(start=1.6e9, count=2, npts=50, datatype='i2')
+        # Incomplete packets at the end are ignored.
+        dat = b''.join(packets) + packets[0][:100]
+        offsets, headers = parse_tracebuf2_headers(dat)
+        np.testing.assert_array_equal(
+            offsets, [0, 464, 928, 1392, 1856, 2020])
+        np.testing.assert_array_equal(headers['nsamp'],
+                                      [100] * 4 + [50] * 2)
+        self.assertEqual(headers['starttime'][1], 1.5e9 + 1)
+        self.assertEqual(headers['starttime'][5], 1.6e9 + 0.5)
+        np.testing.assert_array_equal(headers['samprate'], 100.0)
+        np.testing.assert_array_equal(headers['datatype'],
+                                      [b's4'] * 4 + [b'i2'] * 2)
+        np.testing.assert_array_equal(headers['sta'], b'ACH')
+
+        # Compare to the packet by packet parser.
+        tb = TraceBuf2()
+        tb.parse_header(packets[4][:64])
+        self.assertEqual(tb.ndata, headers['nsamp'][4])
+        self.assertEqual(tb.start.timestamp, headers['starttime'][4])
+        self.assertEqual(tb.end.timestamp, headers['endtime'][4])
+
+        offsets, headers = parse_tracebuf2_headers(b'')
+        self.assertEqual(len(offsets), 0)
+        self.assertEqual(len(headers), 0)
+
+    def test_read_tracebuf2(self):
+        packets = self._packets()
+        # Gap before the last packet.
+        packets[-1] = self._packets(start=1.5e9 + 10, count=1)[0]
+        dat = b''.join(packets)
+
+        tbl = read_tracebuf2(dat)
+        self.assertEqual(len(tbl), 4)
+        for tb in tbl:
+            self.assertEqual(tb.ndata, 100)
+            self.assertEqual(tb.inputType, np.dtype('>i4'))
+
+        tbl = read_tracebuf2(dat, cleanup=True)
+        self.assertEqual(len(tbl), 2)
+        np.testing.assert_array_equal(tbl[0].data, np.arange(300))
+        np.testing.assert_array_equal(tbl[1].data, np.arange(100))
+        self.assertEqual(tbl[0].start.timestamp, 1.5e9)
+        self.assertEqual(tbl[0].end.timestamp, 1.5e9 + 2.99)
+        tr = tbl[0].get_obspy_trace()
+        self.assertEqual(tr.id, 'AV.ACH..EHZ')
+        self.assertEqual(tr.stats.npts, 300)
+
+        # Packets of different data types are never merged.
+        dat = b''.join(self._packets(count=1) +
+                       self._packets(start=1.5e9 + 1, count=1,
+                                     datatype='i2'))
+        tbl = read_tracebuf2(dat, cleanup=True)
+        self.assertEqual(len(tbl), 2)
+        self.assertEqual(tbl[1].inputType, np.dtype('<i2'))
+        np.testing.assert_array_equal(tbl[1].data, np.arange(100))
+
+        self.assertEqual(read_tracebuf2(b''), [])
+
+    def test_connection_pool(self):
+        pool = ConnectionPool(size=2)
+        with FakeWaveServer() as server:
+            server.tanks[('ACH', 'EHZ', 'AV', '--')] = self._packets()
+            for _ in range(3):
+                tbl = read_wave_server_v(
+                    server.host, server.port, ('ACH', 'EHZ', 'AV', '--'),
+                    1.5e9, 1.5e9 + 4, timeout=10, cleanup=True, pool=pool)
+                self.assertEqual(len(tbl), 1)
+                self.assertEqual(tbl[0].ndata, 400)
+            menu = get_menu(server.host, server.port, timeout=10, pool=pool)
+            # Not found.
+            self.assertEqual(read_wave_server_v(
+                server.host, server.port, ('ACH', 'EHN', 'AV', '--'),
+                1.5e9, 1.5e9 + 4, timeout=10, pool=pool), [])
+            # All requests went through the same connection.
+            self.assertEqual(server.connections, 1)
+
+            # Connections closed by the server are replaced.
+            for conn in pool._idle:
+                conn.sock.close()
+                conn.sock = conn.sock.__class__()
+            tbl = read_wave_server_v(
+                server.host, server.port, ('ACH', 'EHZ', 'AV', '--'),
+                1.5e9, 1.5e9 + 4, timeout=10, pool=pool)
+            self.assertEqual(len(tbl), 4)
+            self.assertEqual(server.connections, 2)
+            pool.clear()
+
+            # Without pool every request has its own connection.
+            read_wave_server_v(
+                server.host, server.port, ('ACH', 'EHZ', 'AV', '--'),
+                1.5e9, 1.5e9 + 4, timeout=10)
+            self.assertEqual(server.connections, 3)
+
+        self.assertEqual(menu, [(0, 'ACH', 'EHZ', 'AV', '--', 1.5e9,
+                                 1.5e9 + 3.99, 's4')])
+        self.assertEqual(pool._idle, [])
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(WaveServerTestCase, 'test'))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
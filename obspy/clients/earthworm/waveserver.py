@@ -16,6 +16,7 @@ from future.utils import native_str
 import socket
 import struct
 import sys
+import threading
 
 import numpy as np
 
@@ -43,6 +44,32 @@ DATATYPE_KEY = {
 }
 
 
+# Layout of the 64 byte TraceBuf2 header. The byte order of the numeric
+# fields is given by the data type of the packet.
+TRACEBUF2_HEADER_FIELDS = [
+    (native_str('pinno'), native_str('i4')),
+    (native_str('nsamp'), native_str('i4')),
+    (native_str('starttime'), native_str('f8')),
+    (native_str('endtime'), native_str('f8')),
+    (native_str('samprate'), native_str('f8')),
+    (native_str('sta'), native_str('S7')),
+    (native_str('net'), native_str('S9')),
+    (native_str('chan'), native_str('S4')),
+    (native_str('loc'), native_str('S3')),
+    (native_str('version'), native_str('S2')),
+    (native_str('datatype'), native_str('S3')),
+    (native_str('quality'), native_str('S2')),
+    (native_str('pad'), native_str('S2'))]
+TRACEBUF2_HEADER_DTYPE = np.dtype(TRACEBUF2_HEADER_FIELDS)
+_HEADER_DTYPES = {
+    True: TRACEBUF2_HEADER_DTYPE.newbyteorder(native_str('>')),
+    False: TRACEBUF2_HEADER_DTYPE.newbyteorder(native_str('<'))}
+
+# Consecutive packets are merged if the gap between them equals the sample
+# spacing within the precision of the float header times.
+_ALIGNMENT_TOLERANCE = 1e-6
+
+
 def get_numpy_type(tpstr):
     """
     given a TraceBuf2 type string from header,
@@ -204,7 +231,191 @@ def get_sock_bytes(sock, nbytes, timeout=None):
         return None
 
 
-def get_menu(server, port, scnl=None, timeout=None):
+class WaveServerConnection(object):
+    """
+    Connection to a wave server with buffered reads.
+
+    Can be used for multiple requests, see :class:`ConnectionPool`.
+    """
+    def __init__(self, server, port, timeout=None):
+        self.key = (server, port)
+        self.timeout = timeout
+        self.reused = False
+        self.broken = False
+        self._buffer = b''
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect((server, port))
+
+    def send(self, req_str):
+        """
+        Sends a newline terminated request.
+        """
+        if not req_str.endswith(b'\n'):
+            req_str += b'\n'
+        self.sock.settimeout(self.timeout)
+        try:
+            self.sock.sendall(req_str)
+        except socket.error:
+            self.broken = True
+            raise
+
+    def _recv(self):
+        indat = self.sock.recv(65536)
+        if not indat:
+            self.broken = True
+        return indat
+
+    def readline(self):
+        """
+        Retrieves one newline terminated string or None if the connection
+        timed out or was closed before.
+        """
+        self.sock.settimeout(self.timeout)
+        try:
+            while True:
+                pos = self._buffer.find(b'\n')
+                if pos != -1:
+                    line = self._buffer[:pos + 1]
+                    self._buffer = self._buffer[pos + 1:]
+                    return line
+                indat = self._recv()
+                if not indat:
+                    break
+                self._buffer += indat
+        except socket.timeout:
+            print('socket timeout in readline()', file=sys.stderr)
+            self.broken = True
+            return None
+        except socket.error:
+            self.broken = True
+            return None
+        line = self._buffer
+        self._buffer = b''
+        return line or None
+
+    def read(self, nbytes):
+        """
+        Retrieves nbytes bytes, less if the connection was closed before or
+        None if it timed out.
+        """
+        self.sock.settimeout(self.timeout)
+        chunks = [self._buffer[:nbytes]]
+        self._buffer = self._buffer[nbytes:]
+        btoread = nbytes - len(chunks[0])
+        try:
+            while btoread > 0:
+                indat = self._recv()
+                if not indat:
+                    break
+                if len(indat) > btoread:
+                    self._buffer = indat[btoread:]
+                    indat = indat[:btoread]
+                btoread -= len(indat)
+                chunks.append(indat)
+        except socket.timeout:
+            print('socket timeout in read()', file=sys.stderr)
+            self.broken = True
+            return None
+        except socket.error:
+            self.broken = True
+            return None
+        return b''.join(chunks)
+
+    def close(self):
+        self.broken = True
+        try:
+            self.sock.close()
+        except socket.error:  # pragma: no cover
+            pass
+
+
+class ConnectionPool(object):
+    """
+    Thread safe pool of idle connections to wave servers.
+
+    Connections are kept open after a request and reused by the next one
+    instead of connecting again for each request.
+
+    :type size: int
+    :param size: Maximum number of idle connections kept open.
+    """
+    def __init__(self, size=4):
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self, server, port, timeout=None):
+        """
+        Returns an idle connection to the server or a new one.
+        """
+        key = (server, port)
+        with self._lock:
+            for i, conn in enumerate(self._idle):
+                if conn.key == key:
+                    del self._idle[i]
+                    conn.timeout = timeout
+                    conn.reused = True
+                    return conn
+        return WaveServerConnection(server, port, timeout=timeout)
+
+    def put(self, conn):
+        """
+        Returns a connection to the pool, closes it if the pool is full or
+        the connection can not be used anymore.
+        """
+        if not conn.broken:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    return
+        conn.close()
+
+    def clear(self):
+        """
+        Closes all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _request(server, port, req_str, timeout=None, pool=None):
+    """
+    Sends a request and returns the connection and the first line of the
+    response.
+
+    A connection from the pool might have been closed by the server in the
+    meantime, the request is then sent again on a new connection.
+    """
+    while True:
+        if pool is None:
+            conn = WaveServerConnection(server, port, timeout=timeout)
+        else:
+            conn = pool.get(server, port, timeout=timeout)
+        try:
+            conn.send(req_str)
+        except socket.error:
+            conn.close()
+            if conn.reused:
+                continue
+            raise
+        line = conn.readline()
+        if line is None and conn.reused:
+            conn.close()
+            continue
+        return conn, line
+
+
+def _release(conn, pool=None):
+    if pool is None:
+        conn.close()
+    else:
+        pool.put(conn)
+
+
+def get_menu(server, port, scnl=None, timeout=None, pool=None):
     """
     Return list of tanks on server
     """
@@ -216,10 +427,9 @@ def get_menu(server, port, scnl=None, timeout=None):
     else:
         # added SCNL not documented but required
         getstr = 'MENU: %s SCNL\n' % rid
-    sock = send_sock_req(server, port, getstr.encode('ascii', 'strict'),
-                         timeout=timeout)
-    r = get_sock_char_line(sock, timeout=timeout)
-    sock.close()
+    conn, r = _request(server, port, getstr.encode('ascii', 'strict'),
+                       timeout=timeout, pool=pool)
+    _release(conn, pool)
     if r:
         # XXX: we got here from bytes to utf-8 to keep the remaining code
         # intact
@@ -252,80 +462,132 @@ def get_menu(server, port, scnl=None, timeout=None):
 
 
 def read_wave_server_v(server, port, scnl, start, end, timeout=None,
-                       cleanup=False):
+                       cleanup=False, pool=None):
     """
     Reads data for specified time interval and scnl on specified waveserverV.
 
     Returns list of TraceBuf2 objects
+
+    Pass a :class:`ConnectionPool` as ``pool`` to reuse connections.
     """
     rid = 'rwserv'
     scnlstr = '%s %s %s %s' % scnl
     reqstr = 'GETSCNLRAW: %s %s %f %f\n' % (rid, scnlstr, start, end)
-    sock = send_sock_req(server, port, reqstr.encode('ascii', 'strict'),
-                         timeout=timeout)
-    r = get_sock_char_line(sock, timeout=timeout)
+    conn, r = _request(server, port, reqstr.encode('ascii', 'strict'),
+                       timeout=timeout, pool=pool)
     if not r:
+        conn.close()
         return []
     tokens = str(r.decode()).split()
     flag = tokens[6]
     if flag != 'F':
         msg = 'read_wave_server_v returned flag %s - %s'
         print(msg % (flag, RETURNFLAG_KEY[flag]), file=sys.stderr)
+        _release(conn, pool)
         return []
     nbytes = int(tokens[-1])
-    dat = get_sock_bytes(sock, nbytes, timeout=timeout)
-    sock.close()
-
-    tbl = []
-    bytesread = 1
-    p = 0
-    dat_len = len(dat)
-    current_tb = None
-    period = None
-    bufs = None
+    dat = conn.read(nbytes)
+    _release(conn, pool)
+    if not dat:
+        return []
+    return read_tracebuf2(dat, cleanup=cleanup)
 
-    while bytesread and p < dat_len:
-        if not dat_len > p + 64:
-            break  # no tracebufs left
 
-        new_tb = TraceBuf2()
-        new_tb.parse_header(dat[p:p + 64])
-        p += 64
-        nbytes = new_tb.ndata * new_tb.inputType.itemsize
+def parse_tracebuf2_headers(dat):
+    """
+    Parses the headers of all complete TraceBuf2 packets in a byte string.
 
+    Returns the offsets of the packets and their headers as a numpy
+    structured array with :data:`TRACEBUF2_HEADER_DTYPE` in native byte
+    order.
+    """
+    dat_len = len(dat)
+    offsets = []
+    big_endian = []
+    p = 0
+    # The packets have different lengths, so only the number of samples is
+    # read here to find the next one, everything else is done vectorized.
+    while p + 64 < dat_len:
+        dtype = dat[p + 57:p + 59]
+        if dtype[0:1] in b'ts':
+            endian = True
+        elif dtype[0:1] in b'if':
+            endian = False
+        else:
+            raise ValueError
+        nsamp = struct.unpack_from(b'>i' if endian else b'<i', dat, p + 4)[0]
+        if nsamp < 0:
+            break   # corrupt header
+        nbytes = 64 + nsamp * get_numpy_type(dtype).itemsize
         if dat_len < p + nbytes:
             break   # not enough array to hold data specified in header
+        offsets.append(p)
+        big_endian.append(endian)
+        p += nbytes
 
-        if current_tb is not None:
-            if cleanup and new_tb.start - current_tb.end == period:
-                buf = dat[p:p + nbytes]
-                bufs.append(from_buffer(buf, current_tb.inputType))
-                current_tb.end = new_tb.end
-
-            else:
-                if len(bufs) > 1:
-                    current_tb.data = np.concatenate(bufs)
-                else:
-                    current_tb.data = bufs[0]
-
-                current_tb.ndata = len(current_tb.data)
-                current_tb = None
-
-        if current_tb is None:
-            current_tb = new_tb
-            tbl.append(current_tb)
-            period = 1 / current_tb.rate
-            bufs = [from_buffer(dat[p:p + nbytes], current_tb.inputType)]
+    offsets = np.array(offsets, dtype=np.int64)
+    big_endian = np.array(big_endian, dtype=bool)
+    headers = np.empty(len(offsets), dtype=TRACEBUF2_HEADER_DTYPE)
+    if not len(offsets):
+        return offsets, headers
+    buf = from_buffer(dat, np.uint8)
+    for endian, dtype in _HEADER_DTYPES.items():
+        mask = big_endian == endian
+        if not mask.any():
+            continue
+        index = offsets[mask][:, np.newaxis] + np.arange(64)
+        headers[mask] = buf[index].view(dtype)[:, 0].astype(
+            TRACEBUF2_HEADER_DTYPE)
+    return offsets, headers
+
+
+def read_tracebuf2(dat, cleanup=False):
+    """
+    Reads all TraceBuf2 packets in a byte string.
 
-        p += nbytes
+    Returns list of TraceBuf2 objects. With ``cleanup``, consecutive
+    packets without gaps are merged into one object.
+    """
+    offsets, headers = parse_tracebuf2_headers(dat)
+    if not len(offsets):
+        return []
 
-    if len(bufs) > 1:
-        current_tb.data = np.concatenate(bufs)
+    # Find the packets that continue the previous one.
+    if cleanup and len(offsets) > 1:
+        period = 1.0 / headers['samprate'][:-1]
+        gap = headers['starttime'][1:] - headers['endtime'][:-1]
+        merge = np.abs(gap - period) <= _ALIGNMENT_TOLERANCE
+        for key in ('sta', 'net', 'chan', 'loc', 'datatype'):
+            merge &= headers[key][1:] == headers[key][:-1]
+        breaks = np.nonzero(~merge)[0] + 1
     else:
-        current_tb.data = bufs[0]
-
-    current_tb.ndata = len(current_tb.data)
+        breaks = np.arange(1, len(offsets))
+    starts = np.concatenate([[0], breaks])
+    stops = np.concatenate([breaks, [len(offsets)]])
 
+    tbl = []
+    for first, last in zip(starts, stops):
+        head = headers[first]
+        tb = TraceBuf2()
+        tb.inputType = get_numpy_type(bytes(head['datatype'])[:2])
+        itemsize = tb.inputType.itemsize
+        bufs = [dat[o + 64:o + 64 + n * itemsize] for o, n in zip(
+            offsets[first:last].tolist(),
+            headers['nsamp'][first:last].tolist())]
+        tb.data = from_buffer(b''.join(bufs) if len(bufs) > 1 else bufs[0],
+                              tb.inputType)
+        tb.ndata = len(tb.data)
+        tb.pinno = int(head['pinno'])
+        tb.rate = float(head['samprate'])
+        tb.sta = bytes(head['sta'])
+        tb.net = bytes(head['net'])
+        tb.chan = bytes(head['chan'])
+        tb.loc = bytes(head['loc'])
+        tb.version = bytes(head['version'])
+        tb.qual = bytes(head['quality'])
+        tb.start = UTCDateTime(float(head['starttime']))
+        tb.end = UTCDateTime(float(headers['endtime'][last - 1]))
+        tbl.append(tb)
     return tbl
 
 
@@ -140,6 +140,27 @@ USP     http://sismo.iag.usp.br
         inventory.plot()
 
 
+Caching Responses
+-----------------
+
+Station and event requests that are repeated often, e.g. by processing
+scripts that are run many times, can be answered from an on-disk cache by
+passing a :class:`~obspy.clients.fdsn.cache.ResponseCache` or the name of a
+directory to the ``cache`` argument of the client.
+
+>>> client = Client("IRIS", cache="/tmp/fdsn_cache")  # doctest: +SKIP
+
+
+Concurrent Requests
+-------------------
+
+Applications based on :mod:`asyncio` that issue many requests at once, e.g.
+one waveform request for each of thousands of events, can use
+:class:`~obspy.clients.fdsn.async_client.AsyncClient`. Its methods return
+awaitable futures, limit the number of requests running at the same time
+per data center and retry failed requests. This requires Python 3.
+
+
 Basic Routing Clients Usage
 ---------------------------
 
@@ -239,6 +260,8 @@ from future.builtins import *  # NOQA
 from future.utils import PY2, native_str
 
 from .client import Client  # NOQA
+from .async_client import AsyncClient  # NOQA
+from .cache import ResponseCache  # NOQA
 from .routing.routing_client import RoutingClient  # NOQA
 from .header import URL_MAPPINGS  # NOQA
 
@@ -255,7 +278,9 @@ if r"%s" in Client.__init__.__doc__:
             Client.__init__.__doc__ % \
             str(sorted(URL_MAPPINGS.keys())).strip("[]")
 
-__all__ = [native_str(x) for x in ("Client", "RoutingClient")]
+__all__ = [native_str(x)
+           for x in ("Client", "AsyncClient", "ResponseCache",
+                     "RoutingClient")]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+FDSN web service client for running many requests concurrently from
+:mod:`asyncio` code.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import socket
+import threading
+import time
+
+from obspy.core.compatibility import urlparse
+from .client import Client, download_url
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: no cover
+    asyncio = None
+
+if PY2:
+    import httplib as http_client
+    import urllib2 as urllib_request
+else:
+    import http.client as http_client
+    import urllib.request as urllib_request
+
+
+# HTTP codes of responses that are worth retrying. None is returned by
+# download_url() if there was no response at all.
+RETRY_CODES = (None, 408, 429, 500, 502, 503, 504)
+
+
+def _is_transient(code, data):
+    """
+    Checks if a failed download is worth retrying.
+    """
+    if code not in RETRY_CODES:
+        return False
+    if code is None:
+        # Only network errors and no e.g. redirect exceptions.
+        return isinstance(data, (urllib_request.URLError, socket.error,
+                                 http_client.HTTPException))
+    return True
+
+
+def _retry_after(data):
+    """
+    Returns the seconds of the ``Retry-After`` header of an error response
+    or None if it is not given in seconds.
+    """
+    headers = getattr(data, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _ThrottledClient(Client):
+    """
+    Client that downloads through the per host limits and retries of an
+    :class:`AsyncClient`.
+    """
+    def __init__(self, async_client, *args, **kwargs):
+        self._async_client = async_client
+        super(_ThrottledClient, self).__init__(*args, **kwargs)
+
+    def _download_url(self, url, headers=None, **kwargs):
+        request_headers = self.request_headers
+        if headers:
+            request_headers = dict(request_headers, **headers)
+        return self._async_client._download(
+            url, opener=self._url_opener, headers=request_headers,
+            debug=self.debug, timeout=self.timeout, **kwargs)
+
+
+class AsyncClient(object):
+    """
+    FDSN web service client for :mod:`asyncio` applications.
+
+    ``get_waveforms()``, ``get_waveforms_bulk()``, ``get_stations()`` and
+    ``get_events()`` take the same arguments as the corresponding methods of
+    :class:`~obspy.clients.fdsn.client.Client` but return awaitable futures
+    instead of blocking. Downloading and parsing the responses happens in a
+    thread pool so the event loop is never blocked and thousands of requests
+    can be issued at once, e.g. with :func:`asyncio.gather`. The number of
+    requests running at the same time is limited per host and failed
+    requests (no response, or HTTP codes 408, 429, 500, 502, 503 and 504)
+    are retried with exponential backoff, honoring ``Retry-After`` headers.
+
+    .. code-block:: python
+
+        import asyncio
+        from obspy import UTCDateTime
+        from obspy.clients.fdsn import AsyncClient
+
+        client = AsyncClient("IRIS")
+        t = UTCDateTime("2010-02-27T06:45:00")
+
+        async def main():
+            return await asyncio.gather(*[
+                client.get_waveforms("IU", "ANMO", "00", "LHZ",
+                                     t + i * 60, t + (i + 1) * 60)
+                for i in range(100)])
+
+        streams = asyncio.get_event_loop().run_until_complete(main())
+
+    Requires Python 3.
+
+    :type base_url: str
+    :param base_url: Base URL of FDSN web service compatible server or key
+        string for recognized server, see
+        :meth:`~obspy.clients.fdsn.client.Client.__init__`.
+    :type max_workers: int
+    :param max_workers: Maximum number of requests that are downloaded and
+        parsed at the same time in total.
+    :type max_per_host: int
+    :param max_per_host: Maximum number of requests sent to the same host at
+        the same time. Please be nice to the data centers.
+    :type retries: int
+    :param retries: Number of times a failed request is retried.
+    :type backoff: float
+    :param backoff: Time in seconds to wait before the first retry, the
+        time doubles with every further retry.
+    :type loop: :class:`asyncio.AbstractEventLoop`
+    :param loop: Event loop the futures are bound to. Defaults to the
+        current event loop.
+
+    Any additional keyword arguments are passed to
+    :class:`~obspy.clients.fdsn.client.Client`.
+    """
+    def __init__(self, base_url="IRIS", max_workers=32, max_per_host=4,
+                 retries=3, backoff=1.0, loop=None, **kwargs):
+        if asyncio is None:
+            msg = "AsyncClient requires Python 3."
+            raise NotImplementedError(msg)
+        if max_per_host < 1:
+            msg = "max_per_host must be at least 1."
+            raise ValueError(msg)
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.retried = 0
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._host_semaphores = {}
+        kwargs.setdefault("connection_pool_size", max_per_host)
+        self._client = _ThrottledClient(self, base_url, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __str__(self):
+        return "Asynchronous " + str(self._client)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    @property
+    def client(self):
+        """
+        The underlying blocking
+        :class:`~obspy.clients.fdsn.client.Client`.
+        """
+        return self._client
+
+    @property
+    def services(self):
+        """
+        The services discovered by the underlying client.
+        """
+        return self._client.services
+
+    def close(self):
+        """
+        Shuts down the thread pool and closes idle connections.
+        """
+        self._executor.shutdown(wait=True)
+        self._client._connection_pool.clear()
+
+    def get_waveforms(self, *args, **kwargs):
+        """
+        Awaitable version of
+        :meth:`~obspy.clients.fdsn.client.Client.get_waveforms`.
+        """
+        return self._submit(self._client.get_waveforms, *args, **kwargs)
+
+    def get_waveforms_bulk(self, *args, **kwargs):
+        """
+        Awaitable version of
+        :meth:`~obspy.clients.fdsn.client.Client.get_waveforms_bulk`.
+        """
+        return self._submit(self._client.get_waveforms_bulk, *args, **kwargs)
+
+    def get_stations(self, *args, **kwargs):
+        """
+        Awaitable version of
+        :meth:`~obspy.clients.fdsn.client.Client.get_stations`.
+        """
+        return self._submit(self._client.get_stations, *args, **kwargs)
+
+    def get_events(self, *args, **kwargs):
+        """
+        Awaitable version of
+        :meth:`~obspy.clients.fdsn.client.Client.get_events`.
+        """
+        return self._submit(self._client.get_events, *args, **kwargs)
+
+    def _submit(self, func, *args, **kwargs):
+        future = self._executor.submit(func, *args, **kwargs)
+        return asyncio.wrap_future(future, loop=self._loop)
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+
+    def _download(self, url, **kwargs):
+        """
+        :func:`~obspy.clients.fdsn.client.download_url` within the per host
+        limit and with retries.
+        """
+        semaphore = self._host_semaphore(url)
+        attempt = 0
+        while True:
+            with semaphore:
+                result = download_url(url, **kwargs)
+            code, data = result[:2]
+            if attempt >= self.retries or not _is_transient(code, data):
+                return result
+            delay = self.backoff * 2 ** attempt
+            retry_after = _retry_after(data)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            time.sleep(delay)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
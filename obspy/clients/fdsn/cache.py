@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache for the responses of FDSN web services.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+import obspy
+
+
+# Time in seconds responses of the different services are considered
+# up-to-date. Waveforms are not cached by default.
+DEFAULT_TTL = {"station": 24 * 3600, "event": 3600}
+
+
+def _sha1(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        if part is None:
+            part = b""
+        elif not isinstance(part, bytes):
+            part = part.encode("utf-8")
+        sha.update(part)
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+class ResponseCache(object):
+    """
+    Size-bounded on-disk cache for FDSN web service responses.
+
+    Pass it (or just the name of the directory) to the ``cache`` argument
+    of :class:`~obspy.clients.fdsn.client.Client` to cache the responses of
+    the station and event services.
+
+    >>> from obspy.clients.fdsn import Client
+    >>> cache = ResponseCache("/tmp/fdsn_cache",
+    ...                       ttl={"station": 86400, "event": 600},
+    ...                       parsed=True)  # doctest: +SKIP
+    >>> client = Client("IRIS", cache=cache)  # doctest: +SKIP
+
+    Responses are stored once per content, requests with different URLs
+    resulting in the same response share the data on disk. A cached
+    response is used without contacting the server as long as it is younger
+    than the time-to-live of its service. Older responses are revalidated
+    with a conditional request if the server sent an ``ETag`` or
+    ``Last-Modified`` header and only downloaded again if they changed.
+    If the total size of the cache exceeds ``max_size``, the least recently
+    used files are deleted.
+
+    The cache can be shared by multiple clients, threads and processes.
+
+    :type directory: str
+    :param directory: Directory to store the cache in. Created if it does
+        not exist.
+    :type ttl: dict or float
+    :param ttl: Time-to-live in seconds per service (``"station"``,
+        ``"event"``, ``"dataselect"``). Services that are not given are not
+        cached. A single number applies to all services. Use ``0`` to
+        revalidate each request with the server.
+    :type max_size: int
+    :param max_size: Maximum size of the cache in bytes.
+    :type parsed: bool
+    :param parsed: Also cache the parsed
+        :class:`~obspy.core.inventory.inventory.Inventory` and
+        :class:`~obspy.core.event.Catalog` objects in binary (pickle) form
+        so the same response does not have to be parsed again. Only use
+        this with directories nobody else can write to.
+    """
+    def __init__(self, directory, ttl=None, max_size=1024 ** 3,
+                 parsed=False):
+        if ttl is None:
+            ttl = DEFAULT_TTL
+        elif not isinstance(ttl, dict):
+            ttl = dict((service, ttl)
+                       for service in ("dataselect", "event", "station"))
+        self.directory = directory
+        self.ttl = dict(ttl)
+        self.max_size = max_size
+        self.parsed = parsed
+        self.stats = dict.fromkeys(
+            ("hits", "misses", "revalidated", "stored", "evicted",
+             "parsed_hits"), 0)
+        self._lock = threading.Lock()
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created by someone else in the meantime.
+                if not os.path.isdir(directory):
+                    raise
+        self._size = sum(size for _, _, size in self._files())
+
+    def __str__(self):
+        with self._lock:
+            stats = ", ".join("%s: %i" % (key, self.stats[key])
+                              for key in sorted(self.stats))
+        return "ResponseCache at '%s' (%.1f MB)\n\t%s" % (
+            self.directory, self._size / 1024.0 ** 2, stats)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _files(self):
+        """
+        Yields name, modification time and size of all files in the cache.
+        """
+        for name in os.listdir(self.directory):
+            try:
+                stat = os.stat(self._path(name))
+            except OSError:
+                continue
+            yield name, stat.st_mtime, stat.st_size
+
+    def _read(self, name):
+        try:
+            with open(self._path(name), "rb") as fh:
+                data = fh.read()
+        except (IOError, OSError):
+            return None
+        # Mark as recently used for the eviction.
+        try:
+            os.utime(self._path(name), None)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, name, data):
+        # Write to a temporary file first so other threads or processes
+        # never see partially written files.
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        try:
+            os.rename(temp, self._path(name))
+        except OSError:
+            # Windows does not replace existing files.
+            try:
+                os.remove(self._path(name))
+                os.rename(temp, self._path(name))
+            except OSError:
+                os.remove(temp)
+                return
+        with self._lock:
+            self._size += len(data)
+            evict = self._size > self.max_size
+        if evict:
+            self._evict()
+
+    def _evict(self):
+        """
+        Deletes the least recently used files until the cache is at 90 % of
+        its maximum size.
+        """
+        files = sorted(self._files(), key=lambda x: x[1])
+        size = sum(x[2] for x in files)
+        target = 0.9 * self.max_size
+        evicted = 0
+        for name, _, file_size in files:
+            if size <= target:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                continue
+            size -= file_size
+            evicted += 1
+        with self._lock:
+            self._size = size
+            self.stats["evicted"] += evicted
+
+    def _load(self, key):
+        """
+        Returns metadata and body of a cached response or None.
+        """
+        meta = self._read(key + ".json")
+        if meta is None:
+            return None
+        try:
+            meta = json.loads(meta.decode("utf-8"))
+        except ValueError:
+            return None
+        body = self._read(meta["sha1"] + ".raw")
+        if body is None:
+            return None
+        return meta, body
+
+    def _store(self, key, meta, body=None):
+        if body is not None:
+            # Stored by content, identical responses share the file.
+            try:
+                os.utime(self._path(meta["sha1"] + ".raw"), None)
+            except OSError:
+                self._write(meta["sha1"] + ".raw", body)
+        self._write(key + ".json", json.dumps(meta).encode("utf-8"))
+        self._count("stored")
+
+    def fetch(self, service, url, data, download):
+        """
+        Returns a response from the cache or downloads it.
+
+        :type service: str
+        :param service: The service the request goes to.
+        :type url: str
+        :param url: URL of the request.
+        :type data: bytes
+        :param data: Data sent along with a POST request or None.
+        :param download: Function performing the request. Called with a
+            dictionary of additional request headers, it must return the
+            HTTP code, the body or exception and the response headers like
+            :func:`~obspy.clients.fdsn.client.download_url` with
+            ``return_string=True`` and ``return_headers=True``.
+        :returns: The HTTP code and the body or exception.
+        """
+        ttl = self.ttl[service]
+        key = _sha1(url, data)
+        cached = self._load(key)
+        now = time.time()
+        if cached is not None and now - cached[0]["time"] <= ttl:
+            self._count("hits")
+            return 200, cached[1]
+
+        headers = {}
+        if cached is not None:
+            if cached[0].get("etag"):
+                headers["If-None-Match"] = cached[0]["etag"]
+            if cached[0].get("last_modified"):
+                headers["If-Modified-Since"] = cached[0]["last_modified"]
+        code, body, response_headers = download(headers)
+
+        if code == 304 and cached is not None:
+            meta = cached[0]
+            meta["time"] = now
+            self._store(key, meta)
+            self._count("revalidated")
+            return 200, cached[1]
+        self._count("misses")
+        if code != 200:
+            return code, body
+
+        meta = {"url": url, "time": now, "sha1": _sha1(body),
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified")}
+        self._store(key, meta, body)
+        return code, body
+
+    def parse(self, body, function, kind):
+        """
+        Returns ``function(body)``, from the cache if it has been parsed
+        before.
+
+        :param kind: Name for the kind of object the function returns.
+        """
+        if not self.parsed:
+            return function(body)
+        name = _sha1(body, kind, obspy.__version__,
+                     native_str(sys.version_info[0])) + ".pickle"
+        cached = self._read(name)
+        if cached is not None:
+            try:
+                obj = pickle.loads(cached)
+            except Exception:
+                pass
+            else:
+                self._count("parsed_hits")
+                return obj
+        obj = function(body)
+        self._write(name, pickle.dumps(obj, protocol=2))
+        return obj
+
+    def clear(self):
+        """
+        Deletes all cached responses.
+        """
+        for name, _, _ in list(self._files()):
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -16,7 +16,6 @@ from future.utils import PY2, native_str
 
 import collections
 import copy
-import gzip
 import io
 import os
 import re
@@ -24,6 +23,7 @@ from socket import timeout as socket_timeout
 import textwrap
 import threading
 import warnings
+import zlib
 from collections import OrderedDict
 
 from lxml import etree
@@ -31,10 +31,16 @@ from lxml import etree
 import obspy
 from obspy import UTCDateTime, read_inventory
 from obspy.core.compatibility import urlparse
+from .cache import ResponseCache
+from .connection_pool import (ConnectionPool, KeepAliveHTTPHandler,
+                              KeepAliveHTTPSHandler)
 from .header import (DEFAULT_PARAMETERS, DEFAULT_USER_AGENT, FDSNWS,
                      OPTIONAL_PARAMETERS, PARAMETER_ALIASES, URL_MAPPINGS,
                      WADL_PARAMETERS_NOT_TO_BE_PARSED, FDSNException,
-                     FDSNRedirectException, FDSNNoDataException)
+                     FDSNRedirectException, FDSNNoDataException,
+                     FDSNTooManyRequestsException,
+                     FDSNServiceUnavailableException,
+                     FDSNRequestTooLargeException, FDSNTimeoutException)
 from .wadl_parser import WADLParser
 
 if PY2:
@@ -49,6 +55,9 @@ else:
 
 DEFAULT_SERVICE_VERSIONS = {'dataselect': 1, 'station': 1, 'event': 1}
 
+# Size of the blocks in which responses are read and decompressed.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class CustomRedirectHandler(urllib_request.HTTPRedirectHandler):
     """
@@ -140,7 +149,7 @@ class Client(object):
     def __init__(self, base_url="IRIS", major_versions=None, user=None,
                  password=None, user_agent=DEFAULT_USER_AGENT, debug=False,
                  timeout=120, service_mappings=None, force_redirect=False,
-                 eida_token=None):
+                 eida_token=None, connection_pool_size=10, cache=None):
         """
         Initializes an FDSN Web Service client.
 
@@ -202,6 +211,19 @@ class Client(object):
             used. This mechanism is only available on select EIDA nodes. The
             token can be provided in form of the PGP message as a string, or
             the filename of a local file with the PGP message in it.
+        :type connection_pool_size: int
+        :param connection_pool_size: Maximum number of idle persistent
+            connections kept open per host. Connections are reused by
+            subsequent requests which avoids the TCP and TLS handshakes for
+            each request. The pool is thread-safe so one client can be used
+            from multiple threads at once. Set to ``0`` to open a new
+            connection for every request.
+        :type cache: :class:`~obspy.clients.fdsn.cache.ResponseCache` or str
+        :param cache: Cache the responses of the services on disk, either
+            with a configured
+            :class:`~obspy.clients.fdsn.cache.ResponseCache` or in the given
+            directory with the default settings (station responses for a
+            day and event responses for an hour).
         """
         self.debug = debug
         self.user = user
@@ -230,6 +252,10 @@ class Client(object):
 
         self.base_url = base_url
 
+        self._connection_pool = ConnectionPool(maxsize=connection_pool_size)
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+        self.cache = cache
         self._set_opener(user, password)
 
         self.request_headers = {"User-Agent": user_agent}
@@ -328,6 +354,11 @@ class Client(object):
         else:
             handlers.append(NoRedirectionHandler())
 
+        # Persistent connections, shared by all openers of this client.
+        if self._connection_pool.maxsize > 0:
+            handlers.append(KeepAliveHTTPHandler(self._connection_pool))
+            handlers.append(KeepAliveHTTPSHandler(self._connection_pool))
+
         # Don't install globally to not mess with other codes.
         self._url_opener = urllib_request.build_opener(*handlers)
         if self.debug:
@@ -517,7 +548,8 @@ class Client(object):
             self._write_to_file_object(filename, data_stream)
             data_stream.close()
         else:
-            cat = obspy.read_events(data_stream, format="quakeml")
+            cat = self._parse(data_stream, "catalog", lambda x: (
+                obspy.read_events(x, format="quakeml")))
             data_stream.close()
             return cat
 
@@ -716,7 +748,7 @@ class Client(object):
             data_stream.close()
         else:
             # This works with XML and StationXML data.
-            inventory = read_inventory(data_stream)
+            inventory = self._parse(data_stream, "inventory", read_inventory)
             data_stream.close()
             return inventory
 
@@ -1376,12 +1408,58 @@ class Client(object):
         print("\n".join(msg))
 
     def _download(self, url, return_string=False, data=None, use_gzip=True):
-        code, data = download_url(
-            url, opener=self._url_opener, headers=self.request_headers,
-            debug=self.debug, return_string=return_string, data=data,
-            timeout=self.timeout, use_gzip=use_gzip)
+        service = self._get_cached_service(url)
+        if service is None:
+            code, data = self._download_url(
+                url, return_string=return_string, data=data,
+                use_gzip=use_gzip)
+            raise_on_error(code, data)
+            return data
+
+        def download(headers):
+            return self._download_url(url, data=data, use_gzip=use_gzip,
+                                      headers=headers, return_headers=True)
+
+        code, data = self.cache.fetch(service, url, data, download)
         raise_on_error(code, data)
-        return data
+        if return_string:
+            return data
+        return io.BytesIO(data)
+
+    def _download_url(self, url, headers=None, **kwargs):
+        """
+        Performs a single request with the settings of the client, see
+        :func:`download_url` for the arguments.
+        """
+        request_headers = self.request_headers
+        if headers:
+            request_headers = dict(request_headers, **headers)
+        return download_url(url, opener=self._url_opener,
+                            headers=request_headers, debug=self.debug,
+                            timeout=self.timeout, **kwargs)
+
+    def _get_cached_service(self, url):
+        """
+        Returns the service of a query URL if responses of the service are
+        cached, otherwise None.
+        """
+        if self.cache is None:
+            return None
+        url = url.split("?")[0]
+        for service, ttl in self.cache.ttl.items():
+            if ttl is not None and service in self.services and \
+                    url == self._build_url(service, "query"):
+                return service
+        return None
+
+    def _parse(self, data_stream, kind, function):
+        """
+        Parses a response, using the parsed objects of the cache if enabled.
+        """
+        if self.cache is None or not self.cache.parsed:
+            return function(data_stream)
+        return self.cache.parse(data_stream.read(), lambda x: function(
+            io.BytesIO(x)), kind)
 
     def _build_url(self, service, resource_type, parameters={}):
         """
@@ -1714,10 +1792,14 @@ def raise_on_error(code, data):
                             server_info)
     elif code == 403:
         raise FDSNException("Authentication failed.", server_info)
+    elif code == 429:
+        raise FDSNTooManyRequestsException("Too many requests",
+                                           server_info)
     elif code == 413:
-        raise FDSNException("Request would result in too much data. "
-                            "Denied by the datacenter. Split the request "
-                            "in smaller parts", server_info)
+        raise FDSNRequestTooLargeException(
+            "Request would result in too much data. "
+            "Denied by the datacenter. Split the request "
+            "in smaller parts", server_info)
     # Request URI too large.
     elif code == 414:
         msg = ("The request URI is too large. Please contact the ObsPy "
@@ -1727,10 +1809,11 @@ def raise_on_error(code, data):
         raise FDSNException("Service responds: Internal server error",
                             server_info)
     elif code == 503:
-        raise FDSNException("Service temporarily unavailable", server_info)
+        raise FDSNServiceUnavailableException(
+            "Service temporarily unavailable", server_info)
     elif code is None:
         if "timeout" in str(data).lower():
-            raise FDSNException("Timed Out")
+            raise FDSNTimeoutException("Timed Out")
         else:
             raise FDSNException("Unknown Error (%s): %s" % (
                 (str(data.__class__.__name__), str(data))))
@@ -1740,7 +1823,8 @@ def raise_on_error(code, data):
 
 
 def download_url(url, opener, timeout=10, headers={}, debug=False,
-                 return_string=True, data=None, use_gzip=True):
+                 return_string=True, data=None, use_gzip=True,
+                 return_headers=False):
     """
     Returns a pair of tuples.
 
@@ -1752,6 +1836,9 @@ def download_url(url, opener, timeout=10, headers={}, debug=False,
     specified.
 
     Performs a http GET if data=None, otherwise a http POST.
+
+    If `return_headers=True` the headers of the response are returned as
+    third item (an empty dictionary if there was no response).
     """
     if debug is True:
         print("Downloading %s %s requesting gzip compression" % (
@@ -1775,34 +1862,59 @@ def download_url(url, opener, timeout=10, headers={}, debug=False,
             msg = "HTTP error %i, reason %s, while downloading '%s': %s" % \
                   (e.code, str(e.reason), url, e.read())
             print(msg)
+        if return_headers:
+            return e.code, e, e.headers
         return e.code, e
     except Exception as e:
         if debug is True:
             print("Error while downloading: %s" % url)
+        if return_headers:
+            return None, e, {}
         return None, e
 
     code = url_obj.getcode()
 
-    # Unpack gzip if necessary.
+    # Unpack gzip if necessary. The body is decompressed while it is being
+    # received so the compressed data is never kept in memory as a whole.
     if url_obj.info().get("Content-Encoding") == "gzip":
         if debug is True:
             print("Uncompressing gzipped response for %s" % url)
-        # Cannot directly stream to gzip from urllib!
-        # http://www.enricozini.org/2011/cazzeggio/python-gzip/
-        buf = io.BytesIO(url_obj.read())
-        buf.seek(0, 0)
-        f = gzip.GzipFile(fileobj=buf)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
     else:
-        f = url_obj
+        decompressor = None
+
+    buf = io.BytesIO()
+    try:
+        while True:
+            chunk = url_obj.read(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if decompressor is not None:
+                uncompressed = decompressor.decompress(chunk)
+                # The response might consist of multiple gzip members.
+                while decompressor.unused_data:
+                    chunk = decompressor.unused_data
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    uncompressed += decompressor.decompress(chunk)
+                chunk = uncompressed
+            buf.write(chunk)
+        if decompressor is not None:
+            buf.write(decompressor.flush())
+    finally:
+        # Hands the connection back to the pool.
+        url_obj.close()
 
     if return_string is False:
-        data = io.BytesIO(f.read())
+        buf.seek(0, 0)
+        data = buf
     else:
-        data = f.read()
+        data = buf.getvalue()
 
     if debug is True:
         print("Downloaded %s with HTTP code: %i" % (url, code))
 
+    if return_headers:
+        return code, data, url_obj.info()
     return code, data
 
 
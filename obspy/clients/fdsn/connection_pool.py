@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent HTTP connections for the FDSN web service clients.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import socket
+import threading
+
+if PY2:
+    import httplib as http_client
+    import urllib2 as urllib_request
+else:
+    import http.client as http_client
+    import urllib.request as urllib_request
+
+
+class ConnectionPool(object):
+    """
+    Thread-safe pool of idle keep-alive HTTP connections.
+
+    Connections are stored per scheme, host and port (and proxy tunnel if
+    any, e.g. for HTTPS requests through a proxy). Each connection is only
+    used by one request at a time, concurrent requests to the same host use
+    separate connections which are all returned to the pool afterwards. At
+    most ``maxsize`` idle connections are kept per host, surplus connections
+    are closed.
+
+    >>> pool = ConnectionPool(maxsize=4)
+    >>> print(pool)
+    ConnectionPool(maxsize=4): 0 idle connections, 0 reused, 0 created
+
+    :type maxsize: int
+    :param maxsize: Maximum number of idle connections kept per host.
+    """
+    def __init__(self, maxsize=10):
+        self.maxsize = maxsize
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(_i) for _i in self._idle.values())
+
+    def __str__(self):
+        return ("ConnectionPool(maxsize=%i): %i idle connections, %i reused, "
+                "%i created") % (self.maxsize, len(self), self.reused,
+                                 self.created)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def acquire(self, key):
+        """
+        Returns an idle connection for key or None if there is none.
+        """
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                self.reused += 1
+                # Most recently used first, it is the least likely to have
+                # been closed by the server in the meantime.
+                return connections.pop()
+            self.created += 1
+        return None
+
+    def release(self, key, connection):
+        """
+        Returns a connection whose response has been read completely.
+        """
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.maxsize:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        """
+        Closes all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class _PooledHTTPResponse(http_client.HTTPResponse):
+    """
+    HTTP response that hands its connection back to the pool once it has
+    been read completely and is closed.
+    """
+    _release = None
+    _fully_read = False
+
+    def read(self, amt=None):
+        # Python 2 closes the response from within read() once the end is
+        # reached so the flag has to be set beforehand.
+        fully_read = self._fully_read
+        if amt is None:
+            self._fully_read = True
+        try:
+            data = http_client.HTTPResponse.read(self, amt)
+        except Exception:
+            self._fully_read = fully_read
+            raise
+        if not data:
+            self._fully_read = True
+        return data
+
+    def close(self):
+        release, self._release = self._release, None
+        # Python 3 drops the file object once the body has been consumed.
+        reusable = not self.will_close and (
+            self._fully_read or self.fp is None or self.length == 0)
+        http_client.HTTPResponse.close(self)
+        if release is not None:
+            release(reusable)
+
+
+class _KeepAliveMixin(object):
+    """
+    Opens requests on pooled connections instead of a new connection per
+    request like the default handlers of urllib do.
+    """
+    def _open_pooled(self, connection_class, req, **connection_kwargs):
+        if PY2:
+            host = req.get_host()
+            selector = req.get_selector()
+        else:
+            host = req.host
+            selector = req.selector
+        if not host:
+            raise urllib_request.URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update((k, v) for k, v in req.headers.items()
+                       if k not in headers)
+        headers["Connection"] = "keep-alive"
+        headers = dict((name.title(), value)
+                       for name, value in headers.items())
+        data = req.data if not PY2 else req.get_data()
+
+        # Requests through a proxy tunnel (HTTPS requests with a proxy set)
+        # are sent to the proxy host, same as in do_open() of urllib the
+        # proxy credentials are only sent along when opening the tunnel.
+        tunnel_host = getattr(req, "_tunnel_host", None)
+        tunnel_headers = {}
+        if tunnel_host and "Proxy-Authorization" in headers:
+            tunnel_headers["Proxy-Authorization"] = \
+                headers.pop("Proxy-Authorization")
+        key = (connection_class.__name__, host, tunnel_host,
+               tunnel_headers.get("Proxy-Authorization"))
+
+        while True:
+            connection = self.pool.acquire(key)
+            reused = connection is not None
+            if connection is None:
+                connection = connection_class(host, timeout=req.timeout,
+                                              **connection_kwargs)
+                connection.response_class = _PooledHTTPResponse
+                if tunnel_host:
+                    connection.set_tunnel(tunnel_host,
+                                          headers=tunnel_headers)
+            try:
+                if reused:
+                    timeout = req.timeout
+                    if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+                        timeout = socket.getdefaulttimeout()
+                    connection.timeout = req.timeout
+                    if connection.sock is not None:
+                        connection.sock.settimeout(timeout)
+                connection.request(req.get_method(), selector, data, headers)
+                response = connection.getresponse()
+            except (socket.error, http_client.HTTPException) as e:
+                connection.close()
+                # The server might have closed an idle connection, retry
+                # once on a new one.
+                if reused:
+                    continue
+                raise urllib_request.URLError(e)
+            except Exception:
+                connection.close()
+                raise
+            break
+
+        def release(reusable):
+            if reusable:
+                self.pool.release(key, connection)
+            else:
+                connection.close()
+
+        response._release = release
+        if PY2:
+            # Same as in urllib2.AbstractHTTPHandler.do_open().
+            response.recv = response.read
+            fp = socket._fileobject(response, close=True)
+            resp = urllib_request.addinfourl(fp, response.msg,
+                                             req.get_full_url())
+            resp.code = response.status
+            resp.msg = response.reason
+            return resp
+        response.url = req.get_full_url()
+        response.msg = response.reason
+        return response
+
+
+class KeepAliveHTTPHandler(_KeepAliveMixin, urllib_request.HTTPHandler):
+    """
+    urllib handler for HTTP requests on persistent, pooled connections.
+
+    :type pool: :class:`ConnectionPool`
+    :param pool: Pool to take connections from and return them to.
+    """
+    def __init__(self, pool):
+        urllib_request.HTTPHandler.__init__(self)
+        self.pool = pool
+
+    def http_open(self, req):
+        return self._open_pooled(http_client.HTTPConnection, req)
+
+
+class KeepAliveHTTPSHandler(_KeepAliveMixin, urllib_request.HTTPSHandler):
+    """
+    urllib handler for HTTPS requests on persistent, pooled connections.
+
+    :type pool: :class:`ConnectionPool`
+    :param pool: Pool to take connections from and return them to.
+    """
+    def __init__(self, pool):
+        urllib_request.HTTPSHandler.__init__(self)
+        self.pool = pool
+
+    def https_open(self, req):
+        kwargs = {}
+        context = getattr(self, "_context", None)
+        if context is not None:
+            kwargs["context"] = context
+        return self._open_pooled(http_client.HTTPSConnection, req, **kwargs)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -35,6 +35,37 @@ class FDSNNoDataException(FDSNException):
     pass
 
 
+class FDSNTooManyRequestsException(FDSNException):
+    """
+    Raised if the service rejects a request because too many requests have
+    been sent (HTTP code 429).
+    """
+    pass
+
+
+class FDSNServiceUnavailableException(FDSNException):
+    """
+    Raised if the service is temporarily unavailable (HTTP code 503), e.g.
+    because it is overloaded.
+    """
+    pass
+
+
+class FDSNRequestTooLargeException(FDSNException):
+    """
+    Raised if the service denies a request because it would result in too
+    much data (HTTP code 413).
+    """
+    pass
+
+
+class FDSNTimeoutException(FDSNException):
+    """
+    Raised if a request timed out.
+    """
+    pass
+
+
 # A curated list collecting some implementations:
 # https://www.fdsn.org/webservices/datacenters/
 # https://www.orfeus-eu.org/data/eida/nodes/
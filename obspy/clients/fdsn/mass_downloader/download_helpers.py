@@ -23,28 +23,36 @@ import itertools
 import sys
 from multiprocessing.pool import ThreadPool
 import os
+import threading
 import time
 import timeit
 
 if sys.version_info.major == 2:
-    from itertools import ifilterfalse as filterfalse
+    import Queue as queue
 else:
-    from itertools import filterfalse
+    import queue
 
 import numpy as np
 
 from lxml.etree import XMLSyntaxError
 
 import obspy
+from obspy.clients.fdsn.header import FDSNNoDataException
 from obspy.core.util import Enum
+from obspy.geodetics import locations2degrees
 
 from . import utils
+from .scheduler import AdaptiveConcurrency, DownloadJournal
 
 # The current status of an entity.
 STATUS = Enum(["none", "needs_downloading", "downloaded", "ignore", "exists",
                "download_failed", "download_rejected",
                "download_partially_failed"])
 
+# Number of times a request is retried if the data center answers that it
+# is overloaded.
+MAX_THROTTLED_RETRIES = 5
+
 
 class _SlotsEqualityComparisionObject(object):
     """
@@ -334,7 +342,7 @@ class Station(_SlotsEqualityComparisionObject):
             else:
                 self.stationxml_status = STATUS.IGNORE
 
-    def prepare_mseed_download(self, mseed_storage):
+    def prepare_mseed_download(self, mseed_storage, directory_contents=None):
         """
         Loop through all channels of the station and distribute filenames
         and the current status of the channel.
@@ -345,7 +353,15 @@ class Station(_SlotsEqualityComparisionObject):
         NEEDS_DOWNLOADING.
 
         :param mseed_storage:
+        :type directory_contents: dict
+        :param directory_contents: If given, each directory is only listed
+            once instead of checking each file separately. Maps the
+            directories that have already been listed to sets of the
+            contained file names and is updated by this method.
         """
+        # Enum lookups are comparatively slow.
+        ignore, exists, needs_downloading = \
+            STATUS.IGNORE, STATUS.EXISTS, STATUS.NEEDS_DOWNLOADING
         for channel in self.channels:
             for interval in channel.intervals:
                 interval.filename = utils.get_mseed_filename(
@@ -353,15 +369,29 @@ class Station(_SlotsEqualityComparisionObject):
                     channel.location, channel.channel, interval.start,
                     interval.end)
                 if interval.filename is True:
-                    interval.status = STATUS.IGNORE
+                    interval.status = ignore
+                elif directory_contents is not None:
+                    dirname, basename = os.path.split(interval.filename)
+                    contents = directory_contents.get(dirname)
+                    if contents is None:
+                        if os.path.isdir(dirname or os.curdir):
+                            contents = set(os.listdir(dirname or os.curdir))
+                        else:
+                            os.makedirs(dirname)
+                            contents = set()
+                        directory_contents[dirname] = contents
+                    if basename in contents:
+                        interval.status = exists
+                    else:
+                        interval.status = needs_downloading
                 elif os.path.exists(interval.filename):
-                    interval.status = STATUS.EXISTS
+                    interval.status = exists
                 else:
                     if not os.path.exists(os.path.dirname(interval.filename)):
                         os.makedirs(os.path.dirname(interval.filename))
-                    interval.status = STATUS.NEEDS_DOWNLOADING
+                    interval.status = needs_downloading
 
-    def sanitize_downloads(self, logger):
+    def sanitize_downloads(self, logger, data_coverage=None):
         """
         Should be run after the MiniSEED and StationXML downloads finished.
         It will make sure that every MiniSEED file also has a corresponding
@@ -370,6 +400,11 @@ class Station(_SlotsEqualityComparisionObject):
         It will delete MiniSEED files but never a StationXML file. The logic
         of the download helpers does not allow for a StationXML file with no
         data.
+
+        :type data_coverage: dict
+        :param data_coverage: Start and end time of the data per filename
+            as determined by the quality checks after the download. Only
+            files not in there have to be read again.
         """
         from obspy.io.mseed.util import get_start_and_end_time
         # All or nothing for each channel.
@@ -387,8 +422,12 @@ class Station(_SlotsEqualityComparisionObject):
                         not os.path.isfile(time_interval.filename):
                     continue
                 # Check that the time_interval.start and end are correct!
-                time_interval.start, time_interval.end = \
-                    get_start_and_end_time(time_interval.filename)
+                if data_coverage and time_interval.filename in data_coverage:
+                    time_interval.start, time_interval.end = \
+                        data_coverage[time_interval.filename]
+                else:
+                    time_interval.start, time_interval.end = \
+                        get_start_and_end_time(time_interval.filename)
                 # Only delete downloaded things!
                 if time_interval.status == STATUS.DOWNLOADED:
                     # Only delete if the station data are actually missing
@@ -475,6 +514,36 @@ class TimeInterval(_SlotsEqualityComparisionObject):
                    status=str(self.status))
 
 
+def _remove_most_connected(count, pairs):
+    """
+    Repeatedly removes the point with the most pairs until no pairs are left.
+
+    Ties are resolved in favor of the lowest index.
+
+    :param count: Number of points.
+    :param pairs: Pairs of point indices.
+    :returns: Boolean array, True for all removed points.
+    """
+    removed = np.zeros(count, dtype=np.bool_)
+    degree = np.zeros(count, dtype=np.int64)
+    neighbours = [[] for _ in range(count)]
+    for i, j in pairs:
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+        degree[i] += 1
+        degree[j] += 1
+    while count:
+        most_common = int(np.argmax(degree))
+        if degree[most_common] == 0:
+            break
+        removed[most_common] = True
+        degree[most_common] = 0
+        for neighbour in neighbours[most_common]:
+            if not removed[neighbour]:
+                degree[neighbour] -= 1
+    return removed
+
+
 class ClientDownloadHelper(object):
     """
     :type client: :class:`obspy.fdsn.client.Client`
@@ -500,6 +569,8 @@ class ClientDownloadHelper(object):
         self.logger = logger
         self.stations = {}
         self.is_availability_reliable = None
+        # Start and end time of the data of all downloaded MiniSEED files.
+        self.data_coverage = {}
 
     def __bool__(self):
         return bool(len(self))
@@ -531,8 +602,11 @@ class ClientDownloadHelper(object):
         This will distribute filenames and identify files that require
         downloading.
         """
+        directory_contents = {}
         for station in self.stations.values():
-            station.prepare_mseed_download(mseed_storage=self.mseed_storage)
+            station.prepare_mseed_download(
+                mseed_storage=self.mseed_storage,
+                directory_contents=directory_contents)
 
     def filter_stations_based_on_minimum_distance(
             self, existing_client_dl_helpers):
@@ -560,8 +634,7 @@ class ClientDownloadHelper(object):
         for dlh in existing_client_dl_helpers:
             existing_stations.extend(list(dlh.stations.values()))
 
-        remaining_stations = []
-        rejected_stations = []
+        minimum_distance = self.restrictions.minimum_interstation_distance_in_m
 
         # There are essentially two possibilities. If no station exists yet,
         # it will choose the largest subset of stations satisfying the
@@ -570,71 +643,49 @@ class ClientDownloadHelper(object):
             # Build k-d-tree and query for the neighbours of each point within
             # the minimum distance.
             kd_tree = utils.SphericalNearestNeighbour(stations)
-            nns = kd_tree.query_pairs(
-                self.restrictions.minimum_interstation_distance_in_m)
-
-            indexes_to_remove = []
+            nns = kd_tree.query_pairs(minimum_distance)
             # Keep removing the station with the most pairs until no pairs are
             # left.
-            while nns:
-                most_common = collections.Counter(
-                    itertools.chain.from_iterable(nns)).most_common()[0][0]
-                indexes_to_remove.append(most_common)
-                nns = list(filterfalse(lambda x: most_common in x, nns))
-
-            # Remove these indices this results in a set of stations we wish to
-            # keep.
-            new_remaining_stations = [_i[1] for _i in enumerate(stations)
-                                      if _i[0] not in indexes_to_remove]
-            new_rejected_stations = [_i[1] for _i in enumerate(stations)
-                                     if _i[0] in indexes_to_remove]
-
-            # Station objects are not hashable thus we have to go the long
-            # route.
-            for st in new_remaining_stations:
-                if st not in remaining_stations:
-                    remaining_stations.append(st)
-
-            for st in new_rejected_stations:
-                if st not in rejected_stations:
-                    rejected_stations.append(st)
-
-            # Otherwise it will add new stations approximating a Poisson disk
+            remove = _remove_most_connected(len(stations), nns)
+            remaining_stations = [_s for _s, _r in zip(stations, remove)
+                                  if not _r]
+            rejected_stations = [_s for _s, _r in zip(stations, remove) if _r]
+
+        # Otherwise it will add new stations approximating a Poisson disk
         # distribution.
         else:
-            while stations:
-                # kd-tree with all existing_stations
-                existing_kd_tree = utils.SphericalNearestNeighbour(
-                    existing_stations)
-                # Now we have to get the distance to the closest existing
-                # station for all new stations.
-                distances = np.ma.array(existing_kd_tree.query(stations)[0])
-                if np.isinf(distances[0]):
-                    break
-                distances.mask = False
-
+            remaining_stations = []
+            rejected_stations = []
+            # Distance of all new stations to the closest existing station.
+            # It is updated with each added station, so the existing stations
+            # only have to be queried once.
+            existing_kd_tree = utils.SphericalNearestNeighbour(
+                existing_stations)
+            distances = existing_kd_tree.query(stations)[0]
+            latitudes = np.array([_i.latitude for _i in stations],
+                                 dtype=np.float64)
+            longitudes = np.array([_i.longitude for _i in stations],
+                                  dtype=np.float64)
+            candidates = np.arange(len(stations))
+            while len(candidates):
                 # Step one is to get rid of all stations that are closer
                 # than the minimum distance to any existing station.
-                remove = np.where(
-                    distances <
-                    self.restrictions.minimum_interstation_distance_in_m)[0]
-                rejected_stations.extend([stations[_i] for _i in remove])
-
-                keep = np.where(
-                    distances >=
-                    self.restrictions.minimum_interstation_distance_in_m)[0]
-                distances.mask[remove] = True
-
-                if len(keep):
-                    # Station with the largest distance to next closer station.
-                    largest = np.argmax(distances)
-                    remaining_stations.append(stations[largest])
-                    existing_stations.append(stations[largest])
-
-                    # Add all rejected stations here.
-                    stations = [stations[_i] for _i in keep if _i != largest]
-                else:
-                    stations = []
+                close = distances[candidates] < minimum_distance
+                rejected_stations.extend(
+                    [stations[_i] for _i in candidates[close]])
+                candidates = candidates[~close]
+                if not len(candidates):
+                    break
+                # Station with the largest distance to next closer station.
+                largest = candidates[np.argmax(distances[candidates])]
+                remaining_stations.append(stations[largest])
+                candidates = candidates[candidates != largest]
+                distances[candidates] = np.minimum(
+                    distances[candidates],
+                    utils.SphericalNearestNeighbour.degrees2meters(
+                        locations2degrees(
+                            latitudes[largest], longitudes[largest],
+                            latitudes[candidates], longitudes[candidates])))
 
         # Now actually delete the files and everything of the rejected
         # stations.
@@ -685,14 +736,8 @@ class ClientDownloadHelper(object):
         for station in self.stations.values():
             if not station.miss_station_information:
                 continue
-            s, e = station.temporal_bounds
-            if self.restrictions.station_starttime:
-                s = self.restrictions.station_starttime
-            if self.restrictions.station_endtime:
-                e = self.restrictions.station_endtime
-            bulk = [(station.network, station.station, channel.location,
-                     channel.channel, s, e) for channel in station.channels]
-            arguments.append((self.client, self.client_name, bulk,
+            arguments.append((self.client, self.client_name,
+                              self._get_stationxml_bulk(station),
                               station.stationxml_filename))
 
         if not arguments:
@@ -716,58 +761,8 @@ class ClientDownloadHelper(object):
         # Update the station structures. Loop over each returned file.
         for s_id, filename in results:
             filecount += 1
-            station = self.stations[s_id]
-            size = os.path.getsize(filename)
-            download_size += size
-
-            # Extract information about that file.
-            try:
-                info = utils.get_stationxml_contents(filename)
-            # Sometimes some services choose to not return XML files - guard
-            # against it and just delete the file. At subsequent runs the
-            # mass downloader will attempt to download it again.
-            except XMLSyntaxError:
-                self.logger.info(
-                    "Client '%s' - File %s is not an XML file - it will be "
-                    "deleted." % (self.client_name, filename))
-                utils.safe_delete(filename)
-                continue
-
-            still_missing = {}
-            # Make sure all missing information has been downloaded by
-            # looping over each channel of the station that originally
-            # requested to be downloaded.
-            for c_id, times in station.miss_station_information.items():
-                # Get the temporal range of information in the file.
-                c_info = [_i for _i in info if
-                          _i.network == station.network and
-                          _i.station == station.station and
-                          _i.location == c_id[0] and
-                          _i.channel == c_id[1]]
-                if not c_info:
-                    continue
-                starttime = min([_i.starttime for _i in c_info])
-                endtime = max([_i.endtime for _i in c_info])
-                if starttime > times[0] or endtime < times[1]:
-                    # Cope with case that not full day of station info missing
-                    if starttime < times[1]:
-                        still_missing[c_id] = (times[0], starttime)
-                        station.have_station_information[c_id] = (starttime,
-                                                                  times[1])
-                    elif endtime > times[0]:
-                        still_missing[c_id] = (endtime, times[1])
-                        station.have_station_information[c_id] = (times[0],
-                                                                  endtime)
-                    else:
-                        still_missing[c_id] = times
-                    continue
-                station.have_station_information[c_id] = times
-
-            station.miss_station_information = still_missing
-            if still_missing:
-                station.stationxml_status = STATUS.DOWNLOAD_PARTIALLY_FAILED
-            else:
-                station.stationxml_status = STATUS.DOWNLOADED
+            download_size += os.path.getsize(filename)
+            self._process_downloaded_stationxml(s_id, filename)
 
         # Now loop over all stations and set the status of the ones that
         # still need downloading to download failed.
@@ -782,14 +777,84 @@ class ClientDownloadHelper(object):
                              e_time - s_time,
                              (download_size / 1024.0) / (e_time - s_time)))
 
-    def download_mseed(self, chunk_size_in_mb=25, threads_per_client=3):
+    def _get_stationxml_bulk(self, station):
         """
-        Actually download MiniSEED data.
+        Returns the bulk request for the StationXML file of a station.
+        """
+        s, e = station.temporal_bounds
+        if self.restrictions.station_starttime:
+            s = self.restrictions.station_starttime
+        if self.restrictions.station_endtime:
+            e = self.restrictions.station_endtime
+        return [(station.network, station.station, channel.location,
+                 channel.channel, s, e) for channel in station.channels]
+
+    def _process_downloaded_stationxml(self, s_id, filename):
+        """
+        Updates the station information of a station from a freshly
+        downloaded StationXML file.
 
-        :param chunk_size_in_mb: Attempt to download data in chunks of this
-            size.
-        :param threads_per_client: Threads to launch per client. 3 seems to
-            be a value in agreement with some data centers.
+        Returns False if the file is not a valid StationXML file.
+        """
+        station = self.stations[s_id]
+
+        # Extract information about that file.
+        try:
+            info = utils.get_stationxml_contents(filename)
+        # Sometimes some services choose to not return XML files - guard
+        # against it and just delete the file. At subsequent runs the
+        # mass downloader will attempt to download it again.
+        except XMLSyntaxError:
+            self.logger.info(
+                "Client '%s' - File %s is not an XML file - it will be "
+                "deleted." % (self.client_name, filename))
+            utils.safe_delete(filename)
+            return False
+
+        still_missing = {}
+        # Make sure all missing information has been downloaded by
+        # looping over each channel of the station that originally
+        # requested to be downloaded.
+        for c_id, times in station.miss_station_information.items():
+            # Get the temporal range of information in the file.
+            c_info = [_i for _i in info if
+                      _i.network == station.network and
+                      _i.station == station.station and
+                      _i.location == c_id[0] and
+                      _i.channel == c_id[1]]
+            if not c_info:
+                continue
+            starttime = min([_i.starttime for _i in c_info])
+            endtime = max([_i.endtime for _i in c_info])
+            if starttime > times[0] or endtime < times[1]:
+                # Cope with case that not full day of station info missing
+                if starttime < times[1]:
+                    still_missing[c_id] = (times[0], starttime)
+                    station.have_station_information[c_id] = (starttime,
+                                                              times[1])
+                elif endtime > times[0]:
+                    still_missing[c_id] = (endtime, times[1])
+                    station.have_station_information[c_id] = (times[0],
+                                                              endtime)
+                else:
+                    still_missing[c_id] = times
+                continue
+            station.have_station_information[c_id] = times
+
+        station.miss_station_information = still_missing
+        if still_missing:
+            station.stationxml_status = STATUS.DOWNLOAD_PARTIALLY_FAILED
+        else:
+            station.stationxml_status = STATUS.DOWNLOADED
+        return True
+
+    def _get_mseed_chunks(self, chunk_size_in_mb):
+        """
+        Splits all time intervals that need downloading into chunks of about
+        ``chunk_size_in_mb``.
+
+        Returns the chunks and a counter of the status of all time
+        intervals.
         """
         # Estimate the download size to have equally sized chunks.
         channel_sampling_rate = {
@@ -807,6 +872,7 @@ class ClientDownloadHelper(object):
         max_chunk_length = 50
 
         counter = collections.Counter()
+        needs_downloading = STATUS.NEEDS_DOWNLOADING
 
         # Keep track of attempted downloads.
         for sta in self.stations.values():
@@ -819,22 +885,23 @@ class ClientDownloadHelper(object):
                 except KeyError:
                     # Generic sampling rate for exotic band codes.
                     sr = 1.0
-
-                for interval in cha.intervals:
-                    counter[interval.status] += 1
+                # Assume that each sample needs 4 byte, STEIM compression
+                # reduces size to about a third. Chunk size is in MB, times
+                # in nanoseconds.
+                mb_per_ns = sr * 4.0 / 3.0 / 1024.0 / 1024.0 / 1E9
+
+                statuses = [_i.status for _i in cha.intervals]
+                counter.update(statuses)
+                for interval, status in zip(cha.intervals, statuses):
                     # Only take those time intervals that actually require
                     # some downloading.
-                    if interval.status != STATUS.NEEDS_DOWNLOADING:
+                    if status != needs_downloading:
                         continue
                     chunks_curr.append((
                         sta.network, sta.station, cha.location, cha.channel,
                         interval.start, interval.end, interval.filename))
-                    # Assume that each sample needs 4 byte, STEIM
-                    # compression reduces size to about a third.
-                    # chunk size is in MB
-                    duration = interval.end - interval.start
                     curr_chunks_mb += \
-                        sr * duration * 4.0 / 3.0 / 1024.0 / 1024.0
+                        (interval.end.ns - interval.start.ns) * mb_per_ns
                     if curr_chunks_mb >= chunk_size_in_mb or \
                             len(chunks_curr) >= max_chunk_length:
                         chunks.append(chunks_curr)
@@ -842,14 +909,35 @@ class ClientDownloadHelper(object):
                         curr_chunks_mb = 0
         if chunks_curr:
             chunks.append(chunks_curr)
+        return chunks, counter
 
+    def _log_status_counts(self, counter, when):
         keys = sorted(counter.keys())
         for key in keys:
             self.logger.info(
-                "Client '%s' - Status for %i time intervals/channels before "
-                "downloading: %s" % (self.client_name, counter[key],
+                "Client '%s' - Status for %i time intervals/channels %s "
+                "downloading: %s" % (self.client_name, counter[key], when,
                                      key.upper()))
 
+    def _log_mseed_error(self, e):
+        msg = ("Client '%s' - " % self.client_name) + str(e)
+        if "no data available" in msg.lower():
+            self.logger.info(msg.split("Detailed response")[0].strip())
+        else:
+            self.logger.error(msg)
+
+    def download_mseed(self, chunk_size_in_mb=25, threads_per_client=3):
+        """
+        Actually download MiniSEED data.
+
+        :param chunk_size_in_mb: Attempt to download data in chunks of this
+            size.
+        :param threads_per_client: Threads to launch per client. 3 seems to
+            be a value in agreement with some data centers.
+        """
+        chunks, counter = self._get_mseed_chunks(chunk_size_in_mb)
+        self._log_status_counts(counter, "before")
+
         if not chunks:
             return
 
@@ -864,11 +952,7 @@ class ClientDownloadHelper(object):
                 ret_val = utils.download_and_split_mseed_bulk(
                     *args, logger=self.logger)
             except utils.ERRORS as e:
-                msg = ("Client '%s' - " % args[1]) + str(e)
-                if "no data available" in msg.lower():
-                    self.logger.info(msg.split("Detailed response")[0].strip())
-                else:
-                    self.logger.error(msg)
+                self._log_mseed_error(e)
                 return []
             return ret_val
 
@@ -898,15 +982,250 @@ class ClientDownloadHelper(object):
             for chan in sta.channels:
                 for interval in chan.intervals:
                     counter[interval.status] += 1
-        keys = sorted(counter.keys())
-        for key in keys:
-            self.logger.info(
-                "Client '%s' - Status for %i time intervals/channels after "
-                "downloading: %s" % (
-                    self.client_name, counter[key], key.upper()))
+        self._log_status_counts(counter, "after")
+
+        self._remove_failed_and_ignored_stations()
+
+    def download_mseed_and_stationxml(self, chunk_size_in_mb=25,
+                                      threads_per_client=3,
+                                      max_threads_per_client=None,
+                                      journal=None):
+        """
+        Download MiniSEED and StationXML data at the same time.
+
+        Has the same result as calling :meth:`download_mseed`,
+        :meth:`prepare_stationxml_download` and :meth:`download_stationxml`
+        one after the other, but the StationXML file of a station is
+        requested as soon as all its MiniSEED data has been downloaded and
+        checked, while the MiniSEED data of other stations is still being
+        downloaded.
+
+        The number of concurrent requests starts at ``threads_per_client``
+        and adapts to the throughput of the data center. It is reduced and
+        the requests are retried later if the data center answers with HTTP
+        codes 429 (too many requests) or 503 (service unavailable), see
+        :class:`~.scheduler.AdaptiveConcurrency`.
+
+        :param chunk_size_in_mb: Attempt to download data in chunks of this
+            size.
+        :param threads_per_client: Initial number of concurrent requests.
+        :param max_threads_per_client: Maximum number of concurrent
+            requests. Defaults to ``threads_per_client``.
+        :type journal: :class:`~.scheduler.DownloadJournal`
+        :param journal: Journal recording the progress. Time intervals the
+            journal knows to have no or no acceptable data are not requested
+            again.
+        """
+        if journal is not None:
+            self._apply_journal(journal)
+        chunks, counter = self._get_mseed_chunks(chunk_size_in_mb)
+        self._log_status_counts(counter, "before")
+
+        # Time intervals per filename and number of outstanding chunks per
+        # station.
+        intervals = {}
+        pending_chunks = collections.Counter()
+        for sta in self.stations.values():
+            for cha in sta.channels:
+                for interval in cha.intervals:
+                    if interval.status == STATUS.NEEDS_DOWNLOADING:
+                        intervals[interval.filename] = interval
+        for chunk in chunks:
+            for s_id in set((_i[0], _i[1]) for _i in chunk):
+                pending_chunks[s_id] += 1
+
+        limiter = AdaptiveConcurrency(threads_per_client,
+                                      max_threads_per_client)
+        tasks = queue.PriorityQueue()
+        results = queue.Queue()
+        sequence = itertools.count()
+
+        def submit(kind, payload, attempt=0):
+            # StationXML files are small and complete a station, request
+            # them first.
+            priority = 0 if kind == "stationxml" else 1
+            tasks.put((priority, next(sequence), kind, payload, attempt))
+
+        def submit_stationxml(station):
+            station.prepare_stationxml_download(
+                stationxml_storage=self.stationxml_storage,
+                logger=self.logger)
+            if not station.miss_station_information:
+                return 0
+            if journal is not None:
+                journal.record(station.stationxml_filename,
+                               DownloadJournal.STARTED)
+            submit("stationxml", (self._get_stationxml_bulk(station),
+                                  station.stationxml_filename))
+            return 1
+
+        def worker():
+            while True:
+                _, _, kind, payload, attempt = tasks.get()
+                if kind is None:
+                    return
+                limiter.acquire()
+                nbytes = 0
+                throttled = False
+                # False if the request did not complete, otherwise the
+                # return value of the download function.
+                result = False
+                try:
+                    if kind == "mseed":
+                        try:
+                            result = utils.download_and_split_mseed_bulk(
+                                self.client, self.client_name, payload,
+                                logger=self.logger)
+                        except FDSNNoDataException as e:
+                            self._log_mseed_error(e)
+                            result = []
+                        nbytes = sum(os.path.getsize(_i) for _i in result)
+                    else:
+                        result = utils.download_stationxml(
+                            self.client, self.client_name, payload[0],
+                            payload[1], logger=self.logger)
+                        if result:
+                            nbytes = os.path.getsize(payload[1])
+                except utils.THROTTLING_ERRORS as e:
+                    throttled = True
+                    error = e
+                except utils.ERRORS as e:
+                    self._log_mseed_error(e)
+                except Exception as e:
+                    self.logger.error(
+                        "Client '%s' - Unexpected error during download: "
+                        "%s" % (self.client_name, str(e)))
+                finally:
+                    limiter.release(nbytes=nbytes, throttled=throttled)
+                if throttled:
+                    if attempt < MAX_THROTTLED_RETRIES:
+                        self.logger.info(
+                            "Client '%s' - Data center is overloaded, "
+                            "reduced to %i concurrent requests." % (
+                                self.client_name, limiter.limit))
+                        submit(kind, payload, attempt + 1)
+                        continue
+                    self._log_mseed_error(error)
+                results.put((kind, payload, result))
+
+        outstanding = 0
+        for chunk in chunks:
+            if journal is not None:
+                journal.record([_i[6] for _i in chunk],
+                               DownloadJournal.STARTED)
+            submit("mseed", chunk)
+            outstanding += 1
+        # Stations with no data to download can get their station
+        # information right away.
+        for s_id, station in self.stations.items():
+            if not pending_chunks[s_id]:
+                outstanding += submit_stationxml(station)
+
+        workers = []
+        if outstanding:
+            for _ in range(limiter.maximum):
+                thread = threading.Thread(target=worker)
+                thread.daemon = True
+                thread.start()
+                workers.append(thread)
+
+        d_start = timeit.default_timer()
+        downloaded_bytes = 0
+        discarded_bytes = 0
+        stationxml_count = 0
+        stationxml_bytes = 0
+        while outstanding:
+            kind, payload, result = results.get()
+            outstanding -= 1
+            if kind == "stationxml":
+                filename = payload[1]
+                s_id = (payload[0][0][0], payload[0][0][1])
+                if result and self._process_downloaded_stationxml(
+                        s_id, filename):
+                    stationxml_count += 1
+                    stationxml_bytes += os.path.getsize(filename)
+                if journal is not None:
+                    status = self.stations[s_id].stationxml_status
+                    if status == STATUS.NEEDS_DOWNLOADING:
+                        status = STATUS.DOWNLOAD_FAILED
+                    journal.record(filename, status)
+                continue
+
+            for item in payload:
+                interval = intervals[item[6]]
+                downloaded, discarded = \
+                    self._check_downloaded_interval(interval)
+                downloaded_bytes += downloaded
+                discarded_bytes += discarded
+                if journal is None:
+                    continue
+                # The data center answered but had no data.
+                if result is not False and \
+                        interval.status == STATUS.DOWNLOAD_FAILED and \
+                        not os.path.exists(interval.filename):
+                    journal.record(interval.filename, DownloadJournal.NO_DATA)
+                else:
+                    journal.record(interval.filename, interval.status)
+            for s_id in set((_i[0], _i[1]) for _i in payload):
+                pending_chunks[s_id] -= 1
+                if not pending_chunks[s_id]:
+                    outstanding += submit_stationxml(self.stations[s_id])
+
+        for _ in workers:
+            tasks.put((2, next(sequence), None, None, None))
+        for thread in workers:
+            thread.join()
+        d_end = timeit.default_timer()
+
+        # Stations whose station information could not be downloaded.
+        for station in self.stations.values():
+            if station.stationxml_status == STATUS.NEEDS_DOWNLOADING:
+                station.stationxml_status = STATUS.DOWNLOAD_FAILED
+
+        duration = max(d_end - d_start, 1e-6)
+        total_bytes = downloaded_bytes + discarded_bytes + stationxml_bytes
+        self.logger.info(
+            "Client '%s' - Downloaded %.1f MB [%.2f KB/sec] of data and %i "
+            "station files, %.1f MB of which were discarded afterwards. %i "
+            "requests were throttled by the data center." % (
+                self.client_name, total_bytes / 1024.0 ** 2,
+                total_bytes / 1024.0 / duration, stationxml_count,
+                discarded_bytes / 1024.0 ** 2, limiter.throttled))
+
+        counter = collections.Counter()
+        for sta in self.stations.values():
+            for chan in sta.channels:
+                for interval in chan.intervals:
+                    counter[interval.status] += 1
+        self._log_status_counts(counter, "after")
 
         self._remove_failed_and_ignored_stations()
 
+    def _apply_journal(self, journal):
+        """
+        Skips all time intervals that according to the journal have no or
+        no acceptable data.
+        """
+        skipped = 0
+        for sta in self.stations.values():
+            for cha in sta.channels:
+                for interval in cha.intervals:
+                    if interval.status != STATUS.NEEDS_DOWNLOADING:
+                        continue
+                    state = journal.get(interval.filename)
+                    if state == DownloadJournal.NO_DATA:
+                        interval.status = STATUS.DOWNLOAD_FAILED
+                    elif state == STATUS.DOWNLOAD_REJECTED:
+                        interval.status = STATUS.DOWNLOAD_REJECTED
+                    else:
+                        continue
+                    skipped += 1
+        if skipped:
+            self.logger.info(
+                "Client '%s' - Skipping %i time intervals/channels that had "
+                "no acceptable data in previous runs." % (
+                    self.client_name, skipped))
+
     def _remove_failed_and_ignored_stations(self):
         """
         Removes all stations that have no time interval with either exists
@@ -927,7 +1246,8 @@ class ClientDownloadHelper(object):
         StationXML file.
         """
         for station in self.stations.values():
-            station.sanitize_downloads(logger=self.logger)
+            station.sanitize_downloads(logger=self.logger,
+                                       data_coverage=self.data_coverage)
 
     def _check_downloaded_data(self):
         """
@@ -942,79 +1262,86 @@ class ClientDownloadHelper(object):
         for sta in self.stations.values():
             for cha in sta.channels:
                 for interval in cha.intervals:
-                    # The status of the interval should not have changed if
-                    # it did not require downloading in the first place.
-                    if interval.status != STATUS.NEEDS_DOWNLOADING:
-                        continue
-
-                    # If the file does not exist, mark the time interval as
-                    # download failed.
-                    if not os.path.exists(interval.filename):
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
-
-                    size = os.path.getsize(interval.filename)
-                    if size == 0:
-                        self.logger.warning("Zero byte file '%s'. Will be "
-                                            "deleted." % interval.filename)
-                        utils.safe_delete(interval.filename)
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
-
-                    # Guard against faulty files.
-                    try:
-                        st = obspy.read(interval.filename, headonly=True)
-                    except Exception as e:
-                        self.logger.warning(
-                            "Could not read file '%s' due to: %s\n"
-                            "Will be discarded." % (interval.filename, str(e)))
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
-
-                    # Valid files with no data.
-                    if len(st) == 0:
-                        self.logger.warning(
-                            "Empty file '%s'. Will be deleted." %
-                            interval.filename)
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
+                    downloaded, discarded = \
+                        self._check_downloaded_interval(interval)
+                    downloaded_bytes += downloaded
+                    discarded_bytes += discarded
+        return downloaded_bytes, discarded_bytes
 
-                    # If user did not want gappy files, remove them.
-                    if self.restrictions.reject_channels_with_gaps is True and\
-                            len(st) > 1:
-                        self.logger.info(
-                            "File '%s' has %i traces and thus contains "
-                            "gaps or overlaps. Will be deleted." % (
-                                interval.filename, len(st)))
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_REJECTED
-                        continue
+    def _check_downloaded_interval(self, interval):
+        """
+        QC checks of a single time interval, see
+        :meth:`_check_downloaded_data`.
 
-                    if self.restrictions.minimum_length:
-                        duration = sum([tr.stats.endtime - tr.stats.starttime
-                                        for tr in st])
-                        expected_min_duration = \
-                            self.restrictions.minimum_length * \
-                            (interval.end - interval.start)
-                        if duration < expected_min_duration:
-                            self.logger.info(
-                                "File '%s' has only %.2f seconds of data. "
-                                "%.2f are required. File will be deleted." %
-                                (interval.filename, duration,
-                                 expected_min_duration))
-                            utils.safe_delete(interval.filename)
-                            discarded_bytes += size
-                            interval.status = STATUS.DOWNLOAD_REJECTED
-                            continue
-
-                    downloaded_bytes += size
-                    interval.status = STATUS.DOWNLOADED
-        return downloaded_bytes, discarded_bytes
+        Returns the downloaded and the discarded bytes.
+        """
+        # The status of the interval should not have changed if it did not
+        # require downloading in the first place.
+        if interval.status != STATUS.NEEDS_DOWNLOADING:
+            return 0, 0
+
+        # If the file does not exist, mark the time interval as download
+        # failed.
+        if not os.path.exists(interval.filename):
+            interval.status = STATUS.DOWNLOAD_FAILED
+            return 0, 0
+
+        size = os.path.getsize(interval.filename)
+        if size == 0:
+            self.logger.warning("Zero byte file '%s'. Will be deleted." %
+                                interval.filename)
+            utils.safe_delete(interval.filename)
+            interval.status = STATUS.DOWNLOAD_FAILED
+            return 0, 0
+
+        # Guard against faulty files. Only the headers are read.
+        try:
+            st = obspy.read(interval.filename, format="MSEED", headonly=True)
+        except Exception as e:
+            self.logger.warning(
+                "Could not read file '%s' due to: %s\n"
+                "Will be discarded." % (interval.filename, str(e)))
+            utils.safe_delete(interval.filename)
+            interval.status = STATUS.DOWNLOAD_FAILED
+            return 0, size
+
+        # Valid files with no data.
+        if len(st) == 0:
+            self.logger.warning(
+                "Empty file '%s'. Will be deleted." % interval.filename)
+            utils.safe_delete(interval.filename)
+            interval.status = STATUS.DOWNLOAD_FAILED
+            return 0, size
+
+        # If user did not want gappy files, remove them.
+        if self.restrictions.reject_channels_with_gaps is True and \
+                len(st) > 1:
+            self.logger.info(
+                "File '%s' has %i traces and thus contains gaps or overlaps. "
+                "Will be deleted." % (interval.filename, len(st)))
+            utils.safe_delete(interval.filename)
+            interval.status = STATUS.DOWNLOAD_REJECTED
+            return 0, size
+
+        if self.restrictions.minimum_length:
+            duration = sum([tr.stats.endtime - tr.stats.starttime
+                            for tr in st])
+            expected_min_duration = self.restrictions.minimum_length * \
+                (interval.end - interval.start)
+            if duration < expected_min_duration:
+                self.logger.info(
+                    "File '%s' has only %.2f seconds of data. %.2f are "
+                    "required. File will be deleted." %
+                    (interval.filename, duration, expected_min_duration))
+                utils.safe_delete(interval.filename)
+                interval.status = STATUS.DOWNLOAD_REJECTED
+                return 0, size
+
+        interval.status = STATUS.DOWNLOADED
+        self.data_coverage[interval.filename] = (
+            min(tr.stats.starttime for tr in st),
+            max(tr.stats.endtime for tr in st))
+        return size, 0
 
     def _parse_miniseed_filenames(self, filenames, restrictions):
         time_range = restrictions.minimum_length * (restrictions.endtime -
@@ -1148,9 +1475,9 @@ class ClientDownloadHelper(object):
         self.logger.info("Client '%s' - Successfully requested availability "
                          "(%.2f seconds)" % (self.client_name, end - start))
 
-        # Get the time intervals from the restrictions.
-        intervals = [TimeInterval(start=_i[0], end=_i[1])
-                     for _i in self.restrictions]
+        # Get the time intervals from the restrictions. The times are shared
+        # by the time intervals of all channels.
+        bounds = list(self.restrictions)
 
         for network in inv:
             # Skip network if so desired.
@@ -1186,20 +1513,23 @@ class ClientDownloadHelper(object):
                     continue
 
                 channels = []
+                channel_ids = set()
                 for channel in station.channels:
                     # Remove channels that somehow slipped past the temporal
                     # constraints due to weird behaviour from the data center.
                     if (channel.start_date > self.restrictions.endtime) or \
                             (channel.end_date < self.restrictions.starttime):
                         continue
-                    new_channel = Channel(
-                        location=channel.location_code, channel=channel.code,
-                        intervals=copy.deepcopy(intervals))
                     # Multiple channel epochs would result in duplicate
-                    # channels which we don't want. Bit of a silly logic here
-                    # to get rid of them.
-                    if new_channel not in channels:
-                        channels.append(new_channel)
+                    # channels which we don't want.
+                    channel_id = (channel.location_code, channel.code)
+                    if channel_id in channel_ids:
+                        continue
+                    channel_ids.add(channel_id)
+                    channels.append(Channel(
+                        location=channel.location_code, channel=channel.code,
+                        intervals=[TimeInterval(start=_s, end=_e)
+                                   for _s, _e in bounds]))
 
                 if self.restrictions.channel is None:
                     # Group by locations and apply the channel priority filter
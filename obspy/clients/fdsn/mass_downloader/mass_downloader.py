@@ -25,6 +25,7 @@ from obspy.clients.fdsn.client import Client
 
 from . import utils
 from .download_helpers import ClientDownloadHelper, STATUS
+from .scheduler import DownloadJournal
 
 
 # Setup the logger.
@@ -106,7 +107,8 @@ class MassDownloader(object):
 
     def download(self, domain, restrictions, mseed_storage,
                  stationxml_storage, download_chunk_size_in_mb=20,
-                 threads_per_client=3, print_report=True):
+                 threads_per_client=3, print_report=True,
+                 max_threads_per_client=None, journal=None):
         """
         Launch the actual data download.
 
@@ -130,7 +132,43 @@ class MassDownloader(object):
         :param threads_per_client: The number of download threads launched
             per client.
         :type threads_per_client: int
+        :param max_threads_per_client: The number of download threads per
+            client adapts to the observed throughput and is reduced if a data
+            center reports to be overloaded. This is the upper limit,
+            defaults to ``threads_per_client``.
+        :type max_threads_per_client: int
+        :param journal: Name of a file to record the progress of the
+            download in. A restarted download with the same journal deletes
+            files that were only partially written when it was interrupted
+            and does not request data again that was not available or got
+            rejected before.
+        :type journal: str or :class:`~.scheduler.DownloadJournal`
         """
+        if journal is not None and not isinstance(journal, DownloadJournal):
+            journal = DownloadJournal(journal)
+            close_journal = True
+        else:
+            close_journal = False
+        if journal is not None:
+            journal.remove_unfinished(logger=logger)
+        try:
+            return self._download(
+                domain=domain, restrictions=restrictions,
+                mseed_storage=mseed_storage,
+                stationxml_storage=stationxml_storage,
+                download_chunk_size_in_mb=download_chunk_size_in_mb,
+                threads_per_client=threads_per_client,
+                print_report=print_report,
+                max_threads_per_client=max_threads_per_client,
+                journal=journal)
+        finally:
+            if close_journal:
+                journal.close()
+
+    def _download(self, domain, restrictions, mseed_storage,
+                  stationxml_storage, download_chunk_size_in_mb,
+                  threads_per_client, print_report, max_threads_per_client,
+                  journal):
         # The downloads from each client will be handled separately.
         # Nonetheless collect all in this dictionary.
         client_download_helpers = {}
@@ -195,14 +233,14 @@ class MassDownloader(object):
             logger.info("Client '%s' - Will attempt to download data from %i "
                         "stations." % (client_name, len(helper)))
 
-            # Download MiniSEED data.
+            # Download MiniSEED and StationXML data. The station information
+            # of a station is downloaded as soon as its waveforms are done.
             helper.prepare_mseed_download()
-            helper.download_mseed(chunk_size_in_mb=download_chunk_size_in_mb,
-                                  threads_per_client=threads_per_client)
-
-            # Download StationXML data.
-            helper.prepare_stationxml_download()
-            helper.download_stationxml()
+            helper.download_mseed_and_stationxml(
+                chunk_size_in_mb=download_chunk_size_in_mb,
+                threads_per_client=threads_per_client,
+                max_threads_per_client=max_threads_per_client,
+                journal=journal)
 
             # Sanitize the downloaded things if desired. Assures that all
             # waveform data also has the corresponding station information.
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Scheduling helpers for the mass downloader: adaptive per provider
+concurrency and a journal to resume interrupted downloads.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import json
+import os
+import threading
+import time
+
+
+class AdaptiveConcurrency(object):
+    """
+    Limits the number of concurrent requests to a single data center.
+
+    The limit starts at ``initial`` and adapts to the observed throughput:
+    after each window of completed requests the limit is moved by one in the
+    direction that increased the number of downloaded bytes per second.
+    Throttling responses (HTTP codes 429 and 503) halve the limit and pause
+    all new requests for an exponentially growing time.
+
+    :type initial: int
+    :param initial: Initial number of concurrent requests.
+    :type maximum: int
+    :param maximum: Maximum number of concurrent requests.
+    :type minimum: int
+    :param minimum: Minimum number of concurrent requests.
+    :type backoff: float
+    :param backoff: Pause in seconds after the first throttling response.
+    """
+    def __init__(self, initial, maximum=None, minimum=1, backoff=2.0):
+        self.maximum = max(maximum or initial, initial)
+        self.minimum = max(1, min(minimum, initial))
+        self.limit = max(initial, self.minimum)
+        self.backoff = backoff
+        self.throttled = 0
+        self._active = 0
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._condition = threading.Condition()
+        self._direction = 1
+        self._previous = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = time.time()
+        self._window_bytes = 0
+        self._window_count = 0
+
+    def acquire(self):
+        """
+        Blocks until another request may be started.
+        """
+        with self._condition:
+            while True:
+                wait = self._paused_until - time.time()
+                if wait <= 0 and self._active < self.limit:
+                    break
+                self._condition.wait(wait if wait > 0 else None)
+            self._active += 1
+
+    def release(self, nbytes=0, throttled=False):
+        """
+        Marks a request as finished.
+
+        :param nbytes: Number of downloaded bytes.
+        :param throttled: True if the data center rejected the request
+            because it is overloaded.
+        """
+        with self._condition:
+            self._active -= 1
+            if throttled:
+                self._throttle()
+            else:
+                self._consecutive_throttles = 0
+                self._window_bytes += nbytes
+                self._window_count += 1
+                if self._window_count >= max(4, 2 * self.limit):
+                    self._adjust()
+            self._condition.notify_all()
+
+    def _throttle(self):
+        self.throttled += 1
+        self.limit = max(self.minimum, self.limit // 2)
+        self._paused_until = time.time() + min(
+            60.0, self.backoff * 2 ** self._consecutive_throttles)
+        self._consecutive_throttles += 1
+        self._previous = None
+        self._direction = 1
+        self._reset_window()
+
+    def _adjust(self):
+        elapsed = max(time.time() - self._window_start, 1e-6)
+        rate = self._window_bytes / elapsed
+        if self._previous is not None:
+            previous_limit, previous_rate = self._previous
+            if rate < 0.95 * previous_rate:
+                # Worse than before: go back and try the other direction.
+                self._direction = -self._direction
+                self._previous = None
+                self.limit = previous_limit
+                self._reset_window()
+                return
+            if rate <= 1.05 * previous_rate:
+                # No significant change, stay.
+                self._previous = (self.limit, rate)
+                self._reset_window()
+                return
+        self._previous = (self.limit, rate)
+        self.limit = min(self.maximum, max(self.minimum,
+                                           self.limit + self._direction))
+        self._reset_window()
+
+
+class DownloadJournal(object):
+    """
+    Append-only journal of the files written by the mass downloader.
+
+    Before a file is requested it is marked as ``started``, once the
+    response has been processed its final status is recorded. When a
+    download is restarted, files that were started but never finished (e.g.
+    because the process was killed while writing them) are deleted with
+    :meth:`remove_unfinished` and downloaded again. Time intervals for which
+    the data center answered without data (``no_data``) or whose data was
+    rejected by the quality checks are not requested again.
+
+    >>> import os, tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), "journal.jsonl")
+    >>> journal = DownloadJournal(filename)
+    >>> journal.record(["a.mseed", "b.mseed"], DownloadJournal.STARTED)
+    >>> journal.record("a.mseed", "downloaded")
+    >>> journal.close()
+    >>> journal = DownloadJournal(filename)
+    >>> print(journal.get("a.mseed"))
+    downloaded
+    >>> journal.is_unfinished("b.mseed")
+    True
+
+    :type filename: str
+    :param filename: The file the journal is stored in. It is created if it
+        does not exist and compacted when opened.
+    """
+    STARTED = "started"
+    NO_DATA = "no_data"
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.states = {}
+        self._lock = threading.Lock()
+        if os.path.exists(filename):
+            with io.open(filename, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Truncated last line of an interrupted run.
+                        continue
+                    self.states[entry["file"]] = entry["state"]
+        # Compact, only the final state of each file is of interest.
+        temp = filename + ".tmp"
+        with io.open(temp, "wt", encoding="utf-8") as fh:
+            for name, state in sorted(self.states.items()):
+                fh.write(self._line(name, state))
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp, filename)
+        self._fh = io.open(filename, "at", encoding="utf-8")
+
+    @staticmethod
+    def _line(filename, state):
+        return "%s\n" % json.dumps({"file": filename, "state": state})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+
+    def get(self, filename):
+        """
+        Returns the recorded state of a file or None.
+        """
+        return self.states.get(filename)
+
+    def is_unfinished(self, filename):
+        """
+        True if the file was started but never finished.
+        """
+        return self.states.get(filename) == self.STARTED
+
+    def remove_unfinished(self, logger=None):
+        """
+        Deletes all files whose download has been started but not finished.
+
+        Returns the names of the deleted files.
+        """
+        removed = []
+        for filename, state in sorted(self.states.items()):
+            if state != self.STARTED:
+                continue
+            if os.path.exists(filename):
+                if logger is not None:
+                    logger.info("Deleting possibly incomplete file '%s' of "
+                                "an interrupted download." % filename)
+                os.remove(filename)
+                removed.append(filename)
+        return removed
+
+    def record(self, filenames, state):
+        """
+        Records the state of one or more files.
+        """
+        if not isinstance(filenames, (list, tuple, set)):
+            filenames = [filenames]
+        with self._lock:
+            for filename in filenames:
+                self.states[filename] = str(state)
+                self._fh.write(self._line(filename, str(state)))
+            self._fh.flush()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -20,7 +20,6 @@ import os
 import sys
 from lxml import etree
 import numpy as np
-from scipy.spatial import cKDTree
 from socket import timeout as socket_timeout
 
 if sys.version_info.major == 2:
@@ -30,7 +29,10 @@ else:
 
 import obspy
 from obspy.core.util.base import NamedTemporaryFile
+from obspy.geodetics import SpatialIndex
 from obspy.clients.fdsn.client import FDSNException
+from obspy.clients.fdsn.header import (FDSNServiceUnavailableException,
+                                       FDSNTooManyRequestsException)
 from obspy.io.mseed.util import get_record_information
 
 
@@ -48,6 +50,10 @@ else:
 
 ERRORS = tuple(ERRORS)
 
+# Errors signaling that a data center wants to receive less requests.
+THROTTLING_ERRORS = (FDSNTooManyRequestsException,
+                     FDSNServiceUnavailableException)
+
 # mean earth radius in meter as defined by the International Union of
 # Geodesy and Geophysics. Used for the spherical kd-tree.
 EARTH_RADIUS = 6371009
@@ -80,6 +86,9 @@ def download_stationxml(client, client_name, bulk, filename, logger):
     try:
         client.get_stations_bulk(bulk=bulk, level="response",
                                  filename=filename)
+    except THROTTLING_ERRORS:
+        # Handled by the scheduler which will try again later.
+        raise
     except Exception:
         logger.info("Failed to download StationXML from '%s' for station "
                     "'%s.%s'." % (client_name, network, station))
@@ -279,47 +288,36 @@ def download_and_split_mseed_bulk(client, client_name, chunks, logger):
 
 class SphericalNearestNeighbour(object):
     """
-    Spherical nearest neighbour queries using scipy's fast kd-tree
-    implementation.
+    Spherical nearest neighbour queries for stations based on
+    :class:`~obspy.geodetics.spatial_index.SpatialIndex`.
+
+    All distances are great circle distances in meters.
     """
     def __init__(self, data):
-        cart_data = self.spherical2cartesian(data)
         self.data = data
-        self.kd_tree = cKDTree(data=cart_data, leafsize=10)
+        self.index = SpatialIndex(
+            [_i.latitude for _i in data], [_i.longitude for _i in data],
+            items=data, leafsize=10)
 
     def query(self, points):
-        points = self.spherical2cartesian(points)
-        d, i = self.kd_tree.query(points)
+        d, i = self.index.query_nearest(
+            [_i.latitude for _i in points], [_i.longitude for _i in points])
 
-        # Filter NaNs. Happens when not enough points are available.
+        # Filter infinite distances. Happens when not enough points are
+        # available.
         m = np.isfinite(d)
-        return d[m], i[m]
+        return self.degrees2meters(d[m]), i[m]
 
     def query_pairs(self, maximum_distance):
-        return self.kd_tree.query_pairs(maximum_distance)
+        return self.index.query_pairs(self.meters2degrees(maximum_distance))
 
     @staticmethod
-    def spherical2cartesian(data):
-        """
-        Converts a list of :class:`~obspy.fdsn.download_status.Station`
-        objects to an array of shape(len(list), 3) containing x/y/z in meters.
-        """
-        # Create three arrays containing lat/lng/radius.
-        shape = len(data)
-        lat = np.array([_i.latitude for _i in data], dtype=np.float64)
-        lon = np.array([_i.longitude for _i in data], dtype=np.float64)
-        r = np.array([EARTH_RADIUS for _ in data], dtype=np.float64)
-        # Convert data from lat/lng to x/y/z.
-        colat = 90.0 - lat
-        cart_data = np.empty((shape, 3), dtype=np.float64)
-
-        cart_data[:, 0] = r * np.sin(np.deg2rad(colat)) * \
-            np.cos(np.deg2rad(lon))
-        cart_data[:, 1] = r * np.sin(np.deg2rad(colat)) * \
-            np.sin(np.deg2rad(lon))
-        cart_data[:, 2] = r * np.cos(np.deg2rad(colat))
+    def degrees2meters(degrees):
+        return np.radians(degrees) * EARTH_RADIUS
 
-        return cart_data
+    @staticmethod
+    def meters2degrees(meters):
+        return np.degrees(meters / EARTH_RADIUS)
 
 
 def filter_channel_priority(channels, key, priorities=None):
@@ -517,6 +515,24 @@ def get_stationxml_filename(str_or_fct, network, station, channels,
         raise TypeError("'%s' is not a filepath." % str(path))
 
 
+# Formatted times for the MiniSEED filenames. The time intervals of all
+# channels share the same times so they only have to be formatted once.
+_TIME_STRINGS = {}
+
+
+def _format_time(time):
+    key = time.ns
+    try:
+        return _TIME_STRINGS[key]
+    except KeyError:
+        pass
+    if len(_TIME_STRINGS) > 100000:
+        _TIME_STRINGS.clear()
+    value = time.strftime("%Y%m%dT%H%M%SZ")
+    _TIME_STRINGS[key] = value
+    return value
+
+
 def get_mseed_filename(str_or_fct, network, station, location, channel,
                        starttime, endtime):
     """
@@ -538,7 +554,6 @@ def get_mseed_filename(str_or_fct, network, station, location, channel,
     In the last two cases, the times will be formatted with
     ``"%Y%m%dT%H%M%SZ"``.
     """
-    strftime = "%Y%m%dT%H%M%SZ"
     if callable(str_or_fct):
         path = str_or_fct(network, station, location, channel, starttime,
                           endtime)
@@ -547,15 +562,15 @@ def get_mseed_filename(str_or_fct, network, station, location, channel,
             ("{starttime}" in str_or_fct) and ("{endtime}" in str_or_fct):
         path = str_or_fct.format(
             network=network, station=station, location=location,
-            channel=channel, starttime=starttime.strftime(strftime),
-            endtime=endtime.strftime(strftime))
+            channel=channel, starttime=_format_time(starttime),
+            endtime=_format_time(endtime))
     else:
         path = os.path.join(
             str_or_fct,
             "{network}.{station}.{location}.{channel}__{s}__{e}.mseed".format(
                 network=network, station=station, location=location,
-                channel=channel, s=starttime.strftime(strftime),
-                e=endtime.strftime(strftime)))
+                channel=channel, s=_format_time(starttime),
+                e=_format_time(endtime)))
 
     if path is True:
         return True
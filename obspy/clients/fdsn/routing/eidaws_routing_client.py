@@ -67,6 +67,11 @@ class EIDAWSRoutingClient(BaseRoutingClient):
         The ``filename`` and ``attach_response`` parameters of the single
         provider FDSN client are not supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and a :class:`~obspy.core.stream.Stream`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the `EIDAWS Routing Service
         <http://www.orfeus-eu.org/data/eida/webservices/routing/>`_
@@ -80,6 +85,9 @@ class EIDAWSRoutingClient(BaseRoutingClient):
         # a lot more complicated. I guess in most cases people will use bulk
         # requests for the same time span so it should be fine.
 
+        # Only the waveforms are passed to the callback.
+        callback = kwargs.pop("callback", None)
+
         # Group by time interval - utilize the existing get_bulk_string()
         # method to not have to deal with various different inputs.
         _tmp_bulk_str = get_bulk_string(bulk, {})
@@ -117,6 +125,8 @@ class EIDAWSRoutingClient(BaseRoutingClient):
         r = self._download(self._url + "/query", data=bulk_str)
         split = self._split_routing_response(
             r.content.decode() if hasattr(r.content, "decode") else r.content)
+        if callback is not None:
+            kwargs["callback"] = callback
         return self._download_waveforms(split, **kwargs)
 
     @_assert_filename_not_in_kwargs
@@ -138,6 +148,12 @@ class EIDAWSRoutingClient(BaseRoutingClient):
         The ``filename`` parameter of the single provider FDSN client is not
         supported for practical reasons.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and an
+        :class:`~obspy.core.inventory.inventory.Inventory`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the `EIDAWS Routing Service
         <http://www.orfeus-eu.org/data/eida/webservices/routing/>`_
@@ -159,6 +175,12 @@ class EIDAWSRoutingClient(BaseRoutingClient):
         The ``filename`` parameter of the single provider FDSN client is not
         supported for practical reasons.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and an
+        :class:`~obspy.core.inventory.inventory.Inventory`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the `EIDAWS Routing Service
         <http://www.orfeus-eu.org/data/eida/webservices/routing/>`_
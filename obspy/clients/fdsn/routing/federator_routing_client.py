@@ -67,6 +67,11 @@ class FederatorRoutingClient(BaseRoutingClient):
         The ``filename`` and ``attach_response`` parameters of the single
         provider FDSN client are not supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and a :class:`~obspy.core.stream.Stream`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the
         `IRIS Federator  <https://service.iris.edu/irisws/fedcatalog/1/>`_
@@ -102,6 +107,12 @@ class FederatorRoutingClient(BaseRoutingClient):
         The ``filename`` parameter of the single provider FDSN client is not
         supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and an
+        :class:`~obspy.core.inventory.inventory.Inventory`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the
         `IRIS Federator  <https://service.iris.edu/irisws/fedcatalog/1/>`_
@@ -121,6 +132,12 @@ class FederatorRoutingClient(BaseRoutingClient):
         The ``filename`` parameter of the single provider FDSN client is not
         supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and an
+        :class:`~obspy.core.inventory.inventory.Inventory`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web site of the
         `IRIS Federator  <https://service.iris.edu/irisws/fedcatalog/1/>`_
@@ -14,12 +14,16 @@ Base class for all FDSN routers.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import PY2
 
 from multiprocessing.dummy import Pool as ThreadPool
 
+import collections
 import decorator
 import io
 import sys
+import threading
+import time
 import traceback
 import warnings
 
@@ -30,7 +34,20 @@ import obspy
 from ...base import HTTPClient
 from .. import client
 from ..client import raise_on_error
-from ..header import FDSNException, URL_MAPPINGS, FDSNNoDataException
+from ..header import (FDSNException, URL_MAPPINGS, FDSNNoDataException,
+                      FDSNRequestTooLargeException, FDSNTimeoutException,
+                      FDSNServiceUnavailableException,
+                      FDSNTooManyRequestsException)
+
+if PY2:
+    import Queue as queue
+else:
+    import queue
+
+
+# Errors after which a request is retried.
+TRANSIENT_ERRORS = (FDSNTimeoutException, FDSNServiceUnavailableException,
+                    FDSNTooManyRequestsException)
 
 
 def RoutingClient(routing_type, *args, **kwargs):  # NOQA
@@ -90,17 +107,62 @@ def _assert_attach_response_not_in_kwargs(f, *args, **kwargs):
 
 
 def _try_download_bulk(r):
+    """
+    Downloads a single request, retries it if the data center is
+    temporarily unable to serve it and splits it if it is too large.
+
+    Never raises, failures are turned into warnings and None is returned.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _download_bulk(r)
+        except FDSNRequestTooLargeException:
+            lines = _split_bulk_string(r["bulk_str"], 2)
+            if len(lines) < 2:
+                reason = "Request would result in too much data."
+                break
+            results = [_try_download_bulk(dict(r, bulk_str=_i))
+                       for _i in lines]
+            results = [_i for _i in results if _i]
+            if not results:
+                return None
+            collection = results[0]
+            for _i in results[1:]:
+                collection += _i
+            return collection
+        except TRANSIENT_ERRORS:
+            if attempt >= r["retries"]:
+                reason = "".join(traceback.format_exception(*sys.exc_info()))
+                break
+            time.sleep(r["backoff"] * 2 ** attempt)
+            attempt += 1
+        except Exception:
+            reason = "".join(traceback.format_exception(*sys.exc_info()))
+            break
+    warnings.warn(
+        "Failed to download data of type '%s' from '%s' due to: \n%s" % (
+            r["data_type"], r["endpoint"], reason))
+    return None
+
+
+def _download_to_queue(r, finished):
+    """
+    Runs :func:`_try_download_bulk` in a thread of the pool and puts
+    ``(endpoint, result, exception)`` on the ``finished`` queue.
+
+    Exceptions, e.g. warnings turned into errors, are passed on so the
+    consumer does not wait forever and can raise them.
+    """
     try:
-        return _download_bulk(r)
-    except Exception:
-        reason = "".join(traceback.format_exception(*sys.exc_info()))
-        warnings.warn(
-            "Failed to download data of type '%s' from '%s' due to: \n%s" % (
-                r["data_type"], r["endpoint"], reason))
-        return None
+        result = _try_download_bulk(r)
+    except Exception as e:
+        finished.put((r["endpoint"], None, e))
+    else:
+        finished.put((r["endpoint"], result, None))
 
 
-def _download_bulk(r):
+def _init_client(r):
     # Figure out the passed credentials, if any. Two possibilities:
     # (1) User and password, given explicitly for the base URLs (or an
     #     explicity given `eida_token` key per URL).
@@ -120,6 +182,16 @@ def _download_bulk(r):
     if not credentials and "EIDA_TOKEN" in r["credentials"] and \
             c._has_eida_auth:
         c.set_eida_token(r["credentials"]["EIDA_TOKEN"])
+    return c
+
+
+def _download_bulk(r):
+    if "clients" in r:
+        c = r["clients"].get(r)
+    else:
+        c = _init_client(r)
+    if c is None:
+        return None
 
     if r["data_type"] == "waveform":
         fct = c.get_waveforms_bulk
@@ -135,10 +207,63 @@ def _download_bulk(r):
         bulk_str += "%s=%s\n" % (key, str(value))
     try:
         return fct(bulk_str + r["bulk_str"])
+    except (FDSNRequestTooLargeException, ) + TRANSIENT_ERRORS:
+        raise
     except FDSNException:
         return None
 
 
+def _split_bulk_string(bulk_str, chunks=None, max_lines=None):
+    r"""
+    Splits a bulk string into either ``chunks`` parts or parts with at most
+    ``max_lines`` request lines each.
+
+    ``key=value`` lines apply to the whole request and are kept in every
+    part.
+
+    >>> bulk_str = "level=channel\nA B C D\nE F G H\nI J K L"
+    >>> for _i in _split_bulk_string(bulk_str, max_lines=2):
+    ...     print(_i.replace("\n", " | "))
+    level=channel | A B C D | E F G H
+    level=channel | I J K L
+    """
+    header = []
+    lines = []
+    for line in bulk_str.splitlines():
+        if not line.strip():
+            continue
+        if "=" in line:
+            header.append(line)
+        else:
+            lines.append(line)
+    if chunks is not None:
+        max_lines = max(1, -(-len(lines) // chunks))
+    if not max_lines or len(lines) <= max_lines:
+        return [bulk_str]
+    return ["\n".join(header + lines[_i:_i + max_lines])
+            for _i in range(0, len(lines), max_lines)]
+
+
+class _ClientCache(object):
+    """
+    Initializes one client per data center and shares it between all
+    requests to that data center.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._clients = {}
+
+    def get(self, r):
+        with self._lock:
+            lock = self._locks.setdefault(r["endpoint"], threading.Lock())
+        # Only one thread initializes the client, the others wait for it.
+        with lock:
+            if r["endpoint"] not in self._clients:
+                self._clients[r["endpoint"]] = _init_client(r)
+            return self._clients[r["endpoint"]]
+
+
 def _strip_protocol(url):
     url = urlparse(url)
     return url.netloc + url.path
@@ -149,7 +274,9 @@ def _strip_protocol(url):
 # get_events() but also others).
 class BaseRoutingClient(HTTPClient):
     def __init__(self, debug=False, timeout=120, include_providers=None,
-                 exclude_providers=None, credentials=None):
+                 exclude_providers=None, credentials=None, max_concurrency=10,
+                 max_requests_per_provider=2, max_bulk_lines=1000,
+                 retries=2, backoff=2.0):
         """
         :type routing_type: str
         :param routing_type: The type of
@@ -174,8 +301,35 @@ class BaseRoutingClient(HTTPClient):
             center specific credentials.
             You can also use a URL mapping as for the normal FDSN client
             instead of the URL.
+        :type max_concurrency: int
+        :param max_concurrency: Maximum number of requests running at the
+            same time in total.
+        :type max_requests_per_provider: int
+        :param max_requests_per_provider: Maximum number of requests sent to
+            the same data center at the same time.
+        :type max_bulk_lines: int
+        :param max_bulk_lines: Bulk requests to a single data center with
+            more lines are split into multiple requests. ``None`` to never
+            split them. Requests denied by a data center because they would
+            result in too much data are always split.
+        :type retries: int
+        :param retries: Number of times a request is retried if it timed out
+            or the data center is temporarily unable to serve it (HTTP codes
+            429 and 503).
+        :type backoff: float
+        :param backoff: Time in seconds to wait before the first retry, the
+            time doubles with every further retry.
         """
         HTTPClient.__init__(self, debug=debug, timeout=timeout)
+        if max_concurrency < 1 or max_requests_per_provider < 1:
+            msg = ("max_concurrency and max_requests_per_provider must be "
+                   "at least 1.")
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.max_requests_per_provider = max_requests_per_provider
+        self.max_bulk_lines = max_bulk_lines
+        self.retries = retries
+        self.backoff = backoff
         self.include_providers = include_providers
         self.exclude_providers = exclude_providers
 
@@ -242,6 +396,35 @@ class BaseRoutingClient(HTTPClient):
         return self._download_parallel(split, data_type="station", **kwargs)
 
     def _download_parallel(self, split, data_type, **kwargs):
+        callback = kwargs.pop("callback", None)
+
+        # Merge all results into a single object.
+        if data_type == "waveform":
+            collection = obspy.Stream()
+        elif data_type == "station":
+            collection = obspy.Inventory(
+                networks=[],
+                source="ObsPy FDSN Routing %s" % obspy.__version__)
+        else:  # pragma: no cover
+            raise ValueError
+
+        for endpoint, result in self._iter_download(split, data_type,
+                                                    **kwargs):
+            if callback is not None:
+                callback(endpoint, result)
+            collection += result
+
+        return collection
+
+    def _iter_download(self, split, data_type, **kwargs):
+        """
+        Downloads the data from all data centers and yields
+        ``(endpoint, result)`` tuples in the order the requests finish.
+
+        At most ``max_concurrency`` requests run at the same time and at
+        most ``max_requests_per_provider`` of them to the same data center.
+        Requests that failed or returned no data are not yielded.
+        """
         # Apply the provider filter.
         split = self._filter_requests(split)
 
@@ -253,36 +436,61 @@ class BaseRoutingClient(HTTPClient):
         if data_type not in ["waveform", "station"]:  # pragma: no cover
             raise ValueError("Invalid data type.")
 
-        # One thread per data center.
-        dl_requests = []
-        for k, v in split.items():
-            dl_requests.append({
+        # Large bulk requests are split so the data of a data center is
+        # delivered in parts and a single failure does not lose all of it.
+        clients = _ClientCache()
+        pending = collections.OrderedDict()
+        for k, v in sorted(split.items()):
+            pending[k] = collections.deque({
                 "debug": self._debug,
                 "timeout": self._timeout,
                 "endpoint": k,
-                "bulk_str": v,
+                "bulk_str": _i,
                 "data_type": data_type,
                 "kwargs": kwargs,
-                "credentials": self.credentials})
-        pool = ThreadPool(processes=len(dl_requests))
-        results = pool.map(_try_download_bulk, dl_requests)
-
-        # Merge all results into a single object.
-        if data_type == "waveform":
-            collection = obspy.Stream()
-        elif data_type == "station":
-            collection = obspy.Inventory(
-                networks=[],
-                source="ObsPy FDSN Routing %s" % obspy.__version__)
-        else:  # pragma: no cover
-            raise ValueError
-
-        for _i in results:
-            if not _i:
-                continue
-            collection += _i
-
-        return collection
+                "credentials": self.credentials,
+                "retries": self.retries,
+                "backoff": self.backoff,
+                "clients": clients}
+                for _i in _split_bulk_string(
+                    v, max_lines=self.max_bulk_lines))
+        count = sum(len(_i) for _i in pending.values())
+
+        finished = queue.Queue()
+        active = collections.defaultdict(int)
+        running = 0
+        pool = ThreadPool(processes=min(self.max_concurrency, count))
+        try:
+            while True:
+                # Start as many requests as the limits allow, alternating
+                # between the data centers.
+                started = True
+                while started and running < self.max_concurrency:
+                    started = False
+                    for endpoint, requests in pending.items():
+                        if not requests or running >= self.max_concurrency \
+                                or active[endpoint] >= \
+                                self.max_requests_per_provider:
+                            continue
+                        r = requests.popleft()
+                        pool.apply_async(_download_to_queue, (r, finished))
+                        active[endpoint] += 1
+                        running += 1
+                        started = True
+                if not running:
+                    break
+                endpoint, result, exception = finished.get()
+                active[endpoint] -= 1
+                running -= 1
+                if exception is not None:
+                    raise exception
+                if result:
+                    yield endpoint, result
+            pool.close()
+        finally:
+            # Also reached if the caller stops iterating early.
+            pool.terminate()
+            pool.join()
 
     def _handle_requests_http_error(self, r):
         """
@@ -317,6 +525,11 @@ class BaseRoutingClient(HTTPClient):
         The ``filename`` and ``attach_response`` parameters of the single
         provider FDSN client are not supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and a :class:`~obspy.core.stream.Stream`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, depending on the
         service, please see the web site of each individual routing service
         for details.
@@ -353,6 +566,12 @@ class BaseRoutingClient(HTTPClient):
         The ``filename`` parameter of the single provider FDSN client is not
         supported.
 
+        Pass a ``callback`` function to process the data of each data center
+        as soon as it has been downloaded. It is called with the URL of the
+        data center and an
+        :class:`~obspy.core.inventory.inventory.Inventory`, large requests
+        are delivered in multiple parts.
+
         This can route on a number of different parameters, please see the
         web sites of the
         `IRIS Federator  <https://service.iris.edu/irisws/fedcatalog/1/>`_
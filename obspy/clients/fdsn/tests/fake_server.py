@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for an FDSN web service used by the offline tests.
+
+It serves the WADL files and example data from the ``data`` directory and
+allows to inject failures and delays.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import collections
+import gzip
+import hashlib
+import io
+import os
+import threading
+import time
+
+if PY2:
+    import BaseHTTPServer as http_server
+    import SocketServer as socketserver
+else:
+    import http.server as http_server
+    import socketserver
+
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+# Files served for the different resources of the services.
+RESOURCES = {
+    ("dataselect", "application.wadl"): "dataselect.wadl",
+    ("station", "application.wadl"): "station.wadl",
+    ("event", "application.wadl"): "event.wadl",
+    ("dataselect", "query"): "dataselect_example.mseed",
+    ("station", "query"): "AU.MEEK.xml",
+    ("event", "query"): "iris_events.xml",
+}
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http_server.HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping connections are expected, e.g. when an error
+        # response is not read.
+        pass
+
+
+class _RequestHandler(http_server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.fake._handle(self)
+
+    def do_POST(self):
+        self.server.fake._handle(self)
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+
+class FakeFDSNServer(object):
+    """
+    FDSN web service stand-in running in a background thread.
+
+    Use as a context manager, :attr:`url` is the base URL to pass to the
+    clients.
+
+    :ivar requests: List of ``(method, path, headers)`` of all requests.
+    :ivar failures: Deque of HTTP codes returned for the next queries
+        instead of the data, e.g. ``server.failures.extend([503, 503])``.
+    :ivar delay: Time in seconds each query takes.
+    :ivar etag: Send ``ETag`` and ``Last-Modified`` headers and answer
+        matching conditional requests with ``304 Not Modified``.
+    :ivar max_active: Maximum number of queries processed at the same time.
+    """
+    def __init__(self):
+        self.requests = []
+        self.failures = collections.deque()
+        self.retry_after = None
+        self.delay = 0.0
+        self.etag = False
+        self.last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._data = {}
+        for key, filename in RESOURCES.items():
+            with open(os.path.join(DATA, filename), "rb") as fh:
+                self._data[key] = fh.read()
+
+    def __enter__(self):
+        self.server = _ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler)
+        self.server.fake = self
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def queries(self, service=None):
+        """
+        Returns all query requests, optionally only for one service.
+        """
+        return [r for r in self.requests if "/query" in r[1] and
+                (service is None or "/%s/" % service in r[1])]
+
+    def _handle(self, handler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        if length:
+            handler.rfile.read(length)
+        path = handler.path.split("?")[0]
+        headers = dict((k.lower(), v) for k, v in handler.headers.items())
+        with self._lock:
+            self.requests.append((handler.command, handler.path, headers))
+        parts = path.strip("/").split("/")
+        if len(parts) != 4 or parts[0] != "fdsnws":
+            return self._respond(handler, 404, b"Not found")
+        key = (parts[1], parts[3])
+        if parts[3] == "version" and (parts[1], "query") in self._data:
+            return self._respond(handler, 200, b"1.1.0")
+        if key not in self._data:
+            return self._respond(handler, 404, b"Not found")
+        if parts[3] != "query":
+            return self._respond(handler, 200, self._data[key])
+
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            code = self.failures.popleft() if self.failures else 200
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if code != 200:
+                extra = {}
+                if self.retry_after is not None:
+                    extra["Retry-After"] = str(self.retry_after)
+                return self._respond(handler, code, b"Error", extra)
+            body = self._data[key]
+            extra = {}
+            if self.etag:
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                extra["ETag"] = etag
+                extra["Last-Modified"] = self.last_modified
+                if headers.get("if-none-match") == etag:
+                    return self._respond(handler, 304, b"", extra)
+            if "gzip" in headers.get("accept-encoding", ""):
+                buf = io.BytesIO()
+                with gzip.GzipFile(fileobj=buf, mode="wb") as fh:
+                    fh.write(body)
+                body = buf.getvalue()
+                extra["Content-Encoding"] = "gzip"
+            return self._respond(handler, 200, body, extra)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _respond(self, handler, code, body, headers=None):
+        handler.send_response(code)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.fdsn.async_client test suite.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import time
+import unittest
+
+from obspy import UTCDateTime, Catalog, Inventory, Stream
+from obspy.clients.fdsn import AsyncClient
+from obspy.clients.fdsn.header import FDSNException
+from obspy.clients.fdsn.tests.fake_server import FakeFDSNServer
+
+if not PY2:
+    import asyncio
+
+
+@unittest.skipIf(PY2, "AsyncClient requires Python 3.")
+class AsyncClientTestCase(unittest.TestCase):
+    """
+    Test cases for the AsyncClient against a local FDSN web service.
+    """
+    def setUp(self):
+        self.server = FakeFDSNServer().__enter__()
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncClient(self.server.url, max_per_host=3,
+                                  backoff=0.01, loop=self.loop)
+        self.t = UTCDateTime(2010, 2, 27, 6, 30)
+
+    def tearDown(self):
+        self.client.close()
+        self.loop.close()
+        self.server.__exit__()
+
+    def _run(self, *futures):
+        return self.loop.run_until_complete(asyncio.gather(*futures))
+
+    def _get_waveforms(self, i=0):
+        return self.client.get_waveforms("IU", "ANMO", "00", "BHZ",
+                                         self.t + i, self.t + i + 10)
+
+    def test_services(self):
+        self.assertEqual(sorted(self.client.services),
+                         ["dataselect", "event", "station"])
+
+    def test_all_services(self):
+        t = self.t
+        st, bulk, inv, cat = self._run(
+            self._get_waveforms(),
+            self.client.get_waveforms_bulk(
+                [("IU", "ANMO", "00", "BHZ", t, t + 10)]),
+            self.client.get_stations(network="AU", level="channel"),
+            self.client.get_events(minmagnitude=9))
+        self.assertIsInstance(st, Stream)
+        self.assertEqual(st[0].id, "IU.ANMO.00.BHZ")
+        self.assertIsInstance(bulk, Stream)
+        self.assertEqual(len(bulk), 1)
+        self.assertIsInstance(inv, Inventory)
+        self.assertEqual(inv[0].code, "AU")
+        self.assertIsInstance(cat, Catalog)
+        self.assertEqual(len(cat), 2)
+        methods = sorted(r[0] for r in self.server.queries())
+        self.assertEqual(methods, ["GET", "GET", "GET", "POST"])
+        self.assertIn("minmagnitude=9", self.server.queries("event")[0][1])
+
+    def test_per_host_limit(self):
+        self.server.delay = 0.05
+        streams = self._run(*[self._get_waveforms(i) for i in range(12)])
+        self.assertEqual(len(streams), 12)
+        for st in streams:
+            self.assertEqual(len(st), 1)
+        self.assertEqual(len(self.server.queries()), 12)
+        self.assertGreater(self.server.max_active, 1)
+        self.assertLessEqual(self.server.max_active, 3)
+
+    def test_retries(self):
+        self.server.failures.extend([503, 429])
+        st, = self._run(self._get_waveforms())
+        self.assertEqual(len(st), 1)
+        self.assertEqual(len(self.server.queries()), 3)
+        self.assertEqual(self.client.retried, 2)
+
+    def test_retry_after(self):
+        self.server.failures.append(503)
+        self.server.retry_after = 0.3
+        start = time.time()
+        self._run(self._get_waveforms())
+        self.assertGreaterEqual(time.time() - start, 0.3)
+
+    def test_retries_exhausted(self):
+        self.server.failures.extend([503] * 4)
+        with self.assertRaises(FDSNException) as e:
+            self._run(self._get_waveforms())
+        self.assertIn("temporarily unavailable", str(e.exception))
+        self.assertEqual(len(self.server.queries()), 4)
+
+    def test_no_retry_for_client_errors(self):
+        self.server.failures.append(400)
+        with self.assertRaises(FDSNException):
+            self._run(self._get_waveforms())
+        self.assertEqual(len(self.server.queries()), 1)
+        self.assertEqual(self.client.retried, 0)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(TypeError):
+            self._run(self.client.get_events(unknown_parameter=1))
+        self.assertEqual(len(self.server.queries()), 0)
+
+
+def suite():
+    return unittest.makeSuite(AsyncClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
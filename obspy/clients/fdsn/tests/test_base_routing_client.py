@@ -12,14 +12,18 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import collections
+import threading
+import time
 import unittest
 import warnings
 
 import obspy
 from obspy.core.compatibility import mock
-from obspy.clients.fdsn.header import FDSNNoDataException
+from obspy.clients.fdsn.header import (
+    FDSNNoDataException, FDSNRequestTooLargeException,
+    FDSNServiceUnavailableException)
 from obspy.clients.fdsn.routing.routing_client import (
-    BaseRoutingClient, RoutingClient)
+    BaseRoutingClient, RoutingClient, _split_bulk_string)
 from obspy.clients.fdsn.routing.eidaws_routing_client import (
     EIDAWSRoutingClient)
 from obspy.clients.fdsn.routing.federator_routing_client import (
@@ -204,6 +208,170 @@ class BaseRoutingClientTestCase(unittest.TestCase):
         for _i in wf_bulk.call_args_list:
             self.assertEqual(_i[1], {})
 
+    def test_split_bulk_string(self):
+        bulk_str = "minlatitude=2\nA B C D\n\nE F G H\nI J K L\nM N O P"
+        self.assertEqual(_split_bulk_string(bulk_str), [bulk_str])
+        self.assertEqual(_split_bulk_string(bulk_str, max_lines=4),
+                         [bulk_str])
+        self.assertEqual(_split_bulk_string(bulk_str, max_lines=3), [
+            "minlatitude=2\nA B C D\nE F G H\nI J K L",
+            "minlatitude=2\nM N O P"])
+        self.assertEqual(_split_bulk_string(bulk_str, chunks=2), [
+            "minlatitude=2\nA B C D\nE F G H",
+            "minlatitude=2\nI J K L\nM N O P"])
+        self.assertEqual(_split_bulk_string("A B C D", chunks=2),
+                         ["A B C D"])
+
+    def test_bounded_concurrency(self):
+        split = dict(("http://example%i.com" % _i, "A B C D\nE F G H")
+                     for _i in range(6))
+        lock = threading.Lock()
+        active = collections.defaultdict(int)
+        maxima = {"total": 0, "provider": 0}
+
+        def get_waveforms_bulk(self, bulk_str):
+            with lock:
+                active[self.base_url] += 1
+                maxima["total"] = max(maxima["total"],
+                                      sum(active.values()))
+                maxima["provider"] = max(maxima["provider"],
+                                         active[self.base_url])
+            time.sleep(0.02)
+            with lock:
+                active[self.base_url] -= 1
+            return obspy.read()
+
+        class _DummyClient(object):
+            services = {"dataselect": {}}
+
+            def __init__(self, base_url, **kwargs):
+                self.base_url = base_url
+
+        _DummyClient.get_waveforms_bulk = get_waveforms_bulk
+
+        with mock.patch("obspy.clients.fdsn.client.Client", _DummyClient):
+            c = self._cls_object(max_concurrency=3,
+                                 max_requests_per_provider=1,
+                                 max_bulk_lines=1)
+            st = c._download_waveforms(split=split)
+
+        # Two requests per data center.
+        self.assertEqual(len(st), 36)
+        self.assertEqual(maxima["total"], 3)
+        self.assertEqual(maxima["provider"], 1)
+
+    def test_splitting_and_progressive_delivery(self):
+        split = {
+            "http://example.com": "\n".join(["A B C D"] * 5),
+            "http://example2.com": "A B C D"
+        }
+        received = []
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_waveforms_bulk.side_effect = \
+                lambda *args: obspy.read()
+            mock_instance.services = {"dataselect": {"test1": True}}
+            c = self._cls_object(max_bulk_lines=2)
+            st = c._download_waveforms(
+                split=split, test1="a",
+                callback=lambda *args: received.append(args))
+
+        # Only one client per data center.
+        self.assertEqual(p.call_count, 2)
+        wf_bulk = mock_instance.get_waveforms_bulk
+        self.assertEqual(sorted(_i[0][0] for _i in wf_bulk.call_args_list), [
+            "test1=a\nA B C D",
+            "test1=a\nA B C D",
+            "test1=a\nA B C D\nA B C D",
+            "test1=a\nA B C D\nA B C D"])
+        self.assertEqual(len(st), 12)
+        self.assertEqual(len(received), 4)
+        self.assertEqual(
+            collections.Counter(_i[0] for _i in received),
+            {"http://example.com": 3, "http://example2.com": 1})
+        for _i in received:
+            self.assertEqual(len(_i[1]), 3)
+
+        # The callback is also available for the stations.
+        received = []
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_stations_bulk.return_value = \
+                obspy.read_inventory()
+            mock_instance.services = {"station": {}}
+            c = self._cls_object(max_bulk_lines=None)
+            inv = c._download_stations(
+                split=split, callback=lambda *args: received.append(args))
+        self.assertEqual(len(received), 2)
+        self.assertEqual(len(inv), 4)
+
+    def test_retrying_and_isolating_failures(self):
+        split = {
+            "http://example.com": "A B C D",
+            "http://example2.com": "E F G H"
+        }
+        failures = collections.defaultdict(int)
+
+        def get_waveforms_bulk(bulk_str):
+            if "E F G H" in bulk_str:
+                raise ValueError("random")
+            failures[bulk_str] += 1
+            if failures[bulk_str] <= 2:
+                raise FDSNServiceUnavailableException("Unavailable")
+            return obspy.read()
+
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_waveforms_bulk.side_effect = get_waveforms_bulk
+            mock_instance.services = {"dataselect": {}}
+            c = self._cls_object(retries=2, backoff=0.0)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                st = c._download_waveforms(split=split)
+
+        # Retried twice, the failing data center does not affect the other.
+        self.assertEqual(failures["A B C D"], 3)
+        self.assertEqual(len(st), 3)
+        self.assertEqual(len(w), 1)
+        self.assertIn("'http://example2.com'", w[0].message.args[0])
+
+        # Give up after the retries.
+        failures.clear()
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_waveforms_bulk.side_effect = get_waveforms_bulk
+            mock_instance.services = {"dataselect": {}}
+            c = self._cls_object(retries=1, backoff=0.0)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                st = c._download_waveforms(split=split)
+        self.assertEqual(failures["A B C D"], 2)
+        self.assertEqual(len(st), 0)
+        self.assertEqual(len(w), 2)
+        self.assertIn("FDSNServiceUnavailableException", "".join(
+            _i.message.args[0] for _i in w))
+
+    def test_splitting_requests_that_are_too_large(self):
+        split = {"http://example.com": "A\nB\nC"}
+
+        def get_waveforms_bulk(bulk_str):
+            if len(bulk_str.splitlines()) > 1:
+                raise FDSNRequestTooLargeException("Too much data")
+            return obspy.read()
+
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_waveforms_bulk.side_effect = get_waveforms_bulk
+            mock_instance.services = {"dataselect": {}}
+            c = self._cls_object()
+            st = c._download_waveforms(split=split)
+
+        self.assertEqual(len(st), 9)
+        self.assertEqual(
+            sorted(_i[0][0] for _i in
+                   mock_instance.get_waveforms_bulk.call_args_list),
+            ["A", "A\nB", "A\nB\nC", "B", "C"])
+
     def test_unexpected_exception_handling(self):
         split = {
             "https://example.com": "1234"
@@ -230,6 +398,16 @@ class BaseRoutingClientTestCase(unittest.TestCase):
             "'https://example.com' due to:"))
         self.assertIn("ValueError: random", msg)
 
+        # Exceptions in the download threads are raised.
+        with mock.patch("obspy.clients.fdsn.client.Client") as p:
+            mock_instance = p.return_value
+            mock_instance.get_stations_bulk.side_effect = ValueError("random")
+            c = self._cls_object(debug=False, timeout=240)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                self.assertRaises(UserWarning, c._download_stations,
+                                  split=split)
+
 
 def suite():  # pragma: no cover
     return unittest.makeSuite(BaseRoutingClientTestCase, 'test')
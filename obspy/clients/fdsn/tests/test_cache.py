@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.fdsn.cache test suite.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from obspy import UTCDateTime
+from obspy.clients.fdsn import Client, ResponseCache
+from obspy.clients.fdsn.header import FDSNException
+from obspy.clients.fdsn.tests.fake_server import FakeFDSNServer
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """
+    Test cases for the on-disk response cache against a local FDSN web
+    service.
+    """
+    def setUp(self):
+        self.server = FakeFDSNServer().__enter__()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.__exit__()
+        shutil.rmtree(self.directory)
+
+    def _client(self, **kwargs):
+        cache = ResponseCache(self.directory, **kwargs)
+        return Client(self.server.url, cache=cache), cache
+
+    def _files(self, extension):
+        return [_i for _i in os.listdir(self.directory)
+                if _i.endswith(extension)]
+
+    def test_hits_within_ttl(self):
+        client, cache = self._client()
+        inv = client.get_stations(network="AU")
+        cat = client.get_events(minmagnitude=9)
+        self.assertEqual(client.get_stations(network="AU"), inv)
+        self.assertEqual(len(client.get_events(minmagnitude=9)), len(cat))
+        self.assertEqual(len(self.server.queries()), 2)
+        self.assertEqual(cache.stats["hits"], 2)
+        self.assertEqual(cache.stats["misses"], 2)
+        # A second client with a new cache object on the same directory.
+        client, cache = self._client()
+        client.get_stations(network="AU")
+        self.assertEqual(len(self.server.queries()), 2)
+        self.assertEqual(cache.stats["hits"], 1)
+        # Different queries are different entries.
+        client.get_stations(network="AU", station="MEEK")
+        self.assertEqual(len(self.server.queries()), 3)
+
+    def test_revalidation(self):
+        self.server.etag = True
+        client, cache = self._client(ttl=0)
+        inv = client.get_stations(network="AU")
+        self.assertEqual(client.get_stations(network="AU"), inv)
+        queries = self.server.queries()
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("if-none-match", queries[0][2])
+        self.assertEqual(queries[1][2]["if-none-match"],
+                         self.server.requests[-1][2]["if-none-match"])
+        self.assertEqual(queries[1][2]["if-modified-since"],
+                         self.server.last_modified)
+        self.assertEqual(cache.stats["revalidated"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_expired_without_validators(self):
+        client, cache = self._client(ttl=0)
+        client.get_stations(network="AU")
+        client.get_stations(network="AU")
+        self.assertEqual(len(self.server.queries()), 2)
+        self.assertEqual(cache.stats["misses"], 2)
+        self.assertEqual(cache.stats["hits"], 0)
+
+    def test_content_addressed(self):
+        client, cache = self._client()
+        client.get_stations(network="AU")
+        client.get_stations(network="AU", station="MEEK")
+        self.assertEqual(len(self._files(".json")), 2)
+        self.assertEqual(len(self._files(".raw")), 1)
+
+    def test_errors_and_waveforms_are_not_cached(self):
+        client, cache = self._client()
+        self.server.failures.append(503)
+        with self.assertRaises(FDSNException):
+            client.get_stations(network="AU")
+        client.get_stations(network="AU")
+        self.assertEqual(len(self.server.queries()), 2)
+        t = UTCDateTime(2010, 2, 27, 6, 30)
+        for _i in range(2):
+            client.get_waveforms("IU", "ANMO", "00", "BHZ", t, t + 10)
+        self.assertEqual(len(self.server.queries("dataselect")), 2)
+        self.assertEqual(cache.stats["stored"], 1)
+
+    def test_waveforms_with_ttl(self):
+        client, cache = self._client(ttl={"dataselect": 60})
+        t = UTCDateTime(2010, 2, 27, 6, 30)
+        st = client.get_waveforms("IU", "ANMO", "00", "BHZ", t, t + 10)
+        self.assertEqual(
+            client.get_waveforms("IU", "ANMO", "00", "BHZ", t, t + 10), st)
+        self.assertEqual(len(self.server.queries("dataselect")), 1)
+        client.get_stations(network="AU")
+        client.get_stations(network="AU")
+        self.assertEqual(len(self.server.queries("station")), 2)
+
+    def test_size_bounded_eviction(self):
+        client, cache = self._client(max_size=8000)
+        for station in ("A", "B", "C", "D"):
+            client.get_stations(network="AU", station=station)
+        self.assertGreater(cache.stats["evicted"], 0)
+        size = sum(os.path.getsize(os.path.join(self.directory, _i))
+                   for _i in os.listdir(self.directory))
+        self.assertLessEqual(size, 8000)
+        # The most recent entry survived.
+        client.get_stations(network="AU", station="D")
+        self.assertEqual(cache.stats["hits"], 1)
+        cache.clear()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_parsed_objects(self):
+        client, cache = self._client(parsed=True)
+        inv = client.get_stations(network="AU")
+        cat = client.get_events()
+        self.assertEqual(len(self._files(".pickle")), 2)
+        self.assertEqual(client.get_stations(network="AU"), inv)
+        self.assertEqual(client.get_events(), cat)
+        self.assertEqual(cache.stats["parsed_hits"], 2)
+        # The same response for another query is not parsed again either.
+        client.get_stations(network="AU", station="MEEK")
+        self.assertEqual(cache.stats["parsed_hits"], 3)
+
+    def test_directory_name(self):
+        directory = os.path.join(self.directory, "cache")
+        client = Client(self.server.url, cache=directory)
+        self.assertIsInstance(client.cache, ResponseCache)
+        client.get_events()
+        client.get_events()
+        self.assertEqual(client.cache.stats["hits"], 1)
+        self.assertIn("hits: 1", str(client.cache))
+
+
+def suite():
+    return unittest.makeSuite(ResponseCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
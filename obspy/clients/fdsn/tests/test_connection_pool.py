@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the persistent connections of the FDSN client against a local
+HTTP server.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import gzip
+import io
+import threading
+import unittest
+
+from obspy.clients.fdsn.client import download_url
+from obspy.clients.fdsn.connection_pool import (ConnectionPool,
+                                                KeepAliveHTTPHandler)
+
+if PY2:
+    import BaseHTTPServer as http_server
+    import SocketServer as socketserver
+    import urllib2 as urllib_request
+else:
+    import http.server as http_server
+    import socketserver
+    import urllib.request as urllib_request
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http_server.HTTPServer):
+    daemon_threads = True
+
+
+class _RequestHandler(http_server.BaseHTTPRequestHandler):
+    """
+    Serves ``/plain``, ``/gzip`` and ``/gzip_members`` (multiple gzip
+    members) with HTTP/1.1 keep-alive and ``/close`` closing the connection
+    after each response. Also acts as proxy opening tunnels to itself.
+    """
+    protocol_version = "HTTP/1.1"
+    body = "".join("%06i\n" % _i for _i in range(50000)).encode()
+
+    def setup(self):
+        http_server.BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_CONNECT(self):
+        with self.server.lock:
+            self.server.tunnels.append(
+                (self.path, self.headers.get("Proxy-Authorization")))
+        self.send_response(200)
+        self.end_headers()
+        # The tunnel is requested with HTTP/1.0 but stays open.
+        self.close_connection = False
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.proxy_authorization.append(
+                self.headers.get("Proxy-Authorization"))
+        body = self.body
+        headers = {}
+        if self.path in ("/gzip", "/gzip_members"):
+            buf = io.BytesIO()
+            parts = [body]
+            if self.path == "/gzip_members":
+                parts = [body[:100000], body[100000:]]
+            for part in parts:
+                with gzip.GzipFile(fileobj=buf, mode="wb") as fh:
+                    fh.write(part)
+            body = buf.getvalue()
+            headers["Content-Encoding"] = "gzip"
+        elif self.path == "/close":
+            headers["Connection"] = "close"
+        elif self.path != "/plain":
+            body = b"not found"
+            self.send_response(404)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    """
+    Test cases for the keep-alive connection pool.
+    """
+    def setUp(self):
+        self.server = _ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = 0
+        self.server.tunnels = []
+        self.server.proxy_authorization = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        self.pool = ConnectionPool(maxsize=4)
+        self.opener = urllib_request.build_opener(
+            KeepAliveHTTPHandler(self.pool))
+
+    def tearDown(self):
+        self.pool.clear()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _download(self, path, **kwargs):
+        return download_url(self.url + path, opener=self.opener, **kwargs)
+
+    def test_connections_are_reused(self):
+        for _i in range(5):
+            code, data = self._download("/plain")
+            self.assertEqual(code, 200)
+            self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.created, 1)
+        self.assertEqual(self.pool.reused, 4)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_streamed_gzip_decoding(self):
+        code, data = self._download("/gzip")
+        self.assertEqual(code, 200)
+        self.assertEqual(data, _RequestHandler.body)
+        code, data = self._download("/gzip", return_string=False)
+        self.assertEqual(data.read(), _RequestHandler.body)
+        code, data = self._download("/plain", use_gzip=False)
+        self.assertEqual(data, _RequestHandler.body)
+        code, data = self._download("/gzip_members")
+        self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_proxy_tunnel(self):
+        """
+        Connections through a proxy tunnel are opened like by urllib and
+        pooled separately.
+        """
+        def download(tunnel_host, proxy_authorization="Basic abc"):
+            request = urllib_request.Request(self.url + "/plain")
+            request.add_header("Proxy-Authorization", proxy_authorization)
+            request._tunnel_host = tunnel_host
+            response = self.opener.open(request)
+            try:
+                return response.read()
+            finally:
+                response.close()
+
+        for _i in range(2):
+            self.assertEqual(download("example.com:80"),
+                             _RequestHandler.body)
+        self.assertEqual(self.server.tunnels,
+                         [("example.com:80", "Basic abc")])
+        # The credentials are only sent to the proxy.
+        self.assertEqual(self.server.proxy_authorization, [None, None])
+        self.assertEqual(self.server.connections, 1)
+        download("example.org:80")
+        download("example.com:80", "Basic def")
+        self.assertEqual(len(self.server.tunnels), 3)
+        self._download("/plain")
+        self.assertEqual(self.server.connections, 4)
+        self.assertEqual(len(self.pool), 4)
+
+    def test_connection_close_is_honored(self):
+        for _i in range(3):
+            code, data = self._download("/close")
+            self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.connections, 3)
+        self.assertEqual(len(self.pool), 0)
+
+    def test_http_errors_and_reuse_afterwards(self):
+        code, error = self._download("/missing")
+        self.assertEqual(code, 404)
+        self.assertEqual(error.read(), b"not found")
+        code, data = self._download("/plain")
+        self.assertEqual(data, _RequestHandler.body)
+
+    def test_connections_closed_by_server(self):
+        self._download("/plain")
+        # Simulates the server dropping idle connections.
+        for connections in self.pool._idle.values():
+            for connection in connections:
+                connection.sock.close()
+        code, data = self._download("/plain")
+        self.assertEqual(code, 200)
+        self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_thread_safety(self):
+        results = []
+
+        def worker():
+            for _i in range(5):
+                results.append(self._download("/gzip"))
+
+        threads = [threading.Thread(target=worker) for _i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 40)
+        for code, data in results:
+            self.assertEqual(code, 200)
+            self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.requests, 40)
+        self.assertLessEqual(self.server.connections, 8)
+        self.assertLessEqual(len(self.pool), self.pool.maxsize)
+
+    def test_disabled_pool(self):
+        pool = ConnectionPool(maxsize=0)
+        opener = urllib_request.build_opener(KeepAliveHTTPHandler(pool))
+        for _i in range(3):
+            code, data = download_url(self.url + "/plain", opener=opener)
+            self.assertEqual(data, _RequestHandler.body)
+        self.assertEqual(self.server.connections, 3)
+        self.assertEqual(len(pool), 0)
+
+
+def suite():
+    return unittest.makeSuite(ConnectionPoolTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -21,6 +21,7 @@ import os
 import shutil
 from socket import timeout as socket_timeout
 import tempfile
+import time
 import unittest
 
 import numpy as np
@@ -29,6 +30,7 @@ import obspy
 from obspy.core.compatibility import mock
 from obspy.core.util.base import NamedTemporaryFile, SCIPY_VERSION
 from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.header import FDSNTooManyRequestsException
 from obspy.clients.fdsn.mass_downloader import (domain, Restrictions,
                                                 MassDownloader)
 from obspy.clients.fdsn.mass_downloader.utils import (
@@ -38,6 +40,9 @@ from obspy.clients.fdsn.mass_downloader.utils import (
     _get_stationxml_contents_slow)
 from obspy.clients.fdsn.mass_downloader.download_helpers import (
     Channel, TimeInterval, Station, STATUS, ClientDownloadHelper)
+from obspy.clients.fdsn.mass_downloader.scheduler import (
+    AdaptiveConcurrency, DownloadJournal)
+from obspy.clients.fdsn.mass_downloader.utils import ChannelAvailability
 
 
 class DomainTestCase(unittest.TestCase):
@@ -1303,6 +1308,86 @@ class StationTestCase(unittest.TestCase):
             self.assertEqual(c1.intervals[1].status, STATUS.DOWNLOAD_REJECTED)
             p1.reset_mock()
 
+    def test_sanitize_downloads_with_data_coverage(self):
+        """
+        Files with known data coverage are not read again.
+        """
+        st = obspy.UTCDateTime(2015, 1, 1)
+        c1 = Channel(location="", channel="BHZ", intervals=[
+            TimeInterval(st, st + 60, filename="a.mseed",
+                         status=STATUS.DOWNLOADED),
+            TimeInterval(st + 60, st + 120, filename="b.mseed",
+                         status=STATUS.DOWNLOADED)])
+        station = Station(network="TA", station="A001", latitude=1,
+                          longitude=2, channels=[c1])
+        station.miss_station_information[("", "BHZ")] = (st + 50, st + 200)
+        coverage = {"a.mseed": (st + 1, st + 59),
+                    "b.mseed": (st + 61, st + 119)}
+
+        with mock.patch("obspy.clients.fdsn.mass_downloader"
+                        ".utils.safe_delete") as p1, \
+                mock.patch("obspy.io.mseed.util.get_start_and_end_time") \
+                as p2, \
+                mock.patch("os.path.isfile") as p_isfile:  # NOQA
+            station.sanitize_downloads(mock.MagicMock(),
+                                       data_coverage=coverage)
+        self.assertEqual(p2.call_count, 0)
+        # Only the second file is completely without station information.
+        self.assertEqual(p1.call_count, 1)
+        self.assertEqual(p1.call_args[0][0], "b.mseed")
+        self.assertEqual(c1.intervals[0].status, STATUS.DOWNLOADED)
+        self.assertEqual(c1.intervals[0].start, st + 1)
+        self.assertEqual(c1.intervals[1].status, STATUS.DOWNLOAD_REJECTED)
+
+    def test_prepare_mseed_download_with_directory_contents(self):
+        """
+        Each directory is only listed once if a cache of the directory
+        contents is passed.
+        """
+        st = obspy.UTCDateTime(2015, 1, 1)
+        channels = [Channel(location="", channel=_c, intervals=[
+            TimeInterval(st + _i * 60, st + (_i + 1) * 60)
+            for _i in range(10)]) for _c in ("BHZ", "BHN")]
+        station = Station(network="TA", station="A001", latitude=1,
+                          longitude=2, channels=channels)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "mseed")
+            os.makedirs(path)
+            existing = "TA.A001..BHZ__20150101T000000Z__20150101T000100Z.mseed"
+            with open(os.path.join(path, existing), "wb") as fh:
+                fh.write(b"1")
+            contents = {}
+            with mock.patch("os.path.exists") as p_ex, \
+                    mock.patch("os.listdir",
+                               side_effect=os.listdir) as p_list:
+                station.prepare_mseed_download(mseed_storage=path,
+                                               directory_contents=contents)
+            self.assertEqual(p_ex.call_count, 0)
+            self.assertEqual(p_list.call_count, 1)
+            self.assertEqual(contents, {path: set([existing])})
+            self.assertEqual(channels[0].intervals[0].status, STATUS.EXISTS)
+            self.assertEqual(channels[0].intervals[0].filename,
+                             os.path.join(path, existing))
+            for channel in channels:
+                for interval in channel.intervals:
+                    if interval is channels[0].intervals[0]:
+                        continue
+                    self.assertEqual(interval.status,
+                                     STATUS.NEEDS_DOWNLOADING)
+
+            # Directories that do not exist are created.
+            path = os.path.join(tmpdir, "other")
+            station.prepare_mseed_download(
+                mseed_storage=path + "/{network}/{station}/{location}."
+                "{channel}.{starttime}.{endtime}.mseed",
+                directory_contents=contents)
+            self.assertTrue(os.path.isdir(os.path.join(path, "TA", "A001")))
+            self.assertEqual(contents[os.path.join(path, "TA", "A001")],
+                             set())
+        finally:
+            shutil.rmtree(tmpdir)
+
     def test_prepare_mseed_download(self):
         """
         Tests the prepare_mseed download method.
@@ -1830,6 +1915,78 @@ class ClientDownloadHelperTestCase(unittest.TestCase):
 
     @unittest.skipIf(SCIPY_VERSION < [0, 12],
                      'scipy version 0.12 or higher needed.')
+    def _random_stations(self, count, seed):
+        rng = np.random.RandomState(seed)
+        return [Station("XX", "S%03i" % _i, rng.uniform(-1, 1),
+                        rng.uniform(-1, 1), []) for _i in range(count)]
+
+    def _assert_minimum_distance(self, stations, rejected, existing,
+                                 minimum_distance):
+        """
+        All stations are far enough apart and each rejected station is
+        too close to one of the kept or existing stations.
+        """
+        from obspy.geodetics import locations2degrees
+        from obspy.clients.fdsn.mass_downloader.utils import \
+            SphericalNearestNeighbour
+
+        def distances(a, b):
+            return SphericalNearestNeighbour.degrees2meters(
+                locations2degrees(
+                    np.array([_i.latitude for _i in a])[:, None],
+                    np.array([_i.longitude for _i in a])[:, None],
+                    np.array([_i.latitude for _i in b])[None, :],
+                    np.array([_i.longitude for _i in b])[None, :]))
+
+        d = distances(stations, stations + existing)
+        d[np.arange(len(stations)), np.arange(len(stations))] = np.inf
+        self.assertTrue(np.all(d >= minimum_distance * 0.999))
+        d = distances(rejected, stations + existing)
+        self.assertTrue(np.all(d.min(axis=1) < minimum_distance * 1.001))
+
+    def test_minimum_distance_filter_large_station_sets(self):
+        """
+        Consistency of the vectorized minimum distance filter.
+        """
+        self.restrictions.minimum_interstation_distance_in_m = 10000
+        # No existing stations.
+        stations = self._random_stations(500, 0)
+        c = self._init_client()
+        c.stations = dict(((_i.network, _i.station), _i) for _i in stations)
+        rejected = c.filter_stations_based_on_minimum_distance([])
+        self.assertEqual(len(rejected) + len(c), 500)
+        self.assertTrue(len(rejected) > 50)
+        self.assertTrue(len(c) > 50)
+        self._assert_minimum_distance(list(c.stations.values()),
+                                      list(rejected.values()), [], 10000)
+
+        # With existing stations from another client.
+        existing = self._init_client()
+        existing.stations = dict(
+            ((_i.network, "E" + _i.station), _i)
+            for _i in list(c.stations.values())[::4])
+        stations = self._random_stations(500, 1)
+        c = self._init_client()
+        c.stations = dict(((_i.network, _i.station), _i) for _i in stations)
+        rejected = c.filter_stations_based_on_minimum_distance([existing])
+        self.assertEqual(len(rejected) + len(c), 500)
+        self.assertTrue(len(c) > 10)
+        self._assert_minimum_distance(
+            list(c.stations.values()), list(rejected.values()),
+            list(existing.stations.values()), 10000)
+
+    def test_remove_most_connected(self):
+        from obspy.clients.fdsn.mass_downloader.download_helpers import \
+            _remove_most_connected
+        # A star: removing the center is enough.
+        removed = _remove_most_connected(5, [(0, 4), (1, 4), (2, 4), (3, 4)])
+        np.testing.assert_array_equal(removed, [0, 0, 0, 0, 1])
+        # A chain: ties go to the lowest index.
+        removed = _remove_most_connected(4, [(0, 1), (1, 2), (2, 3)])
+        np.testing.assert_array_equal(removed, [0, 1, 1, 0])
+        removed = _remove_most_connected(3, [])
+        np.testing.assert_array_equal(removed, [0, 0, 0])
+
     def test_station_list_nearest_neighbour_filter(self):
         """
         Test the filtering based on geographical distance.
@@ -2701,17 +2858,15 @@ class DownloadHelperTestCase(unittest.TestCase):
                 "download_helpers.ClientDownloadHelper.get_availability",
                 autospec=True)
     @mock.patch("obspy.clients.fdsn.mass_downloader."
-                "download_helpers.ClientDownloadHelper.download_mseed")
-    @mock.patch("obspy.clients.fdsn.mass_downloader."
-                "download_helpers.ClientDownloadHelper.download_stationxml")
+                "download_helpers.ClientDownloadHelper."
+                "download_mseed_and_stationxml")
     @mock.patch("os.makedirs")
     @mock.patch("logging.Logger.info")
     @mock.patch("logging.Logger.warning")
     @unittest.skipIf(SCIPY_VERSION < [0, 12],
                      'scipy version 0.12 or higher needed.')
     def test_download_method(self, _log_w, _log_p, _patch_makedirs,
-                             patch_dl_mseed, patch_dl_stationxml,
-                             patch_get_avail, patch_discover):
+                             patch_dl, patch_get_avail, patch_discover):
         """
         Mock test of the central download method.
 
@@ -2796,6 +2951,248 @@ class DownloadHelperTestCase(unittest.TestCase):
                        mseed_storage="mseed", stationxml_storage="stationxml")
 
 
+class SchedulerTestCase(unittest.TestCase):
+    """
+    Test cases for the adaptive concurrency and the download journal.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_adaptive_concurrency_throttling(self):
+        limiter = AdaptiveConcurrency(4, backoff=0.05)
+        self.assertEqual(limiter.limit, 4)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.throttled, 1)
+        # New requests have to wait for the pause.
+        start = time.time()
+        limiter.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.04)
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.limit, 1)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        # Never below the minimum.
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.throttled, 3)
+
+    def test_adaptive_concurrency_throughput(self):
+        limiter = AdaptiveConcurrency(2, maximum=4)
+        # Increasing throughput increases the limit up to the maximum.
+        for nbytes in (10, 100, 1000, 10000, 100000):
+            # Sleep to have a measurable time span for each window.
+            time.sleep(0.01)
+            for _ in range(max(4, 2 * limiter.limit)):
+                limiter.acquire()
+                limiter.release(nbytes=nbytes)
+        self.assertEqual(limiter.limit, 4)
+
+        # Decreasing throughput goes back.
+        limiter = AdaptiveConcurrency(2, maximum=4)
+        for nbytes in (10000, 1):
+            time.sleep(0.01)
+            for _ in range(max(4, 2 * limiter.limit)):
+                limiter.acquire()
+                limiter.release(nbytes=nbytes)
+        self.assertEqual(limiter.limit, 2)
+
+        # No maximum given, nothing to adapt to.
+        limiter = AdaptiveConcurrency(3)
+        self.assertEqual(limiter.maximum, 3)
+
+    def test_download_journal(self):
+        filename = os.path.join(self.tempdir, "journal.jsonl")
+        a = os.path.join(self.tempdir, "a.mseed")
+        b = os.path.join(self.tempdir, "b.mseed")
+        for name in (a, b):
+            with open(name, "wb") as fh:
+                fh.write(b"data")
+        with DownloadJournal(filename) as journal:
+            journal.record([a, b], DownloadJournal.STARTED)
+            journal.record(a, STATUS.DOWNLOADED)
+        # An interrupted write leaves a truncated line.
+        with open(filename, "ab") as fh:
+            fh.write(b'{"file": "c.ms')
+
+        with DownloadJournal(filename) as journal:
+            self.assertEqual(journal.get(a), "downloaded")
+            self.assertFalse(journal.is_unfinished(a))
+            self.assertTrue(journal.is_unfinished(b))
+            self.assertEqual(journal.get("c.mseed"), None)
+            self.assertEqual(journal.remove_unfinished(), [b])
+        self.assertTrue(os.path.exists(a))
+        self.assertFalse(os.path.exists(b))
+        # Compacted to one line per file.
+        with open(filename, "rb") as fh:
+            self.assertEqual(len(fh.readlines()), 2)
+
+
+class ScheduledDownloadTestCase(unittest.TestCase):
+    """
+    Test cases for downloading MiniSEED and StationXML at the same time.
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.logger = mock.MagicMock()
+        self.restrictions = Restrictions(
+            starttime=obspy.UTCDateTime(2015, 1, 1),
+            endtime=obspy.UTCDateTime(2015, 1, 1, 2),
+            chunklength_in_sec=3600)
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _init_helper(self):
+        helper = ClientDownloadHelper(
+            client=mock.MagicMock(), client_name="Test",
+            restrictions=self.restrictions, domain=domain.GlobalDomain(),
+            mseed_storage=os.path.join(self.tempdir, "mseed"),
+            stationxml_storage=os.path.join(self.tempdir, "stations"),
+            logger=self.logger)
+        intervals = [TimeInterval(_i[0], _i[1]) for _i in self.restrictions]
+        for code in ("A", "B"):
+            helper.stations[("XX", code)] = Station(
+                "XX", code, 0.0, 0.0,
+                [Channel("", "BHZ", copy.deepcopy(intervals))])
+        helper.prepare_mseed_download()
+        return helper
+
+    def _download_mseed(self, client, client_name, chunks, logger):
+        time.sleep(0.05)
+        self.calls.append(("mseed", chunks[0][1], chunks[0][4]))
+        for chunk in chunks:
+            tr = obspy.Trace(data=np.zeros(100, dtype=np.int32))
+            tr.stats.network, tr.stats.station = chunk[:2]
+            tr.stats.channel = chunk[3]
+            tr.stats.starttime = chunk[4]
+            tr.stats.delta = (chunk[5] - chunk[4]) / 99.0
+            tr.write(chunk[6], format="MSEED")
+        return [_i[6] for _i in chunks]
+
+    def _download_stationxml(self, client, client_name, bulk, filename,
+                             logger):
+        self.calls.append(("stationxml", bulk[0][1]))
+        with open(filename, "wb") as fh:
+            fh.write(b"<xml/>")
+        return (bulk[0][0], bulk[0][1]), filename
+
+    def _stationxml_contents(self, filename):
+        station = os.path.basename(filename).split(".")[1]
+        return [ChannelAvailability(
+            "XX", station, "", "BHZ", self.restrictions.starttime,
+            self.restrictions.endtime, filename)]
+
+    def _patches(self):
+        p = "obspy.clients.fdsn.mass_downloader."
+        return [
+            mock.patch(p + "utils.download_and_split_mseed_bulk",
+                       side_effect=self._download_mseed),
+            mock.patch(p + "utils.download_stationxml",
+                       side_effect=self._download_stationxml),
+            mock.patch(p + "utils.get_stationxml_contents",
+                       side_effect=self._stationxml_contents),
+            mock.patch(p + "download_helpers.AdaptiveConcurrency",
+                       side_effect=lambda *args, **kwargs:
+                       AdaptiveConcurrency(*args, backoff=0.01, **kwargs))]
+
+    def _run(self, helper, **kwargs):
+        patches = self._patches()
+        for patch in patches:
+            patch.start()
+        try:
+            helper.download_mseed_and_stationxml(
+                chunk_size_in_mb=1E-6, threads_per_client=1, **kwargs)
+        finally:
+            for patch in patches:
+                patch.stop()
+
+    def test_overlapping_download(self):
+        helper = self._init_helper()
+        self._run(helper)
+
+        for station in helper.stations.values():
+            self.assertEqual(station.stationxml_status, STATUS.DOWNLOADED)
+            for interval in station.channels[0].intervals:
+                self.assertEqual(interval.status, STATUS.DOWNLOADED)
+                self.assertTrue(os.path.exists(interval.filename))
+                # The data coverage is known from the quality checks.
+                self.assertEqual(helper.data_coverage[interval.filename],
+                                 (interval.start, interval.end))
+        self.assertEqual(len(self.calls), 6)
+        # The StationXML file of the first station is requested before all
+        # MiniSEED data has been downloaded.
+        first = [_i for _i in self.calls if _i[0] == "stationxml"][0]
+        self.assertLess(self.calls.index(first), 5)
+        self.assertEqual(self.calls[-1][0], "stationxml")
+
+    def test_throttled_requests_are_retried(self):
+        helper = self._init_helper()
+        download = self._download_mseed
+        failures = [FDSNTooManyRequestsException("Too many requests")] * 2
+
+        def throttled(*args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return download(*args, **kwargs)
+
+        self._download_mseed = throttled
+        self._run(helper)
+        for station in helper.stations.values():
+            self.assertEqual(station.stationxml_status, STATUS.DOWNLOADED)
+            for interval in station.channels[0].intervals:
+                self.assertEqual(interval.status, STATUS.DOWNLOADED)
+        self.assertEqual(len([_i for _i in self.calls if _i[0] == "mseed"]),
+                         4)
+
+    def test_failed_stationxml_download(self):
+        helper = self._init_helper()
+        self._download_stationxml = lambda *args, **kwargs: None
+        self._run(helper)
+        for station in helper.stations.values():
+            self.assertEqual(station.stationxml_status,
+                             STATUS.DOWNLOAD_FAILED)
+
+    def test_journal(self):
+        journal_file = os.path.join(self.tempdir, "journal.jsonl")
+        helper = self._init_helper()
+        skipped = helper.stations[("XX", "B")].channels[0].intervals[1]
+        with DownloadJournal(journal_file) as journal:
+            journal.record(skipped.filename, DownloadJournal.NO_DATA)
+            self._run(helper, journal=journal)
+            self.assertEqual(skipped.status, STATUS.DOWNLOAD_FAILED)
+            self.assertEqual(len([_i for _i in self.calls
+                                  if _i[0] == "mseed"]), 3)
+            for station in helper.stations.values():
+                self.assertEqual(journal.get(station.stationxml_filename),
+                                 "downloaded")
+                for interval in station.channels[0].intervals:
+                    if interval is skipped:
+                        continue
+                    self.assertEqual(journal.get(interval.filename),
+                                     "downloaded")
+
+        # The data center has no data for a request.
+        helper = self._init_helper()
+        helper.stations.pop(("XX", "A"))
+        intervals = helper.stations[("XX", "B")].channels[0].intervals
+        for interval in intervals:
+            if os.path.exists(interval.filename):
+                os.remove(interval.filename)
+            interval.status = STATUS.NEEDS_DOWNLOADING
+        self._download_mseed = lambda *args, **kwargs: []
+        with DownloadJournal(journal_file) as journal:
+            self._run(helper, journal=journal)
+        with DownloadJournal(journal_file) as journal:
+            for interval in intervals:
+                self.assertEqual(journal.get(interval.filename), "no_data")
+        self.assertEqual(helper.stations, {})
+
+
 def suite():
     testsuite = unittest.TestSuite()
     testsuite.addTest(unittest.makeSuite(DomainTestCase, 'test'))
@@ -2806,6 +3203,8 @@ def suite():
     testsuite.addTest(unittest.makeSuite(DownloadHelperTestCase, 'test'))
     testsuite.addTest(unittest.makeSuite(ClientDownloadHelperTestCase, 'test'))
     testsuite.addTest(unittest.makeSuite(RestrictionsTestCase, 'test'))
+    testsuite.addTest(unittest.makeSuite(SchedulerTestCase, 'test'))
+    testsuite.addTest(unittest.makeSuite(ScheduledDownloadTestCase, 'test'))
     return testsuite
 
 
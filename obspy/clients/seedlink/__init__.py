@@ -11,7 +11,9 @@ For simple requests of finite time windows see
 data streams see
 :class:`~obspy.clients.seedlink.easyseedlink.EasySeedLinkClient`, or for
 lower-level packet handling see
-:class:`~obspy.clients.seedlink.slclient.SLClient`.
+:class:`~obspy.clients.seedlink.slclient.SLClient`. Data streams of many
+servers can be received at once with
+:class:`~obspy.clients.seedlink.multiseedlink.MultiSeedLinkClient`.
 
 :copyright:
     The ObsPy Development Team (devs@obspy.org) & Anthony Lomax
@@ -1566,9 +1566,11 @@ class SeedLinkConnection(object):
         seqnum = slpacket.get_sequence_number()
         if (seqnum == -1):
             raise SeedLinkException("could not determine sequence number")
-        trace = None
+        # Only the header is needed, the data samples are decoded when (and
+        # if) the client asks for the trace.
+        header = None
         try:
-            trace = slpacket.get_trace()
+            header = slpacket.get_header()
         except Exception as e:
             msg = "blockette not 1000 (Data Only SEED Blockette) or other " + \
                 "error reading miniseed data: %s"
@@ -1579,9 +1581,9 @@ class SeedLinkConnection(object):
         station = None
         btime = None
         try:
-            station = trace.stats['station']
-            net = trace.stats['network']
-            btime = trace.stats['starttime']
+            station = header['station']
+            net = header['network']
+            btime = header['starttime']
             # print("DEBUG: station, net, btime:", station, net, btime)
         except Exception as se:
             raise SeedLinkException("trace header read error: %s" % (se))
@@ -79,6 +79,34 @@ class EasySeedLinkClientException(Exception):
     pass
 
 
+def _parse_server_url(server_url):
+    """
+    Returns host name and port of a SeedLink server URL.
+    """
+    # Catch invalid server_url parameters
+    if not isinstance(server_url, (str, native_str)):
+        raise ValueError('Expected string for SeedLink server URL')
+    # Allow for sloppy server URLs (e.g. 'geofon.gfz-potsdam.de:18000).
+    # (According to RFC 1808 the net_path segment needs to start with '//'
+    # and this is expected by the urlparse function, so it is silently
+    # added if it was omitted by the user.)
+    if '://' not in server_url and not server_url.startswith('//'):
+        server_url = '//' + server_url
+
+    parsed_url = urlparse(server_url, scheme='seedlink')
+
+    # Check the provided scheme
+    if not parsed_url.scheme == 'seedlink':
+        msg = 'Unsupported scheme %s (expected "seedlink")' % \
+              parsed_url.scheme
+        raise EasySeedLinkClientException(msg)
+    if not parsed_url.hostname:
+        msg = 'No host name provided'
+        raise EasySeedLinkClientException(msg)
+
+    return parsed_url.hostname, parsed_url.port or 18000
+
+
 class EasySeedLinkClient(object):
     """
     An easy-to-use SeedLink client.
@@ -134,29 +162,8 @@ class EasySeedLinkClient(object):
     """
 
     def __init__(self, server_url, autoconnect=True):
-        # Catch invalid server_url parameters
-        if not isinstance(server_url, (str, native_str)):
-            raise ValueError('Expected string for SeedLink server URL')
-        # Allow for sloppy server URLs (e.g. 'geofon.gfz-potsdam.de:18000).
-        # (According to RFC 1808 the net_path segment needs to start with '//'
-        # and this is expected by the urlparse function, so it is silently
-        # added if it was omitted by the user.)
-        if '://' not in server_url and not server_url.startswith('//'):
-            server_url = '//' + server_url
-
-        parsed_url = urlparse(server_url, scheme='seedlink')
-
-        # Check the provided scheme
-        if not parsed_url.scheme == 'seedlink':
-            msg = 'Unsupported scheme %s (expected "seedlink")' % \
-                  parsed_url.scheme
-            raise EasySeedLinkClientException(msg)
-        if not parsed_url.hostname:
-            msg = 'No host name provided'
-            raise EasySeedLinkClientException(msg)
-
-        self.server_hostname = parsed_url.hostname
-        self.server_port = parsed_url.port or 18000
+        self.server_hostname, self.server_port = \
+            _parse_server_url(server_url)
 
         self.conn = SeedLinkConnection()
         self.conn.set_sl_address('%s:%d' %
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+A SeedLink client receiving data from many servers in one process.
+
+The :class:`~.MultiSeedLinkClient` class handles any number of SeedLink
+connections at once. Every connection is served by a lightweight reader
+thread that only receives the raw packets. The packets of all connections are
+decoded in batches and contiguous packets of the same channel are merged into
+a single trace before they are passed to the
+:meth:`~.MultiSeedLinkClient.on_data` callback.
+
+.. code-block:: python
+
+    from obspy.clients.seedlink.multiseedlink import MultiSeedLinkClient
+
+    class MyClient(MultiSeedLinkClient):
+        def on_data(self, trace):
+            print(trace)
+
+    client = MyClient()
+    client.select_stream('geofon.gfz-potsdam.de', 'GE', 'WLF', 'BH?')
+    client.select_stream('rtserve.iris.washington.edu', 'IU', 'ANMO', 'BH?')
+    client.run()
+
+If the callbacks can not keep up with the incoming data, at most
+``max_buffered_packets`` packets are buffered. The reader threads then stop
+receiving until the buffer has been processed so the servers are throttled by
+the normal TCP flow control instead of memory filling up.
+
+The connections use
+:class:`~obspy.clients.seedlink.client.seedlinkconnection.SeedLinkConnection`
+so reconnects, keepalives and network timeouts are handled per connection as
+usual. A failing server only affects its own connection.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import io
+import logging
+import socket
+import threading
+import time
+
+from obspy import Stream, read
+from .client.seedlinkconnection import SeedLinkConnection
+from .easyseedlink import _parse_server_url
+from .slpacket import SLPacket
+
+if PY2:
+    import Queue as queue
+else:
+    import queue
+
+
+logger = logging.getLogger('obspy.clients.seedlink')
+
+
+def decode_packets(records):
+    """
+    Decodes a batch of MiniSEED records.
+
+    Contiguous records of the same channel are merged into one trace.
+
+    :type records: list of bytes
+    :param records: The MiniSEED records, e.g.
+        :attr:`~obspy.clients.seedlink.slpacket.SLPacket.msrecord`.
+    :rtype: :class:`~obspy.core.stream.Stream`
+    """
+    if not records:
+        return Stream()
+    with io.BytesIO(b''.join(bytes(_i) for _i in records)) as buf:
+        return read(buf, format='MSEED')
+
+
+class _ConnectionThread(threading.Thread):
+    """
+    Receives the packets of one SeedLink connection and puts them into the
+    queue shared by all connections.
+    """
+    def __init__(self, key, conn, packets, stop_event):
+        super(_ConnectionThread, self).__init__()
+        self.daemon = True
+        self.key = key
+        self.conn = conn
+        self.packets = packets
+        self.stop_event = stop_event
+
+    def _put(self, item):
+        # Blocks while the buffer is full, the server is throttled by not
+        # reading from the socket in the meantime.
+        while not self.stop_event.is_set():
+            try:
+                self.packets.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                data = self.conn.collect()
+                if data == SLPacket.SLTERMINATE:
+                    break
+                elif data == SLPacket.SLERROR:
+                    if not self._put((self.key, SLPacket.SLERROR)):
+                        break
+                    continue
+                # In-stream INFO packets are not supported.
+                if data.slhead[:len(SLPacket.INFOSIGNATURE)].lower() == \
+                        SLPacket.INFOSIGNATURE.lower():
+                    continue
+                if not self._put((self.key, data.msrecord)):
+                    break
+        except Exception as e:
+            logger.error("SeedLink connection to %s failed: %s" % (
+                self.key, e))
+        finally:
+            self.conn.close()
+            self._put((self.key, SLPacket.SLTERMINATE))
+
+
+class MultiSeedLinkClient(object):
+    """
+    SeedLink client receiving data from multiple servers at once.
+
+    Meant to be used as a base class with a subclass implementing the
+    :meth:`~.MultiSeedLinkClient.on_data` callback, see the module
+    documentation for an example. All callbacks are called from the thread
+    calling :meth:`~.MultiSeedLinkClient.run`.
+
+    :type batch_size: int
+    :param batch_size: Maximum number of packets decoded at once.
+    :type batch_interval: float
+    :param batch_interval: Maximum time in seconds the first packet of a
+        batch waits for more packets before the batch is decoded. Larger
+        values merge more packets into each trace at the cost of latency.
+    :type max_buffered_packets: int
+    :param max_buffered_packets: Maximum number of received packets waiting
+        to be decoded. The connections stop receiving if it is reached.
+    """
+    def __init__(self, batch_size=1000, batch_interval=0.5,
+                 max_buffered_packets=10000):
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.connections = {}
+        self._packets = queue.Queue(maxsize=max_buffered_packets)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_server(self, server_url, **kwargs):
+        """
+        Adds a SeedLink server.
+
+        Additional keyword arguments are set as attributes of the server's
+        :class:`~obspy.clients.seedlink.client.seedlinkconnection.SeedLinkConnection`,
+        e.g. ``netto``, ``netdly`` or ``keepalive``.
+
+        :type server_url: str
+        :param server_url: The SeedLink server URL.
+        :rtype: :class:`~.seedlinkconnection.SeedLinkConnection`
+        :return: The connection to the server.
+        """
+        key = '%s:%d' % _parse_server_url(server_url)
+        if key not in self.connections:
+            conn = SeedLinkConnection()
+            conn.set_sl_address(key)
+            self.connections[key] = conn
+        conn = self.connections[key]
+        for name, value in kwargs.items():
+            setattr(conn, name, value)
+        return conn
+
+    def select_stream(self, server_url, net, station, selector=None):
+        """
+        Selects a stream of a SeedLink server for data transfer.
+
+        The server is added if necessary. Has to be called before
+        :meth:`~.MultiSeedLinkClient.run`.
+
+        :type server_url: str
+        :param server_url: The SeedLink server URL.
+        :type net: str
+        :param net: The network id
+        :type station: str
+        :param station: The station id
+        :type selector: str
+        :param selector: a valid SeedLink selector, e.g. ``EHZ`` or ``EH?``
+        """
+        self.add_server(server_url).add_stream(net, station, selector,
+                                               seqnum=-1, timestamp=None)
+
+    def run(self):
+        """
+        Starts streaming data from all servers.
+
+        Returns once all connections have been terminated, either by the
+        servers or by calling :meth:`~.MultiSeedLinkClient.stop`.
+        """
+        for key, conn in sorted(self.connections.items()):
+            if not conn.streams:
+                msg = 'No streams selected for %s.' % key
+                raise ValueError(msg)
+        self._stop.clear()
+        self._threads = [
+            _ConnectionThread(key, conn, self._packets, self._stop)
+            for key, conn in sorted(self.connections.items())]
+        for thread in self._threads:
+            thread.start()
+        running = len(self._threads)
+        try:
+            while running and not self._stop.is_set():
+                records, events = self._next_batch()
+                if records:
+                    for trace in self._decode(records):
+                        self.on_data(trace)
+                for key, event in events:
+                    if event == SLPacket.SLERROR:
+                        self.on_seedlink_error(key)
+                    else:
+                        running -= 1
+                        self.on_terminate(key)
+        finally:
+            self.stop()
+
+    def _decode(self, records):
+        try:
+            return decode_packets(records)
+        except Exception:
+            pass
+        # Find and skip the bad packets.
+        traces = []
+        for record in records:
+            try:
+                traces.extend(decode_packets([record]))
+            except Exception as e:
+                logger.error("bad packet: %s" % e)
+        return traces
+
+    def _next_batch(self):
+        """
+        Waits for the next batch of packets.
+
+        Returns the records and the events (termination and errors) of the
+        connections. A batch ends early on an event so the events keep
+        their order relative to the data.
+        """
+        records = []
+        deadline = None
+        while len(records) < self.batch_size:
+            if deadline is None:
+                timeout = 0.1
+            else:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+            try:
+                key, item = self._packets.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is None:
+                    # Nothing received, give run() the chance to return.
+                    break
+                continue
+            if item in (SLPacket.SLERROR, SLPacket.SLTERMINATE):
+                return records, [(key, item)]
+            records.append(item)
+            if deadline is None:
+                deadline = time.time() + self.batch_interval
+        return records, []
+
+    def stop(self):
+        """
+        Terminates all connections.
+
+        Can be called from any thread, e.g. from a callback.
+        """
+        self._stop.set()
+        for conn in self.connections.values():
+            conn.terminate()
+            # Wake up reader threads waiting for data.
+            sock = conn.socket
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except (socket.error, OSError):
+                    pass
+        if threading.current_thread() not in self._threads:
+            for thread in self._threads:
+                thread.join(5.0)
+
+    def on_terminate(self, server):
+        """
+        Callback for handling the termination of a connection.
+
+        :type server: str
+        :param server: ``host:port`` of the SeedLink server.
+        """
+        pass
+
+    def on_seedlink_error(self, server):
+        """
+        Callback for handling SeedLink ``ERROR`` responses.
+
+        :type server: str
+        :param server: ``host:port`` of the SeedLink server.
+        """
+        pass
+
+    def on_data(self, trace):
+        """
+        Callback for handling the reception of waveform data.
+
+        Override this for data streaming.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Data of one channel. Contains the data of all
+            contiguous packets of the channel received within one batch.
+        """
+        pass
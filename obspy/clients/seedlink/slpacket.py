@@ -110,12 +110,12 @@ class SLPacket(object):
             return -1
         return seqnum
 
-    def get_ms_record(self):
+    def get_ms_record(self, dataflag=1):
         # following from obspy.io.mseed.tests.test_libmseed.py -> test_msrParse
         msr = clibmseed.msr_init(None)
         pyobj = from_buffer(self.msrecord, dtype=np.int8)
-        errcode = \
-            clibmseed.msr_parse(pyobj, len(pyobj), C.pointer(msr), -1, 1, 1)
+        errcode = clibmseed.msr_parse(pyobj, len(pyobj), C.pointer(msr), -1,
+                                      dataflag, 1)
         if errcode != 0:
             msg = "failed to decode mini-seed record: msr_parse errcode: %s"
             raise SeedLinkException(msg % (errcode))
@@ -127,6 +127,28 @@ class SLPacket(object):
     def free_ms_record(self, msr, msrecord_py):
         clibmseed.msr_free(msr)
 
+    def get_header(self):
+        """
+        Get the network, station, location and channel codes and the start
+        time of the MiniSEED record without decoding the data samples.
+        """
+        if self.trace is not None:
+            stats = self.trace.stats
+            return {'network': stats.network, 'station': stats.station,
+                    'location': stats.location, 'channel': stats.channel,
+                    'starttime': stats.starttime}
+        msr, msrecord_py = self.get_ms_record(dataflag=0)
+        try:
+            header = dict((key, getattr(msrecord_py, key)) for key in (
+                'network', 'station', 'location', 'channel', 'starttime'))
+        finally:
+            self.free_ms_record(msr, msrecord_py)
+        for key, value in header.items():
+            if key != 'starttime' and not isinstance(value, str):
+                header[key] = value.decode()
+        header['starttime'] = _convert_mstime_to_datetime(header['starttime'])
+        return header
+
     def get_trace(self):
 
         if self.trace is not None:
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.seedlink.multiseedlink test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import io
+import socket
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from obspy import Trace, UTCDateTime
+from obspy.clients.seedlink.multiseedlink import (MultiSeedLinkClient,
+                                                  decode_packets)
+
+if PY2:
+    import SocketServer as socketserver
+else:
+    import socketserver
+
+
+def _make_records(network, station, channel, npts=2000, reclen=512,
+                  starttime=UTCDateTime(2017, 1, 1)):
+    tr = Trace(data=np.arange(npts, dtype=np.int32))
+    tr.stats.network = network
+    tr.stats.station = station
+    tr.stats.channel = channel
+    tr.stats.starttime = starttime
+    with io.BytesIO() as buf:
+        tr.write(buf, format='MSEED', reclen=reclen, encoding='STEIM2')
+        data = buf.getvalue()
+    return [data[i:i + reclen] for i in range(0, len(data), reclen)]
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn,
+                          socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def _command(self):
+        cmd = b''
+        while not cmd.endswith(b'\r'):
+            char = self.request.recv(1)
+            if not char:
+                return None
+            cmd += char
+        return cmd.strip().decode()
+
+    def handle(self):
+        fake = self.server.fake
+        while True:
+            cmd = self._command()
+            if cmd is None:
+                return
+            fake.commands.append(cmd)
+            if cmd == 'HELLO':
+                self.request.sendall(
+                    b'SeedLink v3.1 (2017.001 test)\r\ntest\r\n')
+            elif cmd == 'END':
+                break
+            else:
+                self.request.sendall(b'OK\r\n')
+        for i, record in enumerate(fake.records):
+            self.request.sendall(('SL%06X' % i).encode() + record)
+            time.sleep(fake.delay)
+        if fake.send_end:
+            self.request.sendall(b'END')
+        # Wait for the client to close the connection.
+        while self.request.recv(1024):
+            pass
+
+
+class FakeSeedLinkServer(object):
+    """
+    Sends the given records to every client after the stream negotiation.
+    """
+    def __init__(self, records, delay=0.0, send_end=True):
+        self.records = records
+        self.delay = delay
+        self.send_end = send_end
+        self.commands = []
+
+    def __enter__(self):
+        self.server = _ThreadingTCPServer(('127.0.0.1', 0), _RequestHandler)
+        self.server.fake = self
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = '%s:%d' % self.server.server_address
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class _CollectingClient(MultiSeedLinkClient):
+    def __init__(self, *args, **kwargs):
+        super(_CollectingClient, self).__init__(*args, **kwargs)
+        self.traces = []
+        self.terminated = []
+
+    def on_data(self, trace):
+        self.traces.append(trace)
+
+    def on_terminate(self, server):
+        self.terminated.append(server)
+
+
+class MultiSeedLinkClientTestCase(unittest.TestCase):
+    def test_decode_packets(self):
+        records = _make_records('XX', 'A', 'HHZ')
+        other = _make_records('XX', 'B', 'HHZ')
+        self.assertGreater(len(records), 2)
+        # Interleaved records of two channels.
+        mixed = [r for pair in zip(records, other) for r in pair]
+        st = decode_packets(mixed)
+        self.assertEqual(len(st), 2)
+        st.sort()
+        for tr in st:
+            np.testing.assert_array_equal(
+                tr.data, np.arange(tr.stats.npts))
+        self.assertEqual(st[0].id, 'XX.A..HHZ')
+        self.assertEqual(len(decode_packets([])), 0)
+
+    def test_multiple_servers(self):
+        records_a = _make_records('XX', 'A', 'HHZ')
+        records_b = _make_records('XX', 'B', 'HHZ', npts=3000)
+        with FakeSeedLinkServer(records_a) as server_a, \
+                FakeSeedLinkServer(records_b) as server_b:
+            client = _CollectingClient(batch_interval=0.2,
+                                       max_buffered_packets=2)
+            client.select_stream(server_a.url, 'XX', 'A', 'HHZ')
+            client.select_stream(server_b.url, 'XX', 'B', 'HHZ')
+            # Not reachable, must not affect the other connections.
+            sock = socket.socket()
+            sock.bind(('127.0.0.1', 0))
+            closed_url = '%s:%d' % sock.getsockname()
+            sock.close()
+            client.select_stream(closed_url, 'XX', 'C', 'HHZ')
+            client.run()
+
+        self.assertEqual(sorted(client.terminated),
+                         sorted([server_a.url, server_b.url, closed_url]))
+        self.assertIn('STATION A XX', [' '.join(c.split())
+                                       for c in server_a.commands])
+        self.assertIn('SELECT HHZ', server_a.commands)
+        npts = {}
+        for tr in client.traces:
+            npts[tr.id] = npts.get(tr.id, 0) + tr.stats.npts
+        self.assertEqual(npts, {'XX.A..HHZ': 2000, 'XX.B..HHZ': 3000})
+        # Contiguous packets have been merged.
+        self.assertLess(len(client.traces),
+                        len(records_a) + len(records_b))
+
+    def test_stop(self):
+        records = _make_records('XX', 'A', 'HHZ', npts=20000)
+
+        class _StoppingClient(_CollectingClient):
+            def on_data(self, trace):
+                super(_StoppingClient, self).on_data(trace)
+                self.stop()
+
+        with FakeSeedLinkServer(records, delay=0.05,
+                                send_end=False) as server:
+            client = _StoppingClient(batch_interval=0.1)
+            client.select_stream(server.url, 'XX', 'A', 'HHZ')
+            start = time.time()
+            client.run()
+            self.assertLess(time.time() - start, 10)
+        self.assertEqual(len(client.traces), 1)
+        self.assertLess(client.traces[0].stats.npts, 20000)
+
+    def test_no_streams(self):
+        client = MultiSeedLinkClient()
+        client.add_server('localhost:18000', netto=10)
+        self.assertEqual(client.connections['localhost:18000'].netto, 10)
+        self.assertRaises(ValueError, client.run)
+
+
+def suite():
+    return unittest.makeSuite(MultiSeedLinkClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
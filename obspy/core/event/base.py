@@ -25,16 +25,41 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import copy
+import math
 import warnings
 
-import numpy as np
-
 from obspy.core.event.resourceid import ResourceIdentifier
 from obspy.core.event.header import DataUsedWaveType, ATTRIBUTE_HAS_ERRORS
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
 
 
+# Clock for the modification stamps of the event type objects. It is
+# incremented on every attribute assignment and the new value is stored on the
+# modified object, see AbstractEventType._modified. Caches derived from event
+# objects (e.g. the columnar view of a Catalog) compare the stamps of the
+# objects they were built from to the clock at build time.
+_modification_clock = [0]
+
+
+def _modified_since(objects, stamp):
+    """
+    Returns True if any of the given event type objects was modified after
+    the modification clock had the value ``stamp``.
+
+    Objects without a stamp (e.g. shallow copies) are considered modified.
+    """
+    if _modification_clock[0] == stamp:
+        return False
+    try:
+        for obj in objects:
+            if obj._modified > stamp:
+                return True
+    except AttributeError:
+        return True
+    return False
+
+
 class QuantityError(AttribDict):
     """
     Uncertainty information for a physical quantity.
@@ -107,6 +132,64 @@ def _bool(value):
     return bool(value)
 
 
+# Stands in for error quantities that have not been created yet when
+# comparing or testing event type objects. Never handed out to users.
+_NO_ERROR = QuantityError()
+
+
+def _peek(obj, name):
+    """
+    Returns the attribute of an event type object without creating it if it
+    is a not yet created error quantity.
+    """
+    try:
+        return obj.__dict__[name]
+    except (AttributeError, KeyError):
+        pass
+    if name in getattr(obj, "_lazy_errors", ()):
+        return _NO_ERROR
+    return getattr(obj, name)
+
+
+def _make_converter(attrib_type):
+    """
+    Returns a function ``convert(obj, name, value)`` converting values set as
+    attribute ``name`` of an event type object to ``attrib_type``.
+    """
+    def convert(obj, name, value):
+        # If the value is None or already the correct type just return it.
+        if value is None or type(value) is attrib_type:
+            return value
+        # If it is a dict, and the attrib_type is no dict, than all
+        # values will be assumed to be keyword arguments.
+        if isinstance(value, dict):
+            new_value = attrib_type(**value)
+        else:
+            new_value = attrib_type(value)
+        if new_value is None:
+            msg = 'Setting attribute "%s" failed. ' % (name)
+            msg += 'Value "%s" could not be converted to type "%s"' % \
+                (str(value), str(attrib_type))
+            raise ValueError(msg)
+        return new_value
+
+    if attrib_type is not float:
+        return convert
+
+    def convert_float(obj, name, value):
+        value = convert(obj, name, value)
+        # Make sure all floats are finite - otherwise this is most
+        # likely a user error.
+        if value is not None and (math.isinf(value) or math.isnan(value)):
+            msg = "On %s object: Value '%s' for '%s' is " \
+                  "not a finite floating point value." % (
+                      type(obj).__name__, str(value), name)
+            raise ValueError(msg)
+        return value
+
+    return convert_float
+
+
 def _event_type_class_factory(class_name, class_attributes=[],
                               class_contains=[]):
     """
@@ -190,6 +273,10 @@ def _event_type_class_factory(class_name, class_attributes=[],
         QuantityError(...)
     """
     class AbstractEventType(AttribDict):
+        # Internal state kept out of the AttribDict items: the modification
+        # stamp (see _modification_clock) and the error quantities that will
+        # be created when first accessed.
+        __slots__ = ("_modified", "_lazy_errors")
         # Keep the class attributes in a class level list for a manual property
         # implementation that works when inheriting from AttribDict.
         _properties = []
@@ -201,12 +288,28 @@ def _event_type_class_factory(class_name, class_attributes=[],
         _property_dict = {}
         for key, value in _properties:
             _property_dict[key] = value
+        # Functions converting the values of each property, see
+        # _make_converter().
+        _converters = dict((key, _make_converter(value))
+                           for key, value in _properties)
+        # Error quantities are only created when first accessed. Objects
+        # like picks and arrivals otherwise spend most of their time and
+        # memory on QuantityError objects that are never used.
+        _error_keys = frozenset(
+            key for key, value in _properties
+            if key.endswith("_errors") and value is QuantityError)
         _containers = class_contains
         warn_on_non_default_key = True
         defaults = dict.fromkeys(class_contains, [])
         defaults.update(dict.fromkeys(_property_keys, None))
         do_not_warn_on = ["extra"]
 
+        def __new__(cls, *args, **kwargs):
+            self = super(AbstractEventType, cls).__new__(cls)
+            self._touch()
+            object.__setattr__(self, "_lazy_errors", cls._error_keys)
+            return self
+
         def __init__(self, *args, **kwargs):
             # Make sure the args work as expected. Therefore any specified
             # arg will overwrite a potential kwarg, e.g. arg at position 0 will
@@ -216,25 +319,117 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 # polluted be the error quantities.
                 kwargs[class_attributes[_i][0]] = item
             # Set all property values to None or the kwarg value.
-            for key, _ in self._properties:
+            data = self.__dict__
+            error_keys = lazy_errors = self._error_keys
+            for key in self._property_keys:
                 value = kwargs.get(key, None)
                 # special handling for resource id
                 if key == "resource_id":
                     if kwargs.get("force_resource_id", False):
                         if value is None:
                             value = ResourceIdentifier()
+                if value is None:
+                    # All errors are QuantityError. If they are not given,
+                    # they will be created once they are accessed.
+                    if key not in error_keys:
+                        data[key] = None
+                    continue
+                if key in error_keys:
+                    lazy_errors = lazy_errors.difference((key, ))
                 setattr(self, key, value)
+            object.__setattr__(self, "_lazy_errors", lazy_errors)
             # Containers currently are simple lists.
             for name in self._containers:
-                setattr(self, name, list(kwargs.get(name, [])))
-            # All errors are QuantityError. If they are not set yet, set them
-            # now.
-            for key, _ in self._properties:
-                if key.endswith("_errors") and getattr(self, key) is None:
-                    setattr(self, key, QuantityError())
+                data[name] = list(kwargs.get(name, []))
+
+        def _touch(self):
+            """
+            Updates the modification stamp of the object.
+            """
+            _modification_clock[0] += 1
+            object.__setattr__(self, "_modified", _modification_clock[0])
+
+        def __getitem__(self, name, default=None):
+            try:
+                return self.__dict__[name]
+            except KeyError:
+                if name in self._lazy_errors:
+                    value = self.__dict__[name] = QuantityError()
+                    return value
+                return super(AbstractEventType, self).__getitem__(name,
+                                                                  default)
+
+        def __delitem__(self, name):
+            lazy_errors = self._lazy_errors
+            self._touch()
+            if name in lazy_errors:
+                object.__setattr__(self, "_lazy_errors",
+                                   lazy_errors.difference((name, )))
+                if name not in self.__dict__:
+                    return
+            super(AbstractEventType, self).__delitem__(name)
+
+        __delattr__ = __delitem__
+
+        def __contains__(self, name):
+            # Like for AttribDict, all keys with class level defaults exist.
+            return name in self.__dict__ or name in self.defaults
+
+        def __iter__(self):
+            data = self.__dict__
+            if not self._error_keys:
+                return iter(data)
+            # Errors are added to the dictionary when they are created, so
+            # use the order of the properties followed by all other keys.
+            lazy_errors = self._lazy_errors
+            property_dict = self._property_dict
+            keys = [key for key in self._property_keys
+                    if key in data or key in lazy_errors]
+            keys.extend(key for key in data if key not in property_dict)
+            return iter(keys)
+
+        def __len__(self):
+            data = self.__dict__
+            return len(data) + len(self._lazy_errors.difference(data))
+
+        def __deepcopy__(self, memodict=None):
+            """
+            Copies the already type converted attributes directly instead of
+            setting them one by one on a newly initialized object.
+            """
+            memodict = {} if memodict is None else memodict
+            cls = self.__class__
+            new = cls.__new__(cls)
+            memodict[id(self)] = new
+            new.__dict__.update(copy.deepcopy(self.__dict__, memodict))
+            object.__setattr__(new, "_lazy_errors", self._lazy_errors)
+            resource_id = new.__dict__.get("resource_id")
+            if resource_id is not None:
+                resource_id._bind_referred_object(new)
+            return new
+
+        def __setstate__(self, state):
+            """
+            Restores the already type converted attributes directly.
+            """
+            data = self.__dict__
+            for key in self._property_keys:
+                if key not in self._error_keys:
+                    data[key] = None
+            for name in self._containers:
+                data[name] = []
+            data.update(state)
+            # Also set the slots, unpickling does not always call __new__.
+            self._touch()
+            object.__setattr__(self, "_lazy_errors",
+                               self._error_keys.difference(state))
+            resource_id = state.get("resource_id")
+            if resource_id is not None:
+                resource_id._bind_referred_object(self)
 
         def clear(self):
-            super(AbstractEventType, self).clear()
+            self.__dict__.clear()
+            self._touch()
             self.__init__(force_resource_id=False)
 
         def __str__(self, force_one_line=False):
@@ -273,7 +468,7 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 repr_str = value.__repr__()
                 # Print any associated errors.
                 error_key = key + "_errors"
-                if self.get(error_key, False):
+                if self.__dict__.get(error_key):
                     err_items = sorted(getattr(self, error_key).items())
                     repr_str += " [%s]" % ', '.join(
                         sorted([str(k) + "=" + str(v) for k, v in err_items
@@ -324,7 +519,7 @@ def _event_type_class_factory(class_name, class_attributes=[],
         def __bool__(self):
             # We use custom _bool() for testing getattr() since we want
             # zero valued int and float and empty string attributes to be True.
-            if any([_bool(getattr(self, _i))
+            if any([_bool(_peek(self, _i))
                     for _i in self._property_keys + self._containers]):
                 return True
             return False
@@ -337,8 +532,11 @@ def _event_type_class_factory(class_name, class_attributes=[],
             # Looping should be quicker on average than a list comprehension
             # because only the first non-equal attribute will already return.
             for attrib in self._property_keys:
-                if not hasattr(other, attrib) or \
-                   (getattr(self, attrib) != getattr(other, attrib)):
+                try:
+                    other_value = _peek(other, attrib)
+                except AttributeError:
+                    return False
+                if _peek(self, attrib) != other_value:
                     return False
             for container in self._containers:
                 if not hasattr(other, container) or \
@@ -354,6 +552,8 @@ def _event_type_class_factory(class_name, class_attributes=[],
             Custom property implementation that works if the class is
             inheriting from AttribDict.
             """
+            _modification_clock[0] += 1
+            object.__setattr__(self, "_modified", _modification_clock[0])
             # avoid type casting of 'extra' attribute, to make it possible to
             # control ordering of extra tags by using an OrderedDict for
             # 'extra'.
@@ -361,40 +561,18 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 dict.__setattr__(self, name, value)
                 return
             # Pass to the parent method if not a custom property.
-            if name not in self._property_dict.keys():
+            converter = self._converters.get(name)
+            if converter is None:
                 AttribDict.__setattr__(self, name, value)
                 return
-            attrib_type = self._property_dict[name]
-            # If the value is None or already the correct type just set it.
-            if (value is not None) and (type(value) is not attrib_type):
-                # If it is a dict, and the attrib_type is no dict, than all
-                # values will be assumed to be keyword arguments.
-                if isinstance(value, dict):
-                    new_value = attrib_type(**value)
-                else:
-                    new_value = attrib_type(value)
-                if new_value is None:
-                    msg = 'Setting attribute "%s" failed. ' % (name)
-                    msg += 'Value "%s" could not be converted to type "%s"' % \
-                        (str(value), str(attrib_type))
-                    raise ValueError(msg)
-                value = new_value
-
-            # Make sure all floats are finite - otherwise this is most
-            # likely a user error.
-            if attrib_type is float and value is not None:
-                if not np.isfinite(value):
-                    msg = "On %s object: Value '%s' for '%s' is " \
-                          "not a finite floating point value." % (
-                              type(self).__name__, str(value), name)
-
-                    raise ValueError(msg)
-
-            AttribDict.__setattr__(self, name, value)
+            value = converter(self, name, value)
+            # The value already has the correct type, so none of the checks
+            # and conversions of AttribDict.__setitem__ apply.
+            self.__dict__[name] = value
             # if value is a resource id bind or unbind the resource_id
             if isinstance(value, ResourceIdentifier):
                 if name == "resource_id":  # bind the resource_id to self
-                    self.resource_id.set_referred_object(self, warn=False)
+                    self.resource_id._bind_referred_object(self)
                 else:  # else unbind to allow event scoping later
                     value._parent_key = None
 
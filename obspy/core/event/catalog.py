@@ -38,14 +38,31 @@ from obspy.core.util.decorator import map_example_filename, uncompress_file
 from obspy.core.util.misc import buffered_load_entry_point
 from obspy.imaging.cm import obspy_sequential
 
+from . import base
 from .base import CreationInfo
 from obspy.core.event import ResourceIdentifier
 
 from .event import Event
+from .magnitude import Magnitude
+from .origin import Origin, OriginQuality
 
 EVENT_ENTRY_POINTS = ENTRY_POINTS['event']
 EVENT_ENTRY_POINTS_WRITE = ENTRY_POINTS['event_write']
 
+# Fields of the columnar view of a catalog, see Catalog.to_columns(). String
+# fields are appended with a width depending on the content.
+COLUMNS_NUMERIC_FIELDS = [
+    ("time", np.int64), ("latitude", np.float64), ("longitude", np.float64),
+    ("depth", np.float64), ("magnitude", np.float64),
+    ("standard_error", np.float64), ("azimuthal_gap", np.float64),
+    ("used_station_count", np.float64), ("used_phase_count", np.float64)]
+COLUMNS_STRING_FIELDS = ["magnitude_type", "event_type", "resource_id"]
+COLUMNS_QUALITY_FIELDS = ["standard_error", "azimuthal_gap",
+                          "used_station_count", "used_phase_count"]
+# Undefined times in the columnar view. Sorts and compares smaller than any
+# valid time.
+COLUMNS_NO_TIME = np.iinfo(np.int64).min
+
 
 class Catalog(object):
     """
@@ -88,16 +105,23 @@ class Catalog(object):
             value = ResourceIdentifier(**value)
         elif type(value) != ResourceIdentifier:
             value = ResourceIdentifier(value)
-        value.set_referred_object(self, warn=False)
+        value._bind_referred_object(self)
         self.__dict__['resource_id'] = value
 
+    def __getstate__(self):
+        """
+        Do not pickle the cached columnar view.
+        """
+        state = self.__dict__.copy()
+        state.pop('_columns_cache', None)
+        return state
+
     def __setstate__(self, state):
         """
         Reset the resource id after being unpickled to ensure they are
         bound to the correct object.
         """
-        state['resource_id'].set_referred_object(self, warn=False,
-                                                 parent=self)
+        state['resource_id']._bind_referred_object(self, parent=self)
         self.__dict__.update(state)
 
     resource_id = property(_get_resource_id, _set_resource_id)
@@ -301,6 +325,10 @@ class Catalog(object):
         Use ``inverse=True`` to return the Events that *do not* match the
         specified filter rules.
 
+        The rules are evaluated on the preferred origin and magnitude of each
+        event (or the first ones if no preferred ones are set) using the
+        cached columnar view of the catalog, see :meth:`to_columns`.
+
         :rtype: :class:`Catalog`
         :return: Filtered catalog. A new Catalog object with filtered
             Events as references to the original Events.
@@ -331,28 +359,20 @@ class Catalog(object):
         2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
         2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
         """
-        # Helper functions. Only first argument might be None. Avoid
-        # unorderable types by checking first shortcut on positive is None
-        # also for the greater stuff (is confusing but correct)
-        def _is_smaller(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return True
-            return False
+        # Operators on the columns. Undefined values (NaN or the minimum
+        # time) compare smaller than everything else, just like None values
+        # did in the original implementation.
+        def _is_smaller(values, value):
+            return np.isnan(values) | (values < value)
 
-        def _is_smaller_or_equal(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return True
-            return False
+        def _is_smaller_or_equal(values, value):
+            return np.isnan(values) | (values <= value)
 
-        def _is_greater(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return False
-            return True
+        def _is_greater(values, value):
+            return ~np.isnan(values) & (values > value)
 
-        def _is_greater_or_equal(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return False
-            return True
+        def _is_greater_or_equal(values, value):
+            return ~np.isnan(values) & (values >= value)
 
         # Map the function to the operators.
         operator_map = {"<": _is_smaller,
@@ -365,49 +385,293 @@ class Catalog(object):
         except KeyError:
             inverse = False
 
-        events = list(self.events)
+        columns, has_origin, has_quality = self._get_columns()
+        keep = np.ones(len(columns), dtype=np.bool_)
         for arg in args:
             try:
                 key, operator, value = arg.split(" ", 2)
-            except ValueError:
+                operator = operator_map[operator]
+            except (ValueError, KeyError):
                 msg = "%s is not a valid filter rule." % arg
                 raise ValueError(msg)
             if key == "magnitude":
-                temp_events = []
-                for event in events:
-                    if (event.magnitudes and event.magnitudes[0].mag and
-                        operator_map[operator](
-                            event.magnitudes[0].mag,
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ("longitude", "latitude", "depth", "time"):
-                temp_events = []
-                for event in events:
-                    if (event.origins and key in event.origins[0] and
-                        operator_map[operator](
-                            event.origins[0].get(key),
-                            UTCDateTime(value) if key == 'time' else
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ('standard_error', 'azimuthal_gap',
-                         'used_station_count', 'used_phase_count'):
-                temp_events = []
-                for event in events:
-                    if (event.origins and event.origins[0].quality and
-                        key in event.origins[0].quality and
-                        operator_map[operator](
-                            event.origins[0].quality.get(key),
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
+                values = columns[key]
+                # Events with a magnitude of zero are not matched.
+                valid = ~np.isnan(values) & (values != 0)
+                value = float(value)
+            elif key == "time":
+                values = columns[key]
+                valid = has_origin
+                value = UTCDateTime(value).ns
+            elif key in ("longitude", "latitude", "depth"):
+                values = columns[key]
+                valid = has_origin
+                value = float(value)
+            elif key in COLUMNS_QUALITY_FIELDS:
+                values = columns[key]
+                valid = has_quality
+                value = float(value)
             else:
                 msg = "%s is not a valid filter key" % key
                 raise ValueError(msg)
+            with np.errstate(invalid="ignore"):
+                keep &= valid & operator(values, value)
         if inverse:
-            events = [ev for ev in self.events if ev not in events]
-        return Catalog(events=events)
+            keep = ~keep
+        return Catalog(events=[self.events[_i] for _i in np.nonzero(keep)[0]])
+
+    def _get_columns(self):
+        """
+        Returns the (cached) columnar view of the catalog.
+
+        Also returns boolean arrays denoting which events have an origin and
+        which have an origin with quality information. The cache is
+        invalidated whenever the list of events changes or an attribute of
+        any of the event, origin, origin quality or magnitude objects it was
+        built from is set.
+        """
+        event_ids = tuple(map(id, self.events))
+        cache = self.__dict__.get('_columns_cache')
+        if cache is not None and cache[0] == event_ids and \
+                not base._modified_since(cache[2], cache[1]):
+            return cache[3]
+        columns, has_origin, has_quality, sources = \
+            _events_to_columns(self.events)
+        # Take the clock after creating the columns in case that modified
+        # any objects.
+        self.__dict__['_columns_cache'] = (
+            event_ids, base._modification_clock[0], sources,
+            (columns, has_origin, has_quality))
+        return columns, has_origin, has_quality
+
+    def to_columns(self):
+        """
+        Returns a columnar view of the catalog as a numpy structured array.
+
+        Each row corresponds to one event, using its preferred origin and
+        magnitude (or the first ones if no preferred ones are set). The
+        fields are ``time`` (POSIX timestamp as integer nanoseconds),
+        ``latitude``, ``longitude``, ``depth``, ``magnitude``,
+        ``standard_error``, ``azimuthal_gap``, ``used_station_count``,
+        ``used_phase_count``, ``magnitude_type``, ``event_type`` and
+        ``resource_id``. Undefined floating point values are ``NaN``,
+        undefined times are the smallest possible 64 bit integer and
+        undefined strings are empty.
+
+        The view is cached on the catalog and also used by :meth:`filter`,
+        :meth:`sort` and :meth:`statistics`. Adding or removing events and
+        setting attributes on the events or their preferred origins,
+        origin qualities and magnitudes invalidates the cache. In-place
+        changes to the lists of origins or magnitudes of an event are not
+        detected.
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> columns = cat.to_columns()
+        >>> print(columns["magnitude"])
+        [ 4.4  4.3  3. ]
+        >>> print(columns["magnitude_type"][0], columns["latitude"][0])
+        mb 41.818
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self._get_columns()[0].copy()
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Creates a catalog from its columnar view, see :meth:`to_columns`.
+
+        Each event will have one origin and one magnitude (if the respective
+        values are defined) which are set as the preferred ones.
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> cat2 = Catalog.from_columns(cat.to_columns())
+        >>> print(cat2)
+        3 Event(s) in Catalog:
+        2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb
+        2012-04-04T14:18:37.000000Z | +39.342,  +41.044 | 4.3 ML
+        2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML
+
+        :type columns: :class:`numpy.ndarray`
+        :param columns: Structured array with the fields described in
+            :meth:`to_columns`. Missing fields are considered undefined.
+        :rtype: :class:`Catalog`
+        """
+        names = columns.dtype.names
+
+        def _get(row, key):
+            if key not in names:
+                return None
+            value = row[key]
+            if key in COLUMNS_STRING_FIELDS:
+                return str(value) or None
+            if key == "time":
+                if value == COLUMNS_NO_TIME:
+                    return None
+                return UTCDateTime(ns=int(value))
+            if np.isnan(value):
+                return None
+            if key.startswith("used_"):
+                return int(value)
+            return float(value)
+
+        events = []
+        for row in columns:
+            event = Event(resource_id=_get(row, "resource_id"),
+                          event_type=_get(row, "event_type"))
+            origin_kwargs = dict(
+                (key, _get(row, key))
+                for key in ("time", "latitude", "longitude", "depth"))
+            quality_kwargs = dict(
+                (key, _get(row, key)) for key in COLUMNS_QUALITY_FIELDS)
+            if any(value is not None for value in quality_kwargs.values()):
+                origin_kwargs["quality"] = OriginQuality(**quality_kwargs)
+            if any(value is not None for value in origin_kwargs.values()):
+                origin = Origin(**origin_kwargs)
+                event.origins.append(origin)
+                event.preferred_origin_id = origin.resource_id
+            mag = _get(row, "magnitude")
+            if mag is not None:
+                magnitude = Magnitude(
+                    mag=mag, magnitude_type=_get(row, "magnitude_type"))
+                event.magnitudes.append(magnitude)
+                event.preferred_magnitude_id = magnitude.resource_id
+            events.append(event)
+        return cls(events=events)
+
+    def sort(self, keys=None, reverse=False):
+        """
+        Sorts the events of the catalog in-place.
+
+        Sorting is done on the columnar view of the catalog (see
+        :meth:`to_columns`) and is stable in both directions. Events with
+        undefined values are sorted first for times and last for all other
+        fields (reversed if ``reverse=True``).
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> print(cat.sort(keys=["magnitude"]))
+        3 Event(s) in Catalog:
+        2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
+        2012-04-04T14:18:37.000000Z | +39.342,  +41.044 | 4.3 ML | manual
+        2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
+
+        :type keys: list of str
+        :param keys: Fields of the columnar view to sort by. Sorted by the
+            first field first, then by the second and so on. Defaults to
+            ``["time"]``.
+        :type reverse: bool
+        :param reverse: Sort in descending order.
+        :rtype: :class:`Catalog`
+        :return: The sorted catalog, for convenience.
+        """
+        if keys is None:
+            keys = ["time"]
+        elif isinstance(keys, (str, native_str)):
+            keys = [keys]
+        columns = self._get_columns()[0]
+        for key in keys:
+            if key not in columns.dtype.names:
+                msg = "%s is not a valid sort key" % key
+                raise ValueError(msg)
+        if not keys or not len(columns):
+            return self
+        sort_keys = []
+        # np.lexsort sorts by the last key first.
+        for key in reversed(keys):
+            values = columns[key]
+            if reverse:
+                # Sort by the negated ranks of the values to get a stable
+                # descending order for all field types.
+                values = -np.unique(values, return_inverse=True)[1]
+            sort_keys.append(values)
+        order = np.lexsort(sort_keys)
+        self.events = [self.events[_i] for _i in order]
+        return self
+
+    def statistics(self, keys=None):
+        """
+        Returns summary statistics of the fields of the catalog.
+
+        The statistics are computed on the columnar view of the catalog (see
+        :meth:`to_columns`), ignoring undefined values. For numeric fields a
+        dictionary with ``count``, ``min``, ``max``, ``mean``, ``median``
+        and ``std`` is returned. For ``time`` all values are
+        :class:`~obspy.core.utcdatetime.UTCDateTime` objects except for the
+        standard deviation, which is given in seconds. For
+        ``magnitude_type`` and ``event_type`` a dictionary with the number
+        of occurrences of each value is returned.
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> stats = cat.statistics()
+        >>> print(stats["magnitude"]["max"], stats["magnitude"]["count"])
+        4.4 3
+        >>> print(stats["time"]["min"])
+        2012-04-04T14:08:46.000000Z
+        >>> print(sorted(stats["magnitude_type"].items()))
+        [('ML', 2), ('mb', 1)]
+
+        :type keys: list of str
+        :param keys: Fields to compute the statistics for. Defaults to all
+            fields except ``resource_id``.
+        :rtype: dict
+        """
+        columns = self._get_columns()[0]
+        if keys is None:
+            keys = [key for key in columns.dtype.names
+                    if key != "resource_id"]
+        elif isinstance(keys, (str, native_str)):
+            keys = [keys]
+        stats = {}
+        for key in keys:
+            if key not in columns.dtype.names:
+                msg = "%s is not a valid statistics key" % key
+                raise ValueError(msg)
+            values = columns[key]
+            if key in COLUMNS_STRING_FIELDS:
+                unique, inverse = np.unique(values[values != ""],
+                                            return_inverse=True)
+                counts = np.bincount(inverse, minlength=len(unique))
+                stats[key] = dict((str(value), int(count))
+                                  for value, count in zip(unique, counts))
+                continue
+            if key == "time":
+                values = values[values != COLUMNS_NO_TIME]
+            else:
+                values = values[~np.isnan(values)]
+            result = {"count": len(values)}
+            if len(values):
+                if key == "time":
+                    # Use the offsets to the first time to not lose
+                    # precision.
+                    offsets = (values - values.min()) / 1e9
+                    result["min"] = UTCDateTime(ns=int(values.min()))
+                    result["max"] = UTCDateTime(ns=int(values.max()))
+                    result["mean"] = result["min"] + offsets.mean()
+                    result["median"] = result["min"] + np.median(offsets)
+                    result["std"] = float(offsets.std())
+                else:
+                    for name, func in (("min", np.min), ("max", np.max),
+                                       ("mean", np.mean),
+                                       ("median", np.median),
+                                       ("std", np.std)):
+                        result[name] = float(func(values))
+            else:
+                result.update(dict.fromkeys(
+                    ("min", "max", "mean", "median", "std")))
+            stats[key] = result
+        return stats
 
     def copy(self):
         """
@@ -775,6 +1039,79 @@ class Catalog(object):
         return fig
 
 
+def _events_to_columns(events):
+    """
+    Creates the columnar view of a list of events, see
+    :meth:`Catalog.to_columns`.
+
+    Also returns boolean arrays denoting which events have an origin and
+    which have an origin with quality information as well as a list of all
+    objects the values were taken from.
+    """
+    count = len(events)
+    sources = []
+    numeric = dict((key, np.empty(count, dtype=dtype))
+                   for key, dtype in COLUMNS_NUMERIC_FIELDS)
+    strings = dict((key, []) for key in COLUMNS_STRING_FIELDS)
+    has_origin = np.zeros(count, dtype=np.bool_)
+    has_quality = np.zeros(count, dtype=np.bool_)
+
+    def _float(value):
+        return np.nan if value is None else value
+
+    for _i, event in enumerate(events):
+        sources.append(event)
+        origin = None
+        if event.origins:
+            origin = event.preferred_origin() or event.origins[0]
+        if origin is not None:
+            sources.append(origin)
+            has_origin[_i] = True
+            time = origin.time
+            numeric["time"][_i] = COLUMNS_NO_TIME if time is None else time.ns
+            numeric["latitude"][_i] = _float(origin.latitude)
+            numeric["longitude"][_i] = _float(origin.longitude)
+            numeric["depth"][_i] = _float(origin.depth)
+            quality = origin.quality
+        else:
+            numeric["time"][_i] = COLUMNS_NO_TIME
+            for key in ("latitude", "longitude", "depth"):
+                numeric[key][_i] = np.nan
+            quality = None
+        if quality:
+            sources.append(quality)
+            has_quality[_i] = True
+            for key in COLUMNS_QUALITY_FIELDS:
+                numeric[key][_i] = _float(quality.get(key))
+        else:
+            for key in COLUMNS_QUALITY_FIELDS:
+                numeric[key][_i] = np.nan
+        magnitude = None
+        if event.magnitudes:
+            magnitude = event.preferred_magnitude() or event.magnitudes[0]
+        if magnitude is not None:
+            sources.append(magnitude)
+            numeric["magnitude"][_i] = _float(magnitude.mag)
+            strings["magnitude_type"].append(magnitude.magnitude_type or "")
+        else:
+            numeric["magnitude"][_i] = np.nan
+            strings["magnitude_type"].append("")
+        strings["event_type"].append(event.event_type or "")
+        strings["resource_id"].append(
+            str(event.resource_id) if event.resource_id else "")
+
+    dtype = [(native_str(key), dtype) for key, dtype in COLUMNS_NUMERIC_FIELDS]
+    for key in COLUMNS_STRING_FIELDS:
+        width = max([len(_i) for _i in strings[key]] + [1])
+        dtype.append((native_str(key), native_str("U%i" % width)))
+    columns = np.empty(count, dtype=dtype)
+    for key, values in numeric.items():
+        columns[key] = values
+    for key, values in strings.items():
+        columns[key] = values
+    return columns, has_origin, has_quality, sources
+
+
 @map_example_filename("pathname_or_url")
 def read_events(pathname_or_url=None, format=None, **kwargs):
     """
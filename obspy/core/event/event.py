@@ -26,7 +26,6 @@ import copy
 from obspy.core.event.header import (
     EventType, EventTypeCertainty, EventDescriptionType)
 from obspy.core.event.resourceid import ResourceIdentifier
-from obspy.core.util.misc import _yield_resource_id_parent_attr
 from obspy.imaging.source import plot_radiation_pattern, _setup_figure_and_axes
 
 
@@ -324,17 +323,11 @@ class Event(__Event):
         Ensure all resource_ids in event instance are event-scoped.
 
         This will ensure the resource_ids refer to objects in the event
-        structure when possible.
+        structure when possible. The event is only registered here, its
+        resource_ids are scoped the next time an object is looked up through
+        any resource_id.
         """
-        gen = _yield_resource_id_parent_attr(self)
-
-        for resource_id, parent, attr in gen:
-            if attr == 'resource_id':
-                resource_id.set_referred_object(parent, parent=self,
-                                                warn=False)
-            else:
-                resource_id._parent_key = self
-                resource_id._object_id = None
+        ResourceIdentifier._register_scope(self)
 
 
 __EventDescription = _event_type_class_factory(
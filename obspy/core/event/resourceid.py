@@ -15,11 +15,13 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import re
+import threading
 import warnings
+from collections import deque
 from contextlib import contextmanager
 from copy import deepcopy
 from uuid import uuid4
-from weakref import WeakKeyDictionary, WeakValueDictionary
+from weakref import WeakKeyDictionary, WeakValueDictionary, ref
 
 
 class _ResourceKey(object):
@@ -47,10 +49,12 @@ class _ResourceKey(object):
 
     @classmethod
     def get_resource_key(cls, unique_id):
-        if unique_id not in _ResourceKey._singleton_cache:
+        try:
+            return _ResourceKey._singleton_cache[unique_id]
+        except KeyError:
             single = _ResourceKey()
             _ResourceKey._singleton_cache[unique_id] = single
-        return _ResourceKey._singleton_cache[unique_id]
+            return single
 
 
 class _ResourceKeyDescriptor(object):
@@ -68,9 +72,25 @@ class _ResourceKeyDescriptor(object):
     def __set__(self, instance, value):
         # if an object was passed, use the id of the object for hash
         if value is not None:
-            if not isinstance(value, (int, str, native_str)):
-                value = id(value)
-            setattr(instance, self.name, _ResourceKey.get_resource_key(value))
+            self.set_key(instance, self.get_resource_key(value))
+
+    @staticmethod
+    def get_resource_key(value):
+        """
+        Return the _ResourceKey the descriptor would store for value.
+        """
+        if not isinstance(value, (int, str, native_str)):
+            value = id(value)
+        return _ResourceKey.get_resource_key(value)
+
+    def set_key(self, instance, resource_key):
+        """
+        Store an already looked up _ResourceKey on instance.
+
+        Used to scope many resource ids to the same parent without looking
+        up the key for each of them.
+        """
+        setattr(instance, self.name, resource_key)
 
 
 class ResourceIdentifier(object):
@@ -280,6 +300,12 @@ class ResourceIdentifier(object):
     # {object_id: object}
     _id_object_map = WeakValueDictionary()
 
+    # Weak references to the parents (events) whose resource ids still have
+    # to be scoped to them, in the order they were registered.
+    # See _register_scope().
+    _pending_scopes = deque()
+    _pending_scopes_lock = threading.RLock()
+
     # set default _ResourceKey attributes and object_id
     _parent_key = _ResourceKeyDescriptor('_parent_key')
     _resource_key = _ResourceKeyDescriptor('_resource_key')
@@ -313,6 +339,8 @@ class ResourceIdentifier(object):
         ID as this instance has an associated object. If not, this method will
         return None.
         """
+        if ResourceIdentifier._pending_scopes:
+            ResourceIdentifier._bind_pending_scopes()
         try:
             return ResourceIdentifier._id_object_map[self._object_id]
         except KeyError:
@@ -387,36 +415,148 @@ class ResourceIdentifier(object):
             event object are event-scoped.
         :type parent: object, int
         """
+        # Scopes registered in the meantime have to be bound first, they
+        # could refer to the objects looked up here or be overwritten later.
+        if ResourceIdentifier._pending_scopes:
+            ResourceIdentifier._bind_pending_scopes()
+        if warn:
+            # Get the last object bound to this instance of
+            # ResourceIdentifier or if there is None, get the last
+            # referred_object assigned the same resource_id code.
+            id_object_map = ResourceIdentifier._id_object_map
+            old = id_object_map.get(self._object_id, None)
+            if old is None:  # look for last object with same id code.
+                try:
+                    old_obj_id = \
+                        ResourceIdentifier._id_order[self._resource_key][-1]
+                    old = id_object_map[old_obj_id]
+                except (KeyError, IndexError):
+                    pass
+            if old is not None and old != referred_object:
+                msg = ('Warning, binding object to resource ID %s which '
+                       'is not equal to the last object bound to this '
+                       'resource_id') % self.id
+                warnings.warn(msg, UserWarning)
+        self._bind_referred_object(referred_object, parent=parent)
+
+    def _bind_referred_object(self, referred_object, parent=None):
+        """
+        Bind an object to the ResourceIdentifier instance.
 
-        # Get the last object bound to this instance of ResourceIdentifier or
-        # if there is None, get the last referred_object assigned the same
-        # resource_id code.
-        id_order = ResourceIdentifier._id_order
-        old = ResourceIdentifier._id_object_map.get(self._object_id, None)
-        if old is None:  # look for last object with same id code.
-            try:
-                old_obj_id = id_order[self._resource_key][-1]
-                old = ResourceIdentifier._id_object_map[old_obj_id]
-            except (KeyError, IndexError):
-                pass
-        if warn and old is not None and old != referred_object:
-            msg = ('Warning, binding object to resource ID %s which '
-                   'is not equal to the last object bound to this '
-                   'resource_id') % self.id
-            warnings.warn(msg, UserWarning)
+        Same as ``set_referred_object(referred_object, warn=False,
+        parent=parent)`` but does not bind the pending event scopes first.
+        Used by the event type classes to bind the objects they are creating,
+        copying or unpickling to their own resource ids.
+        """
         # Set the object id to the new object, and update parent scoping tree.
-        self._object_id = id(referred_object)
+        object_id = id(referred_object)
+        resource_key = self._resource_key
+        self._object_id = object_id
         if parent is not None:
             self._parent_key = parent
             id_tree = ResourceIdentifier._parent_id_tree
             if self._parent_key not in id_tree:
                 id_tree[self._parent_key] = WeakKeyDictionary()
-            id_tree[self._parent_key][self._resource_key] = self._object_id
+            id_tree[self._parent_key][resource_key] = object_id
         # Set the new id in id map and append referred_object to id_order.
-        ResourceIdentifier._id_object_map[self._object_id] = referred_object
-        if self._resource_key not in id_order:
-            id_order[self._resource_key] = []
-        id_order[self._resource_key].append(self._object_id)
+        id_object_map = ResourceIdentifier._id_object_map
+        id_object_map[object_id] = referred_object
+        object_ids = ResourceIdentifier._id_order.get(resource_key)
+        if object_ids is None:
+            ResourceIdentifier._id_order[resource_key] = [object_id]
+            return
+        if object_ids and object_ids[-1] == object_id:
+            return
+        object_ids.append(object_id)
+        # Every time the list doubled in size drop the ids of objects that
+        # have been garbage collected in the meantime. This keeps the lists
+        # from growing without bounds when e.g. catalogs are copied over and
+        # over while the cost stays amortized constant.
+        length = len(object_ids)
+        if length >= 16 and not length & (length - 1):
+            object_ids[:] = [_i for _i in object_ids if _i in id_object_map]
+
+    @classmethod
+    def _register_scope(cls, parent):
+        """
+        Register parent (e.g. an event) to scope all its resource ids to.
+
+        Takes constant time, no matter how many resource ids parent holds.
+        The resource ids of all registered parents are bound to their scopes
+        in one go, in the order the parents were registered, the next time
+        an object is looked up or bound through a resource id. Reading,
+        copying and unpickling large catalogs thus does not pay for scoping
+        the resource ids of every event unless they are used.
+        """
+        pending = cls._pending_scopes
+        if pending and pending[-1]() is parent:
+            return
+        pending.append(ref(parent))
+        # Every time the queue doubled in size drop the parents that have
+        # been garbage collected in the meantime, so it does not grow without
+        # bounds if no resource id is ever looked up.
+        length = len(pending)
+        if length >= 1024 and not length & (length - 1):
+            with cls._pending_scopes_lock:
+                alive = [_i for _i in pending if _i() is not None]
+                pending.clear()
+                pending.extend(alive)
+
+    @classmethod
+    def _bind_pending_scopes(cls):
+        """
+        Bind the resource ids of all registered parents to their scopes.
+        """
+        pending = cls._pending_scopes
+        with cls._pending_scopes_lock:
+            while pending:
+                # Only drop the parent once it is bound, other threads wait
+                # for it as long as the queue is not empty.
+                parent = pending[0]()
+                if parent is not None:
+                    cls._bind_scope(parent)
+                pending.popleft()
+
+    @classmethod
+    def _bind_scope(cls, parent):
+        """
+        Scope all resource ids contained in parent to parent.
+
+        Resource ids stored as ``resource_id`` attribute are bound to the
+        object holding them. All others (e.g. the ``pick_id`` of arrivals)
+        are only scoped to parent, their referred objects are looked up again
+        when needed.
+        """
+        from obspy.core.util.misc import _yield_resource_id_parent_attr
+        id_object_map = cls._id_object_map
+        id_order = cls._id_order
+        set_parent_key = cls.__dict__['_parent_key'].set_key
+        parent_key = _ResourceKeyDescriptor.get_resource_key(parent)
+        id_tree = cls._parent_id_tree
+        scope = id_tree.get(parent_key)
+        if scope is None:
+            scope = id_tree[parent_key] = WeakKeyDictionary()
+        for resource_id, obj, attr in _yield_resource_id_parent_attr(parent):
+            set_parent_key(resource_id, parent_key)
+            if attr != 'resource_id':
+                resource_id._object_id = None
+                continue
+            object_id = id(obj)
+            scope[resource_id._resource_key] = object_id
+            # Objects are bound to their own resource ids when they are
+            # created, copied or unpickled. They keep their place in the
+            # order of objects bound to the same id, so objects bound after
+            # parent was registered are still the newest ones.
+            if resource_id._object_id == object_id and \
+                    object_id in id_object_map:
+                continue
+            resource_id._object_id = object_id
+            id_object_map[object_id] = obj
+            object_ids = id_order.get(resource_id._resource_key)
+            if object_ids is None:
+                id_order[resource_id._resource_key] = [object_id]
+            else:
+                object_ids.append(object_id)
 
     def convert_id_to_quakeml_uri(self, authority_id="local"):
         """
@@ -629,6 +769,7 @@ class ResourceIdentifier(object):
         cls._parent_id_tree = state_dict['parent_id_tree']
         cls._id_order = state_dict['id_order']
         cls._id_object_map = state_dict['id_object_map']
+        cls._pending_scopes = state_dict['pending_scopes']
 
     @classmethod
     @contextmanager
@@ -645,12 +786,14 @@ class ResourceIdentifier(object):
             parent_id_tree=cls._parent_id_tree,
             id_order=cls._id_order,
             id_object_map=cls._id_object_map,
+            pending_scopes=cls._pending_scopes,
         )
         # init new class state
         new_state = dict(
             parent_id_tree=WeakKeyDictionary(),
             id_order=WeakKeyDictionary(),
             id_object_map=WeakValueDictionary(),
+            pending_scopes=deque(),
         )
         # bind new state and return dict
         cls._bind_class_state(new_state)
@@ -212,7 +212,8 @@ from .response import (CoefficientsTypeResponseStage,
                        FIRResponseStage, InstrumentPolynomial,
                        InstrumentSensitivity, PolesZerosResponseStage,
                        PolynomialResponseStage, Response,
-                       ResponseListResponseStage, ResponseStage)
+                       ResponseListResponseStage, ResponsePool,
+                       ResponseStage)
 from .station import Station
 
 
@@ -20,6 +20,8 @@ import os
 import textwrap
 import warnings
 
+import numpy as np
+
 import obspy
 from obspy.core.util.base import (ENTRY_POINTS, ComparingObject,
                                   _read_from_plugin, NamedTemporaryFile,
@@ -29,6 +31,7 @@ from obspy.core.util.misc import buffered_load_entry_point
 from obspy.core.util.obspy_types import ObsPyException, ZeroSamplingRate
 
 from .network import Network
+from .response import ResponsePool
 from .util import _unified_content_strings, _textwrap
 
 # Make sure this is consistent with obspy.io.stationxml! Importing it
@@ -333,6 +336,43 @@ class Inventory(ComparingObject):
             raise ValueError(msg)
         self._networks = value
 
+    def deduplicate_responses(self, pool=None):
+        """
+        Share identical responses between all channels of the inventory.
+
+        All :class:`~obspy.core.inventory.response.Response` objects (and
+        their response stages) that are identical are replaced in-place by a
+        single shared instance. This can considerably reduce the memory
+        footprint of large inventories with many channels using the same
+        instrumentation.
+
+        .. warning::
+            Afterwards the channels share their response objects, modifying a
+            response in-place affects all channels it is attached to. See
+            :meth:`ResponsePool.unshare()
+            <obspy.core.inventory.response.ResponsePool.unshare>`.
+
+        >>> from obspy import read_inventory
+        >>> inv = read_inventory()
+        >>> inv += read_inventory()
+        >>> pool = inv.deduplicate_responses()
+        >>> inv[0][0][0].response is inv[2][0][0].response
+        True
+
+        :type pool: :class:`~obspy.core.inventory.response.ResponsePool`
+        :param pool: Pool to use, e.g. to share responses across multiple
+            inventories. A new pool is created if not given.
+        :rtype: :class:`~obspy.core.inventory.response.ResponsePool`
+        :returns: The used pool.
+        """
+        if pool is None:
+            pool = ResponsePool()
+        for net in self.networks:
+            for sta in net.stations:
+                for cha in sta.channels:
+                    cha.response = pool.intern_response(cha.response)
+        return pool
+
     def get_response(self, seed_id, datetime):
         """
         Find response for a given channel at given time.
@@ -459,7 +499,9 @@ class Inventory(ComparingObject):
 
     def select(self, network=None, station=None, location=None, channel=None,
                time=None, starttime=None, endtime=None, sampling_rate=None,
-               keep_empty=False):
+               keep_empty=False, minlatitude=None, maxlatitude=None,
+               minlongitude=None, maxlongitude=None, latitude=None,
+               longitude=None, minradius=None, maxradius=None):
         """
         Return a copy of the inventory filtered on various parameters.
 
@@ -529,6 +571,42 @@ class Inventory(ComparingObject):
         :param keep_empty: If set to `True`, networks/stations that match
             themselves but have no matching child elements (stations/channels)
             will be included in the result.
+        :type minlatitude: float
+        :param minlatitude: Only include stations with a latitude
+            larger than or equal to the specified minimum.
+        :type maxlatitude: float
+        :param maxlatitude: Only include stations with a latitude
+            smaller than or equal to the specified maximum.
+        :type minlongitude: float
+        :param minlongitude: Only include stations with a longitude
+            larger than or equal to the specified minimum.
+        :type maxlongitude: float
+        :param maxlongitude: Only include stations with a longitude
+            smaller than or equal to the specified maximum. If smaller than
+            ``minlongitude`` the region is assumed to cross the antimeridian.
+        :type latitude: float
+        :param latitude: Latitude of the center point for the radius
+            constraints.
+        :type longitude: float
+        :param longitude: Longitude of the center point for the radius
+            constraints.
+        :type minradius: float
+        :param minradius: Only include stations at least this many
+            degrees away from the given center point.
+        :type maxradius: float
+        :param maxradius: Only include stations at most this many
+            degrees away from the given center point.
+
+        The geographic constraints are evaluated in bulk on the station
+        coordinates (using a
+        :class:`~obspy.geodetics.spatial_index.SpatialIndex` for the radius
+        constraints). All channels of a selected station are kept, even if
+        their own coordinates are slightly different.
+
+        >>> inv = read_inventory()
+        >>> inv = inv.select(latitude=48.16, longitude=11.28, maxradius=1.0)
+        >>> print(inv.get_contents()["stations"])
+        ['GR.FUR (Fuerstenfeldbruck, Bavaria, GR-Net)']
         """
         networks = []
         for net in self.networks:
@@ -554,6 +632,14 @@ class Inventory(ComparingObject):
             if has_stations and not keep_empty and not net_.stations:
                 continue
             networks.append(net_)
+        geographic = dict(
+            minlatitude=minlatitude, maxlatitude=maxlatitude,
+            minlongitude=minlongitude, maxlongitude=maxlongitude,
+            latitude=latitude, longitude=longitude, minradius=minradius,
+            maxradius=maxradius)
+        if any(value is not None for value in geographic.values()):
+            networks = _select_geographic(networks, keep_empty=keep_empty,
+                                          **geographic)
         inv = copy.copy(self)
         inv.networks = networks
         return inv
@@ -1038,6 +1124,54 @@ class Inventory(ComparingObject):
         return fig
 
 
+def _select_geographic(networks, keep_empty=False, minlatitude=None,
+                       maxlatitude=None, minlongitude=None, maxlongitude=None,
+                       latitude=None, longitude=None, minradius=None,
+                       maxradius=None):
+    """
+    Applies geographic constraints to a list of already selected networks.
+
+    Stations are selected based on the station coordinates, all channels of
+    a selected station are kept. The networks must be copies as they are
+    modified in-place.
+    """
+    from obspy.geodetics.spatial_index import SpatialIndex, _in_rectangle
+
+    stations = [sta for net in networks for sta in net.stations]
+    latitudes = np.array([np.nan if sta.latitude is None else sta.latitude
+                          for sta in stations], dtype=np.float64)
+    longitudes = np.array([np.nan if sta.longitude is None else
+                           sta.longitude for sta in stations],
+                          dtype=np.float64)
+    rectangle = dict(minlatitude=minlatitude, maxlatitude=maxlatitude,
+                     minlongitude=minlongitude, maxlongitude=maxlongitude)
+    if minradius is None and maxradius is None:
+        # rectangles do not need the k-d tree of a spatial index
+        indices = np.nonzero(_in_rectangle(latitudes, longitudes,
+                                           **rectangle))[0]
+    elif latitude is None or longitude is None:
+        msg = ("latitude and longitude must be given for radius "
+               "constraints.")
+        raise ValueError(msg)
+    elif not stations:
+        indices = []
+    else:
+        indices = SpatialIndex(latitudes, longitudes).select(
+            latitude=latitude, longitude=longitude, minradius=minradius,
+            maxradius=maxradius, **rectangle)
+    station_ids = set(id(stations[_i]) for _i in indices)
+
+    selected_networks = []
+    for net in networks:
+        has_stations = bool(net.stations)
+        net.stations = [sta for sta in net.stations
+                        if id(sta) in station_ids]
+        if has_stations and not keep_empty and not net.stations:
+            continue
+        selected_networks.append(net)
+    return selected_networks
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
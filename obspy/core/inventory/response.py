@@ -19,6 +19,7 @@ from collections import defaultdict, Iterable
 from copy import deepcopy
 import itertools
 from math import pi
+import pickle
 import warnings
 
 import numpy as np
@@ -2085,6 +2086,149 @@ class CoefficientWithUncertainties(FloatWithUncertainties):
         self._number = value
 
 
+class ResponsePool(object):
+    """
+    Intern pool handing out shared instances of identical responses.
+
+    Many channels of real world inventories carry identical responses (e.g.
+    the same sensor/datalogger combination at lots of stations). Passing
+    them through a pool replaces all duplicates of a
+    :class:`Response` (and of the individual :class:`ResponseStage` objects)
+    with a single shared instance which saves memory and makes anything
+    keyed on the response object (e.g. caches) effective.
+
+    .. warning::
+        Interned objects are shared, modifying one of them in-place will
+        modify it for every channel it is attached to. Use
+        :meth:`unshare` (or assign a :func:`copy.deepcopy` of it) before
+        making in-place changes to the response of a single channel.
+
+    >>> from obspy import read_inventory
+    >>> inv = read_inventory()
+    >>> pool = ResponsePool()
+    >>> resp = pool.intern_response(inv[0][0][0].response)
+    >>> resp is pool.intern_response(copy.deepcopy(resp))
+    True
+    >>> print(pool)
+    ResponsePool: 1 responses, 2 stages, 1 hits, 3 misses
+
+    Objects are always pooled by their content, so a single pool can be
+    shared between readers (see :meth:`get`) and
+    :meth:`~obspy.core.inventory.inventory.Inventory.deduplicate_responses`.
+    """
+    def __init__(self):
+        # shared objects, keyed by their content (see _get_key())
+        self._responses = {}
+        self._stages = {}
+        # reader specific keys (e.g. raw XML) mapping to the shared objects
+        self._aliases = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._responses)
+
+    def __str__(self):
+        return "ResponsePool: %i responses, %i stages, %i hits, %i misses" % (
+            len(self._responses), len(self._stages), self.hits, self.misses)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    @staticmethod
+    def _get_key(obj):
+        """
+        Key identifying objects with the exact same content.
+
+        Objects constructed the same way pickle to the same bytes. Equal
+        objects constructed in a different attribute order will simply not
+        be shared which is always safe.
+        """
+        return (type(obj).__name__, pickle.dumps(obj, protocol=2))
+
+    def _intern(self, pool, key, obj):
+        try:
+            shared = pool[key]
+        except KeyError:
+            self.misses += 1
+            pool[key] = obj
+            return obj
+        self.hits += 1
+        return shared
+
+    def get(self, key, factory, stage=False):
+        """
+        Return the pooled object for a precomputed key or create it.
+
+        Meant for readers that can derive a cheap key directly from the raw
+        data (e.g. the serialized XML element) and thus skip parsing
+        duplicates altogether. Newly created objects are pooled by their
+        content like in :meth:`intern_response`, so identical objects are
+        shared regardless of how they were added to the pool.
+
+        :type key: hashable
+        :param key: Key uniquely identifying the content of the object.
+        :param factory: Callable without arguments returning a new object.
+            Only called if no object with the given key is in the pool.
+        :type stage: bool
+        :param stage: Whether the object is a response stage or a full
+            response.
+        """
+        try:
+            shared = self._aliases[(stage, key)]
+        except KeyError:
+            obj = factory()
+            if stage:
+                shared = self.intern_stage(obj)
+            else:
+                shared = self.intern_response(obj)
+            self._aliases[(stage, key)] = shared
+            return shared
+        self.hits += 1
+        return shared
+
+    def intern_stage(self, stage):
+        """
+        Return the shared instance of an identical response stage.
+
+        :type stage: :class:`ResponseStage`
+        """
+        return self._intern(self._stages, self._get_key(stage), stage)
+
+    def intern_response(self, response):
+        """
+        Return the shared instance of an identical response.
+
+        The stages of a newly pooled response are interned as well, so
+        responses that only differ in some of their stages still share the
+        common ones. A response that turns out to be a duplicate is not
+        modified.
+
+        :type response: :class:`Response`
+        """
+        if response is None:
+            return None
+        key = self._get_key(response)
+        if key in self._responses:
+            self.hits += 1
+            return self._responses[key]
+        response.response_stages = [
+            self.intern_stage(stage) for stage in response.response_stages]
+        return self._intern(self._responses, key, response)
+
+    @staticmethod
+    def unshare(response):
+        """
+        Return a private copy of a (potentially shared) response.
+
+        Use this before modifying the response of a single channel in-place,
+        e.g. ``cha.response = ResponsePool.unshare(cha.response)``.
+
+        :type response: :class:`Response`
+        """
+        return deepcopy(response)
+
+
 def _adjust_bode_plot_figure(fig, plot_degrees=False, grid=True, show=True):
     """
     Helper function to do final adjustments to Bode plot figure.
@@ -13,8 +13,6 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
-from copy import copy
-
 import numpy as np
 
 from obspy.core.stream import Stream
@@ -85,6 +83,96 @@ def create_preview(trace, delta=60):
     return tr
 
 
+def downsample_preview(trace, delta):
+    """
+    Creates a preview with a larger delta from a preview trace.
+
+    Each sample of the new preview is the maximum of all samples of the
+    preview within ``delta`` seconds on the same time grid as
+    :func:`create_preview`, so previews of different resolutions (e.g. for
+    overview plots of long time spans) can be created from one preview.
+    Missing data (``-1``) is kept only if all samples are missing. As
+    previews contain the difference of maximum and minimum, the values can
+    be smaller than those of a preview created from the data with the
+    larger delta.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: Preview trace.
+    :type delta: int
+    :param delta: Difference between two preview points, a multiple of the
+        delta of the preview.
+    :rtype: :class:`~obspy.core.trace.Trace`
+    :return: New Trace object.
+    """
+    if not hasattr(trace.stats, 'preview') or not trace.stats.preview:
+        msg = 'Trace\n%s\n is no preview file.' % str(trace)
+        raise Exception(msg)
+    factor = delta / trace.stats.delta
+    if not isinstance(delta, int) or factor < 1 or factor != int(factor):
+        msg = 'The delta value needs to be an integer multiple of the ' \
+              'delta of the preview.'
+        raise ValueError(msg)
+    factor = int(factor)
+    start_time = trace.stats.starttime.timestamp
+    new_start_time = start_time - start_time % delta
+    offset = int(round((start_time - new_start_time) / trace.stats.delta))
+    data = trace.data
+    if len(data):
+        # first sample of each slice
+        index = (np.arange(len(data)) + offset) // factor
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(index)) + 1])
+        data = np.maximum.reduceat(data, starts)
+    tr = Trace(data=data, header=trace.stats.copy())
+    tr.stats.delta = delta
+    tr.stats.npts = len(data)
+    tr.stats.starttime = UTCDateTime(new_start_time)
+    return tr
+
+
+def _merge_preview_data(samples, starts, arrays, dtype):
+    """
+    Merges preview data arrays into a new array.
+
+    :type samples: int
+    :param samples: Length of the new array.
+    :type starts: list of int
+    :param starts: Index of the first sample of each array in the new array.
+        Samples outside of the new array are skipped.
+    :type arrays: list of :class:`numpy.ndarray`
+    :param arrays: Preview data.
+    :rtype: :class:`numpy.ndarray`
+    :return: Maximum of all arrays per sample, ``-1`` for missing data.
+    """
+    data = np.empty(samples, dtype=dtype)
+    # Fill with negative one values which corresponds to a gap.
+    data[:] = -1
+    lengths = np.array([len(arr) for arr in arrays], dtype=np.int64)
+    if not lengths.sum():
+        return data
+    values = np.concatenate(arrays)
+    # Index of every sample in the new array.
+    offsets = np.asarray(starts, dtype=np.int64) - np.cumsum(lengths) + \
+        lengths
+    index = np.arange(len(values), dtype=np.int64) + \
+        np.repeat(offsets, lengths)
+    inside = (index >= 0) & (index < samples)
+    if not inside.all():
+        index = index[inside]
+        values = values[inside]
+        if not len(index):
+            return data
+    # Maximum of overlapping samples.
+    order = np.argsort(index, kind='mergesort')
+    index = index[order]
+    values = values[order]
+    first = np.flatnonzero(np.concatenate([[True],
+                                           index[1:] != index[:-1]]))
+    index = index[first]
+    data[index] = np.maximum(data[index],
+                             np.maximum.reduceat(values, first))
+    return data
+
+
 def merge_previews(stream):
     """
     Merges all preview traces in one Stream object. Does not change the
@@ -95,11 +183,8 @@ def merge_previews(stream):
     :rtype: :class:`~obspy.core.stream.Stream`
     :return: Merged Stream object.
     """
-    copied_traces = copy(stream.traces)
-    stream.sort()
     # Group traces by id.
     traces = {}
-    dtypes = []
     for trace in stream:
         # Throw away empty traces.
         if trace.stats.npts == 0:
@@ -109,12 +194,12 @@ def merge_previews(stream):
             raise Exception(msg)
         traces.setdefault(trace.id, [])
         traces[trace.id].append(trace)
-        dtypes.append(trace.data.dtype)
     if len(traces) == 0:
         return Stream()
     # Initialize new Stream object.
     new_stream = Stream()
-    for value in traces.values():
+    for key in sorted(traces):
+        value = traces[key]
         if len(value) == 1:
             new_stream.append(value[0])
             continue
@@ -129,31 +214,28 @@ def merge_previews(stream):
             raise Exception(msg)
         delta = value[0].stats.delta
         # Check dtype.
-        dtypes = {native_str(tr.data.dtype) for tr in value}
+        dtypes = {tr.data.dtype for tr in value}
         if len(dtypes) > 1:
             msg = 'Different dtypes for traces with id %s' % value[0].id
             raise Exception(msg)
-        dtype = dtypes.pop()
-        # Get the minimum start and maximum end time for all traces.
-        min_starttime = min([tr.stats.starttime for tr in value])
-        max_endtime = max([tr.stats.endtime for tr in value])
-        samples = int(round((max_endtime - min_starttime) / delta)) + 1
-        data = np.empty(samples, dtype=dtype)
-        # Fill with negative one values which corresponds to a gap.
-        data[:] = -1
+        dtype = native_str(dtypes.pop())
+        # Get the minimum start and maximum end time for all traces, using
+        # nanoseconds as comparing many UTCDateTime objects is slow.
+        starts = [tr.stats.starttime._ns for tr in value]
+        ends = [tr.stats.endtime._ns for tr in value]
+        first = min(range(len(value)), key=lambda i: (starts[i], ends[i]))
+        min_starttime = value[first].stats.starttime
+        precision = min_starttime.precision
+        samples = int(round(round((max(ends) - starts[first]) / 1e9,
+                                  precision) / delta)) + 1
+        starts = [int(round((start - starts[first]) / 1e9, precision) / delta)
+                  for start in starts]
+        data = _merge_preview_data(samples, starts,
+                                   [trace.data for trace in value], dtype)
         # Create trace and give starttime.
-        new_trace = Trace(data=data, header=value[0].stats)
-        # Loop over all traces in value and add to data.
-        for trace in value:
-            start_index = int((trace.stats.starttime - min_starttime) / delta)
-            end_index = start_index + len(trace.data)
-            # Element-by-element comparison.
-            data[start_index:end_index] = \
-                np.maximum(data[start_index:end_index], trace.data)
-        # set npts again, because data is changed in place
+        new_trace = Trace(data=data, header=value[first].stats)
         new_trace.stats.npts = len(data)
         new_stream.append(new_trace)
-    stream.traces = copied_traces
     return new_stream
 
 
@@ -182,11 +264,7 @@ def resample_preview(trace, samples, method='accurate'):
     samples, almost half the data will be omitted.
 
     The accurate method has no such problems because it will move a window
-    over the whole array and take the maximum for each window. It loops
-    over each window and is up to 10 times slower than the fast method.
-    This of course is highly depended on the number of wished samples and
-    the original trace and usually the accurate method is still fast
-    enough.
+    over the whole array and take the maximum for each window.
     """
     # Only works for preview traces.
     if not hasattr(trace.stats, 'preview') or not trace.stats.preview:
@@ -215,12 +293,12 @@ def resample_preview(trace, samples, method='accurate'):
         return npts - int(npts / samples) * samples
     # Slow but accurate method.
     elif method == 'accurate':
-        new_data = np.empty(samples, dtype=dtype)
         step = trace.stats.npts / float(samples)
-        for _i in range(samples):
-            new_data[_i] = trace.data[int(_i * step):
-                                      int((_i + 1) * step)].max()
-        trace.data = new_data
+        # first sample of each window
+        starts = (np.arange(samples) * step).astype(np.int64)
+        new_data = np.maximum.reduceat(trace.data[:int(samples * step)],
+                                       starts)
+        trace.data = np.require(new_data, dtype=dtype)
         # Set new sampling rate.
         trace.stats.delta = (endtime - trace.stats.starttime) / \
             float(samples - 1)
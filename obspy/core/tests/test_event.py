@@ -476,6 +476,169 @@ class CatalogTestCase(unittest.TestCase):
             self.assertTrue(all(event in cat_smaller
                                 for event in cat_bigger_inverse))
 
+    def test_filter_uses_preferred_origin(self):
+        """
+        Filtering uses the preferred origin and magnitude (and not the first
+        ones) and handles missing values.
+        """
+        origin_1 = Origin(time=UTCDateTime(2000, 1, 1), latitude=10.0)
+        origin_2 = Origin(time=UTCDateTime(2001, 1, 1), latitude=20.0)
+        magnitude_1 = Magnitude(mag=6.0)
+        magnitude_2 = Magnitude(mag=0.5)
+        event_1 = Event(origins=[origin_1, origin_2],
+                        magnitudes=[magnitude_1, magnitude_2])
+        event_1.preferred_origin_id = origin_2.resource_id
+        event_1.preferred_magnitude_id = magnitude_2.resource_id
+        # Undefined latitude.
+        event_2 = Event(origins=[Origin(time=UTCDateTime(2002, 1, 1))])
+        # No origin at all.
+        event_3 = Event(magnitudes=[Magnitude(mag=3.0)])
+        cat = Catalog(events=[event_1, event_2, event_3])
+        self.assertEqual(cat.filter("latitude > 15").events, [event_1])
+        self.assertEqual(cat.filter("latitude < 15").events, [event_2])
+        self.assertEqual(cat.filter("time < 2001-06-01").events, [event_1])
+        self.assertEqual(cat.filter("magnitude > 1").events, [event_3])
+        self.assertEqual(cat.filter("magnitude < 1").events, [event_1])
+        # Without preferred ones the first origin and magnitude are used.
+        event_1.preferred_origin_id = None
+        event_1.preferred_magnitude_id = None
+        self.assertEqual(cat.filter("latitude > 15").events, [])
+        self.assertEqual(cat.filter("magnitude > 5").events, [event_1])
+        event_1.preferred_origin_id = origin_2.resource_id
+        self.assertEqual(cat.filter("latitude < 15", inverse=True).events,
+                         [event_1, event_3])
+        self.assertRaises(ValueError, cat.filter, "latitude ~ 15")
+        self.assertRaises(ValueError, cat.filter, "spam < 15")
+
+    def test_columns(self):
+        """
+        Tests Catalog.to_columns() and Catalog.from_columns().
+        """
+        cat = read_events()
+        columns = cat.to_columns()
+        self.assertEqual(len(columns), 3)
+        for row, event in zip(columns, cat):
+            origin = event.preferred_origin() or event.origins[0]
+            magnitude = event.preferred_magnitude() or event.magnitudes[0]
+            self.assertEqual(row["time"], origin.time.ns)
+            self.assertEqual(row["latitude"], origin.latitude)
+            self.assertEqual(row["magnitude"], magnitude.mag)
+            self.assertEqual(row["magnitude_type"], magnitude.magnitude_type)
+            self.assertEqual(row["resource_id"], str(event.resource_id))
+        # Round trip.
+        cat2 = Catalog.from_columns(columns)
+        columns2 = cat2.to_columns()
+        self.assertEqual(columns2.dtype, columns.dtype)
+        for name in columns.dtype.names:
+            np.testing.assert_array_equal(columns2[name], columns[name])
+        self.assertEqual(cat2[0].resource_id, cat[0].resource_id)
+        # Undefined values.
+        cat3 = Catalog(events=[Event()])
+        columns = cat3.to_columns()
+        self.assertTrue(np.isnan(columns["latitude"][0]))
+        self.assertEqual(columns["magnitude_type"][0], "")
+        cat4 = Catalog.from_columns(columns)
+        self.assertEqual(cat4[0].origins, [])
+        self.assertEqual(cat4[0].magnitudes, [])
+
+    def test_columns_cache(self):
+        """
+        The cached columnar view is invalidated on modifications.
+        """
+        cat = read_events()
+        self.assertEqual(len(cat.filter("magnitude > 4.35")), 1)
+        # Modifying an event.
+        cat[1].magnitudes[0].mag = 5.0
+        self.assertEqual(len(cat.filter("magnitude > 4.35")), 2)
+        # Adding and removing events.
+        cat.append(cat[0].copy())
+        self.assertEqual(len(cat.filter("magnitude > 4.35")), 3)
+        cat.events.pop(0)
+        self.assertEqual(len(cat.filter("magnitude > 4.35")), 2)
+        # Returned columns are a copy.
+        columns = cat.to_columns()
+        columns["magnitude"] = 0.0
+        self.assertEqual(len(cat.filter("magnitude > 4.35")), 2)
+        # The cache is not pickled.
+        cat2 = pickle.loads(pickle.dumps(cat))
+        self.assertNotIn("_columns_cache", cat2.__dict__)
+        self.assertEqual(cat2, cat)
+        # Reading or modifying other catalogs keeps the cache valid.
+        columns = cat._get_columns()[0]
+        read_events()
+        cat2[0].magnitudes[0].mag = 1.0
+        self.assertIs(cat._get_columns()[0], columns)
+        # Modifying objects that are not part of the view as well.
+        cat[0].picks.append(Pick())
+        cat[0].picks[0].phase_hint = "P"
+        self.assertIs(cat._get_columns()[0], columns)
+        # But not the origin quality.
+        cat[0].origins[0].quality.azimuthal_gap = 99.0
+        self.assertIsNot(cat._get_columns()[0], columns)
+        self.assertEqual(cat.to_columns()["azimuthal_gap"][0], 99.0)
+
+    def test_sort(self):
+        """
+        Tests Catalog.sort().
+        """
+        cat = read_events()
+        events = list(cat.events)
+        self.assertIs(cat.sort(), cat)
+        self.assertEqual(cat.events, events[::-1])
+        cat.sort(keys=["magnitude"], reverse=True)
+        self.assertEqual(cat.events, events)
+        cat.sort(keys=["magnitude_type", "latitude"])
+        self.assertEqual(cat.events, [events[2], events[1], events[0]])
+        self.assertRaises(ValueError, cat.sort, keys=["spam"])
+        # Sorting is stable in both directions.
+        cat = Catalog(events=[Event(magnitudes=[Magnitude(mag=mag)])
+                              for mag in (2.0, 3.0, 2.0, None, 3.0)])
+        events = list(cat.events)
+        cat.sort(keys="magnitude")
+        self.assertEqual(cat.events, [events[_i] for _i in (0, 2, 1, 4, 3)])
+        cat.events = list(events)
+        cat.sort(keys="magnitude", reverse=True)
+        self.assertEqual(cat.events, [events[_i] for _i in (3, 1, 4, 0, 2)])
+        # Undefined times are sorted first.
+        cat = Catalog(events=[
+            Event(origins=[Origin(time=UTCDateTime(2000, 1, 1))]),
+            Event(), Event(origins=[Origin(time=UTCDateTime(1999, 1, 1))])])
+        events = list(cat.events)
+        cat.sort()
+        self.assertEqual(cat.events, [events[1], events[2], events[0]])
+        cat.sort(reverse=True)
+        self.assertEqual(cat.events, [events[0], events[2], events[1]])
+
+    def test_statistics(self):
+        """
+        Tests Catalog.statistics().
+        """
+        cat = read_events()
+        cat.append(Event(magnitudes=[Magnitude(mag=5.0)]))
+        stats = cat.statistics()
+        self.assertNotIn("resource_id", stats)
+        mags = [4.4, 4.3, 3.0, 5.0]
+        self.assertEqual(stats["magnitude"]["count"], 4)
+        self.assertEqual(stats["magnitude"]["min"], 3.0)
+        self.assertEqual(stats["magnitude"]["max"], 5.0)
+        self.assertAlmostEqual(stats["magnitude"]["mean"], np.mean(mags))
+        self.assertAlmostEqual(stats["magnitude"]["median"], np.median(mags))
+        self.assertAlmostEqual(stats["magnitude"]["std"], np.std(mags))
+        self.assertEqual(stats["latitude"]["count"], 3)
+        times = [event.origins[0].time for event in cat[:3]]
+        self.assertEqual(stats["time"]["count"], 3)
+        self.assertEqual(stats["time"]["min"], min(times))
+        self.assertEqual(stats["time"]["max"], max(times))
+        self.assertEqual(stats["time"]["median"], sorted(times)[1])
+        self.assertEqual(stats["magnitude_type"], {"ML": 2, "mb": 1})
+        self.assertEqual(stats["event_type"], {"not reported": 3})
+        # Selected keys and fields without any values.
+        stats = Catalog(events=[Event()]).statistics(keys="depth")
+        self.assertEqual(list(stats.keys()), ["depth"])
+        self.assertEqual(stats["depth"]["count"], 0)
+        self.assertIsNone(stats["depth"]["mean"])
+        self.assertRaises(ValueError, cat.statistics, keys=["spam"])
+
     def test_catalog_resource_id(self):
         """
         See #662
@@ -761,6 +924,109 @@ class BaseTestCase(unittest.TestCase):
             "On Origin object: Value '-inf' for 'latitude' is "
             "not a finite floating point value.")
 
+    def test_lazy_error_quantities(self):
+        """
+        Error quantities are created when first accessed but behave as if
+        they always existed.
+        """
+        pick = Pick(time=UTCDateTime(0),
+                    backazimuth_errors={"uncertainty": 1.0})
+        self.assertNotIn("time_errors", pick.__dict__)
+        self.assertIsInstance(pick.backazimuth_errors, QuantityError)
+        self.assertEqual(pick.backazimuth_errors.uncertainty, 1.0)
+        # Keys, length and membership include the errors in the usual
+        # order.
+        keys = list(pick.keys())
+        self.assertEqual(keys[:3], ["resource_id", "time", "time_errors"])
+        self.assertEqual(set(keys), set(Pick()._property_keys) | set(
+            Pick()._containers))
+        self.assertEqual(len(pick), len(keys))
+        self.assertIn("time_errors", pick)
+        self.assertNotIn("time_errors", pick.__dict__)
+        self.assertNotIn("spam", pick)
+        # Printing and comparing does not create them either.
+        str(pick)
+        self.assertEqual(pick, pick.copy())
+        self.assertNotEqual(pick, Pick(time=UTCDateTime(0)))
+        self.assertNotIn("time_errors", pick.__dict__)
+        # Accessing creates and keeps them.
+        errors = pick.time_errors
+        self.assertIsInstance(errors, QuantityError)
+        self.assertIs(pick.time_errors, errors)
+        self.assertIs(pick["time_errors"], errors)
+        errors.uncertainty = 0.1
+        self.assertEqual(pick.time_errors.uncertainty, 0.1)
+        # items() creates all of them.
+        self.assertIsInstance(dict(pick.items())["horizontal_slowness_errors"],
+                              QuantityError)
+        # Deleted errors are gone just like other attributes.
+        pick = Pick()
+        del pick.time_errors
+        self.assertNotIn("time_errors", list(pick.keys()))
+        self.assertIsNone(pick.time_errors)
+        # Setting works as before.
+        pick.time_errors = QuantityError(uncertainty=0.5)
+        self.assertEqual(pick.time_errors.uncertainty, 0.5)
+
+    def test_clear_with_lazy_error_quantities(self):
+        """
+        clear() and popitem() terminate and reset objects with not yet
+        created error quantities.
+        """
+        origin = Origin(latitude=1.0)
+        origin.clear()
+        self.assertEqual(origin, Origin(force_resource_id=False))
+        self.assertIsNone(origin.latitude)
+        self.assertIsInstance(origin.latitude_errors, QuantityError)
+        origin = Origin()
+        count = len(origin)
+        for _ in range(count):
+            origin.popitem()
+        self.assertEqual(len(origin), 0)
+        self.assertEqual(list(origin.keys()), [])
+        self.assertRaises(KeyError, origin.popitem)
+
+    def test_copy_and_pickle_with_lazy_error_quantities(self):
+        """
+        Copies and pickles keep the values, the created and the not yet
+        created errors and the binding of the resource identifier.
+        """
+        origin = Origin(latitude=1.0, depth_errors={"uncertainty": 2.0},
+                        time=UTCDateTime(0))
+        origin.longitude_errors.uncertainty = 3.0
+        copies = [origin.copy(), pickle.loads(pickle.dumps(origin))]
+        if not PY2:
+            copies.append(pickle.loads(pickle.dumps(origin, protocol=0)))
+        for other in copies:
+            self.assertEqual(other, origin)
+            self.assertEqual(list(other.keys()), list(origin.keys()))
+            self.assertNotIn("latitude_errors", other.__dict__)
+            self.assertEqual(other.depth_errors.uncertainty, 2.0)
+            self.assertEqual(other.longitude_errors.uncertainty, 3.0)
+            self.assertIsInstance(other.latitude_errors, QuantityError)
+            self.assertIsNot(other.longitude_errors, origin.longitude_errors)
+            self.assertIs(other.resource_id.get_referred_object(), other)
+            # Setting attributes still converts values.
+            other.latitude = "2"
+            self.assertEqual(other.latitude, 2.0)
+
+    def test_converters(self):
+        """
+        Values are converted with the per class converters.
+        """
+        self.assertIs(Pick._converters, Pick()._converters)
+        pick = Pick(time="1970-01-01", creation_info={"author": "me"})
+        self.assertEqual(pick.time, UTCDateTime(0))
+        self.assertIsInstance(pick.creation_info, CreationInfo)
+        self.assertEqual(pick.creation_info.author, "me")
+        pick.backazimuth = 1
+        self.assertIs(type(pick.backazimuth), float)
+        pick.backazimuth = np.float32(2.5)
+        self.assertIs(type(pick.backazimuth), float)
+        self.assertRaises(ValueError, setattr, pick, "onset", "spam")
+        self.assertRaises(ValueError, setattr, pick, "backazimuth",
+                          np.float64("nan"))
+
 
 def suite():
     suite = unittest.TestSuite()
@@ -431,6 +431,57 @@ class InventoryTestCase(unittest.TestCase):
         self.assertEqual(len(inv.select(endtime=UTCDateTime(2016, 1, 1),
                                         keep_empty=True)), 2)
 
+    def test_inventory_select_geographic(self):
+        """
+        Test the geographic constraints of the Inventory.select() method.
+        """
+        inv = read_inventory()
+
+        def _codes(inv):
+            return sorted(set(sta.code for net in inv for sta in net))
+
+        # FUR, WET and RJOB are all within 1.5 degrees of each other.
+        self.assertEqual(
+            _codes(inv.select(latitude=48.0, longitude=12.0, maxradius=1.5)),
+            ["FUR", "RJOB", "WET"])
+        self.assertEqual(
+            _codes(inv.select(latitude=48.16, longitude=11.28,
+                              maxradius=0.1)),
+            ["FUR"])
+        self.assertEqual(
+            _codes(inv.select(latitude=48.16, longitude=11.28,
+                              minradius=0.1)),
+            ["RJOB", "WET"])
+        # Rectangles.
+        self.assertEqual(_codes(inv.select(minlatitude=49.0)), ["WET"])
+        self.assertEqual(_codes(inv.select(maxlongitude=12.0)), ["FUR"])
+        self.assertEqual(
+            _codes(inv.select(minlongitude=170.0, maxlongitude=12.0)),
+            ["FUR"])
+        # Combined with other criteria.
+        selected = inv.select(channel="LHZ", minlatitude=48.0)
+        self.assertEqual(
+            sum(len(sta) for net in selected for sta in net), 2)
+        # Empty networks are removed unless keep_empty is given.
+        self.assertEqual(len(inv.select(minlatitude=49.0)), 1)
+        self.assertEqual(
+            len(inv.select(minlatitude=49.0, keep_empty=True)), 2)
+        # The original inventory is not modified.
+        self.assertEqual(sum(len(sta) for net in inv for sta in net), 30)
+        # Radius constraints require a center point.
+        self.assertRaises(ValueError, inv.select, maxradius=1.0)
+        # Stations are selected by their own coordinates, channels with
+        # slightly different coordinates are still kept.
+        inv_2 = read_inventory()
+        for cha in inv_2.select(station="FUR")[0][0]:
+            cha.latitude = float(cha.latitude) + 0.2
+        selected = inv_2.select(latitude=48.16, longitude=11.28,
+                                maxradius=0.1)
+        self.assertEqual(_codes(selected), ["FUR"])
+        self.assertEqual(len(selected[0][0]),
+                         len(inv_2.select(station="FUR")[0][0]))
+        self.assertIn("FUR", _codes(inv_2.select(maxlatitude=48.2)))
+
     def test_inventory_select_with_empty_networks(self):
         """
         Tests the behaviour of the Inventory.select() method with empty
@@ -8,7 +8,8 @@ import unittest
 import numpy as np
 
 from obspy import Stream, Trace, UTCDateTime
-from obspy.core.preview import create_preview, merge_previews, resample_preview
+from obspy.core.preview import (create_preview, downsample_preview,
+                                merge_previews, resample_preview)
 
 
 class UtilTestCase(unittest.TestCase):
@@ -162,6 +163,65 @@ class UtilTestCase(unittest.TestCase):
         # This method is much more accurate.
         np.testing.assert_array_equal(tr.data, np.array([4] * 50 + [2] * 50))
 
+    def test_merge_previews_overlapping(self):
+        """
+        Overlapping traces of several ids in arbitrary order.
+        """
+        traces = []
+        for data, start, channel in (([1, 5, 1], 60, 'EHZ'),
+                                     ([2, 2, 2, 2], 0, 'EHZ'),
+                                     ([7], 120, 'BHZ'),
+                                     ([3, 0], 30, 'EHZ'),
+                                     ([4], 180, 'EHZ')):
+            tr = Trace(data=np.array(data, dtype=np.float32))
+            tr.stats.starttime = UTCDateTime(start)
+            tr.stats.delta = 30.0
+            tr.stats.channel = channel
+            tr.stats.preview = True
+            traces.append(tr)
+        st = Stream(traces=traces)
+        st2 = merge_previews(st)
+        # original stream is unchanged
+        self.assertEqual(st.traces, traces)
+        self.assertEqual([tr.id for tr in st2], ['...BHZ', '...EHZ'])
+        self.assertEqual(st2[1].stats.starttime, UTCDateTime(0))
+        np.testing.assert_array_equal(st2[1].data, [2, 3, 2, 5, 1, -1, 4])
+
+    def test_downsample_preview(self):
+        """
+        Test for creating previews with a larger delta.
+        """
+        tr = Trace(data=np.array([1, 5, 2, -1, -1, 3, -1, 7],
+                                 dtype=np.float32))
+        tr.stats.starttime = UTCDateTime(90)
+        tr.stats.delta = 30.0
+        self.assertRaises(Exception, downsample_preview, tr, 60)
+        tr.stats.preview = True
+        self.assertRaises(ValueError, downsample_preview, tr, 45)
+        self.assertRaises(ValueError, downsample_preview, tr, 15)
+        preview = downsample_preview(tr, 60)
+        self.assertEqual(preview.stats.starttime, UTCDateTime(60))
+        self.assertEqual(preview.stats.delta, 60)
+        self.assertEqual(preview.stats.npts, 5)
+        np.testing.assert_array_equal(preview.data, [1, 5, -1, 3, 7])
+        self.assertEqual(preview.data.dtype, np.float32)
+        preview = downsample_preview(tr, 120)
+        self.assertEqual(preview.stats.starttime, UTCDateTime(0))
+        np.testing.assert_array_equal(preview.data, [1, 5, 7])
+        # same grid as creating the preview with the larger delta, the
+        # maximum of the ranges within 60 s is at most the range within 300 s
+        trace = Trace(data=np.random.RandomState(0).rand(3600))
+        trace.stats.starttime = UTCDateTime(1234)
+        expected = create_preview(trace.copy(), 300)
+        preview = downsample_preview(create_preview(trace, 60), 300)
+        self.assertEqual(preview.stats.starttime, expected.stats.starttime)
+        self.assertEqual(preview.stats.npts, expected.stats.npts)
+        self.assertTrue((preview.data <= expected.data).all())
+        self.assertTrue((preview.data > 0.9 * expected.data).all())
+        # the original trace is not changed
+        self.assertEqual(tr.stats.delta, 30.0)
+        self.assertEqual(tr.stats.npts, 8)
+
     def test_merge_previews_2(self):
         """
         Test case for issue #84.
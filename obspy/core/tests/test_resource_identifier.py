@@ -46,6 +46,7 @@ class ResourceIdentifierTestCase(unittest.TestCase):
         self.parent_id_tree = state['parent_id_tree']
         self.id_order = state['id_order']
         self.id_object_map = state['id_object_map']
+        self.pending_scopes = state['pending_scopes']
 
     def test_same_resource_id_different_referred_object(self):
         """
@@ -578,6 +579,73 @@ class ResourceIdentifierTestCase(unittest.TestCase):
             arrival.pick_id.get_referred_object()
         self.assertEqual(len(w), 0)
 
+    def test_event_scope_is_bound_lazily(self):
+        """
+        Events are only registered when scoped, their resource ids are bound
+        to the event scope once an object is looked up.
+        """
+        pick = event.Pick()
+        arrival = event.Arrival(pick_id=pick.resource_id)
+        ev = event.Event(picks=[pick],
+                         origins=[event.Origin(arrivals=[arrival])])
+        ev.scope_resource_ids()
+        # registering the same event again does not queue it twice
+        self.assertEqual(len(self.pending_scopes), 1)
+        self.assertIs(self.pending_scopes[0](), ev)
+        parent_key = _ResourceKey.get_resource_key(id(ev))
+        self.assertNotIn(parent_key, self.parent_id_tree)
+        self.assertIs(arrival.pick_id.get_referred_object(), pick)
+        self.assertEqual(len(self.pending_scopes), 0)
+        scope = self.parent_id_tree[parent_key]
+        self.assertEqual(scope[pick.resource_id._resource_key], id(pick))
+        self.assertIs(arrival.pick_id._parent_key, parent_key)
+        # the arrival of a copy refers to the pick of the copy
+        ev_2 = ev.copy()
+        self.assertEqual(len(self.pending_scopes), 1)
+        arrival_2 = ev_2.origins[0].arrivals[0]
+        self.assertIs(arrival_2.pick_id.get_referred_object(), ev_2.picks[0])
+        self.assertIs(arrival.pick_id.get_referred_object(), pick)
+
+    def test_objects_bound_after_registration_are_newest(self):
+        """
+        Objects bound to a resource id after an event holding the same id
+        was registered remain the newest objects bound to it.
+        """
+        ev = event.Event(picks=[event.Pick(resource_id='pick')])
+        ev.scope_resource_ids()
+        pick = event.Pick(resource_id='pick')
+        self.assertIs(ResourceIdentifier('pick').get_referred_object(), pick)
+        self.assertIs(ev.picks[0].resource_id.get_referred_object(),
+                      ev.picks[0])
+
+    def test_pending_scopes_stay_bounded(self):
+        """
+        Events garbage collected before any lookup must not pile up in the
+        queue of pending scopes.
+        """
+        for _ in range(3000):
+            event.Event()
+        gc.collect()
+        self.assertLess(len(self.pending_scopes), 1024)
+
+    def test_id_order_stays_bounded(self):
+        """
+        Repeatedly copying an event must not let the internal lists of
+        object ids grow without bounds.
+        """
+        ev = create_diverse_catalog()[0]
+        key = ev.resource_id._resource_key
+        for _ in range(100):
+            ev.copy()
+        gc.collect()
+        self.assertLess(len(self.id_order[key]), 64)
+        # the newest object can still be found
+        ev_2 = ev.copy()
+        del ev
+        gc.collect()
+        self.assertIs(ResourceIdentifier(ev_2.resource_id.id)
+                      .get_referred_object(), ev_2)
+
 
 def get_instances(obj, cls=None, is_attr=None, has_attr=None):
     """
@@ -13,6 +13,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import copy
 import inspect
 import os
 import unittest
@@ -25,7 +26,8 @@ from matplotlib import rcParams
 
 from obspy import UTCDateTime, read_inventory
 from obspy.core.inventory.response import (
-    _pitick2latex, PolesZerosResponseStage, PolynomialResponseStage)
+    _pitick2latex, PolesZerosResponseStage, PolynomialResponseStage,
+    ResponsePool)
 from obspy.core.util import MATPLOTLIB_VERSION
 from obspy.core.util.misc import CatchOutput
 from obspy.core.util.obspy_types import ComplexWithUncertainties
@@ -454,6 +456,53 @@ class ResponseTestCase(unittest.TestCase):
              6.51826202e+08 + 1.28404787e+07j,
              2.00067263e+04 - 2.63711751e+03j])
 
+    def test_response_pool(self):
+        """
+        Identical responses and stages are replaced by shared instances.
+        """
+        inv = read_inventory()
+        resp = inv[0][0][0].response
+        resp2 = copy.deepcopy(resp)
+        # Differs only in the sensitivity, stages can still be shared.
+        resp3 = copy.deepcopy(resp)
+        resp3.instrument_sensitivity.value *= 2.0
+
+        pool = ResponsePool()
+        self.assertIs(pool.intern_response(resp), resp)
+        self.assertIs(pool.intern_response(resp2), resp)
+        self.assertIs(pool.intern_response(resp3), resp3)
+        self.assertIsNone(pool.intern_response(None))
+        self.assertEqual(len(pool), 2)
+        for stage, stage3 in zip(resp.response_stages,
+                                 resp3.response_stages):
+            self.assertIs(stage, stage3)
+        # Unsharing results in an equal but independent copy.
+        resp4 = ResponsePool.unshare(resp)
+        self.assertEqual(resp4, resp)
+        self.assertIsNot(resp4, resp)
+        self.assertIsNot(resp4.response_stages[0], resp.response_stages[0])
+        # Duplicates are not modified.
+        resp5 = copy.deepcopy(resp3)
+        stages = resp5.response_stages
+        self.assertIs(pool.intern_response(resp5), resp3)
+        self.assertIs(resp5.response_stages, stages)
+        self.assertIsNot(resp5.response_stages[0], resp.response_stages[0])
+
+    def test_deduplicate_responses(self):
+        """
+        Tests Inventory.deduplicate_responses().
+        """
+        inv = read_inventory() + read_inventory()
+        original = copy.deepcopy(inv)
+        pool = inv.deduplicate_responses()
+        self.assertEqual(inv, original)
+        channels = inv.select(network="BW", station="RJOB", channel="EHZ",
+                              time=UTCDateTime(2010, 1, 1))
+        channels = [cha for net in channels for sta in net for cha in sta]
+        self.assertEqual(len(channels), 2)
+        self.assertIs(channels[0].response, channels[1].response)
+        self.assertGreater(pool.hits, 0)
+
 
 def suite():
     return unittest.makeSuite(ResponseTestCase, 'test')
@@ -694,15 +694,17 @@ def _yield_obj_parent_attr(obj, cls=None, is_attr=None, has_attr=None):
                     for out in func(val, attr=item, parent=obj):
                         yield out
             # Iterate through non built-in object attributes.
+            # Objects with a __dict__ only use slots for internal state (e.g.
+            # the modification stamps of the event type objects).
+            elif hasattr(obj, '__dict__'):
+                for item, val in obj.__dict__.items():
+                    for out in func(val, attr=item, parent=obj):
+                        yield out
             elif hasattr(obj, '__slots__'):
                 for attr in obj.__slots__:
                     val = getattr(obj, attr)
                     for out in func(val, attr=attr, parent=obj):
                         yield out
-            elif hasattr(obj, '__dict__'):
-                for item, val in obj.__dict__.items():
-                    for out in func(val, attr=item, parent=obj):
-                        yield out
 
     return func(obj)
 
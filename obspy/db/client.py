@@ -13,15 +13,60 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
+import datetime
+import math
+import multiprocessing
 import os
+import warnings
+from multiprocessing.dummy import Pool as ThreadPool
 
+import numpy as np
 from sqlalchemy import and_, create_engine, func, or_
 from sqlalchemy.orm import sessionmaker
 
-from obspy.core.preview import merge_previews
-from obspy.core.stream import Stream
+from obspy.core.preview import (_merge_preview_data, downsample_preview,
+                                merge_previews)
+from obspy.core.stream import Stream, read
 from obspy.core.utcdatetime import UTCDateTime
-from obspy.db.db import Base, WaveformChannel, WaveformFile, WaveformPath
+from obspy.db.db import (PREVIEW_DELTAS, Base, WaveformChannel, WaveformFile,
+                         WaveformPath, WaveformPreview, create_indexes)
+
+
+def _filter_ids(query, trace_ids=None, network=None, station=None,
+                location=None, channel=None):
+    """
+    Filters a query of channels by a list of SEED ids or by network,
+    station, location and channel codes with wildcards.
+    """
+    if trace_ids:
+        # filter over trace id list
+        trace_filter = or_()
+        for trace_id in trace_ids:
+            temp = trace_id.split('.')
+            if len(temp) != 4:
+                continue
+            trace_filter.append(and_(
+                WaveformChannel.network == temp[0],
+                WaveformChannel.station == temp[1],
+                WaveformChannel.location == temp[2],
+                WaveformChannel.channel == temp[3]))
+        if trace_filter.clauses:
+            query = query.filter(trace_filter)
+        return query
+    # filter over network/station/location/channel id
+    kwargs = {'network': network, 'station': station,
+              'location': location, 'channel': channel}
+    for key, value in kwargs.items():
+        if value is None:
+            continue
+        col = getattr(WaveformChannel, key)
+        if '*' in value or '?' in value:
+            value = value.replace('?', '_')
+            value = value.replace('*', '%')
+            query = query.filter(col.like(value))
+        else:
+            query = query.filter(col == value)
+    return query
 
 
 class Client(object):
@@ -47,6 +92,7 @@ class Client(object):
                                         convert_unicode=True)
             Base.metadata.create_all(self.engine,  # @UndefinedVariable
                                      checkfirst=True)
+            create_indexes(self.engine)
             # enable verbosity after table creations
             self.engine.echo = debug
             self.session = sessionmaker(bind=self.engine)
@@ -219,6 +265,110 @@ class Client(object):
             file_dict.setdefault(key, []).append(fname)
         return file_dict
 
+    def get_waveforms(self, network, station, location, channel, starttime,
+                      endtime, merge=-1, threads=None):
+        """
+        Reads waveforms from the indexed files.
+
+        Only files containing the requested channels within the requested
+        time window are read, using multiple threads.
+
+        :type network: str
+        :param network: Network code of requested data (e.g. "BW").
+            Wildcards '*' and '?' are supported.
+        :type station: str
+        :param station: Station code of requested data (e.g. "MANZ").
+            Wildcards '*' and '?' are supported.
+        :type location: str
+        :param location: Location code of requested data (e.g. "").
+            Wildcards '*' and '?' are supported.
+        :type channel: str
+        :param channel: Channel code of requested data (e.g. "EHZ").
+            Wildcards '*' and '?' are supported.
+        :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param starttime: Start of requested time window.
+        :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param endtime: End of requested time window.
+        :type merge: int or None
+        :param merge: Specifies, which merge operation should be performed
+            on the stream before returning the data. Default (``-1``) means
+            only a conservative cleanup merge is performed to merge seamless
+            traces (e.g. when reading across file boundaries). See
+            :meth:`Stream.merge(...) <obspy.core.stream.Stream.merge>` for
+            details. If set to ``None`` (or ``False``) no merge operation at
+            all will be performed.
+        :type threads: int, optional
+        :param threads: Number of threads reading files. Defaults to the
+            number of CPUs.
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        starttime = UTCDateTime(starttime)
+        endtime = UTCDateTime(endtime)
+        if starttime >= endtime:
+            msg = ("'endtime' must be after 'starttime'.")
+            raise ValueError(msg)
+        # build up query
+        session = self.session()
+        query = session.query(WaveformPath.path, WaveformFile.file,
+                              WaveformFile.format)
+        query = query.filter(WaveformPath.id == WaveformFile.path_id)
+        query = query.filter(WaveformFile.id == WaveformChannel.file_id)
+        for key, value in (('network', network), ('station', station),
+                           ('location', location), ('channel', channel)):
+            col = getattr(WaveformChannel, key)
+            if '*' in value or '?' in value:
+                value = value.replace('?', '_')
+                value = value.replace('*', '%')
+                query = query.filter(col.like(value))
+            else:
+                query = query.filter(col == value)
+        query = query.filter(WaveformChannel.endtime > starttime.datetime)
+        query = query.filter(WaveformChannel.starttime < endtime.datetime)
+        results = query.distinct().all()
+        session.close()
+
+        seed_pattern = ".".join((network, station, location, channel))
+
+        def _read(result):
+            filename = os.path.join(result[0], result[1])
+            kwargs = {}
+            if result[2] == 'MSEED':
+                kwargs['sourcename'] = seed_pattern
+            try:
+                return read(filename, format=result[2], starttime=starttime,
+                            endtime=endtime, **kwargs)
+            except Exception as e:
+                msg = "Could not read file '%s': %s" % (filename, e)
+                warnings.warn(msg)
+                return Stream()
+
+        st = Stream()
+        if threads is None:
+            threads = multiprocessing.cpu_count()
+        threads = min(threads, len(results))
+        if threads > 1:
+            pool = ThreadPool(processes=threads)
+            try:
+                streams = pool.map(_read, results)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            streams = [_read(result) for result in results]
+        for stream in streams:
+            st.traces.extend(stream.traces)
+
+        # make sure we only have the desired data, files may contain other
+        # channels
+        st = st.select(network=network, station=station, location=location,
+                       channel=channel)
+        st.trim(starttime, endtime)
+        if merge is None or merge is False:
+            pass
+        else:
+            st.merge(merge)
+        return st
+
     def get_preview(self, trace_ids=[], starttime=None, endtime=None,
                     network=None, station=None, location=None, channel=None,
                     pad=False):
@@ -243,34 +393,8 @@ class Client(object):
         finally:
             query = query.filter(WaveformChannel.starttime < endtime.datetime)
         # process arguments
-        if trace_ids:
-            # filter over trace id list
-            trace_filter = or_()
-            for trace_id in trace_ids:
-                temp = trace_id.split('.')
-                if len(temp) != 4:
-                    continue
-                trace_filter.append(and_(
-                    WaveformChannel.network == temp[0],
-                    WaveformChannel.station == temp[1],
-                    WaveformChannel.location == temp[2],
-                    WaveformChannel.channel == temp[3]))
-            if trace_filter.clauses:
-                query = query.filter(trace_filter)
-        else:
-            # filter over network/station/location/channel id
-            kwargs = {'network': network, 'station': station,
-                      'location': location, 'channel': channel}
-            for key, value in kwargs.items():
-                if value is None:
-                    continue
-                col = getattr(WaveformChannel, key)
-                if '*' in value or '?' in value:
-                    value = value.replace('?', '_')
-                    value = value.replace('*', '%')
-                    query = query.filter(col.like(value))
-                else:
-                    query = query.filter(col == value)
+        query = _filter_ids(query, trace_ids, network, station, location,
+                            channel)
         # execute query
         results = query.all()
         session.close()
@@ -283,3 +407,103 @@ class Client(object):
         st = merge_previews(st)
         st.trim(starttime, endtime, pad=pad)
         return st
+
+    def get_preview_arrays(self, starttime, endtime, network=None,
+                           station=None, location=None, channel=None,
+                           trace_ids=[], delta=None, samples=None):
+        """
+        Returns the previews of all matching channels as one array.
+
+        In contrast to :meth:`get_preview` the previews are loaded at the
+        requested resolution (see :data:`~obspy.db.db.PREVIEW_DELTAS`) with
+        a single query and merged directly into the array, without creating
+        Trace objects, e.g. for overview plots of many channels over long
+        time spans.
+
+        Channels indexed before multiple resolutions were stored fall back
+        to their preview as in :meth:`get_preview`.
+
+        :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param starttime: Start of requested time window.
+        :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param endtime: End of requested time window.
+        :type trace_ids: list of str
+        :param trace_ids: SEED ids of channels, if given the network,
+            station, location and channel codes are ignored.
+        :type delta: int
+        :param delta: Delta of the previews in seconds, one of
+            :data:`~obspy.db.db.PREVIEW_DELTAS`. Defaults to the
+            resolution given by ``samples`` or the finest resolution.
+        :type samples: int
+        :param samples: Minimum number of samples in the time window, the
+            coarsest resolution with at least as many samples is used.
+        :rtype: tuple
+        :return: Sorted list of SEED ids, time of the first sample as
+            :class:`~obspy.core.utcdatetime.UTCDateTime`, delta in seconds
+            and a 32 bit float array with one row of preview data per id.
+            Missing data is ``-1``.
+        """
+        starttime = UTCDateTime(starttime)
+        endtime = UTCDateTime(endtime)
+        if starttime >= endtime:
+            msg = ("'endtime' must be after 'starttime'.")
+            raise ValueError(msg)
+        if delta is None:
+            delta = PREVIEW_DELTAS[0]
+            if samples:
+                for value in PREVIEW_DELTAS:
+                    if (endtime - starttime) / value >= samples:
+                        delta = value
+        elif delta not in PREVIEW_DELTAS:
+            msg = 'delta must be one of %s.' % (PREVIEW_DELTAS, )
+            raise ValueError(msg)
+        first = math.floor(starttime.timestamp / delta) * delta
+        npts = int((endtime.timestamp - first) // delta) + 1
+
+        def _filter(query):
+            query = query.filter(
+                WaveformChannel.endtime > starttime.datetime)
+            query = query.filter(
+                WaveformChannel.starttime < endtime.datetime)
+            return _filter_ids(query, trace_ids, network, station, location,
+                               channel)
+
+        session = self.session()
+        query = session.query(
+            WaveformChannel.network, WaveformChannel.station,
+            WaveformChannel.location, WaveformChannel.channel,
+            WaveformPreview.starttime, WaveformPreview.data)
+        query = query.filter(WaveformChannel.id == WaveformPreview.channel_id)
+        query = query.filter(WaveformPreview.delta == delta)
+        results = _filter(query).all()
+        # channels without previews of multiple resolutions
+        query = session.query(WaveformChannel)
+        query = query.filter(WaveformChannel.preview.isnot(None))
+        query = query.filter(~WaveformChannel.previews.any())
+        legacy = _filter(query).all()
+        session.close()
+
+        epoch = datetime.datetime(1970, 1, 1)
+        previews = {}
+        for result in results:
+            key = '.'.join(result[:4])
+            start = (result[4] - epoch).total_seconds()
+            previews.setdefault(key, []).append(
+                (start, np.frombuffer(result[5], dtype=np.dtype('<f4'))))
+        for result in legacy:
+            tr = result.get_preview()
+            if not len(tr):
+                continue
+            if delta != tr.stats.delta:
+                tr = downsample_preview(tr, delta)
+            previews.setdefault(tr.id, []).append(
+                (tr.stats.starttime.timestamp, tr.data))
+
+        ids = sorted(previews)
+        data = np.empty((len(ids), npts), dtype=np.float32)
+        for i, key in enumerate(ids):
+            starts = [int(round((start - first) / delta))
+                      for start, _ in previews[key]]
+            data[i] = _merge_preview_data(
+                npts, starts, [arr for _, arr in previews[key]], np.float32)
+        return ids, UTCDateTime(first), delta, data
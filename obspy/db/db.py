@@ -15,10 +15,10 @@ from future.builtins import *  # NOQA
 import pickle
 
 from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        PickleType, String)
+                        LargeBinary, PickleType, String, inspect)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relation
-from sqlalchemy.schema import UniqueConstraint
+from sqlalchemy.schema import Index, UniqueConstraint
 import numpy as np
 
 from obspy import Trace, UTCDateTime
@@ -26,6 +26,11 @@ from obspy import Trace, UTCDateTime
 
 Base = declarative_base()
 
+#: Deltas in seconds of the stored previews of channels. The first one is
+#: the preview in :attr:`WaveformChannel.preview`, the others are stored in
+#: :class:`WaveformPreview` for overview plots of long time spans.
+PREVIEW_DELTAS = (30, 300, 3600, 86400)
+
 
 class WaveformPath(Base):
     """
@@ -81,7 +86,11 @@ class WaveformChannel(Base):
     """
     __tablename__ = 'default_waveform_channels'
     __table_args__ = (UniqueConstraint('network', 'station', 'location',
-                                       'channel', 'file_id'), {})
+                                       'channel', 'file_id'),
+                      # time range queries of channels
+                      Index('ix_default_waveform_channels_id_time',
+                            'network', 'station', 'location', 'channel',
+                            'starttime', 'endtime'), {})
 
     id = Column(Integer, primary_key=True)
     file_id = Column(Integer, ForeignKey('default_waveform_files.id'),
@@ -104,6 +113,10 @@ class WaveformChannel(Base):
                         backref="channel",
                         cascade="all, delete, delete-orphan")
 
+    previews = relation("WaveformPreview", order_by="WaveformPreview.delta",
+                        backref="channel",
+                        cascade="all, delete, delete-orphan")
+
     def __init__(self, data={}):
         self.update(data)
 
@@ -124,7 +137,7 @@ class WaveformChannel(Base):
 
     def get_preview(self, apply_calibration=False):
         try:
-            data = np.loads(self.preview)
+            data = pickle.loads(self.preview)
         except Exception:
             data = np.array([])
         if apply_calibration:
@@ -141,6 +154,56 @@ class WaveformChannel(Base):
         return tr
 
 
+class WaveformPreview(Base):
+    """
+    DB table containing previews of channels at multiple resolutions.
+
+    The preview data is stored as little endian 32 bit floats, so many
+    previews can be loaded without unpickling them.
+    """
+    __tablename__ = 'default_waveform_previews'
+    __table_args__ = (UniqueConstraint('channel_id', 'delta'), {})
+
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, ForeignKey('default_waveform_channels.id'),
+                        index=True)
+    delta = Column(Integer, nullable=False, index=True)
+    starttime = Column(DateTime, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    def __init__(self, data={}):
+        self.delta = data.get('delta')
+        self.starttime = data.get('starttime')
+        self.data = data.get('data')
+
+    def __repr__(self):
+        return "<WaveformPreview('%s')>" % (self.id)
+
+    def get_data(self):
+        """
+        Returns the preview data.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return np.frombuffer(self.data, dtype=np.dtype('<f4'))
+
+
+def preview_to_dict(trace):
+    """
+    Converts a preview trace into a dictionary of the columns of
+    :class:`WaveformPreview`.
+    """
+    data = np.require(trace.data, dtype=np.dtype('<f4'), requirements=['C'])
+    try:
+        data = data.tobytes()
+    except AttributeError:
+        # NumPy < 1.9
+        data = data.tostring()
+    return {'delta': int(trace.stats.delta),
+            'starttime': trace.stats.starttime.datetime,
+            'data': data}
+
+
 class WaveformGaps(Base):
     """
     DB table containing gaps.
@@ -184,3 +247,20 @@ class WaveformFeatures(Base):
 
     def __repr__(self):
         return "<WaveformFeatures('%s')>" % (self.id)
+
+
+def create_indexes(engine):
+    """
+    Creates indexes missing in existing databases, e.g. indexes added in
+    later versions of obspy.db.
+    """
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = set(index['name']
+                       for index in inspector.get_indexes(table.name))
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
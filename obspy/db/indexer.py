@@ -14,15 +14,102 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import fnmatch
+import io
+import multiprocessing
 import os
+import pickle
 import sys
 import time
 
+from sqlalchemy import and_
+
 from obspy import read
-from obspy.core.preview import create_preview
+from obspy.core.preview import create_preview, downsample_preview
 from obspy.core.util.base import _get_entry_points
-from obspy.db.db import (WaveformChannel, WaveformFeatures, WaveformFile,
-                         WaveformGaps, WaveformPath)
+from obspy.db.db import (PREVIEW_DELTAS, WaveformChannel, WaveformFeatures,
+                         WaveformFile, WaveformGaps, WaveformPath,
+                         WaveformPreview, preview_to_dict)
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+# Maximum number of values in a single IN clause, SQLite allows 999 bound
+# parameters per statement.
+_IN_CHUNK_SIZE = 500
+
+
+def _chunks(values, size=_IN_CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _walk(root, patterns=('*.*',), skip_dots=True):
+    """
+    Walks recursively through a directory.
+
+    Uses :func:`os.scandir` (or the ``scandir`` package on Python 2) if
+    available, so only files matching one of the patterns are stat'ed.
+    Symbolic links are followed.
+
+    :type root: str
+    :param root: Directory to walk through.
+    :type patterns: list of str
+    :param patterns: File name patterns of files to return.
+    :type skip_dots: bool
+    :param skip_dots: Skip files and directories starting with a dot.
+    :rtype: generator
+    :return: Tuples of directory and a list of ``(file, mtime, size)``
+        tuples for each directory, including directories without matching
+        files.
+    """
+    def _match(name):
+        if skip_dots and name.startswith('.'):
+            return False
+        for pattern in patterns:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+        return False
+
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        files = []
+        dirs = []
+        try:
+            if scandir is not None:
+                for entry in scandir(path):
+                    if entry.is_dir():
+                        if not (skip_dots and entry.name.startswith('.')):
+                            dirs.append(entry.name)
+                    elif _match(entry.name):
+                        stats = entry.stat()
+                        files.append((entry.name, int(stats.st_mtime),
+                                      stats.st_size))
+            else:
+                for name in os.listdir(path):
+                    filepath = os.path.join(path, name)
+                    if os.path.isdir(filepath):
+                        if not (skip_dots and name.startswith('.')):
+                            dirs.append(name)
+                    elif _match(name):
+                        stats = os.stat(filepath)
+                        files.append((name, int(stats.st_mtime),
+                                      stats.st_size))
+        except OSError:
+            # vanished or inaccessible directory or file
+            continue
+        files.sort()
+        yield path, files
+        # process sub directories in alphabetical order
+        stack.extend(os.path.join(path, name)
+                     for name in sorted(dirs, reverse=True))
 
 
 class WaveformFileCrawler(object):
@@ -93,6 +180,9 @@ class WaveformFileCrawler(object):
             # add features
             for feature in data['features']:
                 channel.features.append(WaveformFeatures(feature))
+            # add previews
+            for preview in data.get('previews', []):
+                channel.previews.append(WaveformPreview(preview))
         try:
             session.commit()
         except Exception as e:
@@ -110,9 +200,10 @@ class WaveformFileCrawler(object):
         session = self.session()
         if file:
             query = session.query(WaveformFile)
+            query = query.filter(WaveformFile.path_id == WaveformPath.id)
             query = query.filter(WaveformPath.path == path)
             query = query.filter(WaveformFile.file == file)
-            query = query.filter(WaveformPath.archived is False)
+            query = query.filter(WaveformPath.archived.is_(False))
             for file_obj in query:
                 session.delete(file_obj)
             try:
@@ -126,7 +217,7 @@ class WaveformFileCrawler(object):
         else:
             query = session.query(WaveformPath)
             query = query.filter(WaveformPath.path == path)
-            query = query.filter(WaveformPath.archived is False)
+            query = query.filter(WaveformPath.archived.is_(False))
             for path_obj in query:
                 session.delete(path_obj)
             try:
@@ -392,27 +483,572 @@ class WaveformFileCrawler(object):
         # modification time differs -> update file
         self.input_queue[filepath] = (path, file, self.features)
 
+    def scan(self, processes=None, batch_size=1000, journal=None,
+             preview=True):
+        """
+        Indexes all paths once in batches.
 
-def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
+        In contrast to :meth:`iterate` the directories are walked with
+        :func:`os.scandir`, new and modified files are detected per batch of
+        directories with a single query, decoded by a pool of processes and
+        written with bulk inserts in one transaction per batch. The options
+        ``recent``, ``force_reindex``, ``skip_dots`` and ``cleanup`` are
+        honored, with ``check_duplicates`` files are written one by one.
+
+        :type processes: int
+        :param processes: Number of worker processes decoding the files.
+            Defaults to the number of CPUs, ``1`` decodes in the current
+            process.
+        :type batch_size: int
+        :param batch_size: Number of files per batch and transaction.
+        :type journal: str
+        :param journal: File to record the completed directories in. An
+            interrupted scan with the same journal skips the directories
+            completed before, the journal is removed after a complete scan.
+        :type preview: bool
+        :param preview: Create previews of the traces. Without previews and
+            features only the headers of the files are read.
+        :rtype: dict
+        :return: Number of ``inserted``, ``updated``, ``deleted``,
+            ``unchanged`` and ``failed`` files.
+        """
+        stats = dict.fromkeys(
+            ('inserted', 'updated', 'deleted', 'unchanged', 'failed'), 0)
+        mappings = getattr(self, 'mappings', {})
+        done = set()
+        if journal and os.path.exists(journal):
+            with io.open(journal, 'rt', encoding='utf-8') as fh:
+                done = set(line.rstrip('\n') for line in fh)
+            self.log.info("Resuming scan, skipping %i directories in "
+                          "journal '%s'" % (len(done), journal))
+        journal_fh = None
+        if journal:
+            journal_fh = io.open(journal, 'at', encoding='utf-8')
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes > 1:
+            pool = multiprocessing.Pool(processes, _init_scan_worker,
+                                        (mappings, preview))
+        else:
+            pool = None
+            _init_scan_worker(mappings, preview)
+        try:
+            for root in sorted(self.paths):
+                self._root = root
+                self.log.debug("Scanning root '%s' ..." % root)
+                batch = []
+                count = 0
+                for path, files in _walk(root, self.patterns,
+                                         self.options.skip_dots):
+                    if path in done:
+                        continue
+                    batch.append((path, files))
+                    count += len(files)
+                    if count >= batch_size:
+                        self._scan_batch(batch, pool, processes, stats,
+                                         journal_fh)
+                        batch = []
+                        count = 0
+                if batch:
+                    self._scan_batch(batch, pool, processes, stats,
+                                     journal_fh)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if journal_fh is not None:
+                journal_fh.close()
+        if self.options.cleanup:
+            self._cleanup_paths(stats)
+        if journal:
+            os.remove(journal)
+        self.log.info("Scan finished: %s" % ", ".join(
+            "%i %s" % (stats[key], key) for key in sorted(stats)))
+        return stats
+
+    def _scan_batch(self, batch, pool, processes, stats, journal_fh):
+        """
+        Compares a batch of directories with the database and indexes all
+        new and modified files.
+        """
+        db_files = self._select_many([path for path, _ in batch])
+        recent = self.options.recent
+        now = time.time()
+        work = []
+        removed = []
+        for path, files in batch:
+            known = db_files.get(path, {})
+            for file, mtime, size in files:
+                if recent and now - mtime > 60 * 60 * recent:
+                    known.pop(file, None)
+                    continue
+                db_mtime = known.pop(file, None)
+                if db_mtime == mtime and not self.options.force_reindex:
+                    stats['unchanged'] += 1
+                    continue
+                work.append((os.path.join(path, file), path, file, mtime,
+                             size, self.features))
+            if self.options.cleanup:
+                removed.extend((path, file) for file in known)
+        # decode files
+        if pool is not None:
+            chunksize = max(1, len(work) // (4 * processes))
+            results = pool.imap_unordered(_scan_file, work, chunksize)
+        else:
+            results = (_scan_file(args) for args in work)
+        datasets = []
+        for path, file, dataset, messages in results:
+            for msg in messages:
+                if msg.startswith('['):
+                    self.log.error(msg)
+                else:
+                    self.log.debug(msg)
+            if not dataset:
+                stats['failed'] += 1
+                continue
+            datasets.append(dataset)
+        # write everything in one transaction
+        if self.options.check_duplicates:
+            for dataset in datasets:
+                self._update_or_insert(dataset)
+            for path, file in removed:
+                self._delete(path, file)
+        else:
+            session = self.session()
+            try:
+                self._bulk_write(session, datasets, removed, stats)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self.log.error("Bulk insert failed, inserting files one by "
+                               "one: %s" % e)
+                for dataset in datasets:
+                    self._update_or_insert(dataset)
+                for path, file in removed:
+                    self._delete(path, file)
+            finally:
+                session.close()
+        if journal_fh is not None:
+            for path, _ in batch:
+                journal_fh.write(path + '\n')
+            journal_fh.flush()
+            os.fsync(journal_fh.fileno())
+
+    def _delete_files(self, session, file_ids):
+        """
+        Deletes files and all related entries by database id.
+        """
+        table_f = WaveformFile.__table__
+        table_c = WaveformChannel.__table__
+        for chunk in _chunks(file_ids):
+            channel_ids = [row[0] for row in session.execute(
+                table_c.select(table_c.c.file_id.in_(chunk)).
+                with_only_columns([table_c.c.id]))]
+            for channel_chunk in _chunks(channel_ids):
+                for table in (WaveformGaps.__table__,
+                              WaveformFeatures.__table__,
+                              WaveformPreview.__table__):
+                    session.execute(table.delete(
+                        table.c.channel_id.in_(channel_chunk)))
+            session.execute(table_c.delete(table_c.c.file_id.in_(chunk)))
+            session.execute(table_f.delete(table_f.c.id.in_(chunk)))
+
+    def _cleanup_paths(self, stats):
+        """
+        Removes paths not existing in the file system or without files,
+        skipping archived paths.
+        """
+        table_p = WaveformPath.__table__
+        table_f = WaveformFile.__table__
+        session = self.session()
+        try:
+            query = table_p.select(table_p.c.archived.isnot(True))
+            rows = session.execute(query.with_only_columns(
+                [table_p.c.id, table_p.c.path])).fetchall()
+            used = set(row[0] for row in session.execute(
+                table_f.select().with_only_columns(
+                    [table_f.c.path_id]).distinct()))
+            gone = [id for id, path in rows if not os.path.isdir(path)]
+            for chunk in _chunks(gone):
+                file_ids = [row[0] for row in session.execute(
+                    table_f.select(table_f.c.path_id.in_(chunk)).
+                    with_only_columns([table_f.c.id]))]
+                stats['deleted'] += len(file_ids)
+                self._delete_files(session, file_ids)
+            gone.extend(id for id, _ in rows if id not in used)
+            for chunk in _chunks(set(gone)):
+                session.execute(table_p.delete(table_p.c.id.in_(chunk)))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.log.error("Error cleaning up paths: %s" % e)
+        finally:
+            session.close()
+
+    def _select_many(self, paths):
+        """
+        Fetches the files and modification times of many paths at once.
+        """
+        session = self.session()
+        table_p = WaveformPath.__table__
+        table_f = WaveformFile.__table__
+        result = {}
+        try:
+            for chunk in _chunks(paths):
+                query = table_f.join(table_p).select(
+                    table_p.c.path.in_(chunk)).with_only_columns(
+                    [table_p.c.path, table_f.c.file, table_f.c.mtime])
+                for path, file, mtime in session.execute(query):
+                    result.setdefault(path, {})[file] = mtime
+        finally:
+            session.close()
+        return result
+
+    def _bulk_write(self, session, datasets, removed, stats):
+        """
+        Replaces the database entries of the given files with bulk inserts.
+        """
+        table_p = WaveformPath.__table__
+        table_f = WaveformFile.__table__
+        table_c = WaveformChannel.__table__
+        table_g = WaveformGaps.__table__
+        table_fe = WaveformFeatures.__table__
+
+        def _file_ids(names):
+            # database ids of (path, file) tuples
+            by_path = {}
+            for path, file in names:
+                by_path.setdefault(path_ids[path], []).append(file)
+            ids = {}
+            for path_id, files in by_path.items():
+                for chunk in _chunks(files):
+                    query = table_f.select(and_(
+                        table_f.c.path_id == path_id,
+                        table_f.c.file.in_(chunk))).with_only_columns(
+                        [table_f.c.id, table_f.c.file])
+                    for id, file in session.execute(query):
+                        ids[(paths[path_id], file)] = id
+            return ids
+
+        # skip files with duplicate channels, e.g. after id mappings
+        valid = []
+        for dataset in datasets:
+            ids = set((d['network'], d['station'], d['location'],
+                       d['channel']) for d in dataset)
+            if len(ids) != len(dataset):
+                stats['failed'] += 1
+                self.log.error("Duplicate channels in '%s'" %
+                               dataset[0]['filepath'])
+                continue
+            valid.append(dataset)
+        datasets = valid
+
+        # fetch or create paths
+        all_paths = set(d[0]['path'] for d in datasets)
+        all_paths.update(path for path, _ in removed)
+        path_ids = {}
+        for chunk in _chunks(all_paths):
+            query = table_p.select(table_p.c.path.in_(chunk))
+            for row in session.execute(query):
+                if row.archived and row.path in all_paths:
+                    # never delete files in archived paths
+                    removed = [r for r in removed if r[0] != row.path]
+                path_ids[row.path] = row.id
+        new_paths = [{'path': path, 'archived': False}
+                     for path in all_paths if path not in path_ids]
+        if new_paths:
+            session.execute(table_p.insert(), new_paths)
+            for chunk in _chunks(d['path'] for d in new_paths):
+                query = table_p.select(table_p.c.path.in_(chunk))
+                for row in session.execute(query):
+                    path_ids[row.path] = row.id
+        paths = dict((id, path) for path, id in path_ids.items())
+
+        # delete existing entries
+        names = [(d[0]['path'], d[0]['file']) for d in datasets]
+        old_ids = _file_ids(names + list(removed))
+        self._delete_files(session, old_ids.values())
+        for name in names:
+            stats['updated' if name in old_ids else 'inserted'] += 1
+        stats['deleted'] += len(removed)
+        if not datasets:
+            return
+
+        # insert files
+        session.execute(table_f.insert(), [
+            {'path_id': path_ids[d[0]['path']], 'file': d[0]['file'],
+             'size': d[0]['size'], 'mtime': int(d[0]['mtime']),
+             'format': d[0]['format']} for d in datasets])
+        file_ids = _file_ids(names)
+
+        # insert channels
+        columns = ('network', 'station', 'location', 'channel', 'starttime',
+                   'endtime', 'calib', 'npts', 'sampling_rate', 'preview')
+        rows = []
+        for dataset in datasets:
+            file_id = file_ids[(dataset[0]['path'], dataset[0]['file'])]
+            for data in dataset:
+                row = dict((key, data.get(key)) for key in columns)
+                row['file_id'] = file_id
+                rows.append(row)
+        session.execute(table_c.insert(), rows)
+        channel_ids = {}
+        for chunk in _chunks(file_ids.values()):
+            query = table_c.select(table_c.c.file_id.in_(chunk))
+            for row in session.execute(query.with_only_columns(
+                    [table_c.c.id, table_c.c.file_id, table_c.c.network,
+                     table_c.c.station, table_c.c.location,
+                     table_c.c.channel])):
+                channel_ids[tuple(row[1:])] = row[0]
+
+        # insert gaps, features and previews
+        gaps = []
+        features = []
+        previews = []
+        for dataset in datasets:
+            file_id = file_ids[(dataset[0]['path'], dataset[0]['file'])]
+            for data in dataset:
+                channel_id = channel_ids[(
+                    file_id, data['network'], data['station'],
+                    data['location'], data['channel'])]
+                for gap in data['gaps']:
+                    gap = dict(gap)
+                    gap['channel_id'] = channel_id
+                    gaps.append(gap)
+                for feature in data['features']:
+                    features.append({
+                        'channel_id': channel_id, 'key': feature['key'],
+                        'value': pickle.dumps(feature.get('value', None))})
+                for preview in data.get('previews', []):
+                    preview = dict(preview)
+                    preview['channel_id'] = channel_id
+                    previews.append(preview)
+        if gaps:
+            session.execute(table_g.insert(), gaps)
+        if features:
+            session.execute(table_fe.insert(), features)
+        if previews:
+            session.execute(WaveformPreview.__table__.insert(), previews)
+
+
+# state of scan worker processes, set by _init_scan_worker
+_SCAN_WORKER = {}
+
+
+def _init_scan_worker(mappings, preview):
+    log_queue = []
+    _SCAN_WORKER.update(all_features=_load_features(log_queue),
+                        mappings=mappings, preview=preview,
+                        log_queue=log_queue)
+
+
+def _scan_file(args):
+    """
+    Processes a single file in a worker process of
+    :meth:`WaveformFileCrawler.scan`.
+    """
+    filepath, path, file, mtime, size, features = args
+    log_queue = _SCAN_WORKER['log_queue']
+    dataset = _process_file(
+        filepath, path, file, features, _SCAN_WORKER['all_features'],
+        _SCAN_WORKER['mappings'], log_queue, mtime=mtime, size=size,
+        preview=_SCAN_WORKER['preview'])
+    messages = list(log_queue)
+    del log_queue[:]
+    return path, file, dataset, messages
+
+
+def _load_features(log_queue):
+    """
+    Fetches and initializes all possible waveform feature plug-ins.
+    """
+    all_features = {}
+    for (key, ep) in _get_entry_points('obspy.db.feature').items():
+        try:
+            # load plug-in
+            cls = ep.load()
+            # initialize class
+            func = cls().process
+        except Exception as e:
+            msg = 'Could not initialize feature %s. (%s)'
+            log_queue.append(msg % (key, str(e)))
+            continue
+        all_features[key] = {}
+        all_features[key]['run'] = func
+        try:
+            all_features[key]['indexer_kwargs'] = cls['indexer_kwargs']
+        except Exception:
+            all_features[key]['indexer_kwargs'] = {}
+    return all_features
+
+
+def _merge_headers(stream):
+    """
+    Combines header only traces of the same id like
+    ``stream.merge(fill_value=0)`` combines traces with data.
+    """
+    traces = {}
+    for trace in stream:
+        other = traces.get(trace.id)
+        if other is None:
+            traces[trace.id] = trace
+            continue
+        if other.stats.sampling_rate != trace.stats.sampling_rate:
+            raise Exception("Can't merge traces with same ids but differing "
+                            "sampling rates!")
+        starttime = min(other.stats.starttime, trace.stats.starttime)
+        endtime = max(other.stats.endtime, trace.stats.endtime)
+        other.stats.starttime = starttime
+        other.stats.npts = int(round(
+            (endtime - starttime) * other.stats.sampling_rate)) + 1
+    stream.traces = list(traces.values())
+    return stream
+
+
+def _process_file(filepath, path, file, features, all_features, mappings,
+                  log_queue, mtime=None, size=None, preview=True):
+    """
+    Reads a waveform file and collects the database entries of its traces.
+
+    :type features: list of str
+    :param features: Names of feature plug-ins to apply.
+    :type all_features: dict
+    :param all_features: Loaded feature plug-ins, see
+        :func:`_load_features`.
+    :type mtime: int
+    :param mtime: Modification time of the file, fetched if not given.
+    :type size: int
+    :param size: Size of the file, fetched if not given.
+    :type preview: bool
+    :param preview: Create previews of the traces. The file is only read
+        header only if no previews and features are requested.
+    :rtype: list of dict
+    :return: One dictionary per channel or ``None`` if the file could not
+        be read.
+    """
+    # get additional kwargs for read method from waveform plug-ins
+    kwargs = {'verify_chksum': False}
+    for feature in features:
+        if feature not in all_features:
+            log_queue.append('%s: Unknown feature %s' % (filepath,
+                                                         feature))
+            continue
+        kwargs.update(all_features[feature]['indexer_kwargs'])
+    headonly = not preview and not features
+    # read file and get file stats
     try:
-        # fetch and initialize all possible waveform feature plug-ins
-        all_features = {}
-        for (key, ep) in _get_entry_points('obspy.db.feature').items():
+        if mtime is None or size is None:
+            stats = os.stat(filepath)
+            mtime = int(stats.st_mtime)
+            size = stats.st_size
+        stream = read(filepath, headonly=headonly, **kwargs)
+        # get gap and overlap information
+        gap_list = stream.get_gaps()
+        # merge channels and replace gaps/overlaps with 0 to prevent
+        # generation of masked arrays
+        if headonly:
+            _merge_headers(stream)
+        else:
+            stream.merge(fill_value=0)
+    except Exception as e:
+        msg = '[Reading stream] %s: %s'
+        log_queue.append(msg % (filepath, e))
+        return None
+    # build up dictionary of gaps and overlaps for easier lookup
+    gap_dict = {}
+    for gap in gap_list:
+        id = '.'.join(gap[0:4])
+        temp = {
+            'gap': gap[6] >= 0,
+            'starttime': gap[4].datetime,
+            'endtime': gap[5].datetime,
+            'samples': abs(gap[7])
+        }
+        gap_dict.setdefault(id, []).append(temp)
+    # loop through traces
+    dataset = []
+    for trace in stream:
+        result = {}
+        # general file information
+        result['mtime'] = int(mtime)
+        result['size'] = size
+        result['path'] = path
+        result['file'] = file
+        result['filepath'] = filepath
+        # trace information
+        result['format'] = trace.stats._format
+        result['station'] = trace.stats.station
+        result['location'] = trace.stats.location
+        result['channel'] = trace.stats.channel
+        result['network'] = trace.stats.network
+        result['starttime'] = trace.stats.starttime.datetime
+        result['endtime'] = trace.stats.endtime.datetime
+        result['calib'] = trace.stats.calib
+        result['npts'] = trace.stats.npts
+        result['sampling_rate'] = trace.stats.sampling_rate
+        # check for any id mappings
+        if trace.id in mappings:
+            old_id = trace.id
+            for mapping in mappings[old_id]:
+                if trace.stats.starttime and \
+                   trace.stats.starttime > mapping['endtime']:
+                    continue
+                if trace.stats.endtime and \
+                   trace.stats.endtime < mapping['starttime']:
+                    continue
+                result['network'] = mapping['network']
+                result['station'] = mapping['station']
+                result['location'] = mapping['location']
+                result['channel'] = mapping['channel']
+                msg = "Mapping '%s' to '%s.%s.%s.%s'" % \
+                    (old_id, mapping['network'], mapping['station'],
+                     mapping['location'], mapping['channel'])
+                log_queue.append(msg)
+        # gaps/overlaps for current trace
+        result['gaps'] = gap_dict.get(trace.id, [])
+        # apply feature functions
+        result['features'] = []
+        for key in features:
+            if key not in all_features:
+                continue
             try:
-                # load plug-in
-                cls = ep.load()
-                # initialize class
-                func = cls().process
+                # run plug-in and update results
+                temp = all_features[key]['run'](trace)
+                for key, value in temp.items():
+                    result['features'].append({'key': key,
+                                               'value': value})
             except Exception as e:
-                msg = 'Could not initialize feature %s. (%s)'
-                log_queue.append(msg % (key, str(e)))
+                msg = '[Processing feature] %s: %s'
+                log_queue.append(msg % (filepath, e))
                 continue
-            all_features[key] = {}
-            all_features[key]['run'] = func
+        # generate previews of trace
+        result['preview'] = None
+        result['previews'] = []
+        if preview and ('.LOG.L.' not in file or
+                        trace.stats.channel != 'LOG'):
+            # create previews only for non-log files (see issue #400)
             try:
-                all_features[key]['indexer_kwargs'] = cls['indexer_kwargs']
-            except Exception:
-                all_features[key]['indexer_kwargs'] = {}
+                trace = create_preview(trace, PREVIEW_DELTAS[0])
+                result['preview'] = trace.data.dumps()
+                result['previews'].append(preview_to_dict(trace))
+                for delta in PREVIEW_DELTAS[1:]:
+                    result['previews'].append(preview_to_dict(
+                        downsample_preview(trace, delta)))
+            except ValueError:
+                pass
+            except Exception as e:
+                msg = '[Creating preview] %s: %s'
+                log_queue.append(msg % (filepath, e))
+        # update dataset
+        dataset.append(result)
+    del stream
+    return dataset
+
+
+def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
+    try:
+        # fetch and initialize all possible waveform feature plug-ins
+        all_features = _load_features(log_queue)
         # loop through input queue
         while True:
             # fetch a unprocessed item
@@ -424,118 +1060,14 @@ def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
             if filepath in work_queue:
                 continue
             work_queue.append(filepath)
-            # get additional kwargs for read method from waveform plug-ins
-            kwargs = {'verify_chksum': False}
-            for feature in features:
-                if feature not in all_features:
-                    log_queue.append('%s: Unknown feature %s' % (filepath,
-                                                                 feature))
-                    continue
-                kwargs.update(all_features[feature]['indexer_kwargs'])
-            # read file and get file stats
-            try:
-                stats = os.stat(filepath)
-                stream = read(filepath, **kwargs)
-                # get gap and overlap information
-                gap_list = stream.get_gaps()
-                # merge channels and replace gaps/overlaps with 0 to prevent
-                # generation of masked arrays
-                stream.merge(fill_value=0)
-            except Exception as e:
-                msg = '[Reading stream] %s: %s'
-                log_queue.append(msg % (filepath, e))
+            dataset = _process_file(filepath, path, file, features,
+                                    all_features, mappings, log_queue)
+            # return results to main loop
+            if dataset is not None:
                 try:
-                    work_queue.remove(filepath)
+                    output_queue.append(dataset)
                 except Exception:
                     pass
-                continue
-            # build up dictionary of gaps and overlaps for easier lookup
-            gap_dict = {}
-            for gap in gap_list:
-                id = '.'.join(gap[0:4])
-                temp = {
-                    'gap': gap[6] >= 0,
-                    'starttime': gap[4].datetime,
-                    'endtime': gap[5].datetime,
-                    'samples': abs(gap[7])
-                }
-                gap_dict.setdefault(id, []).append(temp)
-            # loop through traces
-            dataset = []
-            for trace in stream:
-                result = {}
-                # general file information
-                result['mtime'] = int(stats.st_mtime)
-                result['size'] = stats.st_size
-                result['path'] = path
-                result['file'] = file
-                result['filepath'] = filepath
-                # trace information
-                result['format'] = trace.stats._format
-                result['station'] = trace.stats.station
-                result['location'] = trace.stats.location
-                result['channel'] = trace.stats.channel
-                result['network'] = trace.stats.network
-                result['starttime'] = trace.stats.starttime.datetime
-                result['endtime'] = trace.stats.endtime.datetime
-                result['calib'] = trace.stats.calib
-                result['npts'] = trace.stats.npts
-                result['sampling_rate'] = trace.stats.sampling_rate
-                # check for any id mappings
-                if trace.id in mappings:
-                    old_id = trace.id
-                    for mapping in mappings[old_id]:
-                        if trace.stats.starttime and \
-                           trace.stats.starttime > mapping['endtime']:
-                            continue
-                        if trace.stats.endtime and \
-                           trace.stats.endtime < mapping['starttime']:
-                            continue
-                        result['network'] = mapping['network']
-                        result['station'] = mapping['station']
-                        result['location'] = mapping['location']
-                        result['channel'] = mapping['channel']
-                        msg = "Mapping '%s' to '%s.%s.%s.%s'" % \
-                            (old_id, mapping['network'], mapping['station'],
-                             mapping['location'], mapping['channel'])
-                        log_queue.append(msg)
-                # gaps/overlaps for current trace
-                result['gaps'] = gap_dict.get(trace.id, [])
-                # apply feature functions
-                result['features'] = []
-                for key in features:
-                    if key not in all_features:
-                        continue
-                    try:
-                        # run plug-in and update results
-                        temp = all_features[key]['run'](trace)
-                        for key, value in temp.items():
-                            result['features'].append({'key': key,
-                                                       'value': value})
-                    except Exception as e:
-                        msg = '[Processing feature] %s: %s'
-                        log_queue.append(msg % (filepath, e))
-                        continue
-                # generate preview of trace
-                result['preview'] = None
-                if '.LOG.L.' not in file or trace.stats.channel != 'LOG':
-                    # create previews only for non-log files (see issue #400)
-                    try:
-                        trace = create_preview(trace, 30)
-                        result['preview'] = trace.data.dumps()
-                    except ValueError:
-                        pass
-                    except Exception as e:
-                        msg = '[Creating preview] %s: %s'
-                        log_queue.append(msg % (filepath, e))
-                # update dataset
-                dataset.append(result)
-            del stream
-            # return results to main loop
-            try:
-                output_queue.append(dataset)
-            except Exception:
-                pass
             try:
                 work_queue.remove(filepath)
             except Exception:
@@ -23,6 +23,12 @@ A command-line program that indexes seismogram files into a database.
 (2) Run only once and remove duplicates::
 
        ./obspy-indexer -v -i0.0 --run-once --check-duplicates -n1 -u$DB -d$DATA
+
+(3) Index a large archive once in batches using 8 processes, reading only
+    the headers of the files and resuming interrupted runs::
+
+       ./obspy-indexer -u$DB -d$DATA -n8 --scan --skip-previews \
+           --journal=indexer.journal
 """
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
@@ -44,7 +50,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm.session import sessionmaker
 
 from obspy import __version__
-from obspy.db.db import Base
+from obspy.db.db import Base, create_indexes
 from obspy.db.indexer import WaveformFileCrawler, worker
 from obspy.db.util import parse_mapping_data
 
@@ -108,29 +114,71 @@ class WaveformIndexer(http_server.HTTPServer, WaveformFileCrawler):
             self.iterate()
 
 
+def _prepare(crawler, options):
+    """
+    Prepares paths, mappings and database of a crawler.
+    """
+    # prepare paths
+    if ',' in options.data:
+        paths = options.data.split(',')
+    else:
+        paths = [options.data]
+    paths = crawler._prepare_paths(paths)
+    if not paths:
+        return None
+    # prepare map file
+    if options.mapping_file:
+        with open(options.mapping_file, 'r') as f:
+            data = f.readlines()
+        mappings = parse_mapping_data(data)
+        logging.info("Parsed %d lines from mapping file %s" %
+                     (len(data), options.mapping_file))
+    else:
+        mappings = {}
+    return paths, mappings
+
+
+def _connect(options):
+    # connect to database
+    engine = create_engine(options.db_uri, encoding=native_str('utf-8'),
+                           convert_unicode=True)
+    metadata = Base.metadata
+    # recreate database
+    if options.drop_database:
+        metadata.drop_all(engine, checkfirst=True)
+    metadata.create_all(engine, checkfirst=True)
+    create_indexes(engine)
+    return sessionmaker(bind=engine)
+
+
+def _run_scan(options):
+    logging.info("Starting scan ...")
+    crawler = WaveformFileCrawler()
+    crawler.log = logging
+    prepared = _prepare(crawler, options)
+    if not prepared:
+        return
+    crawler.paths, crawler.mappings = prepared
+    crawler.session = _connect(options)
+    crawler.options = options
+    crawler.scan(processes=options.number_of_cpus,
+                 batch_size=options.batch_size, journal=options.journal,
+                 preview=not options.skip_previews)
+
+
 def _run_indexer(options):
+    if options.scan:
+        _run_scan(options)
+        return
     logging.info("Starting indexer %s:%s ..." % (options.host, options.port))
     # initialize crawler
     service = WaveformIndexer((options.host, options.port), MyHandler)
     service.log = logging
     try:
-        # prepare paths
-        if ',' in options.data:
-            paths = options.data.split(',')
-        else:
-            paths = [options.data]
-        paths = service._prepare_paths(paths)
-        if not paths:
+        prepared = _prepare(service, options)
+        if not prepared:
             return
-        # prepare map file
-        if options.mapping_file:
-            with open(options.mapping_file, 'r') as f:
-                data = f.readlines()
-            mappings = parse_mapping_data(data)
-            logging.info("Parsed %d lines from mapping file %s" %
-                         (len(data), options.mapping_file))
-        else:
-            mappings = {}
+        paths, mappings = prepared
         # create file queue and worker processes
         manager = multiprocessing.Manager()
         in_queue = manager.dict()
@@ -143,17 +191,8 @@ def _run_indexer(options):
             p = multiprocessing.Process(target=worker, args=args)
             p.daemon = True
             p.start()
-        # connect to database
-        engine = create_engine(options.db_uri, encoding=native_str('utf-8'),
-                               convert_unicode=True)
-        metadata = Base.metadata
-        # recreate database
-        if options.drop_database:
-            metadata.drop_all(engine, checkfirst=True)
-        metadata.create_all(engine, checkfirst=True)
         # initialize database + options
-        _session = sessionmaker(bind=engine)
-        service.session = _session
+        service.session = _connect(options)
         service.options = options
         service.mappings = mappings
         # set queues
@@ -239,6 +278,24 @@ Default path option is 'data=*.*'.""")
     parser.add_argument(
         '--drop-database', action='store_true',
         help="Deletes and recreates the complete database at start up.")
+    parser.add_argument(
+        '--scan', action='store_true',
+        help="Index all paths once in batches using a pool of -n processes "
+             "and bulk inserts and quit afterwards, instead of running the "
+             "crawler service. Much faster for large archives.")
+    parser.add_argument(
+        '--batch-size', type=int, default=1000,
+        help="Number of files per batch and transaction with --scan "
+             "(default is 1000).")
+    parser.add_argument(
+        '--journal', default=None,
+        help="Journal file recording the completed directories with --scan. "
+             "Interrupted scans using the same journal resume where they "
+             "stopped.")
+    parser.add_argument(
+        '--skip-previews', action='store_true',
+        help="Do not create previews with --scan. Files are read header "
+             "only if no features are given.")
     parser.add_argument(
         '-H', '--host', default='localhost',
         help="Server host name. Default is 'localhost'.")
@@ -5,12 +5,16 @@ from future.builtins import *  # NOQA
 
 import os
 import unittest
+import warnings
 
 import numpy as np
+from sqlalchemy import create_engine, inspect
 
-from obspy.core.preview import create_preview
+from obspy import read
+from obspy.core.preview import create_preview, downsample_preview
 from obspy.core.trace import Trace
 from obspy.core.utcdatetime import UTCDateTime
+from obspy.core.util.misc import TemporaryWorkingDirectory
 from obspy.db.client import Client
 from obspy.db.db import WaveformChannel, WaveformFile, WaveformPath
 
@@ -249,6 +253,132 @@ class ClientTestCase(unittest.TestCase):
         self.assertEqual(len(st), 1)
         self.assertEqual(st[0].stats.npts, 3380)
 
+    def test_get_preview_arrays(self):
+        """
+        Tests for method get_preview_arrays with previews of databases
+        without multiple resolutions.
+        """
+        dt = UTCDateTime('2012-01-01 00:00:00.000000')
+        dt2 = UTCDateTime('2012-01-01T08:19:30.000000Z')
+        ids, starttime, delta, data = self.client.get_preview_arrays(dt, dt2)
+        self.assertEqual(ids, ['GE.FUR.00.BHZ'])
+        self.assertEqual(starttime, dt)
+        self.assertEqual(delta, 30)
+        self.assertEqual(data.dtype, np.float32)
+        self.assertEqual(data.shape, (1, 1000))
+        np.testing.assert_equal(data[0], self.preview)
+        # padded and coarser resolution chosen by number of samples
+        ids, starttime, delta, data = self.client.get_preview_arrays(
+            dt - 3600, dt2, trace_ids=['GE.FUR.00.BHZ', 'GE.FUR.00.BHN'],
+            samples=50)
+        self.assertEqual(starttime, dt - 3600)
+        self.assertEqual(delta, 300)
+        self.assertEqual(data.shape, (1, 112))
+        np.testing.assert_equal(data[0, :12], -1)
+        expected = self.client.get_preview(starttime=dt, endtime=dt2)[0]
+        expected = downsample_preview(expected, 300)
+        np.testing.assert_equal(data[0, 12:], expected.data)
+        # no data
+        ids, starttime, delta, data = self.client.get_preview_arrays(
+            dt, dt2, network='XX', delta=3600)
+        self.assertEqual(ids, [])
+        self.assertEqual(data.shape, (0, 9))
+        self.assertRaises(ValueError, self.client.get_preview_arrays, dt,
+                          dt2, delta=60)
+        self.assertRaises(ValueError, self.client.get_preview_arrays, dt2,
+                          dt)
+
+
+class ClientGetWaveformsTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.db.client.Client.get_waveforms.
+    """
+    def setUp(self):
+        self._dir = TemporaryWorkingDirectory()
+        self._dir.__enter__()
+        self.client = Client('sqlite:///indexer.sqlite')
+        session = self.client.session()
+        self.st = read()
+        self.t0 = self.st[0].stats.starttime
+        # three consecutive files of 10 s in different directories
+        for i in range(3):
+            path = WaveformPath({'path': os.path.abspath('dir%i' % i)})
+            os.mkdir(path.path)
+            file = WaveformFile({'file': 'file.mseed', 'size': 0, 'mtime': 0,
+                                 'format': 'MSEED'})
+            path.files.append(file)
+            st = self.st.slice(self.t0 + 10 * i, self.t0 + 10 * i + 9.99)
+            st.write(os.path.join(path.path, file.file), format='MSEED')
+            for tr in st:
+                header = dict(tr.stats)
+                header['starttime'] = tr.stats.starttime.datetime
+                header['endtime'] = tr.stats.endtime.datetime
+                file.channels.append(WaveformChannel(header))
+            session.add(path)
+        session.commit()
+        session.close()
+
+    def tearDown(self):
+        self._dir.__exit__(None, None, None)
+
+    def test_get_waveforms(self):
+        for threads in (1, 3):
+            st = self.client.get_waveforms('BW', 'RJOB', '', 'EH?',
+                                           self.t0 + 5, self.t0 + 25,
+                                           threads=threads)
+            self.assertEqual(len(st), 3)
+            st.sort()
+            expected = self.st.slice(self.t0 + 5, self.t0 + 25)
+            expected.sort()
+            for tr, tr_expected in zip(st, expected):
+                self.assertEqual(tr.stats.starttime,
+                                 tr_expected.stats.starttime)
+                np.testing.assert_array_equal(tr.data, tr_expected.data)
+        # wildcards, no merge
+        st = self.client.get_waveforms('?W', 'R*', '*', 'EHZ', self.t0 + 5,
+                                       self.t0 + 25, merge=None)
+        self.assertEqual(len(st), 3)
+        self.assertEqual(st[0].stats.starttime, self.t0 + 5)
+        self.assertEqual(st[-1].stats.endtime, self.t0 + 25)
+        # no data
+        st = self.client.get_waveforms('BW', 'RJOB', '', 'EHZ', self.t0 - 10,
+                                       self.t0 - 5)
+        self.assertEqual(len(st), 0)
+        st = self.client.get_waveforms('BW', 'RJOB', '00', 'EHZ', self.t0,
+                                       self.t0 + 5)
+        self.assertEqual(len(st), 0)
+        self.assertRaises(ValueError, self.client.get_waveforms, 'BW',
+                          'RJOB', '', 'EHZ', self.t0, self.t0)
+
+    def test_only_overlapping_files(self):
+        with open(os.path.join('dir2', 'file.mseed'), 'wb') as fh:
+            fh.write(b'junk')
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            st = self.client.get_waveforms('BW', 'RJOB', '', 'EHZ', self.t0,
+                                           self.t0 + 15)
+            self.assertEqual(len(w), 0)
+            self.assertEqual(len(st), 1)
+            st = self.client.get_waveforms('BW', 'RJOB', '', 'EHZ', self.t0,
+                                           self.t0 + 25)
+            self.assertEqual(len(w), 1)
+            self.assertIn('dir2', str(w[0].message))
+        self.assertEqual(st[0].stats.endtime, self.t0 + 19.99)
+
+    def test_indexes(self):
+        engine = create_engine('sqlite:///indexer.sqlite')
+        name = 'ix_default_waveform_channels_id_time'
+        indexes = inspect(engine).get_indexes('default_waveform_channels')
+        index = [_i for _i in indexes if _i['name'] == name][0]
+        self.assertEqual(index['column_names'],
+                         ['network', 'station', 'location', 'channel',
+                          'starttime', 'endtime'])
+        # created in existing databases
+        engine.execute('DROP INDEX %s' % name)
+        Client('sqlite:///indexer.sqlite')
+        indexes = inspect(engine).get_indexes('default_waveform_channels')
+        self.assertIn(name, [_i['name'] for _i in indexes])
+
 
 def suite():
     try:
@@ -257,7 +387,10 @@ def suite():
         # skip the whole test suite if module sqlite3 is missing
         return unittest.makeSuite(object, 'test')
     else:
-        return unittest.makeSuite(ClientTestCase, 'test')
+        suite = unittest.TestSuite()
+        suite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+        suite.addTest(unittest.makeSuite(ClientGetWaveformsTestCase, 'test'))
+        return suite
 
 
 if __name__ == '__main__':
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import logging
+import os
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import numpy as np
+
+from obspy import UTCDateTime, read
+from obspy.core.preview import create_preview, downsample_preview
+from obspy.core.util.attribdict import AttribDict
+from obspy.core.util.misc import TemporaryWorkingDirectory
+from obspy.db.client import Client
+from obspy.db.db import (PREVIEW_DELTAS, Base, WaveformChannel, WaveformFile,
+                         WaveformGaps, WaveformPath, WaveformPreview)
+from obspy.db.indexer import WaveformFileCrawler, _walk
+
+
+class IndexerTestCase(unittest.TestCase):
+    """
+    Test suite for the batch scan of obspy.db.indexer.
+    """
+    def setUp(self):
+        self._dir = TemporaryWorkingDirectory()
+        self._dir.__enter__()
+        self.root = os.path.abspath('archive')
+        st = read()
+        for i, folder in enumerate(['2010', os.path.join('2010', '001'),
+                                    '2011']):
+            os.makedirs(os.path.join(self.root, folder))
+            for j in range(3):
+                st2 = st.copy()
+                for tr in st2:
+                    tr.stats.starttime += 3600 * (3 * i + j)
+                if j == 0:
+                    # file with gaps and overlaps
+                    st2 += st2.copy().trim(st2[0].stats.starttime + 20)
+                    st2[3].stats.starttime += 15
+                st2.write(os.path.join(self.root, folder, 'file%i.mseed' % j),
+                          format='MSEED')
+        with open(os.path.join(self.root, '2011', 'junk.mseed'), 'wb') as fh:
+            fh.write(b'junk')
+        with open(os.path.join(self.root, '2011', 'notes.txt'), 'wb') as fh:
+            fh.write(b'junk')
+        os.makedirs(os.path.join(self.root, '.hidden'))
+        st.write(os.path.join(self.root, '.hidden', 'file.mseed'),
+                 format='MSEED')
+
+    def tearDown(self):
+        self._dir.__exit__(None, None, None)
+
+    def _crawler(self, name='indexer.sqlite', **kwargs):
+        crawler = WaveformFileCrawler()
+        crawler.log = logging.getLogger('obspy.db.tests')
+        crawler.options = AttribDict(
+            recent=0, force_reindex=False, skip_dots=True, cleanup=False,
+            check_duplicates=False)
+        crawler.options.update(kwargs)
+        engine = create_engine('sqlite:///' + name)
+        Base.metadata.create_all(engine)
+        crawler.session = sessionmaker(bind=engine)
+        crawler.paths = crawler._prepare_paths([self.root + '=*.mseed'])
+        return crawler
+
+    def _dump(self, crawler):
+        session = crawler.session()
+        files = session.query(
+            WaveformPath.path, WaveformFile.file, WaveformFile.size,
+            WaveformFile.mtime, WaveformFile.format).filter(
+            WaveformPath.id == WaveformFile.path_id).all()
+        channels = session.query(
+            WaveformFile.file, WaveformChannel.network,
+            WaveformChannel.station, WaveformChannel.location,
+            WaveformChannel.channel, WaveformChannel.starttime,
+            WaveformChannel.endtime, WaveformChannel.npts,
+            WaveformChannel.sampling_rate, WaveformChannel.preview).filter(
+            WaveformFile.id == WaveformChannel.file_id).all()
+        gaps = session.query(
+            WaveformFile.file, WaveformChannel.channel, WaveformGaps.gap,
+            WaveformGaps.starttime, WaveformGaps.endtime,
+            WaveformGaps.samples).filter(
+            WaveformFile.id == WaveformChannel.file_id).filter(
+            WaveformChannel.id == WaveformGaps.channel_id).all()
+        session.close()
+        return sorted(files), sorted(channels), sorted(gaps)
+
+    def test_walk(self):
+        result = list(_walk(self.root, ['*.mseed']))
+        self.assertEqual([path for path, _ in result], [
+            self.root, os.path.join(self.root, '2010'),
+            os.path.join(self.root, '2010', '001'),
+            os.path.join(self.root, '2011')])
+        self.assertEqual([name for name, _, _ in result[3][1]],
+                         ['file0.mseed', 'file1.mseed', 'file2.mseed',
+                          'junk.mseed'])
+        filename = os.path.join(self.root, '2011', 'file1.mseed')
+        self.assertEqual(result[3][1][1][1:],
+                         (int(os.stat(filename).st_mtime),
+                          os.path.getsize(filename)))
+        result = list(_walk(self.root, ['*.mseed'], skip_dots=False))
+        self.assertEqual(len(result), 5)
+
+    def test_scan(self):
+        """
+        Bulk inserts are the same as inserting files one by one.
+        """
+        crawler = self._crawler()
+        stats = crawler.scan(processes=1, batch_size=4)
+        self.assertEqual(stats, {'inserted': 9, 'updated': 0, 'deleted': 0,
+                                 'unchanged': 0, 'failed': 1})
+        files, channels, gaps = self._dump(crawler)
+        self.assertEqual(len(files), 9)
+        self.assertEqual(len(channels), 27)
+        self.assertEqual(len(gaps), 9)
+        self.assertTrue(all(channel[-1] is not None for channel in channels))
+
+        expected = self._crawler('expected.sqlite', check_duplicates=True)
+        expected.scan(processes=1, batch_size=4)
+        self.assertEqual(self._dump(expected), (files, channels, gaps))
+
+        # header only
+        crawler = self._crawler('headonly.sqlite')
+        crawler.scan(processes=2, preview=False)
+        files2, channels2, gaps2 = self._dump(crawler)
+        self.assertEqual(files2, files)
+        self.assertEqual([channel[:-1] for channel in channels2],
+                         [channel[:-1] for channel in channels])
+        self.assertTrue(all(channel[-1] is None for channel in channels2))
+        self.assertEqual(gaps2, gaps)
+
+    def test_rescan(self):
+        crawler = self._crawler(cleanup=True)
+        crawler.scan(processes=1)
+        stats = crawler.scan(processes=1)
+        self.assertEqual(stats, {'inserted': 0, 'updated': 0, 'deleted': 0,
+                                 'unchanged': 9, 'failed': 1})
+        # modify, add and remove files
+        filename = os.path.join(self.root, '2010', 'file1.mseed')
+        read(filename)[:1].write(filename, format='MSEED')
+        os.utime(filename, (0, 0))
+        read().write(os.path.join(self.root, '2010', 'new.mseed'),
+                     format='MSEED')
+        os.remove(os.path.join(self.root, '2011', 'file2.mseed'))
+        os.rename(os.path.join(self.root, '2010', '001'),
+                  os.path.join(self.root, '.old'))
+        stats = crawler.scan(processes=1)
+        self.assertEqual(stats, {'inserted': 1, 'updated': 1, 'deleted': 4,
+                                 'unchanged': 4, 'failed': 1})
+        files, channels, gaps = self._dump(crawler)
+        self.assertEqual(len(files), 6)
+        self.assertEqual(len(channels), 16)
+        session = crawler.session()
+        self.assertEqual(session.query(WaveformPath).count(), 2)
+        self.assertEqual(session.query(WaveformGaps).count(), 6)
+        session.close()
+        # forced reindex
+        crawler.options.force_reindex = True
+        stats = crawler.scan(processes=1)
+        self.assertEqual(stats['updated'], 6)
+        self.assertEqual(self._dump(crawler)[:2], (files, channels))
+
+    def test_rescan_one_by_one(self):
+        """
+        Removed files are also deleted if the files are written one by one.
+        """
+        crawlers = [self._crawler('duplicates.sqlite', cleanup=True,
+                                  check_duplicates=True),
+                    self._crawler('fallback.sqlite', cleanup=True)]
+        for crawler in crawlers:
+            crawler.scan(processes=1)
+        # bulk inserts fail
+        crawlers[1]._bulk_write = None
+        filename = os.path.join(self.root, '2010', 'file1.mseed')
+        read(filename)[:1].write(filename, format='MSEED')
+        os.utime(filename, (0, 0))
+        os.remove(os.path.join(self.root, '2011', 'file2.mseed'))
+        for crawler in crawlers:
+            crawler.scan(processes=1)
+            files, channels, gaps = self._dump(crawler)
+            self.assertEqual(len(files), 8)
+            self.assertEqual(len(channels), 22)
+            session = crawler.session()
+            self.assertEqual(session.query(WaveformPreview).count(),
+                             22 * len(PREVIEW_DELTAS))
+            session.close()
+
+    def test_previews(self):
+        """
+        Previews of multiple resolutions are stored and returned by the
+        client.
+        """
+        def _dump_previews(crawler):
+            session = crawler.session()
+            query = session.query(
+                WaveformFile.file, WaveformChannel.channel,
+                WaveformPreview.delta, WaveformPreview.starttime,
+                WaveformPreview.data).filter(
+                WaveformFile.id == WaveformChannel.file_id).filter(
+                WaveformChannel.id == WaveformPreview.channel_id)
+            result = sorted(query.all())
+            session.close()
+            return result
+
+        crawler = self._crawler()
+        crawler.scan(processes=1)
+        previews = _dump_previews(crawler)
+        self.assertEqual(len(previews), 27 * len(PREVIEW_DELTAS))
+        expected = self._crawler('expected.sqlite', check_duplicates=True)
+        expected.scan(processes=1)
+        self.assertEqual(_dump_previews(expected), previews)
+
+        client = Client(session=crawler.session)
+        t = read()[0].stats.starttime
+        ids, starttime, delta, data = client.get_preview_arrays(
+            t - 3600, t + 10 * 3600, channel='EH?')
+        self.assertEqual(ids, ['BW.RJOB..EHE', 'BW.RJOB..EHN',
+                               'BW.RJOB..EHZ'])
+        self.assertEqual(delta, 30)
+        self.assertEqual(starttime, UTCDateTime(t.timestamp // 30 * 30) -
+                         3600)
+        self.assertEqual(data.shape, (3, 1321))
+        tr = read(os.path.join(self.root, '2010', 'file1.mseed')).select(
+            channel='EHZ')[0]
+        for delta in PREVIEW_DELTAS[:2]:
+            ids, starttime, delta, data = client.get_preview_arrays(
+                t - 3600, t + 10 * 3600, channel='EH?', delta=delta)
+            preview = create_preview(tr.copy(), 30)
+            if delta != 30:
+                preview = downsample_preview(preview, delta)
+            i = int((preview.stats.starttime - starttime) / delta)
+            np.testing.assert_equal(data[2, i:i + len(preview)],
+                                    preview.data)
+
+    def test_journal(self):
+        """
+        Directories in the journal of an interrupted scan are skipped.
+        """
+        crawler = self._crawler()
+        with open('scan.journal', 'w') as fh:
+            fh.write(os.path.join(self.root, '2010') + '\n')
+            fh.write(os.path.join(self.root, '2011') + '\n')
+        stats = crawler.scan(processes=1, journal='scan.journal')
+        self.assertEqual(stats['inserted'], 3)
+        self.assertFalse(os.path.exists('scan.journal'))
+        # interrupt a scan after all directories have been written
+        crawler = self._crawler('other.sqlite')
+        crawler._cleanup_paths = None
+        crawler.options.cleanup = True
+        self.assertRaises(TypeError, crawler.scan, processes=1,
+                          journal='scan.journal')
+        with open('scan.journal') as fh:
+            self.assertEqual(len(fh.read().splitlines()), 4)
+
+
+def suite():
+    try:
+        import sqlite3  # @UnusedImport # NOQA
+    except ImportError:
+        # skip the whole test suite if module sqlite3 is missing
+        return unittest.makeSuite(object, 'test')
+    else:
+        return unittest.makeSuite(IndexerTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -16,6 +16,7 @@ from future.builtins import *  # NOQA
 from .base import (calc_vincenty_inverse, degrees2kilometers, gps2dist_azimuth,
                    kilometer2degrees, kilometers2degrees, locations2degrees)
 from .flinnengdahl import FlinnEngdahl
+from .spatial_index import SpatialIndex
 
 
 if __name__ == '__main__':
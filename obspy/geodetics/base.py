@@ -92,7 +92,17 @@ matplotlib/files/matplotlib-toolkits/basemap-0.9.5/
               longitudes
             * Direct problem: Latitude and longitude from known position,
               azimuth and distance.
+
+    The coordinates can also be arrays, the results are then arrays of the
+    broadcast shape of the coordinates. Instead of raising a
+    ``StopIteration``, the results of pairs without solution are NaN.
+
+    >>> dist, az, baz = calc_vincenty_inverse([0.0, 10.0], 0.0, 10.0, 10.0)
+    >>> print(dist.round(1), az.round(4), baz.round(4))
+    [ 1565109.1  1096351.6] [ 44.7519  89.1296] [ 225.629   270.8704]
     """
+    if any(np.ndim(_i) for _i in (lat1, lon1, lat2, lon2)):
+        return _calc_vincenty_inverse_array(lat1, lon1, lat2, lon2, a, f)
     # Check inputs
     if lat1 > 90 or lat1 < -90:
         msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
@@ -202,6 +212,107 @@ matplotlib/files/matplotlib-toolkits/basemap-0.9.5/
     return dist, alpha12, alpha21
 
 
+def _calc_vincenty_inverse_array(lat1, lon1, lat2, lon2, a=WGS84_A,
+                                 f=WGS84_F):
+    """
+    Array version of :func:`calc_vincenty_inverse`.
+
+    Performs the same iteration for all pairs at once, pairs drop out of the
+    iteration once they converged.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *[np.asarray(_i, dtype=np.float64) for _i in (lat1, lon1, lat2,
+                                                      lon2)])
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [_i.ravel() for _i in (lat1, lon1, lat2, lon2)]
+    with np.errstate(invalid="ignore"):
+        if np.any((lat1 > 90) | (lat1 < -90)):
+            msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
+            raise ValueError(msg)
+        if np.any((lat2 > 90) | (lat2 < -90)):
+            msg = "Latitude of Point 2 out of bounds! (-90 <= lat2 <=90)"
+            raise ValueError(msg)
+    lon1 = (lon1 + 180.0) % 360.0 - 180.0
+    lon2 = (lon2 + 180.0) % 360.0 - 180.0
+
+    b = a * (1 - f)  # semiminor axis
+
+    dist = np.zeros(lat1.shape)
+    alpha12 = np.zeros(lat1.shape)
+    alpha21 = np.zeros(lat1.shape)
+    same = (np.abs(lat1 - lat2) < 1e-8) & (np.abs(lon1 - lon2) < 1e-8)
+
+    u_1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u_2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u_1), np.cos(u_1)
+    sin_u2, cos_u2 = np.sin(u_2), np.cos(u_2)
+    omega = np.radians(lon2) - np.radians(lon1)
+    dlon = omega.copy()
+
+    # Indices of the pairs still iterating. Like the scalar version, pairs
+    # that did not converge after 100 iterations have no solution.
+    active = np.nonzero(~same)[0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(100):
+            if not len(active):
+                break
+            s_u1, c_u1 = sin_u1[active], cos_u1[active]
+            s_u2, c_u2 = sin_u2[active], cos_u2[active]
+            last_dlon = dlon[active]
+            sin_dlon, cos_dlon = np.sin(last_dlon), np.cos(last_dlon)
+
+            sqr_sin_sigma = (c_u2 * sin_dlon) ** 2 + \
+                (c_u1 * s_u2 - s_u1 * c_u2 * cos_dlon) ** 2
+            sin_sigma = np.sqrt(sqr_sin_sigma)
+            cos_sigma = s_u1 * s_u2 + c_u1 * c_u2 * cos_dlon
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = c_u1 * c_u2 * sin_dlon / np.sin(sigma)
+            # math.asin() raises for values outside [-1, 1], arcsin() gives
+            # NaN which marks the pair as failed.
+            sqr_cos_alpha = np.cos(np.arcsin(sin_alpha)) ** 2
+            cos2sigma_m = cos_sigma - 2 * s_u1 * s_u2 / sqr_cos_alpha
+            c = (f / 16) * sqr_cos_alpha * (4 + f * (4 - 3 * sqr_cos_alpha))
+            new_dlon = omega[active] + (1 - c) * f * sin_alpha * \
+                (sigma + c * sin_sigma *
+                    (cos2sigma_m + c * cos_sigma *
+                        (-1 + 2 * cos2sigma_m ** 2)))
+
+            u2 = sqr_cos_alpha * (a * a - b * b) / (b * b)
+            _a = 1 + (u2 / 16384) * (4096 + u2 * (-768 + u2 *
+                                                  (320 - 175 * u2)))
+            _b = (u2 / 1024) * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+            delta_sigma = _b * sin_sigma * \
+                (cos2sigma_m + (_b / 4) *
+                    (cos_sigma * (-1 + 2 * cos2sigma_m ** 2) - (_b / 6) *
+                        cos2sigma_m * (-3 + 4 * sqr_sin_sigma) *
+                        (-3 + 4 * cos2sigma_m ** 2)))
+
+            dlon[active] = new_dlon
+            dist[active] = b * _a * (sigma - delta_sigma)
+            sin_dlon, cos_dlon = np.sin(new_dlon), np.cos(new_dlon)
+            alpha12[active] = np.arctan2(c_u2 * sin_dlon,
+                                         c_u1 * s_u2 - s_u1 * c_u2 * cos_dlon)
+            alpha21[active] = np.arctan2(
+                c_u1 * sin_dlon, -s_u1 * c_u2 + c_u1 * s_u2 * cos_dlon)
+
+            converged = (new_dlon == 0) | \
+                (np.abs((last_dlon - new_dlon) / new_dlon) <= 1.0e-9)
+            active = active[~converged]
+
+    failed = np.isnan(dist)
+    failed[active] = True
+    alpha12 = alpha12 % (2.0 * np.pi)
+    alpha21 = (alpha21 + np.pi) % (2.0 * np.pi)
+    alpha12[same] = 0.0
+    alpha21[same] = 0.0
+    dist[failed] = np.nan
+    alpha12[failed] = np.nan
+    alpha21[failed] = np.nan
+
+    return (dist.reshape(shape), np.degrees(alpha12).reshape(shape),
+            np.degrees(alpha21).reshape(shape))
+
+
 def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
     """
     Computes the distance between two geographic points on the WGS84
@@ -229,7 +340,18 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
         (:func:`obspy.core.util.geodetics.calc_vincenty_inverse`) is used which
         has known limitations for two nearly antipodal points and is ca. 4x
         slower.
+
+    The coordinates can also be arrays, the results are then arrays of the
+    broadcast shape of the coordinates. All pairs are solved at once with
+    Vincenty's Inverse formulae, only nearly antipodal pairs are solved with
+    geographiclib, if installed.
+
+    >>> dist, az, baz = gps2dist_azimuth(0.0, 0.0, [10.0, 20.0], [10.0, 0.0])
+    >>> print(dist.round(1), az.round(4), baz.round(4))
+    [ 1565109.1  2212366.3] [ 44.7519   0.    ] [ 225.629  180.   ]
     """
+    if any(np.ndim(_i) for _i in (lat1, lon1, lat2, lon2)):
+        return _gps2dist_azimuth_array(lat1, lon1, lat2, lon2, a, f)
     if HAS_GEOGRAPHICLIB:
         if lat1 > 90 or lat1 < -90:
             msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
@@ -261,6 +383,41 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
             raise e
 
 
+def _gps2dist_azimuth_array(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
+    """
+    Array version of :func:`gps2dist_azimuth`.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *[np.asarray(_i, dtype=np.float64) for _i in (lat1, lon1, lat2,
+                                                      lon2)])
+    dist, azim, bazim = _calc_vincenty_inverse_array(lat1, lon1, lat2, lon2,
+                                                     a, f)
+    failed = np.isnan(dist)
+    for _i in (lat1, lon1, lat2, lon2):
+        failed &= ~np.isnan(_i)
+    if not failed.any():
+        return dist, azim, bazim
+    if HAS_GEOGRAPHICLIB:
+        geodesic = Geodesic(a=a, f=f)
+        for index in zip(*np.nonzero(failed)):
+            result = geodesic.Inverse(lat1[index], lon1[index], lat2[index],
+                                      lon2[index])
+            dist[index] = result['s12']
+            azim[index] = result['azi1'] % 360
+            bazim[index] = result['azi2'] + 180
+    else:
+        msg = ("Catching unstable calculation on antipodes. "
+               "The currently used Vincenty's Inverse formulae "
+               "has known limitations for two nearly antipodal points. "
+               "Install the Python module 'geographiclib' to solve this "
+               "issue.")
+        warnings.warn(msg)
+        dist[failed] = 20004314.5
+        azim[failed] = 0.0
+        bazim[failed] = 0.0
+    return dist, azim, bazim
+
+
 def kilometers2degrees(kilometer, radius=6371):
     """
     Convenience function to convert kilometers to degrees assuming a perfectly
@@ -8,6 +8,8 @@ from future.utils import native_str
 import csv
 import os
 
+import numpy as np
+
 
 class FlinnEngdahl(object):
     """
@@ -19,6 +21,11 @@ class FlinnEngdahl(object):
     GERMANY
     >>> print(fe.get_region_by_number(543))
     GERMANY
+
+    The coordinates can also be arrays, e.g. of all events of a catalog:
+
+    >>> print(fe.get_number([12, -60], [48, -30]))
+    [543 133]
     """
 
     data_directory = os.path.join(os.path.dirname(__file__), 'data')
@@ -34,7 +41,23 @@ class FlinnEngdahl(object):
     numbers_file = os.path.join(data_directory, 'Flinn-Engdahl.csv')
     quads_order = ('ne', 'nw', 'se', 'sw')
 
+    # The tables are the same for all instances, read them only once.
+    _cache = {}
+
     def __init__(self):
+        if not self._cache:
+            self._read()
+            self._cache.update(
+                (key, getattr(self, key))
+                for key in ('quads_index', 'names', 'lons_per_lat',
+                            'lat_begins', 'lons', 'fenums', 'by_number'))
+        else:
+            self.__dict__.update(self._cache)
+
+    def _read(self):
+        """
+        Reads the tables from the data files.
+        """
         self.quads_index = []
 
         with open(self.names_file, 'r') as fh:
@@ -115,6 +138,71 @@ class FlinnEngdahl(object):
         if longitude < 0 and latitude < 0:
             return 'sw'
 
+    def _get_grid(self):
+        """
+        Return the region numbers of all quadrants on the 1 degree grid of
+        the tables.
+
+        The regions only change at full degrees so the grid gives the same
+        results as the tables. Built on first use.
+
+        :rtype: :class:`numpy.ndarray`
+        :return: Region numbers with shape ``(4, 91, 181)`` for the
+            quadrants (in the order of :attr:`quads_order`), absolute
+            latitudes and absolute longitudes.
+        """
+        grid = self._cache.get('grid')
+        if grid is None:
+            grid = np.empty((len(self.quads_order), 91, 181), dtype=np.int16)
+            abs_longitudes = np.arange(181)
+            for i, quad in enumerate(self.quads_order):
+                lons = np.array(self.lons[quad])
+                fenums = np.array(self.fenums[quad])
+                for lat in range(91):
+                    begin = self.lat_begins[quad][lat]
+                    num = int(self.lons_per_lat[quad][lat])
+                    index = np.searchsorted(lons[begin:begin + num],
+                                            abs_longitudes, side='right')
+                    grid[i, lat] = fenums[begin:begin + num][index - 1]
+            self._cache['grid'] = grid
+        return grid
+
+    def get_number(self, longitude, latitude):
+        """
+        Return region number from given coordinates
+
+        >>> fe = FlinnEngdahl()
+        >>> print(fe.get_number(12, 48))
+        543
+        >>> print(fe.get_number([12, -60], [48, -30]))
+        [543 133]
+
+        :param longitude: WGS84 longitude
+        :type longitude: int, float or array_like
+        :param latitude: WGS84 latitude
+        :type latitude: int, float or array_like
+        :rtype: int or :class:`numpy.ndarray`
+        :return: Flinn Engdahl region number(s), arrays have the broadcast
+            shape of the coordinates.
+        """
+        scalar = not np.ndim(longitude) and not np.ndim(latitude)
+        longitude, latitude = np.broadcast_arrays(
+            np.asarray(longitude, dtype=np.float64),
+            np.asarray(latitude, dtype=np.float64))
+        # Also catches NaN.
+        if not np.all((longitude >= -180) & (longitude <= 180)):
+            raise ValueError
+        if not np.all((latitude >= -90) & (latitude <= 90)):
+            raise ValueError
+
+        longitude = np.where(longitude == -180, 180.0, longitude)
+        quad = 2 * (latitude < 0) + (longitude < 0)
+        numbers = self._get_grid()[quad, np.abs(latitude).astype(np.int_),
+                                   np.abs(longitude).astype(np.int_)]
+        if scalar:
+            return int(numbers)
+        return numbers.astype(np.int_)
+
     def get_region(self, longitude, latitude):
         """
         Return region from given coordinate
@@ -124,14 +212,23 @@ class FlinnEngdahl(object):
         GERMANY
         >>> print(fe.get_region(-60, -30))
         NORTHEASTERN ARGENTINA
+        >>> print(fe.get_region([12, -60], [48, -30]))  # doctest: +SKIP
+        ['GERMANY' 'NORTHEASTERN ARGENTINA']
 
         :param longitude: WGS84 longitude
-        :type longitude: int or float
+        :type longitude: int, float or array_like
         :param latitude: WGS84 latitude
-        :type latitude: int or float
-        :rtype: string
-        :return: Flinn Engdahl region name
+        :type latitude: int, float or array_like
+        :rtype: string or :class:`numpy.ndarray`
+        :return: Flinn Engdahl region name, an array of names for arrays of
+            coordinates (see :meth:`get_number`).
         """
+        if np.ndim(longitude) or np.ndim(latitude):
+            names = self._cache.get('names_array')
+            if names is None:
+                names = np.array(self.names)
+                self._cache['names_array'] = names
+            return names[self.get_number(longitude, latitude) - 1]
 
         if longitude < -180 or longitude > 180:
             raise ValueError
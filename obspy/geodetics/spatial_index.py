@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Spatial index for fast bulk geographic queries.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def _to_unit_vectors(latitudes, longitudes):
+    """
+    Converts geographic coordinates in degrees to an array of shape (N, 3)
+    containing the cartesian coordinates on the unit sphere.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64).ravel())
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64).ravel())
+    xyz = np.empty((len(lat), 3), dtype=np.float64)
+    cos_lat = np.cos(lat)
+    xyz[:, 0] = cos_lat * np.cos(lon)
+    xyz[:, 1] = cos_lat * np.sin(lon)
+    xyz[:, 2] = np.sin(lat)
+    return xyz
+
+
+def _degrees_to_chord(degrees):
+    """
+    Length of the chord on the unit sphere for a great circle distance.
+    """
+    degrees = np.clip(degrees, 0.0, 180.0)
+    return 2.0 * np.sin(np.radians(degrees) / 2.0)
+
+
+def _angular_distance(xyz_1, xyz_2):
+    """
+    Great circle distance in degrees between two sets of unit vectors.
+
+    Uses the numerically stable arctan2 formulation which is accurate for
+    very small and for close to antipodal distances.
+    """
+    cross = np.linalg.norm(np.cross(xyz_1, xyz_2), axis=-1)
+    dot = np.sum(xyz_1 * xyz_2, axis=-1)
+    return np.degrees(np.arctan2(cross, dot))
+
+
+def _in_rectangle(latitudes, longitudes, minlatitude=None, maxlatitude=None,
+                  minlongitude=None, maxlongitude=None):
+    """
+    Boolean mask of the points inside a geographic rectangle.
+
+    Does not need a k-d tree, see :meth:`SpatialIndex.query_rectangle`.
+    """
+    lat = np.asarray(latitudes, dtype=np.float64)
+    lon = np.asarray(longitudes, dtype=np.float64)
+    mask = np.isfinite(lat) & np.isfinite(lon)
+    if minlatitude is not None:
+        mask &= lat >= minlatitude
+    if maxlatitude is not None:
+        mask &= lat <= maxlatitude
+    if minlongitude is not None and maxlongitude is not None and \
+            minlongitude > maxlongitude:
+        mask &= (lon >= minlongitude) | (lon <= maxlongitude)
+    else:
+        if minlongitude is not None:
+            mask &= lon >= minlongitude
+        if maxlongitude is not None:
+            mask &= lon <= maxlongitude
+    return mask
+
+
+class SpatialIndex(object):
+    """
+    Spatial index over points on a spherical Earth.
+
+    The points are stored as 3D unit vectors in a k-d tree so radius and
+    nearest neighbour queries for many points only take logarithmic time
+    per query instead of computing distances point by point. All distances
+    are great circle distances in degrees on a sphere, consistent with
+    :func:`~obspy.geodetics.base.locations2degrees`.
+
+    Points with undefined coordinates (``None`` or ``NaN``) are kept to
+    preserve the indices but will never be returned by any query.
+
+    :type latitudes: array_like
+    :param latitudes: Latitudes of the points in degrees.
+    :type longitudes: array_like
+    :param longitudes: Longitudes of the points in degrees.
+    :type items: list, optional
+    :param items: Arbitrary objects belonging to the points, e.g. the
+        stations or events. Stored as the ``items`` attribute of the index
+        to easily map returned indices back to objects.
+    :type leafsize: int
+    :param leafsize: Leaf size of the k-d tree.
+
+    .. rubric:: Example
+
+    >>> index = SpatialIndex([0.0, 0.0, 10.0], [0.0, 5.0, 0.0])
+    >>> index.query_radius(0.0, 1.0, maxradius=5.0)
+    array([0, 1])
+    >>> distances, indices = index.query_nearest(9.0, 0.0)
+    >>> print(round(float(distances), 2), int(indices))
+    1.0 2
+    >>> index.query_rectangle(minlatitude=5.0)
+    array([2])
+    """
+    def __init__(self, latitudes, longitudes, items=None, leafsize=16):
+        latitudes = np.array(latitudes, dtype=np.float64).ravel()
+        longitudes = np.array(longitudes, dtype=np.float64).ravel()
+        if latitudes.shape != longitudes.shape:
+            msg = "latitudes and longitudes must have the same length."
+            raise ValueError(msg)
+        if items is not None and len(items) != len(latitudes):
+            msg = "items must have the same length as the coordinates."
+            raise ValueError(msg)
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.items = items
+        valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+        # Maps positions in the tree to the positions of the input points.
+        self._valid_indices = np.nonzero(valid)[0]
+        self._xyz = _to_unit_vectors(latitudes[valid], longitudes[valid])
+        self._kd_tree = cKDTree(self._xyz, leafsize=leafsize)
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    @classmethod
+    def from_inventory(cls, inventory, level="station", **kwargs):
+        """
+        Creates a spatial index for all stations or channels of an inventory.
+
+        The ``items`` of the index will be the
+        :class:`~obspy.core.inventory.station.Station` or
+        :class:`~obspy.core.inventory.channel.Channel` objects.
+
+        :type inventory: :class:`~obspy.core.inventory.inventory.Inventory`
+        :type level: str
+        :param level: Either ``"station"`` or ``"channel"``.
+        """
+        if level == "station":
+            items = [sta for net in inventory for sta in net]
+        elif level == "channel":
+            items = [cha for net in inventory for sta in net for cha in sta]
+        else:
+            msg = "level must be either 'station' or 'channel'."
+            raise ValueError(msg)
+        return cls([_i.latitude for _i in items],
+                   [_i.longitude for _i in items], items=items, **kwargs)
+
+    @classmethod
+    def from_catalog(cls, catalog, **kwargs):
+        """
+        Creates a spatial index for all events of a catalog.
+
+        The location of the preferred origin, or the first origin if no
+        preferred one is set, is used. Events without an origin are never
+        returned by any query. The ``items`` of the index will be the
+        :class:`~obspy.core.event.event.Event` objects.
+
+        :type catalog: :class:`~obspy.core.event.catalog.Catalog`
+        """
+        latitudes = []
+        longitudes = []
+        for event in catalog:
+            origin = event.preferred_origin() or (
+                event.origins[0] if event.origins else None)
+            if origin is None or origin.latitude is None or \
+                    origin.longitude is None:
+                latitudes.append(np.nan)
+                longitudes.append(np.nan)
+            else:
+                latitudes.append(origin.latitude)
+                longitudes.append(origin.longitude)
+        return cls(latitudes, longitudes, items=list(catalog.events),
+                   **kwargs)
+
+    def query_radius(self, latitude, longitude, maxradius, minradius=None):
+        """
+        Returns the indices of all points within the given distance range.
+
+        :type latitude: float or array_like
+        :param latitude: Latitude(s) of the query point(s) in degrees.
+        :type longitude: float or array_like
+        :param longitude: Longitude(s) of the query point(s) in degrees.
+        :type maxradius: float
+        :param maxradius: Maximum great circle distance in degrees.
+        :type minradius: float, optional
+        :param minradius: Minimum great circle distance in degrees.
+        :rtype: :class:`numpy.ndarray` or list of :class:`numpy.ndarray`
+        :returns: Sorted indices of the points within the distance range.
+            A list of index arrays, one per query point, if multiple query
+            points are given.
+        """
+        scalar = np.isscalar(latitude) and np.isscalar(longitude)
+        xyz = _to_unit_vectors(*np.broadcast_arrays(latitude, longitude))
+        # Slightly enlarge the search radius so no point is lost due to
+        # floating point inaccuracies. The exact distance is checked below.
+        chord = _degrees_to_chord(maxradius) * (1.0 + 1e-9) + 1e-12
+        results = []
+        for point, candidates in zip(
+                xyz, self._kd_tree.query_ball_point(xyz, chord)):
+            candidates = np.array(sorted(candidates), dtype=np.intp)
+            if len(candidates):
+                distances = _angular_distance(self._xyz[candidates], point)
+                mask = distances <= maxradius
+                if minradius is not None:
+                    mask &= distances >= minradius
+                candidates = candidates[mask]
+            results.append(self._valid_indices[candidates])
+        if scalar:
+            return results[0]
+        return results
+
+    def query_nearest(self, latitude, longitude, k=1):
+        """
+        Finds the ``k`` nearest points to the given query point(s).
+
+        :type latitude: float or array_like
+        :param latitude: Latitude(s) of the query point(s) in degrees.
+        :type longitude: float or array_like
+        :param longitude: Longitude(s) of the query point(s) in degrees.
+        :type k: int
+        :param k: Number of neighbours to return.
+        :rtype: tuple of two :class:`numpy.ndarray`
+        :returns: Great circle distances in degrees and the indices of the
+            nearest points, sorted by increasing distance. Shapes follow
+            :meth:`scipy.spatial.cKDTree.query`. If less than ``k`` points
+            are available, missing neighbours have an infinite distance and
+            an index of ``len(self)``.
+        """
+        scalar = np.isscalar(latitude) and np.isscalar(longitude)
+        xyz = _to_unit_vectors(*np.broadcast_arrays(latitude, longitude))
+        chord, tree_indices = self._kd_tree.query(xyz, k=k)
+        chord = np.asarray(chord)
+        tree_indices = np.asarray(tree_indices)
+        found = np.isfinite(chord)
+        distances = np.empty(chord.shape, dtype=np.float64)
+        distances[~found] = np.inf
+        distances[found] = np.degrees(
+            2.0 * np.arcsin(np.clip(chord[found] / 2.0, 0.0, 1.0)))
+        indices = np.empty(tree_indices.shape, dtype=np.intp)
+        indices[~found] = len(self)
+        indices[found] = self._valid_indices[tree_indices[found]]
+        if scalar:
+            return distances[0], indices[0]
+        return distances, indices
+
+    def query_rectangle(self, minlatitude=None, maxlatitude=None,
+                        minlongitude=None, maxlongitude=None):
+        """
+        Returns the indices of all points inside a geographic rectangle.
+
+        If ``minlongitude`` is larger than ``maxlongitude`` the rectangle is
+        assumed to cross the antimeridian.
+
+        :rtype: :class:`numpy.ndarray`
+        :returns: Sorted indices of the points inside the rectangle.
+        """
+        return np.nonzero(_in_rectangle(
+            self.latitudes, self.longitudes, minlatitude=minlatitude,
+            maxlatitude=maxlatitude, minlongitude=minlongitude,
+            maxlongitude=maxlongitude))[0]
+
+    def query_pairs(self, maxradius):
+        """
+        Finds all pairs of points closer to each other than ``maxradius``.
+
+        :type maxradius: float
+        :param maxradius: Maximum great circle distance in degrees.
+        :rtype: set of tuples
+        :returns: Set of pairs ``(i, j)`` of indices with ``i < j``.
+        """
+        chord = _degrees_to_chord(maxradius)
+        pairs = self._kd_tree.query_pairs(chord)
+        return set(tuple(sorted((int(self._valid_indices[_i]),
+                                 int(self._valid_indices[_j]))))
+                   for _i, _j in pairs)
+
+    def select(self, latitude=None, longitude=None, minradius=None,
+               maxradius=None, minlatitude=None, maxlatitude=None,
+               minlongitude=None, maxlongitude=None):
+        """
+        Returns the indices of all points matching all given criteria.
+
+        The parameters follow the naming of the geographic constraints of
+        the FDSN web services. Radius constraints require ``latitude`` and
+        ``longitude`` to be given.
+
+        :rtype: :class:`numpy.ndarray`
+        :returns: Sorted indices of the matching points.
+        """
+        indices = self.query_rectangle(
+            minlatitude=minlatitude, maxlatitude=maxlatitude,
+            minlongitude=minlongitude, maxlongitude=maxlongitude)
+        if minradius is None and maxradius is None:
+            return indices
+        if latitude is None or longitude is None:
+            msg = ("latitude and longitude must be given for radius "
+                   "constraints.")
+            raise ValueError(msg)
+        in_radius = self.query_radius(
+            float(latitude), float(longitude),
+            maxradius=180.0 if maxradius is None else maxradius,
+            minradius=minradius)
+        return np.intersect1d(indices, in_radius)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
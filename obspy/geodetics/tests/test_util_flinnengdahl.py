@@ -7,9 +7,11 @@ from future.builtins import *  # NOQA
 import os
 import unittest
 
+import numpy as np
+
 from obspy.scripts.flinnengdahl import main as obspy_flinnengdahl
 from obspy.geodetics import FlinnEngdahl
-from obspy.core.util.misc import CatchOutput
+from obspy.core.util.misc import CatchOutput, TemporaryWorkingDirectory
 
 
 class UtilFlinnEngdahlTestCase(unittest.TestCase):
@@ -40,6 +42,50 @@ class UtilFlinnEngdahlTestCase(unittest.TestCase):
                     )
                 )
 
+    def test_coordinates_array(self):
+        longitudes, latitudes, checked_regions = [], [], []
+        with open(self.samples_file, 'r') as fh:
+            for line in fh:
+                longitude, latitude, checked_region = line.strip().split('\t')
+                longitudes.append(float(longitude))
+                latitudes.append(float(latitude))
+                checked_regions.append(checked_region)
+        regions = self.flinnengdahl.get_region(longitudes, latitudes)
+        self.assertEqual(regions.tolist(), checked_regions)
+
+        # Random points, full degrees and the edges of the quadrants.
+        np.random.seed(42)
+        longitudes = np.concatenate([
+            np.random.uniform(-180, 180, 2000),
+            np.random.randint(-180, 181, 500).astype(np.float64),
+            [-180.0, 180.0, 0.0, -0.0, 0.0, 0.0, -0.5, 0.5]])
+        latitudes = np.concatenate([
+            np.random.uniform(-90, 90, 2000),
+            np.random.randint(-90, 91, 500).astype(np.float64),
+            [0.0, 0.0, 90.0, -90.0, -0.0, -0.5, 0.5, -0.5]])
+        numbers = self.flinnengdahl.get_number(longitudes, latitudes)
+        regions = self.flinnengdahl.get_region(longitudes, latitudes)
+        self.assertEqual(numbers.shape, longitudes.shape)
+        for longitude, latitude, number, region in zip(
+                longitudes, latitudes, numbers, regions):
+            expected = self.flinnengdahl.get_region(longitude, latitude)
+            self.assertEqual(region, expected)
+            self.assertEqual(self.flinnengdahl.names[number - 1], expected)
+
+        # Broadcasting and scalars.
+        self.assertEqual(
+            self.flinnengdahl.get_number([[12.0], [-60.0]], 48.0).shape,
+            (2, 1))
+        self.assertEqual(self.flinnengdahl.get_number(12, 48), 543)
+
+    def test_invalid_coordinates(self):
+        for longitude, latitude in ((181, 0), (0, -91), (np.nan, 0),
+                                    ([0, 181], [0, 0]), ([0, 0], [0, np.nan])):
+            self.assertRaises(ValueError, self.flinnengdahl.get_number,
+                              longitude, latitude)
+            self.assertRaises(ValueError, self.flinnengdahl.get_region,
+                              longitude, latitude)
+
     def test_script(self):
         with open(self.samples_file, 'r') as fh:
             # Testing once is sufficient.
@@ -61,6 +107,28 @@ class UtilFlinnEngdahlTestCase(unittest.TestCase):
                 )
             )
 
+    def test_script_batch(self):
+        with open(self.samples_file, 'r') as fh:
+            lines = fh.read().splitlines()
+        with TemporaryWorkingDirectory():
+            with open('points.txt', 'w') as fh:
+                fh.write('# longitude latitude\n\n')
+                for line in lines:
+                    fh.write(','.join(line.split('\t')[:2]) + '\n')
+            with CatchOutput() as out:
+                obspy_flinnengdahl(['-f', 'points.txt'])
+            self.assertEqual(out.stdout.splitlines(), lines)
+
+            with CatchOutput() as out:
+                obspy_flinnengdahl(['-n', '-f', 'points.txt', '12', '48'])
+            output = out.stdout.splitlines()
+            self.assertEqual(len(output), len(lines) + 1)
+            self.assertEqual(output[0], '543')
+            for line, checked in zip(output[1:], lines):
+                number = int(line.split('\t')[2])
+                self.assertEqual(self.flinnengdahl.names[number - 1],
+                                 checked.split('\t')[2])
+
 
 def suite():
     return unittest.makeSuite(UtilFlinnEngdahlTestCase, 'test')
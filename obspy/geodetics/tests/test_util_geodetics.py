@@ -287,6 +287,73 @@ class UtilGeodeticsTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             locations2degrees(1, 2, [3, 4], [5, 6, 7])
 
+    def test_calc_vincenty_inverse_array(self):
+        """
+        Tests the array version of calc_vincenty_inverse against the scalar
+        version.
+        """
+        rng = np.random.RandomState(815)
+        lat1, lat2 = rng.uniform(-90, 90, (2, 500))
+        lon1, lon2 = rng.uniform(-360, 360, (2, 500))
+        # Coincident and nearly antipodal points.
+        lat2[:5] = lat1[:5]
+        lon2[:5] = lon1[:5]
+        lat2[5:10] = -lat1[5:10]
+        lon2[5:10] = lon1[5:10] + 179.9999
+        for a, f in ((6378137.0, 1 / 298.257223563),
+                     (6377397.155, 1 / 299.1528128)):
+            result = calc_vincenty_inverse(lat1, lon1, lat2, lon2, a, f)
+            for i in range(500):
+                try:
+                    expected = calc_vincenty_inverse(lat1[i], lon1[i],
+                                                     lat2[i], lon2[i], a, f)
+                except StopIteration:
+                    self.assertTrue(np.isnan(result[0][i]))
+                    self.assertTrue(np.isnan(result[1][i]))
+                    continue
+                self.assertAlmostEqual(result[0][i], expected[0], 4)
+                self.assertAlmostEqual(result[1][i], expected[1], 8)
+                self.assertAlmostEqual(result[2][i], expected[2], 8)
+            self.assertTrue(np.isnan(result[0][5:10]).all())
+
+        # Broadcasting.
+        dist, azim, bazim = calc_vincenty_inverse(
+            [[50.0], [-50.0]], 10.0, 51.0, [9.0, 10.0, 11.0])
+        self.assertEqual(dist.shape, (2, 3))
+        self.assertAlmostEqual(dist[0, 2], calc_vincenty_inverse(
+            50.0, 10.0, 51.0, 11.0)[0], 4)
+        self.assertRaises(ValueError, calc_vincenty_inverse, [0, 91], 0, 0,
+                          0)
+        self.assertRaises(ValueError, calc_vincenty_inverse, 0, 0,
+                          [-91.0], 0)
+
+    def test_gps_2_dist_azimuth_array(self):
+        """
+        Tests the array version of gps2dist_azimuth against the scalar
+        version.
+        """
+        rng = np.random.RandomState(4711)
+        lat1, lat2 = rng.uniform(-90, 90, (2, 500))
+        lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+        lat2[:5] = -lat1[:5]
+        lon2[:5] = lon1[:5] + 179.9999
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            result = gps2dist_azimuth(lat1, lon1, lat2, lon2)
+            expected = np.array([
+                gps2dist_azimuth(*_i) for _i in zip(lat1, lon1, lat2, lon2)])
+        if not HAS_GEOGRAPHICLIB:
+            # One warning for all antipodes of the array.
+            self.assertEqual(len(w), 6)
+        np.testing.assert_allclose(result[0], expected[:, 0], rtol=0,
+                                   atol=1e-3)
+        for i in (1, 2):
+            difference = (result[i] - expected[:, i] + 180) % 360 - 180
+            np.testing.assert_allclose(difference, 0, rtol=0, atol=1e-7)
+        dist, azim, bazim = gps2dist_azimuth(50, 10, [51, 49], [11, 9])
+        np.testing.assert_array_equal(np.round(azim), [32, 213])
+        np.testing.assert_array_equal(np.round(bazim), [213, 33])
+
     @unittest.skipIf(not HAS_GEOGRAPHICLIB, 'Module geographiclib is not '
                                             'installed')
     def test_issue_375(self):
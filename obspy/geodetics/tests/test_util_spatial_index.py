@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import unittest
+
+import numpy as np
+
+from obspy import read_events, read_inventory
+from obspy.geodetics import SpatialIndex, locations2degrees
+
+
+class UtilSpatialIndexTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.geodetics.spatial_index
+    """
+    def setUp(self):
+        rng = np.random.RandomState(42)
+        self.lats = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+        self.lons = rng.uniform(-180, 180, 2000)
+        self.index = SpatialIndex(self.lats, self.lons)
+
+    def test_query_radius_matches_brute_force(self):
+        for lat, lon in [(0.0, 0.0), (89.5, 10.0), (-45.0, 179.9),
+                         (12.0, -75.0)]:
+            dist = locations2degrees(lat, lon, self.lats, self.lons)
+            for minradius, maxradius in [(None, 10.0), (5.0, 30.0),
+                                         (100.0, 180.0)]:
+                expected = dist <= maxradius
+                if minradius is not None:
+                    expected &= dist >= minradius
+                got = self.index.query_radius(lat, lon, maxradius=maxradius,
+                                              minradius=minradius)
+                np.testing.assert_array_equal(got, np.nonzero(expected)[0])
+
+    def test_query_radius_bulk(self):
+        results = self.index.query_radius([0.0, 10.0], [0.0, 20.0], 15.0)
+        self.assertEqual(len(results), 2)
+        np.testing.assert_array_equal(
+            results[1], self.index.query_radius(10.0, 20.0, 15.0))
+
+    def test_query_nearest(self):
+        lat, lon = np.array([1.0, -60.0]), np.array([2.0, 100.0])
+        distances, indices = self.index.query_nearest(lat, lon, k=3)
+        self.assertEqual(distances.shape, (2, 3))
+        for i in range(2):
+            dist = locations2degrees(lat[i], lon[i], self.lats, self.lons)
+            np.testing.assert_array_equal(indices[i], np.argsort(dist)[:3])
+            np.testing.assert_allclose(distances[i], np.sort(dist)[:3])
+        # Not enough points.
+        index = SpatialIndex([0.0], [0.0])
+        distances, indices = index.query_nearest(1.0, 1.0, k=2)
+        self.assertTrue(np.isinf(distances[1]))
+        self.assertEqual(indices[1], 1)
+
+    def test_query_rectangle(self):
+        got = self.index.query_rectangle(minlatitude=-10, maxlatitude=10,
+                                         minlongitude=170, maxlongitude=-170)
+        expected = (self.lats >= -10) & (self.lats <= 10) & \
+            ((self.lons >= 170) | (self.lons <= -170))
+        np.testing.assert_array_equal(got, np.nonzero(expected)[0])
+
+    def test_query_pairs(self):
+        lats, lons = self.lats[:300], self.lons[:300]
+        index = SpatialIndex(lats, lons)
+        expected = set()
+        for i in range(300):
+            dist = locations2degrees(lats[i], lons[i], lats, lons)
+            for j in np.nonzero(dist <= 3.0)[0]:
+                if j > i:
+                    expected.add((i, j))
+        self.assertEqual(index.query_pairs(3.0), expected)
+
+    def test_undefined_coordinates(self):
+        index = SpatialIndex([0.0, np.nan, 1.0], [0.0, 0.0, None])
+        np.testing.assert_array_equal(index.query_radius(0, 0, 180), [0])
+        np.testing.assert_array_equal(index.query_rectangle(), [0])
+        self.assertEqual(index.query_nearest(5.0, 5.0)[1], 0)
+
+    def test_select(self):
+        got = self.index.select(latitude=0.0, longitude=0.0, maxradius=40.0,
+                                minlatitude=5.0)
+        dist = locations2degrees(0.0, 0.0, self.lats, self.lons)
+        expected = (dist <= 40.0) & (self.lats >= 5.0)
+        np.testing.assert_array_equal(got, np.nonzero(expected)[0])
+        self.assertRaises(ValueError, self.index.select, maxradius=1.0)
+
+    def test_from_inventory_and_catalog(self):
+        inv = read_inventory()
+        index = SpatialIndex.from_inventory(inv, level="channel")
+        self.assertEqual(len(index), 30)
+        self.assertEqual(
+            sorted(set(index.items[_i].code
+                       for _i in index.query_radius(47.74, 12.80, 0.1))),
+            ["EHE", "EHN", "EHZ"])
+        cat = read_events()
+        index = SpatialIndex.from_catalog(cat)
+        self.assertEqual(len(index), 3)
+        distances, indices = index.query_nearest(39.0, 41.0)
+        self.assertIs(index.items[indices], cat[1])
+
+
+def suite():
+    return unittest.makeSuite(UtilSpatialIndexTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -19,7 +19,11 @@ options --no-x and --no-gaps can help to reduce the size of the plot
 considerably.
 
 Gap data can be written to a NumPy npz file. This file can be loaded later
-for optionally adding more data and plotting.
+for optionally adding more data and plotting. With "--cache", modification
+times and sizes of all files are stored as well and when scanning directories
+again after loading the npz file, only new and modified files are read (e.g.
+"--cache -l scan.npz -w scan.npz DIR"). Files can be read in parallel by
+multiple processes using "-p".
 
 Supported formats: All formats supported by ObsPy modules (currently: MSEED,
 GSE2, SAC, SACXY, WAV, SH-ASC, SH-Q, SEISAN).
@@ -34,10 +38,13 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import glob
+import multiprocessing
 import os
 import sys
 import warnings
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from collections import Counter
 
 import numpy as np
 from matplotlib.ticker import FuncFormatter
@@ -60,9 +67,10 @@ def compress_start_end(x, stop_iteration, merge_overlaps=False,
     pieces into one.
     This reduces the number of lines needed in the plot considerably and is
     necessary for very large data sets.
-    The maximum number of iterations can be specified.
 
-    Works in-place!
+    All adjacent pieces are merged at once, so ``stop_iteration`` is not
+    used anymore and only kept for backwards compatibility. A new array is
+    returned, the input array is not modified.
 
     :type margin_in_seconds: float
     :param margin_in_seconds: Allowance in seconds that has to be exceeded by
@@ -72,44 +80,25 @@ def compress_start_end(x, stop_iteration, merge_overlaps=False,
         ``0.8`` times the sampling interval for a 100 Hz stream, use
         ``(1 / 100.0) * 0.8) == 0.008``).
     """
+    if len(x) < 2:
+        return x
     # matplotlib date numbers are in days
     margin = margin_in_seconds / (24 * 3600)
-
-    def _get_indices_to_merge(startend):
-        """
-        Return boolean array signaling at which positions a merge of adjacent
-        tuples should be performed.
-        """
-        diffs = x[1:, 0] - x[:-1, 1]
-        if merge_overlaps:
-            # if overlaps should be merged we set any negative diff to zero and
-            # it will be merged in the following commands
-            diffs[diffs < 0] = 0
-        # any diff of expected and actual next sample time that is smaller than
-        # 0+-margin is considered no gap/overlap but rather merged together
-        inds = np.concatenate(
-            [(diffs >= -margin) & (diffs <= margin), [False]])
-        return inds
-
-    inds = _get_indices_to_merge(x)
-    i = 0
-    while any(inds):
-        if i >= stop_iteration:
-            msg = "Stopping to merge lines for plotting at iteration %d"
-            msg = msg % i
-            warnings.warn(msg)
-            break
-        i += 1
-        first_ind = np.nonzero(inds)[0][0]
-        # to use fast NumPy methods currently we only can merge two consecutive
-        # pieces, so we set every second entry to False
-        inds[first_ind + 1::2] = False
-        inds_next = np.roll(inds, 1)
-        x[inds, 1] = x[inds_next, 1]
-        inds_del = np.nonzero(inds_next)
-        x = np.delete(x, inds_del, 0)
-        inds = _get_indices_to_merge(x)
-    return x
+    diffs = x[1:, 0] - x[:-1, 1]
+    if merge_overlaps:
+        # if overlaps should be merged we set any negative diff to zero and
+        # it will be merged in the following commands
+        diffs[diffs < 0] = 0
+    # any diff of expected and actual next sample time that is smaller than
+    # 0+-margin is considered no gap/overlap but rather merged together
+    merge = (diffs >= -margin) & (diffs <= margin)
+    if not merge.any():
+        return x
+    # every run of merged pieces starts at the first piece and ends at the
+    # end of its last piece
+    firsts = np.concatenate([[0], np.nonzero(~merge)[0] + 1])
+    lasts = np.concatenate([firsts[1:] - 1, [len(x) - 1]])
+    return np.column_stack((x[firsts, 0], x[lasts, 1]))
 
 
 def parse_file_to_dict(data_dict, samp_int_dict, file, counter, format=None,
@@ -172,39 +161,209 @@ def recursive_parse(data_dict, samp_int_dict, path, counter, format=None,
     return counter
 
 
-def write_npz(file_, data_dict, samp_int_dict):
+def _find_files(path, recursive=True, ignore_links=False, verbose=False):
+    """
+    Returns all files to parse for a file/directory path, sorted by name in
+    every directory.
+
+    Without ``recursive``, wildcards are expanded like by
+    :func:`~obspy.core.stream.read`.
+    """
+    paths = [path]
+    if not recursive and not os.path.isfile(path):
+        paths = [file for file in sorted(glob.glob(path), reverse=True)
+                 if os.path.isfile(file)]
+        if not paths:
+            # reported as unreadable file
+            return [path]
+    files = []
+    while paths:
+        path = paths.pop()
+        if ignore_links and os.path.islink(path):
+            if verbose:
+                print("Ignoring symlink: %s" % (path))
+        elif os.path.isfile(path):
+            files.append(path)
+        elif os.path.isdir(path) and recursive:
+            paths.extend(os.path.join(path, file)
+                         for file in sorted(os.listdir(path), reverse=True))
+        elif verbose:
+            print("Problem with filename/dirname: %s" % (path))
+    return files
+
+
+def _read_file(args):
+    """
+    Reads the headers of a single file, also in the worker processes of
+    :meth:`Scanner.parse`.
+
+    Returns the start/end times and sampling intervals per SEED ID and the
+    string representation of the stream for verbose output, or ``None`` if
+    the file can not be read.
+    """
+    file, format, verbose = args
+    try:
+        stream = read(file, format=format, headonly=True)
+    except Exception:
+        return None
+    data_dict = {}
+    samp_int_dict = {}
+    add_stream_to_dict(data_dict, samp_int_dict, stream, verbose=verbose)
+    return data_dict, samp_int_dict, verbose and str(stream) or None
+
+
+def _remove_from_dict(data_dict, samp_int_dict, removed):
+    """
+    Removes the start/end times of files from the data dictionaries.
+
+    Rows of different files with the same times are interchangeable, so
+    for every row of a removed file one equal row is removed.
+
+    :type removed: list
+    :param removed: ``(data_dict, samp_int_dict)`` tuples of the removed
+        files.
+    """
+    counts = {}
+    for data, samp_int in removed:
+        for key, startend in data.items():
+            counter = counts.setdefault(key, Counter())
+            counter.update((start, end, delta) for (start, end), delta in
+                           zip(startend, samp_int[key]))
+    for key, counter in counts.items():
+        startend = []
+        samp_int = []
+        for row, delta in zip(data_dict.get(key, []),
+                              samp_int_dict.get(key, [])):
+            row_key = (row[0], row[1], delta)
+            if counter[row_key] > 0:
+                counter[row_key] -= 1
+                continue
+            startend.append(row)
+            samp_int.append(delta)
+        if startend:
+            data_dict[key] = startend
+            samp_int_dict[key] = samp_int
+        else:
+            data_dict.pop(key, None)
+            samp_int_dict.pop(key, None)
+
+
+def write_npz(file_, data_dict, samp_int_dict, files=None):
+    """
+    Writes scanned data to a npz file.
+
+    :type files: dict
+    :param files: Optional cache of parsed files, mapping file names to
+        ``(mtime, size, data_dict, samp_int_dict)`` tuples of their rows in
+        ``data_dict``/``samp_int_dict``. For every SEED ID an additional
+        ``_FILE`` array stores the index of the file each row belongs to
+        (``-1`` if the row does not belong to a cached file).
+    """
     npz_dict = data_dict.copy()
     for key in samp_int_dict.keys():
         npz_dict[key + '_SAMP'] = samp_int_dict[key]
+    if files:
+        names = sorted(files)
+        # indices of the files of all rows, by SEED ID and row
+        rows = {}
+        for i, name in enumerate(names):
+            data, samp_int = files[name][2:]
+            for key, startend in data.items():
+                rows_ = rows.setdefault(key, {})
+                for (start, end), delta in zip(startend, samp_int[key]):
+                    rows_.setdefault((start, end, delta), []).append(i)
+        valid = np.ones(len(names), dtype=np.bool_)
+        file_index = {}
+        for key, startend in data_dict.items():
+            rows_ = rows.pop(key, {})
+            index = np.empty(len(startend), dtype=np.int64)
+            for j, (row, delta) in enumerate(zip(startend,
+                                                 samp_int_dict[key])):
+                indices = rows_.get((row[0], row[1], delta))
+                index[j] = indices.pop() if indices else -1
+            # files with rows that are not part of the data anymore
+            for indices in rows_.values():
+                valid[indices] = False
+            file_index[key] = index
+        for rows_ in rows.values():
+            for indices in rows_.values():
+                valid[indices] = False
+        # renumber the files that are still valid
+        new_index = np.cumsum(valid) - 1
+        for key, index in file_index.items():
+            cached = index >= 0
+            cached[cached] = valid[index[cached]]
+            npz_dict[key + '_FILE'] = np.where(
+                cached, new_index[np.maximum(index, 0)], -1)
+        names = [name for name, valid_ in zip(names, valid) if valid_]
+        npz_dict["__files__"] = np.array(names, dtype=np.unicode_)
+        npz_dict["__files_mtime__"] = np.array(
+            [files[name][0] for name in names], dtype=np.float64)
+        npz_dict["__files_size__"] = np.array(
+            [files[name][1] for name in names], dtype=np.int64)
     npz_dict["__version__"] = __version__
     np.savez(file_, **npz_dict)
 
 
-def load_npz(file_, data_dict, samp_int_dict):
+def load_npz(file_, data_dict, samp_int_dict, files=None):
+    """
+    Loads scanned data from a npz file.
+
+    :type files: dict
+    :param files: Dictionary to load the cache of parsed files into, see
+        :func:`write_npz`.
+    """
     npz_dict = np.load(file_)
-    # check obspy version the npz was done with
-    if "__version__" in npz_dict:
-        version_string = npz_dict["__version__"].item()
-    else:
-        version_string = None
-    # npz data computed with obspy < 1.1.0 are slightly different
-    if version_string is None or \
-            [int(x) for x in version_string.split(".")[:2]] < [1, 1]:
-        msg = ("Loading npz data computed with ObsPy < 1.1.0. Definition of "
-               "end times of individual time slices was changed by one time "
-               "the sampling interval (see #1366), so it is best to recompute "
-               "the npz from the raw data once.")
-        warnings.warn(msg)
-    # load data from npz
-    for key in npz_dict.keys():
-        if key == "__version__":
-            continue
-        elif key.endswith('_SAMP'):
-            samp_int_dict[key[:-5]] = npz_dict[key].tolist()
+    try:
+        # check obspy version the npz was done with
+        if "__version__" in npz_dict:
+            version_string = npz_dict["__version__"].item()
         else:
-            data_dict[key] = npz_dict[key].tolist()
-    if hasattr(npz_dict, "close"):
-        npz_dict.close()
+            version_string = None
+        # npz data computed with obspy < 1.1.0 are slightly different
+        if version_string is None or \
+                [int(x) for x in version_string.split(".")[:2]] < [1, 1]:
+            msg = ("Loading npz data computed with ObsPy < 1.1.0. Definition "
+                   "of end times of individual time slices was changed by "
+                   "one time the sampling interval (see #1366), so it is "
+                   "best to recompute the npz from the raw data once.")
+            warnings.warn(msg)
+        # load data from npz
+        file_index = {}
+        for key in npz_dict.keys():
+            if key.startswith("__"):
+                continue
+            elif key.endswith('_SAMP'):
+                samp_int_dict[key[:-5]] = npz_dict[key].tolist()
+            elif key.endswith('_FILE'):
+                file_index[key[:-5]] = npz_dict[key]
+            else:
+                data_dict[key] = npz_dict[key].tolist()
+        if files is None or "__files__" not in npz_dict:
+            return
+        names = npz_dict["__files__"].tolist()
+        for name, mtime, size in zip(names,
+                                     npz_dict["__files_mtime__"].tolist(),
+                                     npz_dict["__files_size__"].tolist()):
+            files[name] = (mtime, size, {}, {})
+        for key, index in file_index.items():
+            startend = npz_dict[key]
+            if not len(index):
+                continue
+            samp_int_ = npz_dict[key + '_SAMP']
+            # group the rows by file
+            order = np.argsort(index, kind='mergesort')
+            index = index[order]
+            firsts = np.concatenate([[0], np.nonzero(np.diff(index))[0] + 1])
+            for i, rows in zip(index[firsts], np.split(order, firsts[1:])):
+                if i < 0:
+                    continue
+                data, samp_int = files[names[i]][2:]
+                data[key] = startend[rows].tolist()
+                samp_int[key] = samp_int_[rows].tolist()
+    finally:
+        if hasattr(npz_dict, "close"):
+            npz_dict.close()
 
 
 class Scanner(object):
@@ -257,9 +416,18 @@ class Scanner(object):
     :param recursive: Whether to parse directories recursively.
     :type ignore_links: bool
     :param ignore_links: Whether to ignore symbolic links.
+    :type processes: int
+    :param processes: Number of processes reading the files in parallel,
+        ``None`` for one process per CPU.
+    :type cache: bool
+    :param cache: Whether to keep track of the modification times and sizes
+        of all parsed files. Unmodified files are not read again when they
+        are parsed another time and the information is stored in npz files
+        (see :meth:`save_npz`), which can not be loaded by older ObsPy
+        versions then.
     """
     def __init__(self, format=None, verbose=False, recursive=True,
-                 ignore_links=False):
+                 ignore_links=False, processes=1, cache=False):
         """
         see :class:`~obspy.imaging.scripts.scan.Scanner`
         """
@@ -267,10 +435,14 @@ class Scanner(object):
         self.verbose = verbose
         self.recursive = recursive
         self.ignore_links = ignore_links
+        self.processes = processes
+        self.cache = cache
         # Generate dictionary containing nested lists of start and end times
         # per station
         self.data = {}
         self.samp_int = {}
+        # modification time, size and start/end times of all parsed files
+        self._files = {}
         self.counter = 1
 
     def plot(self, outfile=None, show=True, fig=None, plot_x=True,
@@ -572,31 +744,42 @@ class Scanner(object):
         Load information on scanned data from npz file.
 
         Currently, data can only be loaded from npz as the first operation,
-        i.e. before parsing any files.
+        i.e. before parsing any files. With option ``cache``, files that are
+        parsed afterwards are only read again if they have been modified.
 
         :type filename: str
         :param filename: Filename to load from.
         """
-        if self.data or self.samp_int:
+        if self.data or self.samp_int or self._files:
             msg = ("Currently, data can only be loaded from npz as the first "
                    "operation, i.e. before parsing any files.")
             raise NotImplementedError(msg)
-        load_npz(filename, data_dict=self.data, samp_int_dict=self.samp_int)
+        load_npz(filename, data_dict=self.data, samp_int_dict=self.samp_int,
+                 files=self._files if self.cache else None)
 
     def save_npz(self, filename):
         """
         Save information on scanned data to npz file.
 
+        With option ``cache``, the modification times and sizes of the
+        parsed files are stored as well, see :meth:`load_npz`.
+
         :type filename: str
         :param filename: Filename to save to.
         """
-        write_npz(filename, data_dict=self.data, samp_int_dict=self.samp_int)
+        write_npz(filename, data_dict=self.data, samp_int_dict=self.samp_int,
+                  files=self._files)
 
-    def parse(self, path, recursive=None, ignore_links=None):
+    def parse(self, path, recursive=None, ignore_links=None, processes=None):
         """
         Parse file/directory and store information on encountered waveform
         files.
 
+        With option ``cache``, files that have been parsed before (also if
+        loaded with :meth:`load_npz`) are only read again if their
+        modification time or size changed and files that do not exist
+        anymore in a parsed directory are removed.
+
         :type path: str
         :param path: File or directory path (relative or absolute) to parse.
         :type recursive: bool
@@ -605,21 +788,84 @@ class Scanner(object):
         :type ignore_links: bool
         :param ignore_links: Override for value of option ``ignore_links`` set
             at initialization.
+        :type processes: int
+        :param processes: Override for value of option ``processes`` set at
+            initialization.
         """
         if recursive is None:
             recursive = self.recursive
         if ignore_links is None:
             ignore_links = self.ignore_links
-
-        if recursive:
-            parse_func = recursive_parse
+        if processes is None:
+            processes = self.processes
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        found = set()
+        removed = []
+        work = []
+        for file in _find_files(path, recursive=recursive,
+                                ignore_links=ignore_links,
+                                verbose=self.verbose):
+            name = os.path.abspath(file)
+            if not self.cache:
+                work.append((file, name, None, None))
+                continue
+            found.add(name)
+            try:
+                stat = os.stat(file)
+            except OSError:
+                # not cached, reported as unreadable file
+                work.append((file, name, None, None))
+                continue
+            cached = self._files.get(name)
+            if cached is not None:
+                if cached[:2] == (stat.st_mtime, stat.st_size):
+                    if cached[2]:
+                        self.counter += 1
+                    continue
+                removed.append(self._files.pop(name)[2:])
+            work.append((file, name, stat.st_mtime, stat.st_size))
+        if recursive and os.path.isdir(path):
+            root = os.path.join(os.path.abspath(path), '')
+            for name in list(self._files):
+                if name.startswith(root) and name not in found:
+                    removed.append(self._files.pop(name)[2:])
+        if removed:
+            _remove_from_dict(self.data, self.samp_int, removed)
+
+        args = [(file, self.format, self.verbose) for file, _, _, _ in work]
+        if processes > 1 and len(args) > 1:
+            pool = multiprocessing.Pool(min(processes, len(args)))
+            chunksize = max(1, len(args) // (4 * processes))
+            results = pool.imap(_read_file, args, chunksize)
         else:
-            parse_func = parse_file_to_dict
-
-        self.counter = parse_func(
-            self.data, self.samp_int, path, self.counter, self.format,
-            verbose=self.verbose, quiet=not self.verbose,
-            ignore_links=ignore_links)
+            pool = None
+            results = (_read_file(_i) for _i in args)
+        try:
+            for (file, name, mtime, size), result in zip(work, results):
+                if result is None:
+                    if self.verbose:
+                        print("Can not read %s" % (file))
+                    data, samp_int = {}, {}
+                else:
+                    data, samp_int, text = result
+                    if self.verbose:
+                        sys.stdout.write("%s %s\n" % (self.counter, file))
+                        for line in text.split("\n"):
+                            sys.stdout.write("    " + line + "\n")
+                        sys.stdout.flush()
+                    self.counter += 1
+                    for key, startend in data.items():
+                        self.data.setdefault(key, []).extend(startend)
+                        self.samp_int.setdefault(key, []).extend(
+                            samp_int[key])
+                if mtime is not None:
+                    self._files[name] = (mtime, size, data, samp_int)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
     def add_stream(self, stream):
         """
@@ -638,14 +884,22 @@ class Scanner(object):
 def scan(paths, format=None, verbose=False, recursive=True,
          ignore_links=False, starttime=None, endtime=None, seed_ids=None,
          event_times=None, npz_output=None, npz_input=None, plot_x=True,
-         plot_gaps=True, print_gaps=False, plot=False):
+         plot_gaps=True, print_gaps=False, plot=False, processes=1,
+         cache=False):
     """
     :type plot: bool or str
     :param plot: False for no plot at all, True for interactive window, str for
         output to image file.
+    :type processes: int
+    :param processes: Number of processes reading the files in parallel,
+        ``None`` for one process per CPU.
+    :type cache: bool
+    :param cache: Whether to keep track of modification times and sizes of
+        the parsed files, see :class:`Scanner`.
     """
     scanner = Scanner(format=format, verbose=verbose, recursive=recursive,
-                      ignore_links=ignore_links)
+                      ignore_links=ignore_links, processes=processes,
+                      cache=cache)
 
     if plot is None:
         plot = False
@@ -702,6 +956,9 @@ def main(argv=None):
                         help='Optional. Do not descend into directories.')
     parser.add_argument('-i', '--ignore-links', action='store_true',
                         help='Optional. Do not follow symbolic links.')
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help='Optional. Number of processes reading the '
+                             'files in parallel, 0 for one process per CPU.')
     parser.add_argument('--start-time', default=None, type=UTCDateTime,
                         help='Optional, a UTCDateTime compatible string. ' +
                              'Only visualize data after this time and set ' +
@@ -728,6 +985,12 @@ def main(argv=None):
     parser.add_argument('-l', '--load', default=None,
                         help='Optional, npz file for loading data '
                              'before scanning waveform files')
+    parser.add_argument('--cache', action='store_true',
+                        help='Optional, store modification times and sizes '
+                             'of the scanned files in the npz file and '
+                             'only read new and modified files after '
+                             'loading it. Such npz files can not be loaded '
+                             'by older ObsPy versions.')
     parser.add_argument('--no-x', action='store_true',
                         help='Optional, Do not plot crosses.')
     parser.add_argument('--no-gaps', action='store_true',
@@ -754,7 +1017,8 @@ def main(argv=None):
          event_times=args.event_time, npz_output=args.write,
          npz_input=args.load, plot_x=not args.no_x,
          plot_gaps=not args.no_gaps, print_gaps=args.print_gaps,
-         plot=args.output or True)
+         plot=args.output or True, processes=args.processes or None,
+         cache=args.cache)
 
 
 if __name__ == '__main__':
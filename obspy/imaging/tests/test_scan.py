@@ -12,12 +12,14 @@ import unittest
 from os.path import abspath, dirname, join, pardir
 import warnings
 
+import numpy as np
+
 from obspy import read, UTCDateTime
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.misc import TemporaryWorkingDirectory, CatchOutput
 from obspy.core.util.testing import ImageComparison
 from obspy.imaging.scripts.scan import main as obspy_scan
-from obspy.imaging.scripts.scan import scan, Scanner
+from obspy.imaging.scripts.scan import compress_start_end, scan, Scanner
 
 
 class ScanTestCase(unittest.TestCase):
@@ -202,6 +204,112 @@ class ScanTestCase(unittest.TestCase):
                             t1, t2 = utc1.timestamp, utc2.timestamp
                             self.assertTrue(abs(t1 - t2) < .001)
 
+    def test_compress_start_end(self):
+        x = np.array([[0., 1.], [1., 2.], [2., 3.], [4., 5.], [4.5, 6.],
+                      [6., 7.], [9., 10.]])
+        np.testing.assert_array_equal(
+            compress_start_end(x.copy(), 1000),
+            [[0., 3.], [4., 5.], [4.5, 7.], [9., 10.]])
+        np.testing.assert_array_equal(
+            compress_start_end(x.copy(), 1000, merge_overlaps=True),
+            [[0., 3.], [4., 7.], [9., 10.]])
+        np.testing.assert_array_equal(
+            compress_start_end(x.copy(), 1000, merge_overlaps=True,
+                               margin_in_seconds=86400.),
+            [[0., 7.], [9., 10.]])
+        # contained pieces are merged with the end of the later piece
+        np.testing.assert_array_equal(
+            compress_start_end(np.array([[0., 10.], [2., 5.], [6., 7.]]),
+                               1000, merge_overlaps=True), [[0., 5.],
+                                                            [6., 7.]])
+        self.assertEqual(compress_start_end(x[:1], 1000).tolist(), [[0., 1.]])
+
+    def test_scan_cache(self):
+        """
+        With option ``cache`` files are only read again after loading a npz
+        file if they have been modified.
+        """
+        def _sorted(scanner):
+            return dict(
+                (key, sorted(zip(map(tuple, value), scanner.samp_int[key])))
+                for key, value in scanner.data.items())
+
+        st = read()
+        with TemporaryWorkingDirectory():
+            os.makedirs(os.path.join('data', 'sub'))
+            filenames = [os.path.join('data', 'a.mseed'),
+                         os.path.join('data', 'sub', 'b.mseed'),
+                         os.path.join('data', 'sub', 'c.mseed')]
+            for i, filename in enumerate(filenames):
+                st2 = st.copy()
+                for tr in st2:
+                    tr.stats.starttime += 3600 * i
+                st2.write(filename, format='MSEED')
+                os.utime(filename, (1e9, 1e9))
+            with open(os.path.join('data', 'junk.txt'), 'wb') as fh:
+                fh.write(b'junk')
+
+            # without cache the npz files are readable by older versions
+            scanner = Scanner()
+            scanner.parse('data')
+            self.assertEqual(scanner._files, {})
+            expected = _sorted(scanner)
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter('ignore', UserWarning)
+                scanner.save_npz('scan.npz')
+            npz = np.load('scan.npz')
+            try:
+                self.assertEqual(sorted(npz.keys()), [
+                    'BW.RJOB..EHE', 'BW.RJOB..EHE_SAMP', 'BW.RJOB..EHN',
+                    'BW.RJOB..EHN_SAMP', 'BW.RJOB..EHZ', 'BW.RJOB..EHZ_SAMP',
+                    '__version__'])
+            finally:
+                npz.close()
+            scanner.parse('data')
+            self.assertEqual(len(scanner.data['BW.RJOB..EHZ']), 6)
+
+            scanner = Scanner(cache=True)
+            scanner.parse('data')
+            self.assertEqual(len(scanner._files), 4)
+            self.assertEqual(_sorted(scanner), expected)
+            # same result with multiple processes
+            scanner2 = Scanner(processes=2, cache=True)
+            scanner2.parse('data')
+            self.assertEqual(_sorted(scanner2), expected)
+            # parsing files again does not add them twice
+            scanner2.parse('data')
+            self.assertEqual(_sorted(scanner2), expected)
+
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter('ignore', UserWarning)
+                scanner.save_npz('scan.npz')
+                scanner = Scanner(cache=True)
+                scanner.load_npz('scan.npz')
+                # the cache is ignored without option cache
+                scanner3 = Scanner()
+                scanner3.load_npz('scan.npz')
+            self.assertEqual(_sorted(scanner), expected)
+            self.assertEqual(_sorted(scanner3), expected)
+            self.assertEqual(scanner3._files, {})
+            self.assertEqual(scanner._files, scanner2._files)
+
+            # unmodified files are not read again
+            with open(filenames[0], 'r+b') as fh:
+                fh.write(b'\x00' * os.path.getsize(filenames[0]))
+            os.utime(filenames[0], (1e9, 1e9))
+            scanner.parse('data')
+            self.assertEqual(_sorted(scanner), expected)
+            # modified and removed files
+            st[:1].write(filenames[1], format='MSEED')
+            os.remove(filenames[2])
+            scanner.parse('data')
+            self.assertEqual(sorted(scanner.data), ['BW.RJOB..EHE',
+                                                    'BW.RJOB..EHN',
+                                                    'BW.RJOB..EHZ'])
+            self.assertEqual(len(scanner.data['BW.RJOB..EHZ']), 2)
+            self.assertEqual(len(scanner.data['BW.RJOB..EHN']), 1)
+            self.assertEqual(len(scanner._files), 3)
+
 
 def suite():
     return unittest.makeSuite(ScanTestCase, 'test')
@@ -161,11 +161,60 @@ class Unpickler(object):
         self.xml_doc = etree.parse(io.BytesIO(string))
         return self._deserialize()
 
+    def iload(self, file):
+        """
+        Incrementally reads a QuakeML file yielding one event at a time.
+
+        Only the elements of the currently processed event are kept in
+        memory so arbitrarily large files can be read. Catalog level
+        information is ignored.
+
+        :type file: str or file-like object
+        :param file: File name or open file to read.
+        :rtype: generator of :class:`~obspy.core.event.event.Event`
+        """
+        context = etree.iterparse(file, events=("start", "end"))
+        root = None
+        event_tag = None
+        for action, element in context:
+            if action == "start":
+                if root is None:
+                    root = element
+                    self._quakeml_namespaces = [
+                        ns for ns in root.nsmap.values()
+                        if ns.startswith(r"http://quakeml.org/xmlns/")]
+                elif event_tag is None:
+                    # first child of root is the eventParameters element,
+                    # its namespace is the global namespace of the file
+                    if element.getparent() is not root or \
+                            etree.QName(element).localname != \
+                            "eventParameters":
+                        break
+                    namespace = etree.QName(element).namespace
+                    event_tag = etree.QName(namespace, "event").text
+                continue
+            if element.tag != event_tag or \
+                    element.getparent().getparent() is not root:
+                continue
+            event = self._event(element)
+            # discard the already processed elements to keep memory bounded
+            element.clear()
+            parent = element.getparent()
+            while element.getprevious() is not None and \
+                    element.getprevious().tag == event_tag:
+                parent.remove(element.getprevious())
+            if event is not None:
+                yield event
+        if event_tag is None:
+            raise Exception("Not a QuakeML compatible file or string")
+
     def _xpath2obj(self, xpath, element=None, convert_to=str, namespace=None):
         q = self._xpath(xpath, element=element, namespace=namespace)
         if not q:
             return None
-        text = q[0].text
+        return self._text2obj(q[0].text, convert_to)
+
+    def _text2obj(self, text, convert_to=str):
         if text is None or text == '':
             return None
         if convert_to == bool:
@@ -198,18 +247,25 @@ class Unpickler(object):
             element = self.xml_root
 
         namespaces = None
+        namespace = self._namespace(element, namespace)
         if namespace:
             xpath = "b:%s" % xpath
             namespaces = {"b": namespace}
-        elif hasattr(element, "nsmap") and None in element.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": element.nsmap[None]}
-        elif hasattr(self, "nsmap") and None in self.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": self.nsmap[None]}
 
         return element.xpath(xpath, namespaces=namespaces)
 
+    def _namespace(self, element, namespace=None):
+        """
+        Returns the namespace the tags queried by _xpath() are in.
+        """
+        if namespace:
+            return namespace
+        elif hasattr(element, "nsmap") and None in element.nsmap:
+            return element.nsmap[None]
+        elif hasattr(self, "nsmap") and None in self.nsmap:
+            return self.nsmap[None]
+        return None
+
     def _comments(self, parent):
         obj = []
         for el in self._xpath('comment', parent):
@@ -240,14 +296,23 @@ class Unpickler(object):
         elif len(elements) == 0:
             return None
         element = elements[0]
-        obj = CreationInfo()
-        obj.agency_uri = self._xpath2obj('agencyURI', element)
-        obj.author_uri = self._xpath2obj('authorURI', element)
-        obj.agency_id = self._xpath2obj('agencyID', element)
-        obj.author = self._xpath2obj('author', element)
-        obj.creation_time = self._xpath2obj(
-            'creationTime', element, UTCDateTime)
-        obj.version = self._xpath2obj('version', element)
+        # Creation information is attached to most objects, so collect the
+        # texts of all its fields in a single pass over the children instead
+        # of running one xpath query per field.
+        namespace = self._namespace(element)
+        prefix = "{%s}" % namespace if namespace else ""
+        texts = {}
+        for child in element:
+            texts.setdefault(child.tag, child.text)
+
+        def _get(name, convert_to=str):
+            return self._text2obj(texts.get(prefix + name), convert_to)
+
+        obj = CreationInfo(
+            agency_id=_get('agencyID'), agency_uri=_get('agencyURI'),
+            author=_get('author'), author_uri=_get('authorURI'),
+            creation_time=_get('creationTime', UTCDateTime),
+            version=_get('version'))
         self._extra(element, obj)
         return obj
 
@@ -915,89 +980,98 @@ class Unpickler(object):
         catalog.creation_info = self._creation_info(catalog_el)
         # loop over all events
         for event_el in self._xpath('event', catalog_el):
-            # create new Event object
-            event = Event(force_resource_id=False)
-            # optional event attributes
-            event.preferred_origin_id = \
-                self._xpath2obj('preferredOriginID', event_el)
-            event.preferred_magnitude_id = \
-                self._xpath2obj('preferredMagnitudeID', event_el)
-            event.preferred_focal_mechanism_id = \
-                self._xpath2obj('preferredFocalMechanismID', event_el)
-            event_type = self._xpath2obj('type', event_el)
-            # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
-            # event type. Will be replaced with 'not reported'.
-            if event_type == "null":
-                event_type = "not reported"
-            # USGS event types contain '_' which is not compliant with
-            # the QuakeML standard
-            if isinstance(event_type, str):
-                event_type = event_type.replace("_", " ")
-            try:
-                event.event_type = event_type
-            except ValueError:
-                msg = "Event type '%s' does not comply " % event_type
-                msg += "with QuakeML standard -- event will be ignored."
-                warnings.warn(msg, UserWarning)
-                continue
-            self._set_enum('typeCertainty', event_el,
-                           event, 'event_type_certainty')
-            event.creation_info = self._creation_info(event_el)
-            event.event_descriptions = self._event_description(event_el)
-            event.comments = self._comments(event_el)
-            # origins
-            event.origins = []
-            for origin_el in self._xpath('origin', event_el):
-                # Have to be created before the origin is created to avoid a
-                # rare issue where a warning is read when the same event is
-                # read twice - the warnings does not occur if two referred
-                # to objects compare equal - for this the arrivals have to
-                # be bound to the event before the resource id is assigned.
-                arrivals = []
-                for arrival_el in self._xpath('arrival', origin_el):
-                    arrival = self._arrival(arrival_el)
-                    arrivals.append(arrival)
-
-                origin = self._origin(origin_el, arrivals=arrivals)
-
-                # append origin with arrivals
-                event.origins.append(origin)
-            # magnitudes
-            event.magnitudes = []
-            for magnitude_el in self._xpath('magnitude', event_el):
-                magnitude = self._magnitude(magnitude_el)
-                event.magnitudes.append(magnitude)
-            # station magnitudes
-            event.station_magnitudes = []
-            for magnitude_el in self._xpath('stationMagnitude', event_el):
-                magnitude = self._station_magnitude(magnitude_el)
-                event.station_magnitudes.append(magnitude)
-            # picks
-            event.picks = []
-            for pick_el in self._xpath('pick', event_el):
-                pick = self._pick(pick_el)
-                event.picks.append(pick)
-            # amplitudes
-            event.amplitudes = []
-            for el in self._xpath('amplitude', event_el):
-                amp = self._amplitude(el)
-                event.amplitudes.append(amp)
-            # focal mechanisms
-            event.focal_mechanisms = []
-            for fm_el in self._xpath('focalMechanism', event_el):
-                fm = self._focal_mechanism(fm_el)
-                event.focal_mechanisms.append(fm)
-            # finally append newly created event to catalog
-            event.resource_id = event_el.get('publicID')
-            self._extra(event_el, event)
-            # bind event scoped resource IDs to this event
-            event.scope_resource_ids()
-            catalog.append(event)
+            event = self._event(event_el)
+            if event is not None:
+                catalog.append(event)
 
         catalog.resource_id = catalog_el.get('publicID')
         self._extra(catalog_el, catalog)
         return catalog
 
+    def _event(self, event_el):
+        """
+        Creates an Event object from an event element.
+
+        Returns ``None`` if the event has to be ignored.
+        """
+        # create new Event object
+        event = Event(force_resource_id=False)
+        # optional event attributes
+        event.preferred_origin_id = \
+            self._xpath2obj('preferredOriginID', event_el)
+        event.preferred_magnitude_id = \
+            self._xpath2obj('preferredMagnitudeID', event_el)
+        event.preferred_focal_mechanism_id = \
+            self._xpath2obj('preferredFocalMechanismID', event_el)
+        event_type = self._xpath2obj('type', event_el)
+        # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
+        # event type. Will be replaced with 'not reported'.
+        if event_type == "null":
+            event_type = "not reported"
+        # USGS event types contain '_' which is not compliant with
+        # the QuakeML standard
+        if isinstance(event_type, str):
+            event_type = event_type.replace("_", " ")
+        try:
+            event.event_type = event_type
+        except ValueError:
+            msg = "Event type '%s' does not comply " % event_type
+            msg += "with QuakeML standard -- event will be ignored."
+            warnings.warn(msg, UserWarning)
+            return None
+        self._set_enum('typeCertainty', event_el,
+                       event, 'event_type_certainty')
+        event.creation_info = self._creation_info(event_el)
+        event.event_descriptions = self._event_description(event_el)
+        event.comments = self._comments(event_el)
+        # origins
+        event.origins = []
+        for origin_el in self._xpath('origin', event_el):
+            # Have to be created before the origin is created to avoid a
+            # rare issue where a warning is read when the same event is
+            # read twice - the warnings does not occur if two referred
+            # to objects compare equal - for this the arrivals have to
+            # be bound to the event before the resource id is assigned.
+            arrivals = []
+            for arrival_el in self._xpath('arrival', origin_el):
+                arrival = self._arrival(arrival_el)
+                arrivals.append(arrival)
+
+            origin = self._origin(origin_el, arrivals=arrivals)
+
+            # append origin with arrivals
+            event.origins.append(origin)
+        # magnitudes
+        event.magnitudes = []
+        for magnitude_el in self._xpath('magnitude', event_el):
+            magnitude = self._magnitude(magnitude_el)
+            event.magnitudes.append(magnitude)
+        # station magnitudes
+        event.station_magnitudes = []
+        for magnitude_el in self._xpath('stationMagnitude', event_el):
+            magnitude = self._station_magnitude(magnitude_el)
+            event.station_magnitudes.append(magnitude)
+        # picks
+        event.picks = []
+        for pick_el in self._xpath('pick', event_el):
+            pick = self._pick(pick_el)
+            event.picks.append(pick)
+        # amplitudes
+        event.amplitudes = []
+        for el in self._xpath('amplitude', event_el):
+            amp = self._amplitude(el)
+            event.amplitudes.append(amp)
+        # focal mechanisms
+        event.focal_mechanisms = []
+        for fm_el in self._xpath('focalMechanism', event_el):
+            fm = self._focal_mechanism(fm_el)
+            event.focal_mechanisms.append(fm)
+        event.resource_id = event_el.get('publicID')
+        self._extra(event_el, event)
+        # bind event scoped resource IDs to this event
+        event.scope_resource_ids()
+        return event
+
     def _extra(self, element, obj):
         """
         Add information stored in custom tags/attributes in obj.extra.
@@ -1083,6 +1157,61 @@ class Pickler(object):
         fh.write(self._serialize(catalog))
         fh.close()
 
+    def dump_events(self, events, file, resource_id=None,
+                    pretty_print=True):
+        """
+        Incrementally writes events into a QuakeML file.
+
+        Each event is serialized and written to the file on its own, so
+        ``events`` can be any iterable, e.g. the generator returned by
+        :func:`iread_events`, and the events never need to be held in
+        memory all at once.
+
+        :type events: iterable of :class:`~obspy.core.event.event.Event`
+        :param events: Events to write.
+        :type file: str or file-like object
+        :param file: File name or open file opened in binary mode.
+        :type resource_id: :class:`~obspy.core.event.ResourceIdentifier`,
+            optional
+        :param resource_id: Resource identifier of the written
+            eventParameters element. A new one is created if not given.
+        """
+        if resource_id is None:
+            resource_id = ResourceIdentifier()
+        with etree.xmlfile(file, encoding="utf-8") as xf:
+            xf.write_declaration()
+            with xf.element('{%s}quakeml' % NSMAP_QUAKEML['q'],
+                            nsmap=self.ns_dict):
+                with xf.element('eventParameters',
+                                attrib={'publicID': self._id(resource_id)}):
+                    if pretty_print:
+                        xf.write("\n")
+                    for event in events:
+                        xf.write(self._streamed_event(event),
+                                 pretty_print=pretty_print)
+                if pretty_print:
+                    xf.write("\n")
+
+    def _streamed_event(self, event):
+        """
+        Converts an Event object into an event element that declares all
+        custom namespaces used within it.
+
+        The namespace map of the root element is already written when
+        streaming, so custom namespaces have to be declared on the event
+        element to be in scope when reading the extra information back.
+        """
+        event_el = self._event(event)
+        nsmap = dict((abbrev, ns)
+                     for abbrev, ns in self._get_namespace_map().items()
+                     if abbrev not in self.ns_dict)
+        if not nsmap:
+            return event_el
+        element = etree.Element(event_el.tag, attrib=event_el.attrib,
+                                nsmap=nsmap)
+        element.extend(event_el)
+        return element
+
     def dumps(self, catalog):
         """
         Returns QuakeML string of given ObsPy Catalog object.
@@ -1725,6 +1854,59 @@ class Pickler(object):
         self._extra(focal_mechanism, element)
         return element
 
+    def _event(self, event):
+        """
+        Converts an Event object into an event element.
+        """
+        # create event node
+        event_el = etree.Element(
+            'event', attrib={'publicID': self._id(event.resource_id)})
+        # optional event attributes
+        if hasattr(event, "preferred_origin_id"):
+            self._str(event.preferred_origin_id, event_el,
+                      'preferredOriginID')
+        if hasattr(event, "preferred_magnitude_id"):
+            self._str(event.preferred_magnitude_id, event_el,
+                      'preferredMagnitudeID')
+        if hasattr(event, "preferred_focal_mechanism_id"):
+            self._str(event.preferred_focal_mechanism_id, event_el,
+                      'preferredFocalMechanismID')
+        # event type and event type certainty also are optional attributes.
+        if hasattr(event, "event_type"):
+            self._str(event.event_type, event_el, 'type')
+        if hasattr(event, "event_type_certainty"):
+            self._str(event.event_type_certainty, event_el,
+                      'typeCertainty')
+        # event descriptions
+        for description in event.event_descriptions:
+            el = etree.Element('description')
+            self._str(description.text, el, 'text', True)
+            self._str(description.type, el, 'type')
+            self._extra(description, el)
+            event_el.append(el)
+        self._comments(event.comments, event_el)
+        self._creation_info(event.creation_info, event_el)
+        # origins
+        for origin in event.origins:
+            event_el.append(self._origin(origin))
+        # magnitudes
+        for magnitude in event.magnitudes:
+            event_el.append(self._magnitude(magnitude))
+        # station magnitudes
+        for magnitude in event.station_magnitudes:
+            event_el.append(self._station_magnitude(magnitude))
+        # picks
+        for pick in event.picks:
+            event_el.append(self._pick(pick))
+        # amplitudes
+        for amp in event.amplitudes:
+            event_el.append(self._amplitude(amp))
+        # focal mechanisms
+        for focal_mechanism in event.focal_mechanisms:
+            event_el.append(self._focal_mechanism(focal_mechanism))
+        self._extra(event, event_el)
+        return event_el
+
     def _serialize(self, catalog, pretty_print=True):
         """
         Converts a Catalog object into XML string.
@@ -1737,55 +1919,8 @@ class Pickler(object):
         self._comments(catalog.comments, catalog_el)
         self._creation_info(catalog.creation_info, catalog_el)
         for event in catalog:
-            # create event node
-            event_el = etree.Element(
-                'event', attrib={'publicID': self._id(event.resource_id)})
-            # optional event attributes
-            if hasattr(event, "preferred_origin_id"):
-                self._str(event.preferred_origin_id, event_el,
-                          'preferredOriginID')
-            if hasattr(event, "preferred_magnitude_id"):
-                self._str(event.preferred_magnitude_id, event_el,
-                          'preferredMagnitudeID')
-            if hasattr(event, "preferred_focal_mechanism_id"):
-                self._str(event.preferred_focal_mechanism_id, event_el,
-                          'preferredFocalMechanismID')
-            # event type and event type certainty also are optional attributes.
-            if hasattr(event, "event_type"):
-                self._str(event.event_type, event_el, 'type')
-            if hasattr(event, "event_type_certainty"):
-                self._str(event.event_type_certainty, event_el,
-                          'typeCertainty')
-            # event descriptions
-            for description in event.event_descriptions:
-                el = etree.Element('description')
-                self._str(description.text, el, 'text', True)
-                self._str(description.type, el, 'type')
-                self._extra(description, el)
-                event_el.append(el)
-            self._comments(event.comments, event_el)
-            self._creation_info(event.creation_info, event_el)
-            # origins
-            for origin in event.origins:
-                event_el.append(self._origin(origin))
-            # magnitudes
-            for magnitude in event.magnitudes:
-                event_el.append(self._magnitude(magnitude))
-            # station magnitudes
-            for magnitude in event.station_magnitudes:
-                event_el.append(self._station_magnitude(magnitude))
-            # picks
-            for pick in event.picks:
-                event_el.append(self._pick(pick))
-            # amplitudes
-            for amp in event.amplitudes:
-                event_el.append(self._amplitude(amp))
-            # focal mechanisms
-            for focal_mechanism in event.focal_mechanisms:
-                event_el.append(self._focal_mechanism(focal_mechanism))
-            self._extra(event, event_el)
             # add event node to catalog
-            catalog_el.append(event_el)
+            catalog_el.append(self._event(event))
         self._extra(catalog, catalog_el)
         nsmap = self._get_namespace_map()
         root_el = etree.Element('{%s}quakeml' % NSMAP_QUAKEML['q'],
@@ -1821,6 +1956,39 @@ def _read_quakeml(filename):
     return Unpickler().load(filename)
 
 
+def iread_events(filename):
+    """
+    Incrementally reads a QuakeML file yielding one event at a time.
+
+    In contrast to :func:`~obspy.core.event.read_events` the file is never
+    parsed in its entirety, so memory usage stays bounded by the size of
+    the largest single event even for very large files. Resource
+    identifiers are resolved within each event. Catalog level information
+    (description, comments, ...) is ignored.
+
+    :type filename: str or file-like object
+    :param filename: QuakeML file to be read.
+    :rtype: generator of :class:`~obspy.core.event.event.Event`
+
+    .. rubric:: Example
+
+    >>> events = iread_events('/path/to/iris_events.xml')  # doctest: +SKIP
+    >>> for event in events:  # doctest: +SKIP
+    ...     print(event.short_str())
+    2011-03-11T05:46:24.120000Z | +38.297, +142.373 | 9.1 MW
+    2006-09-10T04:26:33.610000Z |  +9.614, +121.961 | 9.8 MS
+
+    Combined with :meth:`Pickler.dump_events` this allows filtering large
+    files without ever loading them completely:
+
+    >>> events = iread_events('/path/to/iris_events.xml')  # doctest: +SKIP
+    >>> events = (ev for ev in events  # doctest: +SKIP
+    ...           if ev.magnitudes[0].mag > 9.5)
+    >>> Pickler().dump_events(events, 'large_events.xml')  # doctest: +SKIP
+    """
+    return Unpickler().iload(filename)
+
+
 def _write_quakeml(catalog, filename, validate=False, nsmap=None,
                    **kwargs):  # @UnusedVariable
     """
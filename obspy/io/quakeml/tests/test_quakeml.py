@@ -18,7 +18,8 @@ from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.testing import compare_xml_strings
-from obspy.io.quakeml.core import Pickler, _read_quakeml, _write_quakeml
+from obspy.io.quakeml.core import (Pickler, _read_quakeml, _validate,
+                                   _write_quakeml, iread_events)
 
 
 # lxml < 2.3 seems not to ship with RelaxNG schema parser and namespace support
@@ -1107,6 +1108,56 @@ class QuakeMLTestCase(unittest.TestCase):
         # It should of course not be set.
         self.assertIsNone(cat[0].origins[0].depth_type)
 
+    def test_iread_events(self):
+        """
+        Tests incrementally reading a QuakeML file event by event.
+        """
+        for filename in ('iris_events.xml', 'neries_events.xml',
+                         'quakeml_1.2_event.xml'):
+            filename = os.path.join(self.path, filename)
+            catalog = _read_quakeml(filename)
+            events = iread_events(filename)
+            self.assertFalse(isinstance(events, (list, Catalog)))
+            events = list(events)
+            self.assertEqual(events, catalog.events)
+            # resource identifiers are resolved within each event
+            for event in events:
+                for origin in event.origins:
+                    self.assertIs(origin.resource_id.get_referred_object(),
+                                  origin)
+                for magnitude in event.magnitudes:
+                    self.assertIs(
+                        magnitude.resource_id.get_referred_object(),
+                        magnitude)
+        # also works with open files
+        with open(self.neries_filename, 'rb') as fh:
+            self.assertEqual(list(iread_events(fh)),
+                             self.neries_catalog.events)
+        # not a QuakeML file
+        with self.assertRaises(Exception):
+            list(iread_events(io.BytesIO(b'<a><b/></a>')))
+
+    def test_dump_events(self):
+        """
+        Tests incrementally writing events to a QuakeML file.
+        """
+        catalog = self.neries_catalog
+        catalog.events[0].extra = {
+            'public': {'value': 'yes', 'namespace': 'http://test.org/xmlns/'}}
+        with io.BytesIO() as buf:
+            Pickler().dump_events(iter(catalog), buf)
+            buf.seek(0)
+            self.assertTrue(_validate(buf))
+            buf.seek(0)
+            events = list(iread_events(buf))
+        self.assertEqual(events, catalog.events)
+        self.assertEqual(events[0].extra, catalog.events[0].extra)
+        # a resource id of the written event parameters can be given
+        with NamedTemporaryFile() as tf:
+            Pickler().dump_events(catalog, tf.name,
+                                  resource_id=catalog.resource_id)
+            self.assertEqual(_read_quakeml(tf.name), catalog)
+
 
 def suite():
     return unittest.makeSuite(QuakeMLTestCase, 'test')
@@ -125,11 +125,21 @@ def validate_stationxml(path_or_object):
     return (True, ())
 
 
-def _read_stationxml(path_or_file_object):
+def _read_stationxml(path_or_file_object, deduplicate_responses=False):
     """
     Function reading a StationXML file.
 
     :param path_or_file_object: File name or file like object.
+    :type deduplicate_responses: bool or
+        :class:`~obspy.core.inventory.response.ResponsePool`
+    :param deduplicate_responses: If ``True``, channels with identical
+        responses (or response stages) will share a single instance of it
+        instead of each carrying a separate copy. Duplicates are detected on
+        the raw XML and not parsed again which speeds up reading large
+        files. Pass an existing
+        :class:`~obspy.core.inventory.response.ResponsePool` to share
+        responses across multiple files. Note that modifying a shared
+        response in-place will affect all channels using it.
     """
     root = etree.parse(path_or_file_object).getroot()
 
@@ -149,9 +159,17 @@ def _read_stationxml(path_or_file_object):
     module = _tag2obj(root, _ns("Module"), str)
     module_uri = _tag2obj(root, _ns("ModuleURI"), str)
 
+    if isinstance(deduplicate_responses, obspy.core.inventory.ResponsePool):
+        response_pool = deduplicate_responses
+    elif deduplicate_responses:
+        response_pool = obspy.core.inventory.ResponsePool()
+    else:
+        response_pool = None
+
     networks = []
     for network in root.findall(_ns("Network")):
-        networks.append(_read_network(network, _ns))
+        networks.append(_read_network(network, _ns,
+                                      response_pool=response_pool))
 
     inv = obspy.core.inventory.Inventory(networks=networks, source=source,
                                          sender=sender, created=created,
@@ -190,7 +208,7 @@ def _read_base_node(element, object_to_write_to, _ns):
     _read_extra(element, object_to_write_to)
 
 
-def _read_network(net_element, _ns):
+def _read_network(net_element, _ns, response_pool=None):
     network = obspy.core.inventory.Network(net_element.get("code"))
     _read_base_node(net_element, network, _ns)
     network.total_number_of_stations = \
@@ -199,12 +217,13 @@ def _read_network(net_element, _ns):
         _tag2obj(net_element, _ns("SelectedNumberStations"), int)
     stations = []
     for station in net_element.findall(_ns("Station")):
-        stations.append(_read_station(station, _ns))
+        stations.append(_read_station(station, _ns,
+                                      response_pool=response_pool))
     network.stations = stations
     return network
 
 
-def _read_station(sta_element, _ns):
+def _read_station(sta_element, _ns, response_pool=None):
     longitude = _read_floattype(sta_element, _ns("Longitude"), Longitude,
                                 datum=True)
     latitude = _read_floattype(sta_element, _ns("Latitude"), Latitude,
@@ -238,7 +257,7 @@ def _read_station(sta_element, _ns):
         # Skip empty channels.
         if not channel.items() and not channel.attrib:
             continue
-        cha = _read_channel(channel, _ns)
+        cha = _read_channel(channel, _ns, response_pool=response_pool)
         # Might be None in case the channel could not be parsed.
         if cha is None:
             # This is None if, and only if, one of the coordinates could not
@@ -307,7 +326,7 @@ def _read_floattype_list(parent, tag, cls, unit=False, datum=False,
     return objs
 
 
-def _read_channel(cha_element, _ns):
+def _read_channel(cha_element, _ns, response_pool=None):
     """
     Returns either a :class:`~obspy.core.inventory.channel.Channel` object or
     ``None``.
@@ -387,11 +406,23 @@ def _read_channel(cha_element, _ns):
     # Finally parse the response.
     response = cha_element.find(_ns("Response"))
     if response is not None:
-        channel.response = _read_response(response, _ns)
+        if response_pool is None:
+            channel.response = _read_response(response, _ns)
+        else:
+            channel.response = response_pool.get(
+                _get_pool_key(response),
+                lambda: _read_response(response, _ns, response_pool))
     return channel
 
 
-def _read_response(resp_element, _ns):
+def _get_pool_key(element):
+    """
+    Key identifying the full content of an element for the response pool.
+    """
+    return etree.tostring(element, with_tail=False)
+
+
+def _read_response(resp_element, _ns, response_pool=None):
     response = obspy.core.inventory.response.Response()
     response.resource_id = resp_element.attrib.get('resourceId')
     if response.resource_id is not None:
@@ -405,10 +436,16 @@ def _read_response(resp_element, _ns):
         response.instrument_polynomial = \
             _read_instrument_polynomial(instrument_polynomial, _ns)
     # Now read all the stages.
-    for stage in resp_element.findall(_ns("Stage")):
-        if not len(stage):
+    for stage_elem in resp_element.findall(_ns("Stage")):
+        if not len(stage_elem):
             continue
-        response.response_stages.append(_read_response_stage(stage, _ns))
+        if response_pool is None:
+            stage = _read_response_stage(stage_elem, _ns)
+        else:
+            stage = response_pool.get(
+                _get_pool_key(stage_elem),
+                lambda: _read_response_stage(stage_elem, _ns), stage=True)
+        response.response_stages.append(stage)
     _read_extra(resp_element, response)
     return response
 
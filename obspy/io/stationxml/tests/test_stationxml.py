@@ -1093,6 +1093,68 @@ class StationXMLTestCase(unittest.TestCase):
             {'networks': ['IV'], 'stations': ['IV.LATE (Latera)'],
              'channels': []})
 
+    def test_reading_with_deduplicated_responses(self):
+        """
+        Tests sharing identical responses between channels upon reading.
+        """
+        filename = os.path.join(self.data_dir,
+                                "IRIS_single_channel_with_response.xml")
+        inv = obspy.read_inventory(filename, format="STATIONXML")
+        pool = obspy.core.inventory.ResponsePool()
+        inv_a = obspy.read_inventory(filename, format="STATIONXML",
+                                     deduplicate_responses=pool)
+        hits = pool.hits
+        inv_b = obspy.read_inventory(filename, format="STATIONXML",
+                                     deduplicate_responses=pool)
+        # Contents are not affected.
+        self.assertEqual(inv_a, inv)
+        self.assertEqual(inv_b, inv)
+        resp_a = inv_a[0][0][0].response
+        resp_b = inv_b[0][0][0].response
+        self.assertIs(resp_a, resp_b)
+        self.assertEqual(len(pool), 1)
+        # the whole response was found without parsing it again
+        self.assertEqual(pool.hits, hits + 1)
+        # A boolean creates a new pool per file.
+        inv_c = obspy.read_inventory(filename, format="STATIONXML",
+                                     deduplicate_responses=True)
+        self.assertEqual(inv_c, inv)
+        self.assertIsNot(inv_c[0][0][0].response, resp_a)
+
+    def test_reading_with_deduplicated_responses_many_channels(self):
+        """
+        Identical responses of several channels in a single file are shared
+        and the same pool can afterwards be used for deduplicating other
+        inventories.
+        """
+        inv = obspy.read_inventory()
+        with io.BytesIO() as buf:
+            inv.write(buf, format="STATIONXML")
+            data = buf.getvalue()
+        pool = obspy.core.inventory.ResponsePool()
+        inv_a = obspy.read_inventory(io.BytesIO(data), format="STATIONXML",
+                                     deduplicate_responses=pool)
+        self.assertEqual(inv_a, obspy.read_inventory(io.BytesIO(data),
+                                                     format="STATIONXML"))
+        responses = [cha.response for net in inv_a for sta in net
+                     for cha in sta]
+        self.assertEqual(len(responses), 30)
+        # equal responses are the identical object
+        for resp_1 in responses:
+            for resp_2 in responses:
+                self.assertEqual(resp_1 is resp_2, resp_1 == resp_2)
+        distinct = len(set(id(resp) for resp in responses))
+        self.assertLess(distinct, len(responses))
+        self.assertEqual(len(pool), distinct)
+        # deduplicating equal responses built differently uses the same
+        # shared objects
+        inv.deduplicate_responses(pool)
+        self.assertEqual(len(pool), distinct)
+        for cha, cha_a in zip(inv.get_contents()["channels"],
+                              inv_a.get_contents()["channels"]):
+            self.assertIs(inv.select(*cha.split("."))[0][0][0].response,
+                          inv_a.select(*cha_a.split("."))[0][0][0].response)
+
 
 def suite():
     return unittest.makeSuite(StationXMLTestCase, "test")
@@ -48,6 +48,26 @@ class RtMemory:
 
         self.initialized = True
 
+    def work_array(self, size, data_type):
+        """
+        Return an uninitialized work array, e.g. for the output of a
+        processing function.
+
+        The array is kept and reused by following calls so processing
+        sequential packets does not allocate new arrays for every packet.
+
+        :type size: int
+        :param size: Length of the work array.
+        :type data_type: numpy.dtype
+        :param data_type: Desired array data-type.
+        :return: NumPy :class:`~numpy.ndarray` of given length.
+        """
+        work = getattr(self, '_work', None)
+        if work is None or work.size < size or work.dtype != data_type:
+            work = np.empty(size, data_type)
+            self._work = work
+        return work[:size]
+
     def _update(self, memory_array, data):
         """
         Update specified memory array using specified number of points from
@@ -61,15 +81,20 @@ class RtMemory:
         :return: NumPy :class:`~numpy.ndarray` object containing updated
             memory array (input or output).
         """
-        if data.size >= np.size(memory_array):
+        # the memory is updated in place, it must never share its data with
+        # the (possibly reused) data array
+        size = np.size(memory_array)
+        if size == 0:
+            return memory_array
+        if data.size >= size:
             # data length greater than or equal to memory length
-            memory_array = data[np.size(data) - np.size(memory_array):]
-        else:
+            memory_array[:] = data[data.size - size:]
+        elif data.size > 0:
             # data length less than memory length
             # shift memory
-            memory_array = memory_array[data.size:]
+            memory_array[:size - data.size] = memory_array[data.size:]
             # append data
-            memory_array = np.concatenate((memory_array, data))
+            memory_array[size - data.size:] = data
         return memory_array
 
     def update_output(self, data):
@@ -49,6 +49,12 @@ class RtTrace(Trace):
     :type max_length: int, optional
     :param max_length: maximum trace length in seconds
 
+    The samples are stored in a preallocated buffer of about twice the
+    maximum trace length and :attr:`data` is a view of the latest window of
+    this buffer. Appending a packet only copies the new samples, the buffer
+    is compacted once it is full. Replacing :attr:`data` is allowed, the
+    buffer is rebuilt from the new data on the next append.
+
     .. rubric:: Example
 
     RtTrace has been built to handle real time processing of periodically
@@ -147,6 +153,12 @@ class RtTrace(Trace):
         # added using append
         super(RtTrace, self).__init__(data=np.array([]), header=None)
 
+        # sample buffer, self.data is a view of self._buffer[_start:_end]
+        self._buffer = None
+        self._view = None
+        self._start = 0
+        self._end = 0
+
     def __eq__(self, other):
         """
         Implements rich comparison of RtTrace objects for "==" operator.
@@ -261,7 +273,10 @@ class RtTrace(Trace):
                     print("%s: self.stats.starttime adjusted by: %gs"
                           % (self.__class__.__name__, diff -
                              self.stats.delta))
-        # first apply all registered processing to Trace
+        # first apply all registered processing to Trace, working on a copy
+        # as the processing functions modify the data in place
+        if self.processing:
+            trace = trace.copy()
         for proc in self.processing:
             process_name, options, rtmemory_list = proc
             # if gap or overlap, clear memory
@@ -269,7 +284,6 @@ class RtTrace(Trace):
                 for n in range(len(rtmemory_list)):
                     rtmemory_list[n] = RtMemory()
             # apply processing
-            trace = trace.copy()
             dtype = trace.data.dtype
             if hasattr(process_name, '__call__'):
                 # check if direct function call
@@ -283,11 +297,24 @@ class RtTrace(Trace):
             trace.data = np.require(trace.data, dtype=dtype)
         # if first data, set stats
         if not self.have_appended_data:
-            self.data = np.array(trace.data)
             self.stats = Stats(header=trace.stats)
+            self._buffer = None
+            self.data = np.array([], dtype=trace.data.dtype)
+            self._append_to_buffer(trace.data)
             self.have_appended_data = True
             return trace
-        # handle all following data sets
+        max_samples = None
+        if self.max_length is not None:
+            max_samples = int(self.max_length * self.stats.sampling_rate + 0.5)
+        if not gap_or_overlap and \
+                not isinstance(self.data, np.ma.MaskedArray) and \
+                not isinstance(trace.data, np.ma.MaskedArray):
+            # contiguous data, only the new samples are copied
+            trimmed = self._append_to_buffer(trace.data, max_samples)
+            if trimmed:
+                self.stats.starttime += trimmed * self.stats.delta
+            return trace
+        # handle gaps and overlaps
         # fix Trace.__add__ parameters
         # TODO: IMPORTANT? Should check for gaps and overlaps and handle
         # more elegantly
@@ -297,8 +324,7 @@ class RtTrace(Trace):
         # Trace.__add__ returns new Trace, so update to this RtTrace
         self.data = sum_trace.data
         # left trim if data length exceeds max_length
-        if self.max_length is not None:
-            max_samples = int(self.max_length * self.stats.sampling_rate + 0.5)
+        if max_samples is not None:
             if np.size(self.data) > max_samples:
                 starttime = self.stats.starttime + \
                     (np.size(self.data) - max_samples) / \
@@ -307,6 +333,46 @@ class RtTrace(Trace):
                             fill_value=None)
         return trace
 
+    def _append_to_buffer(self, data, max_samples=None):
+        """
+        Appends samples to the buffer and updates the data view.
+
+        :param data: Samples to append.
+        :param max_samples: Maximum number of samples to keep, older samples
+            are dropped.
+        :return: Number of samples dropped from the beginning.
+        """
+        if self._buffer is None or self.data is not self._view or \
+                self._buffer.dtype != self.data.dtype:
+            # no buffer yet or data has been replaced
+            current = self.data
+            self._buffer = np.empty(max(2 * len(current), 1), current.dtype)
+            self._buffer[:len(current)] = current
+            self._start, self._end = 0, len(current)
+        buf = self._buffer
+        size = self._end - self._start
+        trimmed = 0
+        if max_samples is not None and size + len(data) > max_samples:
+            trimmed = size + len(data) - max_samples
+        start = self._start + min(trimmed, size)
+        data = data[max(0, trimmed - size):]
+        end = self._end
+        if end + len(data) > len(buf):
+            keep = end - start
+            capacity = 2 * (keep + len(data))
+            if capacity > len(buf):
+                # grow, the capacity settles at twice the maximum length
+                buf = np.empty(capacity, buf.dtype)
+            # move the kept samples to the front
+            buf[:keep] = self._buffer[start:end]
+            self._buffer = buf
+            start, end = 0, keep
+        buf[end:end + len(data)] = data
+        self._start, self._end = start, end + len(data)
+        self._view = buf[self._start:self._end]
+        self.data = self._view
+        return trimmed
+
     def register_rt_process(self, process, **options):
         """
         Adds real-time processing algorithm to processing list of this RtTrace.
@@ -379,8 +445,17 @@ class RtTrace(Trace):
         # registered NumPy function (numpy.ufunc) calls
         temp = copy.copy(self.processing)
         self.processing = []
-        new = copy.deepcopy(self, *args, **kwargs)
+        # the buffer is not copied, the copy rebuilds it on the next append
+        buffer_ = self.__dict__.pop('_buffer', None)
+        view = self.__dict__.pop('_view', None)
+        try:
+            new = copy.deepcopy(self, *args, **kwargs)
+        finally:
+            self._buffer = buffer_
+            self._view = view
         new.processing = temp
+        new._buffer = None
+        new._view = None
         return new
 
 
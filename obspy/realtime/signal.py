@@ -14,6 +14,11 @@ the boxcar has to be subtracted from the running boxcar sum, this value may be
 in a previous packet, so has to be retrieved from memory see
 :func:`obspy.realtime.signal.boxcar`.
 
+All processing functions work in place on the data of the given trace and
+return it. Intermediate results are stored in work arrays of the
+:class:`~obspy.realtime.rtmemory.RtMemory` objects that are reused for the
+following packets.
+
 :copyright:
     The ObsPy Development Team (devs@obspy.org), Anthony Lomax & Alessia Maggi
 :license:
@@ -223,8 +228,8 @@ def boxcar(trace, width, rtmemory_list=None):
         rtmemory.initialize(sample.dtype, memory_size_input,
                             memory_size_output, 0, 0)
 
-    # initialize array for time-series results
-    new_sample = np.zeros(np.size(sample), sample.dtype)
+    # reused array for time-series results
+    new_sample = rtmemory.work_array(np.size(sample), sample.dtype)
 
     i = 0
     i1 = i - width
@@ -261,7 +266,8 @@ def boxcar(trace, width, rtmemory_list=None):
 
     rtmemory.update_input(sample)
 
-    return new_sample
+    sample[:] = new_sample
+    return sample
 
 
 def tauc(trace, width, rtmemory_list=None):
@@ -321,8 +327,9 @@ def tauc(trace, width, rtmemory_list=None):
         rtmemory_dval.initialize(sample.dtype, memory_size_input,
                                  memory_size_output, 0, 0)
 
-    new_sample = np.zeros(np.size(sample), sample.dtype)
-    deriv = np.zeros(np.size(sample), sample.dtype)
+    # reused arrays, all values are set below
+    new_sample = rtmemory.work_array(np.size(sample), sample.dtype)
+    deriv = rtmemory_dval.work_array(np.size(sample), sample.dtype)
 
     # sample_last = rtmemory.input[width - 1]
     sample_d = 0.0
@@ -361,7 +368,8 @@ def tauc(trace, width, rtmemory_list=None):
     rtmemory_dval.output[0] = dval
     rtmemory_dval.update_input(deriv)
 
-    return new_sample
+    sample[:] = new_sample
+    return sample
 
 
 # memory object indices for storing specific values
@@ -430,7 +438,8 @@ def mwpintegral(trace, max_time, ref_time, mem_time=1.0, gain=1.0,
         rtmemory.initialize(sample.dtype, memory_size_input,
                             memory_size_output, 0, 0)
 
-    new_sample = np.zeros(np.size(sample), sample.dtype)
+    new_sample = rtmemory.work_array(np.size(sample), sample.dtype)
+    new_sample.fill(0)
 
     ioffset_pick = int(round(
                        (ref_time - trace.stats.starttime) *
@@ -500,7 +509,8 @@ def mwpintegral(trace, max_time, ref_time, mem_time=1.0, gain=1.0,
     # update memory
     rtmemory.update_input(sample)
 
-    return new_sample
+    sample[:] = new_sample
+    return sample
 
 
 MWP_INVALID = -9.9
@@ -581,8 +591,9 @@ def kurtosis(trace, win=3.0, rtmemory_list=None):
     c_2 = (1.0 - a1 * a1) / 2.0
     bias = -3 * c_1 - 3.0
 
-    # prepare the output array
-    kappa4 = np.empty(npts, sample.dtype)
+    # the output is computed in place, every sample is only read before it
+    # is overwritten
+    kappa4 = sample
 
     # initialize the real-time memory needed to store
     # the recursive kurtosis coefficients until the
@@ -163,6 +163,63 @@ class RtTraceTestCase(unittest.TestCase):
         rtr.register_rt_process(np.square)
         rtr.copy()
 
+    def test_append_max_length(self):
+        """
+        Appended data is trimmed to max_length without reallocating the
+        buffer for every packet.
+        """
+        data = np.arange(1000, dtype=np.float64)
+        tr = Trace(data=data)
+        tr.stats.sampling_rate = 10.0
+        rtr = RtTrace(max_length=12)
+        buffers = set()
+        for i, trace in enumerate(tr / 50):
+            rtr.append(trace, gap_overlap_check=True)
+            end = (i + 1) * 20
+            expected = data[max(0, end - 120):end]
+            np.testing.assert_array_equal(rtr.data, expected)
+            self.assertEqual(rtr.stats.npts, len(expected))
+            self.assertEqual(rtr.stats.starttime,
+                             tr.stats.starttime + expected[0] / 10.0)
+            buffers.add(id(rtr._buffer))
+        # the data is a view of the buffer
+        self.assertIs(rtr.data.base, rtr._buffer)
+        self.assertLessEqual(len(rtr._buffer), 240)
+        self.assertLessEqual(len(buffers), 4)
+
+        # replacing the data is possible
+        rtr.data = rtr.data[-10:].copy()
+        rtr.stats.starttime = tr.stats.endtime - 0.9
+        trace = Trace(data=np.arange(1000, 1005, dtype=np.float64))
+        trace.stats.sampling_rate = 10.0
+        trace.stats.starttime = tr.stats.endtime + 0.1
+        rtr.append(trace, gap_overlap_check=True)
+        np.testing.assert_array_equal(rtr.data, np.arange(990, 1005))
+
+        # a copy does not share the buffer
+        rtr2 = rtr.copy()
+        rtr2.append(Trace(data=np.array([1005.0]), header={
+            'sampling_rate': 10.0, 'starttime': rtr.stats.endtime + 0.1}))
+        np.testing.assert_array_equal(rtr.data, np.arange(990, 1005))
+        np.testing.assert_array_equal(rtr2.data, np.arange(990, 1006))
+
+    def test_rtmemory_update(self):
+        """
+        The memory is updated in place and never shares data with the input.
+        """
+        mem = RtMemory()
+        mem.initialize(np.float64, 4, 0)
+        memory = mem.input
+        data = np.arange(6, dtype=np.float64)
+        mem.update_input(data)
+        data[:] = -1
+        np.testing.assert_array_equal(mem.input, [2, 3, 4, 5])
+        mem.update_input(np.array([6.0]))
+        np.testing.assert_array_equal(mem.input, [3, 4, 5, 6])
+        self.assertIs(mem.input, memory)
+        work = mem.work_array(10, np.float64)
+        self.assertIs(mem.work_array(5, np.float64).base, work.base)
+
     def test_append_not_float32(self):
         """
         Test for not using float32.
@@ -7,27 +7,82 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import io
+import sys
 from argparse import ArgumentParser
 
+import numpy as np
+
 from obspy import __version__
 from obspy.geodetics import FlinnEngdahl
 
 
+def _read_coordinates(filename):
+    """
+    Read longitudes and latitudes from the first two columns of a file.
+
+    Columns are separated by whitespace or commas, empty lines and lines
+    starting with ``#`` are skipped. ``-`` reads from standard input.
+    """
+    if filename == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with io.open(filename, 'rt') as fh:
+            lines = fh.read().splitlines()
+    coordinates = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        coordinates.append(line.replace(',', ' ').split()[:2])
+    return coordinates
+
+
 def main(argv=None):
     parser = ArgumentParser(prog='obspy-flinn-engdahl',
                             description=__doc__.strip())
     parser.add_argument('-V', '--version', action='version',
                         version='%(prog)s ' + __version__)
-    parser.add_argument('longitude', type=float,
+    parser.add_argument('-f', '--file', action='append', default=[],
+                        help='Batch mode: read longitudes and latitudes '
+                             'from the first two columns of a file (separated '
+                             'by whitespace or commas, "-" for standard '
+                             'input) and print them with their region, one '
+                             'point per line. Can be given multiple times.')
+    parser.add_argument('-n', '--number', action='store_true',
+                        help='Print the region numbers instead of the names.')
+    parser.add_argument('longitude', type=float, nargs='?',
                         help='Longitude (in degrees) of point. Positive for '
                              'East, negative for West.')
-    parser.add_argument('latitude', type=float,
+    parser.add_argument('latitude', type=float, nargs='?',
                         help='Latitude (in degrees) of point. Positive for '
                              'North, negative for South.')
     args = parser.parse_args(argv)
 
+    if args.latitude is None and not args.file:
+        parser.error('Either longitude and latitude or a file are required.')
+
     flinn_engdahl = FlinnEngdahl()
-    print(flinn_engdahl.get_region(args.longitude, args.latitude))
+    if args.number:
+        get_region = flinn_engdahl.get_number
+    else:
+        get_region = flinn_engdahl.get_region
+
+    if args.latitude is not None:
+        print(get_region(args.longitude, args.latitude))
+
+    for filename in args.file:
+        coordinates = _read_coordinates(filename)
+        if not coordinates:
+            continue
+        try:
+            longitudes, latitudes = np.array(coordinates,
+                                             dtype=np.float64).T
+            regions = get_region(longitudes, latitudes)
+        except ValueError:
+            parser.error('Invalid coordinates in %s.' % filename)
+        print('\n'.join('%s\t%s\t%s' % (lon, lat, region)
+                        for (lon, lat), region in zip(coordinates, regions)))
 
 
 if __name__ == '__main__':
@@ -108,6 +108,10 @@ object which can be queried for various attributes.
 >>> arr.ray_param, arr.time, arr.incident_angle  # doctest: +ELLIPSIS
 (453.7535..., 485.2100..., 24.3988...)
 
+If only the first arrivals of a few phases are needed for very many source
+depths and distances, a precomputed
+:class:`~obspy.taup.travel_time_table.TravelTimeTable` is much faster.
+
 Ray Paths
 ^^^^^^^^^
 
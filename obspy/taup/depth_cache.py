@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of TauModels split at source and receiver depths.
+
+Calculating travel times for a source depth requires splitting the branches
+of the model at the source (and receiver) depth, which is expensive. By
+default every :class:`~obspy.taup.tau.TauPyModel` keeps a small in-memory
+cache of split models, so separate instances, e.g. in the worker processes
+of a :mod:`multiprocessing` pool, repeat the same work. A
+:class:`DepthCache` stores the split models on disk instead so they are
+calculated once and then shared by all instances and processes using the
+same directory.
+
+>>> from obspy.taup import TauPyModel
+>>> from obspy.taup.depth_cache import DepthCache
+>>> cache = DepthCache("/tmp/taup_depth_cache")  # doctest: +SKIP
+>>> model = TauPyModel("iasp91", cache=cache)  # doctest: +SKIP
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from .utils import get_cache_directory
+
+
+def _pack(arrays):
+    """
+    Stacks the arrays of the tau branches of a serialized model.
+
+    Reading the header of an array is slower than reading its data, models
+    have two tau branches per layer.
+    """
+    arrays = dict(arrays)
+    keys = sorted(key for key in arrays if key.startswith("tau_branches_"))
+    dtypes = set(arrays[key].dtype for key in keys)
+    if len(dtypes) != 1:
+        return arrays
+    j, i = [int(_i.split("/")[1]) for _i in keys[0].split("__")[1:]]
+    branches = np.empty((j, i), dtype=dtypes.pop())
+    for key in keys:
+        j_, i_ = [int(_i.split("/")[0]) for _i in key.split("__")[1:]]
+        branches[j_, i_] = arrays.pop(key)
+    arrays["tau_branches"] = branches
+    return arrays
+
+
+def _unpack(arrays):
+    """
+    Reverts :func:`_pack`.
+    """
+    arrays = dict(arrays)
+    branches = arrays.pop("tau_branches", None)
+    if branches is not None:
+        j, i = branches.shape
+        for j_ in range(j):
+            for i_ in range(i):
+                key = 'tau_branches__%i/%i__%i/%i' % (j_, j, i_, i)
+                arrays[key] = branches[j_, i_]
+    return arrays
+
+
+class DepthCache(object):
+    """
+    Process-safe on-disk cache of depth corrected TauModels.
+
+    Pass it to the ``cache`` argument of
+    :class:`~obspy.taup.tau.TauPyModel`. The models are stored per model
+    hash (see :meth:`~obspy.taup.tau_model.TauModel.get_hash`), source depth
+    and receiver depth, so one directory can be shared by different models
+    and changed models are never served from the cache. Files are written
+    to temporary names and renamed afterwards, so any number of processes
+    can read and write the same directory at once.
+
+    The most recently used models are additionally kept in memory.
+
+    :type directory: str
+    :param directory: Directory to store the models in. Defaults to the
+        ``depth`` subdirectory of
+        :func:`~obspy.taup.utils.get_cache_directory`.
+    :type mmap: bool
+    :param mmap: Store the models as uncompressed arrays and memory-map them
+        when loading. Loading is faster and processes using the same models
+        share the memory, but the files are larger.
+    :type memory_size: int
+    :param memory_size: Number of models kept in memory.
+    """
+    def __init__(self, directory=None, mmap=False, memory_size=128):
+        if directory is None:
+            directory = get_cache_directory("depth")
+        elif not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created by someone else in the meantime.
+                if not os.path.isdir(directory):
+                    raise
+        self.directory = directory
+        self.mmap = mmap
+        self.memory_size = memory_size
+        self.stats = dict.fromkeys(
+            ("memory_hits", "hits", "misses", "stored"), 0)
+        self._memory = OrderedDict()
+        self._hashes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        with self._lock:
+            stats = ", ".join("%s: %i" % (key, self.stats[key])
+                              for key in sorted(self.stats))
+        return "DepthCache at '%s' (%i models in memory)\n\t%s" % (
+            self.directory, len(self._memory), stats)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def __getstate__(self):
+        # Used by other processes, they only share the files.
+        state = self.__dict__.copy()
+        for key in ("_memory", "_hashes", "_lock"):
+            del state[key]
+        state["stats"] = dict.fromkeys(self.stats, 0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._memory = OrderedDict()
+        self._hashes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _hash(self, model):
+        # Hashing the model is not free, surface models are not changed
+        # once they have been loaded.
+        try:
+            return self._hashes[model]
+        except KeyError:
+            value = model.get_hash()
+            self._hashes[model] = value
+            return value
+
+    def _path(self, model_hash, depth, receiver_depth):
+        name = "%r_%r" % (float(depth), float(receiver_depth))
+        if not self.mmap:
+            name += ".npz"
+        return os.path.join(self.directory, model_hash, name)
+
+    def depth_correct(self, model, depth, receiver_depth=None):
+        """
+        Returns the model corrected for a source and receiver depth.
+
+        Loads it from the cache or calculates and stores it.
+
+        :type model: :class:`~obspy.taup.tau_model.TauModel`
+        :param model: Model for a surface source.
+        :type depth: float
+        :param depth: Source depth in km.
+        :type receiver_depth: float
+        :param receiver_depth: Receiver depth in km. The model is not split
+            at the receiver depth if it is not given.
+        :rtype: :class:`~obspy.taup.tau_model.TauModel`
+        """
+        if receiver_depth is None:
+            receiver_depth = depth
+        key = (self._hash(model), float(depth), float(receiver_depth))
+        with self._lock:
+            value = self._memory.pop(key, None)
+            if value is not None:
+                self._memory[key] = value
+                self.stats["memory_hits"] += 1
+                return value
+
+        path = self._path(*key)
+        value = self._load(path)
+        if value is not None:
+            self._count("hits")
+        else:
+            self._count("misses")
+            value = model._load_from_depth_cache(depth)
+            if receiver_depth != depth:
+                value = value.split_branch(receiver_depth)
+            self._store(path, value)
+
+        with self._lock:
+            self._memory[key] = value
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        return value
+
+    def _load(self, path):
+        from .tau_model import TauModel
+        if not os.path.exists(path):
+            return None
+        try:
+            if self.mmap:
+                arrays = {}
+                for name in os.listdir(path):
+                    key = name[:-len(".npy")]
+                    arrays[key] = np.load(os.path.join(path, name),
+                                          mmap_mode="r")
+            else:
+                npz = np.load(path)
+                try:
+                    arrays = dict((key, npz[key]) for key in npz.keys())
+                finally:
+                    if hasattr(npz, 'close'):
+                        npz.close()
+                    else:
+                        del npz
+            return TauModel._from_arrays(_unpack(arrays), cache=False)
+        except Exception:
+            # Incomplete or corrupt files are calculated again.
+            return None
+
+    def _store(self, path, model):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        # Write to a temporary file or directory first so other processes
+        # never see partially written models.
+        arrays = _pack(model._to_arrays())
+        if self.mmap:
+            temp = tempfile.mkdtemp(dir=directory, suffix=".tmp")
+            for key, arr in arrays.items():
+                np.save(os.path.join(temp, key + ".npy"), np.asanyarray(arr))
+        else:
+            fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, **arrays)
+        try:
+            os.rename(temp, path)
+        except OSError:
+            # Stored by another process in the meantime.
+            if os.path.isdir(temp):
+                shutil.rmtree(temp, ignore_errors=True)
+            elif os.path.exists(temp):
+                os.remove(temp)
+            return
+        self._count("stored")
+
+    def clear(self):
+        """
+        Removes all models from the cache.
+        """
+        with self._lock:
+            self._memory.clear()
+        for name in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, name),
+                          ignore_errors=True)
@@ -1034,6 +1034,138 @@ class SeismicPhase(object):
                 self._settings["max_recursion"]))
         return arrivals
 
+    def calc_time_many(self, degrees, refine=False):
+        """
+        Calculate arrival times of this phase for many distances at once.
+
+        The arrivals are found with the same search as
+        :meth:`~SeismicPhase.calc_time` but for all distances at once and
+        the results are returned as arrays instead of
+        :class:`~obspy.taup.helper_classes.Arrival` objects.
+
+        :param degrees: Epicentral distances in degrees.
+        :type degrees: :class:`numpy.ndarray`
+        :param refine: If ``True``, every arrival is refined by shooting
+            rays exactly like :meth:`~SeismicPhase.calc_time` does. Otherwise
+            the arrivals are linearly interpolated between the ray
+            parameters sampled for the model, which is much faster but less
+            accurate.
+        :type refine: bool
+        :return: Dictionary with the arrays ``index`` (index of the distance
+            the arrival belongs to, a distance can have multiple or no
+            arrivals), ``time``, ``purist_dist``, ``ray_param``,
+            ``takeoff_angle`` and ``incident_angle``.
+        :rtype: dict
+        """
+        degrees = np.atleast_1d(np.asarray(degrees, dtype=np.float64))
+        result = dict(
+            (key, []) for key in ("index", "time", "purist_dist",
+                                  "ray_param", "takeoff_angle",
+                                  "incident_angle"))
+        if self.dist is None or len(self.dist) == 0 or len(degrees) == 0:
+            return dict((key, np.array(value, dtype=np.int_
+                                       if key == "index" else np.float64))
+                        for key, value in result.items())
+        # Same normalization as the C loop in calc_time().
+        temp_deg = np.abs(degrees)
+        temp_deg = np.where(temp_deg > 360.0, np.mod(temp_deg, 360.0),
+                            temp_deg)
+        temp_deg = np.where(temp_deg > 180.0, 360.0 - temp_deg, temp_deg)
+        rad_dist = np.radians(temp_deg)
+
+        dist = self.dist
+        count = len(dist)
+        left = dist[:-1]
+        right = dist[1:]
+        # Ray intervals that are skipped because of a constant ray parameter.
+        usable = ~((self.ray_param[:-1] == self.ray_param[1:]) & (count > 2))
+        not_last = np.arange(1, count) != count - 1
+
+        # Limit the size of the distance x ray matrices.
+        chunk = max(1, 2000000 // max(count, 1))
+        indices, search_dists, ray_nums = [], [], []
+        n = 0
+        while True:
+            search = n * 2.0 * np.pi + rad_dist
+            valid = search <= self.max_distance
+            if not valid.any():
+                break
+            candidates = [(np.nonzero(valid)[0], search)]
+            mirror = (n + 1) * 2.0 * np.pi - rad_dist
+            candidates.append((np.nonzero(valid & (temp_deg != 180.0))[0],
+                               mirror))
+            for idx, values in candidates:
+                for start in range(0, len(idx), chunk):
+                    sub = idx[start:start + chunk]
+                    sd = values[sub][:, np.newaxis]
+                    hit = ((left - sd) * (sd - right) >= 0) & usable & \
+                        ~((sd == right) & not_last)
+                    rows, cols = np.nonzero(hit)
+                    indices.append(sub[rows])
+                    search_dists.append(sd[rows, 0])
+                    ray_nums.append(cols)
+            n += 1
+        index = np.concatenate(indices) if indices else \
+            np.array([], dtype=np.int_)
+        search_dist = np.concatenate(search_dists) if search_dists else \
+            np.array([], dtype=np.float64)
+        ray_num = np.concatenate(ray_nums) if ray_nums else \
+            np.array([], dtype=np.int_)
+
+        if refine:
+            for _i, _r, _d in zip(index, ray_num, search_dist):
+                arrival = self.refine_arrival(
+                    degrees[_i], _r, _d, REFINE_DIST_RADIAN_TOL,
+                    self._settings["max_recursion"])
+                result["index"].append(_i)
+                for key in ("time", "purist_dist", "ray_param",
+                            "takeoff_angle", "incident_angle"):
+                    result[key].append(float(getattr(arrival, key)))
+            return dict((key, np.array(value, dtype=np.int_
+                                       if key == "index" else np.float64))
+                        for key, value in result.items())
+
+        # Vectorized version of linear_interp_arrival().
+        left_dist = dist[ray_num]
+        right_dist = dist[ray_num + 1]
+        left_time = self.time[ray_num]
+        left_p = self.ray_param[ray_num]
+        right_p = self.ray_param[ray_num + 1]
+        on_left = left_dist == search_dist
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time = (search_dist - left_dist) / (right_dist - left_dist) * \
+                (self.time[ray_num + 1] - left_time) + left_time
+            ray_param = (search_dist - right_dist) / \
+                (left_dist - right_dist) * (left_p - right_p) + right_p
+        time = np.where(on_left, left_time, time)
+        ray_param = np.where(on_left, left_p, ray_param)
+        degenerate = (ray_num == 0) & (search_dist == dist[0])
+        time[degenerate] = self.time[0]
+        ray_param[degenerate] = self.ray_param[0]
+
+        # Vectorized versions of calc_takeoff_angle() and
+        # calc_incident_angle().
+        if self.name.endswith('kmps') or not len(ray_param):
+            takeoff_angle = np.zeros(len(ray_param))
+            incident_angle = np.zeros(len(ray_param))
+        else:
+            radius = self.tau_model.radius_of_planet
+            takeoff_angle = np.degrees(np.arcsin(np.clip(
+                self._takeoff_velocity() * ray_param /
+                (radius - self.source_depth), -1.0, 1.0)))
+            if not self.down_going[0]:
+                takeoff_angle = 180 - takeoff_angle
+            incident_angle = np.degrees(np.arcsin(np.clip(
+                self._incident_velocity() * ray_param /
+                (radius - self.receiver_depth), -1.0, 1.0)))
+            if self.down_going[-1]:
+                incident_angle = 180 - incident_angle
+        takeoff_angle[degenerate] = 0.0
+        incident_angle[degenerate] = 0.0
+        return {"index": index, "time": time, "purist_dist": search_dist,
+                "ray_param": ray_param, "takeoff_angle": takeoff_angle,
+                "incident_angle": incident_angle}
+
     def calc_pierce(self, degrees):
         """
         Calculate pierce points for this phase.
@@ -1423,22 +1555,35 @@ class SeismicPhase(object):
         return ((self.tau_model.radius_of_planet - self.source_depth) *
                 math.sin(np.radians(takeoff_degree)) / takeoff_velocity)
 
-    def calc_takeoff_angle(self, ray_param):
-        if self.name.endswith('kmps'):
-            return 0
-
+    def _takeoff_velocity(self):
         v_mod = self.tau_model.s_mod.v_mod
         try:
             if self.down_going[0]:
-                takeoff_velocity = v_mod.evaluate_below(self.source_depth,
-                                                        self.name[0])
+                return v_mod.evaluate_below(self.source_depth, self.name[0])
             else:
-                takeoff_velocity = v_mod.evaluate_above(self.source_depth,
-                                                        self.name[0])
+                return v_mod.evaluate_above(self.source_depth, self.name[0])
+        except (IndexError, LookupError) as e:
+            raise_from(RuntimeError('Please contact the developers. This '
+                                    'error should not occur.'), e)
+
+    def _incident_velocity(self):
+        v_mod = self.tau_model.s_mod.v_mod
+        # Very last item is "END", assume first char is P or S
+        last_leg = self.legs[-2][0]
+        try:
+            if self.down_going[-1]:
+                return v_mod.evaluate_above(self.receiver_depth, last_leg)
+            else:
+                return v_mod.evaluate_below(self.receiver_depth, last_leg)
         except (IndexError, LookupError) as e:
             raise_from(RuntimeError('Please contact the developers. This '
                                     'error should not occur.'), e)
 
+    def calc_takeoff_angle(self, ray_param):
+        if self.name.endswith('kmps'):
+            return 0
+
+        takeoff_velocity = self._takeoff_velocity()
         takeoff_angle = np.degrees(math.asin(np.clip(
             takeoff_velocity * ray_param /
             (self.tau_model.radius_of_planet - self.source_depth), -1.0, 1.0)))
@@ -1452,20 +1597,7 @@ class SeismicPhase(object):
         if self.name.endswith('kmps'):
             return 0
 
-        v_mod = self.tau_model.s_mod.v_mod
-        # Very last item is "END", assume first char is P or S
-        last_leg = self.legs[-2][0]
-        try:
-            if self.down_going[-1]:
-                incident_velocity = v_mod.evaluate_above(self.receiver_depth,
-                                                         last_leg)
-            else:
-                incident_velocity = v_mod.evaluate_below(self.receiver_depth,
-                                                         last_leg)
-        except (IndexError, LookupError) as e:
-            raise_from(RuntimeError('Please contact the developers. This '
-                                    'error should not occur.'), e)
-
+        incident_velocity = self._incident_velocity()
         incident_angle = np.degrees(math.asin(np.clip(
             incident_velocity * ray_param /
             (self.tau_model.radius_of_planet - self.receiver_depth),
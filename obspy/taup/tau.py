@@ -6,8 +6,10 @@ High-level interface to travel-time calculation routines.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import copy
+import multiprocessing
 import warnings
 
 import matplotlib as mpl
@@ -16,13 +18,14 @@ from matplotlib.cm import get_cmap
 import matplotlib.text
 import numpy as np
 
-from .helper_classes import Arrival
+from .helper_classes import Arrival, TimeDistGeo
 from .tau_model import TauModel
 from .taup_create import TauPCreate
 from .taup_path import TauPPath
 from .taup_pierce import TauPPierce
 from .taup_time import TauPTime
-from .taup_geo import calc_dist, add_geo_to_arrivals
+from .taup_geo import (add_geo_to_arrivals, calc_dist, calc_dist_azi,
+                       get_receiver_coordinates)
 from .utils import parse_phase_list
 import obspy.geodetics.base as geodetics
 
@@ -567,6 +570,89 @@ class Arrivals(list):
                               phase_list=("ttall",))
 
 
+class NetworkArrivals(object):
+    """
+    Arrivals of one source at many receivers stored in arrays.
+
+    Returned by :meth:`TauPyModel.get_travel_times_geo_many`,
+    :meth:`TauPyModel.get_pierce_points_geo_many` and
+    :meth:`TauPyModel.get_ray_paths_geo_many`.
+
+    :ivar receiver_ids: ``NET.STA`` of the receivers if they were given as
+        an inventory, otherwise ``None``.
+    :vartype receiver_ids: list of str
+    :ivar latitudes: Receiver latitudes in degrees.
+    :vartype latitudes: :class:`numpy.ndarray`
+    :ivar longitudes: Receiver longitudes in degrees.
+    :vartype longitudes: :class:`numpy.ndarray`
+    :ivar distances: Epicentral distances of the receivers in degrees.
+    :vartype distances: :class:`numpy.ndarray`
+    :ivar azimuths: Azimuths from the source to the receivers in degrees.
+    :vartype azimuths: :class:`numpy.ndarray`
+    :ivar backazimuths: Backazimuths from the receivers to the source in
+        degrees.
+    :vartype backazimuths: :class:`numpy.ndarray`
+    :ivar arrivals: One row per arrival, sorted by receiver and travel time,
+        see :meth:`TauPyModel.get_travel_times_many` for the fields. The
+        ``index`` field is the index of the receiver.
+    :vartype arrivals: :class:`numpy.ndarray`
+    :ivar points: The pierce or ray path points of all arrivals
+        (dtype = :const:`~obspy.taup.helper_classes.TimeDistGeo`),
+        ``None`` for travel times. The coordinates are NaN if the Python
+        module ``geographiclib`` is not installed.
+    :vartype points: :class:`numpy.ndarray`
+    :ivar offsets: The points of arrival ``i`` are
+        ``points[offsets[i]:offsets[i + 1]]``.
+    :vartype offsets: :class:`numpy.ndarray`
+    """
+    def __init__(self, receiver_ids, latitudes, longitudes, distances,
+                 azimuths, backazimuths, arrivals, points=None, offsets=None):
+        self.receiver_ids = receiver_ids
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.distances = distances
+        self.azimuths = azimuths
+        self.backazimuths = backazimuths
+        self.arrivals = arrivals
+        self.points = points
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.arrivals)
+
+    def __str__(self):
+        return "%i arrivals at %i receivers" % (len(self.arrivals),
+                                                len(self.distances))
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def get_points(self, index):
+        """
+        Returns the pierce or ray path points of an arrival.
+
+        :type index: int
+        :param index: Index of the arrival in :attr:`arrivals`.
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.points is None:
+            return None
+        return self.points[self.offsets[index]:self.offsets[index + 1]]
+
+
+# The model used by the worker processes of the get_*_geo_many() methods.
+_WORKER_MODEL = None
+
+
+def _init_worker(model):
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+
+
+def _calc_points_chunk(args):
+    return _WORKER_MODEL._calc_points_chunk(*args)
+
+
 class TauPyModel(object):
     """
     Representation of a seismic model and methods for ray paths through it.
@@ -593,8 +679,11 @@ class TauPyModel(object):
             multiple results are requested for the same source depth. The
             dictionary must be ordered, otherwise the LRU cache will not
             behave correctly. If ``False`` is specified, then no cache will be
-            used.
-        :type cache: :class:`collections.OrderedDict` or bool
+            used. A :class:`~obspy.taup.depth_cache.DepthCache` stores the
+            split models on disk to share them between instances and
+            processes.
+        :type cache: :class:`collections.OrderedDict`,
+            :class:`~obspy.taup.depth_cache.DepthCache` or bool
 
         Usage:
 
@@ -641,6 +730,92 @@ class TauPyModel(object):
         return Arrivals(sorted(tt.arrivals, key=lambda x: x.time),
                         model=self.model)
 
+    def get_travel_times_many(self, source_depths_in_km, distances_in_degree,
+                              phase_list=("ttall",),
+                              receiver_depth_in_km=0.0, refine=False):
+        """
+        Return travel times for many pairs of source depth and distance.
+
+        The pairs are grouped by source depth and the model is depth
+        corrected and every phase is calculated only once per depth. The
+        arrivals of all distances of a depth are then determined at once.
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel()
+        >>> arrivals = model.get_travel_times_many(
+        ...     [10.0, 10.0, 100.0], [20.0, 30.0, 50.0], phase_list=["P"])
+        >>> print(arrivals["index"])
+        [0 0 0 0 0 1 2]
+        >>> print(arrivals["name"][0], round(arrivals["time"][0], 1))
+        P 272.7
+
+        :param source_depths_in_km: Source depths in km.
+        :type source_depths_in_km: float or array_like
+        :param distances_in_degree: Epicentral distances in degrees, must
+            broadcast against the source depths.
+        :type distances_in_degree: float or array_like
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param receiver_depth_in_km: Receiver depth in km
+        :type receiver_depth_in_km: float
+        :param refine: If ``True``, the arrivals are refined like in
+            :meth:`get_travel_times` and the results are identical. By
+            default the arrivals are interpolated linearly between the ray
+            parameters sampled by the model which is orders of magnitude
+            faster, the travel times typically deviate by less than 0.1 s.
+        :type refine: bool
+
+        :return: Structured array with one row per arrival, sorted by the
+            index of the depth/distance pair and the travel time. The fields
+            are ``index`` (index of the depth/distance pair), ``name``,
+            ``source_depth``, ``distance`` (in degrees), ``time``,
+            ``purist_distance`` (in degrees), ``ray_param`` (in seconds per
+            radian), ``takeoff_angle`` and ``incident_angle``.
+        :rtype: :class:`numpy.ndarray`
+        """
+        depths, distances = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(source_depths_in_km, dtype=np.float64)),
+            np.atleast_1d(np.asarray(distances_in_degree, dtype=np.float64)))
+        depths = depths.ravel()
+        distances = distances.ravel()
+        phase_names = parse_phase_list(phase_list)
+
+        columns = []
+        unique_depths, inverse = np.unique(depths, return_inverse=True)
+        for _i, depth in enumerate(unique_depths):
+            selection = np.nonzero(inverse == _i)[0]
+            tt = TauPTime(self.model, phase_names, depth, None,
+                          receiver_depth_in_km)
+            tt.depth_correct(depth, receiver_depth_in_km)
+            tt.recalc_phases()
+            for phase in tt.phases:
+                result = phase.calc_time_many(distances[selection],
+                                              refine=refine)
+                result["index"] = selection[result["index"]]
+                result["name"] = phase.name
+                result["source_depth"] = depth
+                columns.append(result)
+
+        name_length = max([len(_i) for _i in phase_names] + [1])
+        arrivals = np.empty(sum(len(_i["index"]) for _i in columns),
+                            dtype=_arrivals_dtype(name_length))
+        start = 0
+        for column in columns:
+            end = start + len(column["index"])
+            rows = arrivals[start:end]
+            rows["index"] = column["index"]
+            rows["name"] = column["name"]
+            rows["source_depth"] = column["source_depth"]
+            rows["distance"] = distances[column["index"]]
+            rows["time"] = column["time"]
+            rows["purist_distance"] = np.degrees(column["purist_dist"])
+            rows["ray_param"] = column["ray_param"]
+            rows["takeoff_angle"] = column["takeoff_angle"]
+            rows["incident_angle"] = column["incident_angle"]
+            start = end
+        return arrivals[np.lexsort((arrivals["time"], arrivals["index"]))]
+
     def get_pierce_points(self, source_depth_in_km, distance_in_degree,
                           phase_list=("ttall",), receiver_depth_in_km=0.0):
         """
@@ -870,6 +1045,248 @@ class TauPyModel(object):
 
         return arrivals
 
+    def _network_arrivals(self, source_latitude_in_deg,
+                          source_longitude_in_deg, receivers):
+        ids, latitudes, longitudes = get_receiver_coordinates(receivers)
+        distances, azimuths, backazimuths = calc_dist_azi(
+            source_latitude_in_deg, source_longitude_in_deg, latitudes,
+            longitudes, self.model.radius_of_planet, self.planet_flattening)
+        return NetworkArrivals(ids, latitudes, longitudes, distances,
+                               azimuths, backazimuths, arrivals=None)
+
+    def get_travel_times_geo_many(self, source_depth_in_km,
+                                  source_latitude_in_deg,
+                                  source_longitude_in_deg, receivers,
+                                  phase_list=("ttall",), refine=False):
+        """
+        Return travel times of every given phase at many receivers.
+
+        The epicentral distances are calculated at once and the travel times
+        with :meth:`get_travel_times_many`.
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param source_latitude_in_deg: Source latitude in degrees
+        :type source_latitude_in_deg: float
+        :param source_longitude_in_deg: Source longitude in degrees
+        :type source_longitude_in_deg: float
+        :param receivers: The receivers, either an inventory or a tuple of
+            arrays with latitudes and longitudes in degrees, see
+            :func:`~obspy.taup.taup_geo.get_receiver_coordinates`.
+        :type receivers: :class:`~obspy.core.inventory.inventory.Inventory`
+            or tuple
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param refine: See :meth:`get_travel_times_many`.
+        :type refine: bool
+        :rtype: :class:`NetworkArrivals`
+        """
+        result = self._network_arrivals(source_latitude_in_deg,
+                                        source_longitude_in_deg, receivers)
+        result.arrivals = self.get_travel_times_many(
+            source_depth_in_km, result.distances, phase_list=phase_list,
+            refine=refine)
+        return result
+
+    def get_pierce_points_geo_many(self, source_depth_in_km,
+                                   source_latitude_in_deg,
+                                   source_longitude_in_deg, receivers,
+                                   phase_list=("ttall",), resample=False,
+                                   processes=None):
+        """
+        Return pierce points of every given phase at many receivers.
+
+        Like :meth:`get_pierce_points_geo` for all receivers, the receivers
+        are distributed over a pool of processes.
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param source_latitude_in_deg: Source latitude in degrees
+        :type source_latitude_in_deg: float
+        :param source_longitude_in_deg: Source longitude in degrees
+        :type source_longitude_in_deg: float
+        :param receivers: The receivers, either an inventory or a tuple of
+            arrays with latitudes and longitudes in degrees, see
+            :func:`~obspy.taup.taup_geo.get_receiver_coordinates`.
+        :type receivers: :class:`~obspy.core.inventory.inventory.Inventory`
+            or tuple
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param resample: See :meth:`get_pierce_points_geo`.
+        :type resample: bool
+        :param processes: Number of processes to use. Defaults to the
+            number of CPUs, ``1`` calculates everything in the current
+            process.
+        :type processes: int
+        :rtype: :class:`NetworkArrivals`
+        """
+        return self._get_points_geo_many(
+            "pierce", source_depth_in_km, source_latitude_in_deg,
+            source_longitude_in_deg, receivers, phase_list, resample,
+            processes)
+
+    def get_ray_paths_geo_many(self, source_depth_in_km,
+                               source_latitude_in_deg,
+                               source_longitude_in_deg, receivers,
+                               phase_list=("ttall",), resample=False,
+                               processes=None):
+        """
+        Return ray paths of every given phase at many receivers.
+
+        Like :meth:`get_ray_paths_geo` for all receivers, the receivers are
+        distributed over a pool of processes.
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param source_latitude_in_deg: Source latitude in degrees
+        :type source_latitude_in_deg: float
+        :param source_longitude_in_deg: Source longitude in degrees
+        :type source_longitude_in_deg: float
+        :param receivers: The receivers, either an inventory or a tuple of
+            arrays with latitudes and longitudes in degrees, see
+            :func:`~obspy.taup.taup_geo.get_receiver_coordinates`.
+        :type receivers: :class:`~obspy.core.inventory.inventory.Inventory`
+            or tuple
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param resample: See :meth:`get_ray_paths_geo`.
+        :type resample: bool
+        :param processes: Number of processes to use. Defaults to the
+            number of CPUs, ``1`` calculates everything in the current
+            process.
+        :type processes: int
+        :rtype: :class:`NetworkArrivals`
+        """
+        return self._get_points_geo_many(
+            "path", source_depth_in_km, source_latitude_in_deg,
+            source_longitude_in_deg, receivers, phase_list, resample,
+            processes)
+
+    def _get_points_geo_many(self, kind, source_depth_in_km,
+                             source_latitude_in_deg, source_longitude_in_deg,
+                             receivers, phase_list, resample, processes):
+        result = self._network_arrivals(source_latitude_in_deg,
+                                        source_longitude_in_deg, receivers)
+        if not geodetics.HAS_GEOGRAPHICLIB:
+            msg = "Not able to evaluate positions of points. " + \
+                  "Install the Python module 'geographiclib' to solve " + \
+                  "this issue."
+            warnings.warn(msg)
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        count = len(result.distances)
+        # A few chunks per process to balance the load.
+        chunk_size = max(1, -(-count // (4 * processes)))
+        chunks = [
+            (kind, source_depth_in_km, source_latitude_in_deg,
+             source_longitude_in_deg, np.arange(start, min(start + chunk_size,
+                                                           count)),
+             result.distances[start:start + chunk_size],
+             result.latitudes[start:start + chunk_size],
+             result.longitudes[start:start + chunk_size],
+             phase_list, resample)
+            for start in range(0, count, chunk_size)]
+        if processes == 1 or len(chunks) < 2:
+            results = [self._calc_points_chunk(*_i) for _i in chunks]
+        else:
+            pool = multiprocessing.Pool(min(processes, len(chunks)),
+                                        initializer=_init_worker,
+                                        initargs=(self,))
+            try:
+                results = pool.map(_calc_points_chunk, chunks)
+            finally:
+                pool.close()
+                pool.join()
+
+        name_length = max([1] + [
+            _i[0]["name"].dtype.itemsize // np.dtype(native_str("U1")).itemsize
+            for _i in results])
+        arrivals = np.empty(sum(len(_i[0]) for _i in results),
+                            dtype=_arrivals_dtype(name_length))
+        points = []
+        counts = []
+        start = 0
+        for rows, points_, counts_ in results:
+            arrivals[start:start + len(rows)] = rows
+            start += len(rows)
+            points.append(points_)
+            counts.append(counts_)
+        result.arrivals = arrivals
+        result.points = np.concatenate(
+            points) if points else np.empty(0, dtype=TimeDistGeo)
+        result.offsets = np.zeros(len(arrivals) + 1, dtype=np.int_)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=result.offsets[1:])
+        return result
+
+    def _calc_points_chunk(self, kind, source_depth_in_km,
+                           source_latitude_in_deg, source_longitude_in_deg,
+                           indices, distances, latitudes, longitudes,
+                           phase_list, resample):
+        """
+        Calculates the pierce points or ray paths of a chunk of receivers.
+
+        Returns the arrivals, the concatenated points and the number of
+        points per arrival.
+        """
+        rows = []
+        points = []
+        for index, distance, latitude, longitude in zip(
+                indices, distances, latitudes, longitudes):
+            if kind == "path":
+                arrivals = self.get_ray_paths(source_depth_in_km, distance,
+                                              phase_list)
+            else:
+                arrivals = self.get_pierce_points(source_depth_in_km,
+                                                  distance, phase_list)
+            if geodetics.HAS_GEOGRAPHICLIB:
+                arrivals = add_geo_to_arrivals(
+                    arrivals, source_latitude_in_deg, source_longitude_in_deg,
+                    latitude, longitude, self.model.radius_of_planet,
+                    self.planet_flattening, resample=resample)
+            for arrival in arrivals:
+                rows.append((index, arrival.name, arrival.source_depth,
+                             distance, arrival.time, arrival.purist_distance,
+                             arrival.ray_param, arrival.takeoff_angle,
+                             arrival.incident_angle))
+                arr = arrival.path if kind == "path" else arrival.pierce
+                if arr.dtype != TimeDistGeo:
+                    geo = np.empty(len(arr), dtype=TimeDistGeo)
+                    for key in arr.dtype.names:
+                        geo[key] = arr[key]
+                    geo["lat"] = np.nan
+                    geo["lon"] = np.nan
+                    arr = geo
+                points.append(arr)
+        name_length = max([1] + [len(_i[1]) for _i in rows])
+        rows = np.array(rows, dtype=_arrivals_dtype(name_length))
+        counts = np.array([len(_i) for _i in points], dtype=np.int_)
+        if points:
+            points = np.concatenate(points)
+        else:
+            points = np.empty(0, dtype=TimeDistGeo)
+        return rows, points, counts
+
+
+def _arrivals_dtype(name_length):
+    """
+    The dtype of the arrays returned by
+    :meth:`TauPyModel.get_travel_times_many`.
+    """
+    return np.dtype([
+        (native_str("index"), np.int_),
+        (native_str("name"), native_str("U%d" % name_length)),
+        (native_str("source_depth"), np.float64),
+        (native_str("distance"), np.float64),
+        (native_str("time"), np.float64),
+        (native_str("purist_distance"), np.float64),
+        (native_str("ray_param"), np.float64),
+        (native_str("takeoff_angle"), np.float64),
+        (native_str("incident_angle"), np.float64)])
+
 
 def create_taup_model(model_name, output_dir, input_dir):
     """
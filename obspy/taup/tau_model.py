@@ -9,6 +9,7 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 from collections import OrderedDict
+import hashlib
 import os
 from copy import deepcopy
 from itertools import count
@@ -200,7 +201,7 @@ class TauModel(object):
         # Could implement the model validation; not critical right now
         return True
 
-    def depth_correct(self, depth):
+    def depth_correct(self, depth, receiver_depth=None):
         """
         Called in TauPTime. Computes a new tau model for a source at depth
         using the previously computed branches for a surface source. No
@@ -211,6 +212,9 @@ class TauModel(object):
         the slowness at the source depth must be sampled exactly as it is an
         extremal point for each of these branches. Cf. [Buland1983]_, page
         1290.
+
+        If a receiver depth different from the source depth is given, the
+        model is split at the receiver depth as well.
         """
         if self.source_depth != 0:
             raise TauModelError("Can't depth correct a TauModel that is not "
@@ -218,7 +222,14 @@ class TauModel(object):
         if depth > self.radius_of_planet:
             raise TauModelError("Can't depth correct to a source deeper than "
                                 "the radius of the planet.")
-        return self.load_from_depth_cache(depth)
+        if hasattr(self._depth_cache, "depth_correct"):
+            # On-disk cache, see obspy.taup.depth_cache.
+            return self._depth_cache.depth_correct(self, depth,
+                                                   receiver_depth)
+        depth_corrected = self.load_from_depth_cache(depth)
+        if receiver_depth is not None and receiver_depth != depth:
+            depth_corrected = depth_corrected.split_branch(receiver_depth)
+        return depth_corrected
 
     def load_from_depth_cache(self, depth):
         # Very simple and straightforward LRU cache implementation.
@@ -403,6 +414,25 @@ class TauModel(object):
             for i in range(1, len(self.tau_branches[0]))]
         return branch_depths
 
+    def get_hash(self):
+        """
+        Returns a hash identifying the model.
+
+        It is calculated from the velocity model, the slowness sampling and
+        the source depth the model has been corrected for, so models built
+        from the same input with the same settings have the same hash.
+
+        :rtype: str
+        :return: Hexadecimal SHA-1 digest.
+        """
+        sha1 = hashlib.sha1()
+        for arr in (self.s_mod.v_mod.layers, self.s_mod.p_layers,
+                    self.s_mod.s_layers, self.ray_params,
+                    np.array([self.radius_of_planet, self.source_depth],
+                             dtype=np.float64)):
+            sha1.update(np.ascontiguousarray(arr).view(np.uint8))
+        return sha1.hexdigest()
+
     def serialize(self, filename):
         """
         Serialize model to numpy npz binary file.
@@ -473,6 +503,15 @@ class TauModel(object):
             moho_depth <type 'float'>
             radius_of_planet <type 'float'>
         """
+        # finally save the collection of (structured) arrays to a binary file
+        np.savez_compressed(filename, **self._to_arrays())
+
+    def _to_arrays(self):
+        """
+        Returns the contents of the model as a dictionary of arrays.
+
+        See :meth:`serialize` for details.
+        """
         # a) handle simple contents
         keys = ['cmb_branch', 'cmb_depth', 'debug', 'iocb_branch',
                 'iocb_depth', 'moho_branch', 'moho_depth', 'no_discon_depths',
@@ -536,9 +575,7 @@ class TauModel(object):
             velocity_model[key] = getattr(self.s_mod.v_mod, key)
         arrays['v_mod'] = velocity_model
         arrays['v_mod.layers'] = self.s_mod.v_mod.layers
-
-        # finally save the collection of (structured) arrays to a binary file
-        np.savez_compressed(filename, **arrays)
+        return arrays
 
     @staticmethod
     def deserialize(filename, cache=None):
@@ -548,86 +585,98 @@ class TauModel(object):
         # XXX: Make this a with statement when old NumPy support is dropped.
         npz = np.load(filename)
         try:
-            model = TauModel(s_mod=None,
-                             radius_of_planet=float(npz["radius_of_planet"]),
-                             cache=cache, skip_calc=True)
-            complex_contents = [
-                'tau_branches', 's_mod', 'v_mod',
-                's_mod.p_layers', 's_mod.s_layers', 's_mod.critical_depths',
-                's_mod.fluid_layer_depths',
-                's_mod.high_slowness_layer_depths_p',
-                's_mod.high_slowness_layer_depths_s', 'v_mod.layers']
-
-            # a) handle simple contents
-            for key in npz.keys():
-                # we have multiple, dynamic key names for individual tau
-                # branches now, skip them all
-                if key in complex_contents or key.startswith('tau_branches'):
-                    continue
-                arr = npz[key]
-                if arr.ndim == 0:
-                    arr = arr[()]
-                setattr(model, key, arr)
-
-            # b) handle .tau_branches
-            tau_branch_keys = [key for key in npz.keys()
-                               if key.startswith('tau_branches_')]
-            j, i = tau_branch_keys[0].split("__")[1:]
-            i = int(i.split("/")[1])
-            j = int(j.split("/")[1])
-            branches = np.empty(shape=(i, j), dtype=np.object_)
-            for key in tau_branch_keys:
-                j_, i_ = key.split("__")[1:]
-                i_ = int(i_.split("/")[0])
-                j_ = int(j_.split("/")[0])
-                branches[i_][j_] = TauBranch._from_array(npz[key])
-            # no idea how numpy lays out empty arrays of object type,
-            # make a copy just in case..
-            branches = np.copy(branches)
-            setattr(model, "tau_branches", branches)
-
-            # c) handle simple contents of .s_mod
-            slowness_model = SlownessModel(v_mod=None,
-                                           skip_model_creation=True)
-            setattr(model, "s_mod", slowness_model)
-            for key in npz['s_mod'].dtype.names:
-                # restore scalar types from 0d array
-                arr = npz['s_mod'][key]
-                if arr.ndim == 0:
-                    arr = arr.flatten()[0]
-                setattr(slowness_model, key, arr)
-
-            # d) handle complex contents of .s_mod
-            for key in ['p_layers', 's_layers', 'critical_depths']:
-                setattr(slowness_model, key, npz['s_mod.' + key])
-            for key in ['fluid_layer_depths', 'high_slowness_layer_depths_p',
-                        'high_slowness_layer_depths_s']:
-                arr_ = npz['s_mod.' + key]
-                if len(arr_) == 0:
-                    data = []
-                else:
-                    data = [DepthRange._from_array(x) for x in arr_]
-                setattr(slowness_model, key, data)
-
-            # e) handle .s_mod.v_mod
-            velocity_model = VelocityModel(
-                model_name=native_str(npz["v_mod"]["model_name"]),
-                radius_of_planet=float(npz["v_mod"]["radius_of_planet"]),
-                min_radius=float(npz["v_mod"]["min_radius"]),
-                max_radius=float(npz["v_mod"]["max_radius"]),
-                moho_depth=float(npz["v_mod"]["moho_depth"]),
-                cmb_depth=float(npz["v_mod"]["cmb_depth"]),
-                iocb_depth=float(npz["v_mod"]["iocb_depth"]),
-                is_spherical=bool(npz["v_mod"]["is_spherical"]),
-                layers=None
-            )
-            setattr(slowness_model, "v_mod", velocity_model)
-            setattr(velocity_model, 'layers', npz['v_mod.layers'])
+            return TauModel._from_arrays(npz, cache=cache)
         finally:
             if hasattr(npz, 'close'):
                 npz.close()
             else:
                 del npz
+
+    @staticmethod
+    def _from_arrays(npz, cache=None):
+        """
+        Creates a model from a mapping of arrays created by
+        :meth:`_to_arrays`, e.g. an opened npz file.
+        """
+        model = TauModel(s_mod=None,
+                         radius_of_planet=float(npz["radius_of_planet"]),
+                         cache=cache, skip_calc=True)
+        complex_contents = [
+            'tau_branches', 's_mod', 'v_mod',
+            's_mod.p_layers', 's_mod.s_layers', 's_mod.critical_depths',
+            's_mod.fluid_layer_depths',
+            's_mod.high_slowness_layer_depths_p',
+            's_mod.high_slowness_layer_depths_s', 'v_mod.layers']
+
+        # a) handle simple contents
+        for key in npz.keys():
+            # we have multiple, dynamic key names for individual tau
+            # branches now, skip them all
+            if key in complex_contents or key.startswith('tau_branches'):
+                continue
+            arr = npz[key]
+            if arr.ndim == 0:
+                arr = arr[()]
+            setattr(model, key, arr)
+
+        # b) handle .tau_branches
+        tau_branch_keys = [key for key in npz.keys()
+                           if key.startswith('tau_branches_')]
+        j, i = tau_branch_keys[0].split("__")[1:]
+        i = int(i.split("/")[1])
+        j = int(j.split("/")[1])
+        branches = np.empty(shape=(i, j), dtype=np.object_)
+        for key in tau_branch_keys:
+            j_, i_ = key.split("__")[1:]
+            i_ = int(i_.split("/")[0])
+            j_ = int(j_.split("/")[0])
+            branches[i_][j_] = TauBranch._from_array(npz[key])
+        # no idea how numpy lays out empty arrays of object type,
+        # make a copy just in case..
+        branches = np.copy(branches)
+        setattr(model, "tau_branches", branches)
+
+        # c) handle simple contents of .s_mod
+        slowness_model = SlownessModel(v_mod=None,
+                                       skip_model_creation=True)
+        setattr(model, "s_mod", slowness_model)
+        for key in npz['s_mod'].dtype.names:
+            # restore scalar types from 0d array
+            arr = npz['s_mod'][key]
+            if arr.ndim == 0:
+                arr = arr.flatten()[0]
+            setattr(slowness_model, key, arr)
+
+        # d) handle complex contents of .s_mod
+        for key in ['p_layers', 's_layers', 'critical_depths']:
+            setattr(slowness_model, key, npz['s_mod.' + key])
+        for key in ['fluid_layer_depths', 'high_slowness_layer_depths_p',
+                    'high_slowness_layer_depths_s']:
+            arr_ = npz['s_mod.' + key]
+            if len(arr_) == 0:
+                data = []
+            else:
+                data = [DepthRange._from_array(x) for x in arr_]
+            setattr(slowness_model, key, data)
+
+        # e) handle .s_mod.v_mod
+        model_name = npz["v_mod"]["model_name"].item()
+        if isinstance(model_name, bytes):
+            # Models stored with Python 2.
+            model_name = model_name.decode("utf-8")
+        velocity_model = VelocityModel(
+            model_name=native_str(model_name),
+            radius_of_planet=float(npz["v_mod"]["radius_of_planet"]),
+            min_radius=float(npz["v_mod"]["min_radius"]),
+            max_radius=float(npz["v_mod"]["max_radius"]),
+            moho_depth=float(npz["v_mod"]["moho_depth"]),
+            cmb_depth=float(npz["v_mod"]["cmb_depth"]),
+            iocb_depth=float(npz["v_mod"]["iocb_depth"]),
+            is_spherical=bool(npz["v_mod"]["is_spherical"]),
+            layers=None
+        )
+        setattr(slowness_model, "v_mod", velocity_model)
+        setattr(velocity_model, 'layers', npz['v_mod.layers'])
         return model
 
     @staticmethod
@@ -79,7 +79,21 @@ def calc_dist_azi(source_latitude_in_deg, source_longitude_in_deg,
     :returns: distance_in_deg (in degrees), source_receiver_azimuth (in
               degrees) and receiver_to_source_backazimuth (in degrees).
     :rtype: tuple of three floats
+
+    The coordinates can also be arrays, e.g. the coordinates of all stations
+    of a network, the results are then arrays of their broadcast shape. The
+    calculation is vectorized for spherical planets.
+
+    >>> dist, az, baz = calc_dist_azi(0.0, 0.0, [0.0, 10.0], [10.0, 0.0],
+    ...                               6371.0, 0.0)
+    >>> print(dist.round(6), az.round(6), baz.round(6))
+    [ 10.  10.] [ 90.   0.] [ 270.  180.]
     """
+    coordinates = (source_latitude_in_deg, source_longitude_in_deg,
+                   receiver_latitude_in_deg, receiver_longitude_in_deg)
+    if any(np.ndim(_i) for _i in coordinates):
+        return _calc_dist_azi_array(coordinates, radius_of_planet_in_km,
+                                    flattening_of_planet)
     if geodetics.HAS_GEOGRAPHICLIB:
         ellipsoid = Geodesic(a=radius_of_planet_in_km * 1000.0,
                              f=flattening_of_planet)
@@ -114,6 +128,86 @@ def calc_dist_azi(source_latitude_in_deg, source_longitude_in_deg,
             receiver_to_source_backazimuth)
 
 
+def _calc_dist_azi_array(coordinates, radius_of_planet_in_km,
+                         flattening_of_planet):
+    """
+    Array version of :func:`calc_dist_azi`.
+    """
+    coordinates = np.broadcast_arrays(
+        *[np.asarray(_i, dtype=np.float64) for _i in coordinates])
+    if flattening_of_planet != 0.0 and not geodetics.HAS_GEOGRAPHICLIB:
+        distance_in_m, source_receiver_azimuth, \
+            receiver_to_source_backazimuth = gps2dist_azimuth(
+                *coordinates, a=radius_of_planet_in_km * 1000.0,
+                f=flattening_of_planet)
+        msg = "Assuming spherical planet when calculating epicentral " + \
+              "distance. Install the Python module 'geographiclib' " + \
+              "to solve this."
+        warnings.warn(msg)
+        distance_in_deg = kilometer2degrees(distance_in_m / 1000.0,
+                                            radius=radius_of_planet_in_km)
+        return (distance_in_deg, source_receiver_azimuth % 360,
+                receiver_to_source_backazimuth % 360)
+    elif flattening_of_planet != 0.0:
+        # Geodesics on an ellipsoid, one point at a time.
+        results = np.empty((3,) + coordinates[0].shape)
+        for index in np.ndindex(*coordinates[0].shape):
+            results[(slice(None),) + index] = calc_dist_azi(
+                *([float(_i[index]) for _i in coordinates] +
+                  [radius_of_planet_in_km, flattening_of_planet]))
+        return results[0], results[1], results[2]
+    lat1, lon1, lat2, lon2 = [np.radians(_i) for _i in coordinates]
+    dlon = lon2 - lon1
+    sin_lat1, cos_lat1 = np.sin(lat1), np.cos(lat1)
+    sin_lat2, cos_lat2 = np.sin(lat2), np.cos(lat2)
+    sin_dlon, cos_dlon = np.sin(dlon), np.cos(dlon)
+    # Great circle distance with the formula that is accurate for all
+    # distances.
+    y = cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * cos_dlon
+    x = sin_lat1 * sin_lat2 + cos_lat1 * cos_lat2 * cos_dlon
+    distance_in_deg = np.degrees(np.arctan2(
+        np.sqrt((cos_lat2 * sin_dlon) ** 2 + y ** 2), x))
+    source_receiver_azimuth = np.degrees(
+        np.arctan2(sin_dlon * cos_lat2, y)) % 360
+    receiver_to_source_backazimuth = np.degrees(np.arctan2(
+        -sin_dlon * cos_lat1,
+        cos_lat2 * sin_lat1 - sin_lat2 * cos_lat1 * cos_dlon)) % 360
+    return (distance_in_deg, source_receiver_azimuth,
+            receiver_to_source_backazimuth)
+
+
+def get_receiver_coordinates(receivers):
+    """
+    Returns the coordinates of receivers.
+
+    :param receivers: Either an
+        :class:`~obspy.core.inventory.inventory.Inventory` or
+        :class:`~obspy.core.inventory.network.Network` (the coordinates of
+        all station epochs are used) or a tuple of arrays with latitudes and
+        longitudes in degrees.
+    :returns: The receiver ids (``NET.STA``, ``None`` for coordinate
+        arrays), latitudes and longitudes.
+    :rtype: tuple of list and two :class:`numpy.ndarray`
+    """
+    if hasattr(receivers, "networks") or hasattr(receivers, "stations"):
+        networks = getattr(receivers, "networks", [receivers])
+        ids = []
+        latitudes = []
+        longitudes = []
+        for network in networks:
+            for station in network.stations:
+                ids.append("%s.%s" % (network.code, station.code))
+                latitudes.append(station.latitude)
+                longitudes.append(station.longitude)
+        return (ids, np.array(latitudes, dtype=np.float64),
+                np.array(longitudes, dtype=np.float64))
+    latitudes, longitudes = receivers
+    latitudes, longitudes = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(latitudes, dtype=np.float64)),
+        np.atleast_1d(np.asarray(longitudes, dtype=np.float64)))
+    return None, latitudes.ravel(), longitudes.ravel()
+
+
 def add_geo_to_arrivals(arrivals, source_latitude_in_deg,
                         source_longitude_in_deg, receiver_latitude_in_deg,
                         receiver_longitude_in_deg, radius_of_planet_in_km,
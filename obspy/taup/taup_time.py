@@ -47,9 +47,10 @@ class TauPTime(object):
             receiver_depth = self.receiver_depth
         if self.depth_corrected_model is None or \
                 self.depth_corrected_model.source_depth != depth:
-            self.depth_corrected_model = self.model.depth_correct(depth)
+            self.depth_corrected_model = self.model.depth_correct(
+                depth, receiver_depth)
             self.arrivals = []
-        if receiver_depth != depth:
+        elif receiver_depth != depth:
             # If already split on receiver depth this does nothing.
             self.depth_corrected_model = \
                 self.depth_corrected_model.split_branch(receiver_depth)
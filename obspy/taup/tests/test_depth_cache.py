@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Tests the on-disk cache of depth corrected models.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import unittest
+
+import numpy as np
+
+from obspy.core.util.misc import TemporaryWorkingDirectory
+from obspy.taup import TauPyModel
+from obspy.taup.depth_cache import DepthCache
+
+
+class DepthCacheTestCase(unittest.TestCase):
+    """
+    Tests the on-disk cache of depth corrected models.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = TauPyModel("iasp91", cache=False)
+
+    def _assert_same_arrivals(self, model, depth, distance,
+                              receiver_depth_in_km=0.0):
+        arrivals = model.get_travel_times(
+            depth, distance, receiver_depth_in_km=receiver_depth_in_km)
+        expected = self.reference.get_travel_times(
+            depth, distance, receiver_depth_in_km=receiver_depth_in_km)
+        self.assertEqual([_i.name for _i in arrivals],
+                         [_i.name for _i in expected])
+        np.testing.assert_array_equal([_i.time for _i in arrivals],
+                                      [_i.time for _i in expected])
+
+    def _check_cache(self, mmap):
+        with TemporaryWorkingDirectory():
+            cache = DepthCache("cache", mmap=mmap)
+            model = TauPyModel("iasp91", cache=cache)
+            self._assert_same_arrivals(model, 33.3, 40.0)
+            self._assert_same_arrivals(model, 33.3, 40.0,
+                                       receiver_depth_in_km=2.0)
+            self.assertEqual(cache.stats["misses"], 2)
+            self.assertEqual(cache.stats["stored"], 2)
+            self.assertEqual(cache.stats["hits"], 0)
+            self._assert_same_arrivals(model, 33.3, 50.0)
+            self.assertEqual(cache.stats["memory_hits"], 1)
+            model_hash = model.model.get_hash()
+            self.assertEqual(os.listdir("cache"), [model_hash])
+            self.assertEqual(len(os.listdir(os.path.join("cache",
+                                                         model_hash))), 2)
+
+            # Other instances, e.g. in other processes, use the files.
+            cache = DepthCache("cache", mmap=mmap)
+            model = TauPyModel("iasp91", cache=cache)
+            self._assert_same_arrivals(model, 33.3, 40.0,
+                                       receiver_depth_in_km=2.0)
+            paths = model.get_ray_paths(33.3, 40.0, phase_list=["P", "PcP"])
+            expected = self.reference.get_ray_paths(33.3, 40.0,
+                                                    phase_list=["P", "PcP"])
+            for path, path_expected in zip(paths, expected):
+                np.testing.assert_allclose(path.path["time"],
+                                           path_expected.path["time"])
+            self.assertEqual(cache.stats["misses"], 0)
+            self.assertEqual(cache.stats["hits"], 2)
+            self.assertEqual(cache.stats["stored"], 0)
+
+            # Different models have different hashes.
+            model = TauPyModel("ak135", cache=cache)
+            model.get_travel_times(33.3, 40.0)
+            self.assertEqual(len(os.listdir("cache")), 2)
+
+            cache.clear()
+            self.assertEqual(os.listdir("cache"), [])
+
+    def test_depth_cache(self):
+        self._check_cache(mmap=False)
+
+    def test_depth_cache_mmap(self):
+        self._check_cache(mmap=True)
+
+    def test_corrupt_file(self):
+        with TemporaryWorkingDirectory():
+            cache = DepthCache("cache")
+            model = TauPyModel("iasp91", cache=cache)
+            model.get_travel_times(10.0, 40.0)
+            directory = os.path.join("cache", model.model.get_hash())
+            filename = os.path.join(directory, os.listdir(directory)[0])
+            with open(filename, "r+b") as fh:
+                fh.truncate(100)
+            cache = DepthCache("cache")
+            model = TauPyModel("iasp91", cache=cache)
+            self._assert_same_arrivals(model, 10.0, 40.0)
+            self.assertEqual(cache.stats["misses"], 1)
+            self.assertEqual(cache.stats["stored"], 1)
+            # The file has been replaced.
+            cache = DepthCache("cache")
+            TauPyModel("iasp91", cache=cache).get_travel_times(10.0, 40.0)
+            self.assertEqual(cache.stats["hits"], 1)
+
+
+def suite():
+    return unittest.makeSuite(DepthCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
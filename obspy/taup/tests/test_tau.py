@@ -1023,6 +1023,47 @@ class TauPyModelTestCase(unittest.TestCase):
             self.assertEqual(a.name, d[0])
             self.assertAlmostEqual(a.time, d[1], 3)
 
+    def test_get_travel_times_many(self):
+        """
+        Compares the batched travel times with single requests.
+        """
+        m = TauPyModel("iasp91")
+        depths = [10.0, 300.0, 10.0, 0.0, 300.0]
+        distances = [35.0, 120.0, 3.0, 200.0, 0.0]
+        phases = ["P", "S", "PKiKP", "Pn", "pP", "SKS", "Pdiff"]
+        for refine in (True, False):
+            result = m.get_travel_times_many(depths, distances,
+                                             phase_list=phases,
+                                             refine=refine)
+            expected = []
+            for i, (depth, distance) in enumerate(zip(depths, distances)):
+                expected.extend((i, arr) for arr in m.get_travel_times(
+                    depth, distance, phase_list=phases))
+            self.assertEqual(len(result), len(expected))
+            # Sorted by pair and time.
+            np.testing.assert_array_equal(
+                result["index"], [i for i, _ in expected])
+            for row, (i, arr) in zip(result, expected):
+                self.assertEqual(row["name"], arr.name)
+                self.assertEqual(row["source_depth"], arr.source_depth)
+                self.assertEqual(row["distance"], arr.distance)
+                decimal = 6 if refine else 1
+                self.assertAlmostEqual(row["time"], arr.time, decimal)
+                self.assertAlmostEqual(row["purist_distance"],
+                                       arr.purist_distance, decimal)
+                self.assertAlmostEqual(row["takeoff_angle"],
+                                       arr.takeoff_angle, decimal - 1)
+                self.assertAlmostEqual(row["incident_angle"],
+                                       arr.incident_angle, decimal - 1)
+                self.assertLess(abs(row["ray_param"] - arr.ray_param),
+                                10.0 ** -decimal * 100)
+
+        # Scalars and empty input.
+        result = m.get_travel_times_many(10.0, [20.0, 30.0],
+                                         phase_list=["S"])
+        np.testing.assert_array_equal(np.unique(result["index"]), [0, 1])
+        self.assertEqual(len(m.get_travel_times_many([], [])), 0)
+
 
 def suite():
     return unittest.makeSuite(TauPyModelTestCase, 'test')
@@ -8,9 +8,11 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import unittest
+import warnings
 
 import numpy as np
 
+from obspy import read_inventory
 from obspy.taup.tau import TauPyModel
 from obspy.taup.taup_geo import calc_dist, calc_dist_azi
 import obspy.geodetics.base as geodetics
@@ -210,11 +212,118 @@ class TaupGeoDistTestCase(unittest.TestCase):
         self.assert_angle_almost_equal(azi, 180.0, 5)
         self.assert_angle_almost_equal(backazi, 0.0, 5)
 
+    def test_taup_geo_calc_dist_azi_array(self):
+        """Test for calc_dist_azi with arrays"""
+        rng = np.random.RandomState(42)
+        lat1, lat2 = rng.uniform(-90, 90, (2, 50))
+        lon1, lon2 = rng.uniform(-180, 180, (2, 50))
+        for flattening in (0.0, 1 / 298.257223563):
+            result = calc_dist_azi(lat1, lon1, lat2, lon2, 6371.0,
+                                   flattening)
+            for i in range(50):
+                expected = calc_dist_azi(lat1[i], lon1[i], lat2[i], lon2[i],
+                                         6371.0, flattening)
+                self.assertAlmostEqual(result[0][i], expected[0], 8)
+                for j in (1, 2):
+                    difference = (result[j][i] - expected[j] + 180) % 360
+                    self.assertAlmostEqual(difference, 180.0, 6)
+        # Broadcasting.
+        dist, azi, backazi = calc_dist_azi(20.0, 33.0, [[55.0], [-15.0]],
+                                           [33.0, 33.0, 33.0], 6371.0, 0.0)
+        self.assertEqual(dist.shape, (2, 3))
+        np.testing.assert_allclose(dist, 35.0)
+        np.testing.assert_allclose(azi[0], 0.0, atol=1e-8)
+        np.testing.assert_allclose(azi[1], 180.0)
+
+
+class TaupGeoManyTestCase(unittest.TestCase):
+    """
+    Tests the network versions of the geographical methods.
+    """
+    def setUp(self):
+        self.model = TauPyModel('iasp91')
+        self.latitudes = np.array([10.0, -35.0, 60.0, 0.0])
+        self.longitudes = np.array([20.0, 100.0, -120.0, 150.0])
+
+    def test_get_travel_times_geo_many(self):
+        result = self.model.get_travel_times_geo_many(
+            10.0, 5.0, 15.0, (self.latitudes, self.longitudes),
+            phase_list=["P", "S"], refine=True)
+        self.assertIsNone(result.points)
+        self.assertIsNone(result.receiver_ids)
+        self.assertEqual(len(result.distances), 4)
+        for i in range(4):
+            expected = self.model.get_travel_times_geo(
+                10.0, 5.0, 15.0, self.latitudes[i], self.longitudes[i],
+                phase_list=["P", "S"])
+            rows = result.arrivals[result.arrivals["index"] == i]
+            self.assertEqual(list(rows["name"]), [_i.name for _i in expected])
+            np.testing.assert_allclose(rows["time"],
+                                       [_i.time for _i in expected])
+
+    def test_get_ray_paths_geo_many(self):
+        receivers = (self.latitudes, self.longitudes)
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("ignore")
+            result = self.model.get_ray_paths_geo_many(
+                10.0, 5.0, 15.0, receivers, phase_list=["P", "PcP"],
+                processes=1)
+            parallel = self.model.get_ray_paths_geo_many(
+                10.0, 5.0, 15.0, receivers, phase_list=["P", "PcP"],
+                processes=2)
+            pierce = self.model.get_pierce_points_geo_many(
+                10.0, 5.0, 15.0, receivers, phase_list=["P", "PcP"],
+                processes=2)
+        np.testing.assert_array_equal(result.arrivals, parallel.arrivals)
+        np.testing.assert_array_equal(result.offsets, parallel.offsets)
+        np.testing.assert_array_equal(result.points["time"],
+                                      parallel.points["time"])
+        self.assertEqual(len(result.offsets), len(result) + 1)
+        self.assertEqual(result.offsets[-1], len(result.points))
+        self.assertEqual(len(pierce), len(result))
+
+        for i, row in enumerate(result.arrivals):
+            index = row["index"]
+            expected = [_i for _i in self.model.get_ray_paths(
+                10.0, result.distances[index], phase_list=["P", "PcP"])
+                if _i.name == row["name"] and _i.time == row["time"]]
+            self.assertEqual(len(expected), 1)
+            path = result.get_points(i)
+            np.testing.assert_array_equal(path["time"],
+                                          expected[0].path["time"])
+            np.testing.assert_array_equal(path["depth"],
+                                          expected[0].path["depth"])
+            pierce_points = pierce.get_points(i)
+            self.assertAlmostEqual(pierce_points["time"][-1],
+                                   pierce.arrivals["time"][i], delta=0.1)
+            if geodetics.GEOGRAPHICLIB_VERSION_AT_LEAST_1_34:
+                self.assertAlmostEqual(path["lat"][-1],
+                                       result.latitudes[index], delta=0.1)
+                self.assertAlmostEqual(path["lon"][-1],
+                                       result.longitudes[index], delta=0.1)
+            else:
+                self.assertTrue(np.isnan(path["lat"]).all())
+
+    def test_inventory_receivers(self):
+        inv = read_inventory()
+        result = self.model.get_travel_times_geo_many(
+            10.0, 5.0, 15.0, inv, phase_list=["P"])
+        # One entry per station epoch.
+        self.assertEqual(result.receiver_ids,
+                         ["GR.FUR", "GR.WET"] + ["BW.RJOB"] * 3)
+        self.assertEqual(result.latitudes[0],
+                         inv.select(station="FUR")[0][0].latitude)
+        # Networks work as well.
+        result = self.model.get_travel_times_geo_many(
+            10.0, 5.0, 15.0, inv[0], phase_list=["P"])
+        self.assertEqual(result.receiver_ids, ["GR.FUR", "GR.WET"])
+
 
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TaupGeoTestCase, 'test'))
     suite.addTest(unittest.makeSuite(TaupGeoDistTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(TaupGeoManyTestCase, 'test'))
     return suite
 
 
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Tests the travel time tables.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import unittest
+
+import numpy as np
+
+from obspy.core.util.misc import TemporaryWorkingDirectory
+from obspy.taup import TauPyModel
+from obspy.taup.travel_time_table import TravelTimeTable
+
+
+class TravelTimeTableTestCase(unittest.TestCase):
+    """
+    Tests the travel time tables.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TauPyModel("iasp91")
+        cls.table = TravelTimeTable.from_model(
+            cls.model, phase_list=["S", "P"], max_depth=60.0,
+            depth_step=20.0, max_distance=30.0, distance_step=2.0,
+            refine=True)
+
+    def test_grid(self):
+        table = self.table
+        self.assertEqual(table.phases, ["P", "S"])
+        np.testing.assert_array_equal(table.depths, [0, 20, 40, 60])
+        self.assertEqual(len(table.distances), 16)
+        self.assertEqual(table.time.shape, (2, 4, 16))
+        self.assertEqual(table.error.shape, (2, 3, 15))
+        self.assertEqual(table.model_name, "iasp91")
+        self.assertEqual(table.model_hash, self.model.model.get_hash())
+        # Grid points are the first arrivals.
+        arrival = self.model.get_travel_times(40.0, 14.0, ["P"])[0]
+        self.assertAlmostEqual(table.time[0, 2, 7], arrival.time, 6)
+        self.assertAlmostEqual(table.ray_param[0, 2, 7], arrival.ray_param,
+                               6)
+        self.assertAlmostEqual(table.takeoff_angle[0, 2, 7],
+                               arrival.takeoff_angle, 6)
+
+    def test_interpolate(self):
+        depths = [5.0, 33.0, 51.5, 12.0]
+        distances = [3.3, 17.9, 29.5, 9.0]
+        for phase in self.table.phases:
+            result = self.table.interpolate(phase, depths, distances)
+            self.assertEqual(result.shape, (4,))
+            for i, (depth, distance) in enumerate(zip(depths, distances)):
+                arrival = self.model.get_travel_times(depth, distance,
+                                                      [phase])[0]
+                self.assertLessEqual(
+                    abs(result["time"][i] - arrival.time),
+                    result["error"][i] + 1e-6)
+                self.assertGreaterEqual(result["error"][i], 0.0)
+
+        # Grid points are reproduced exactly.
+        result = self.table.interpolate("P", 40.0, 14.0)
+        self.assertEqual(result.shape, ())
+        self.assertEqual(result["time"], self.table.time[0, 2, 7])
+        # Broadcasting.
+        result = self.table.interpolate("P", [[10.0], [20.0]],
+                                        [1.0, 2.0, 3.0])
+        self.assertEqual(result.shape, (2, 3))
+        # Close to deep sources there is only the upgoing p phase.
+        self.assertTrue(np.isnan(self.table.time[0, 3, 0]))
+        self.assertTrue(np.isnan(
+            self.table.interpolate("P", 50.0, 1.0)["time"]))
+
+    def test_outside_grid(self):
+        result = self.table.interpolate("P", [-1.0, 10.0, 61.0, 10.0],
+                                        [10.0, 31.0, 10.0, 10.0])
+        self.assertTrue(np.isnan(result["time"][:3]).all())
+        self.assertTrue(np.isnan(result["error"][:3]).all())
+        self.assertFalse(np.isnan(result["time"][3]))
+        self.assertRaises(ValueError, self.table.interpolate, "PKP", 10.0,
+                          10.0)
+
+    def test_save_load(self):
+        with TemporaryWorkingDirectory():
+            self.table.save("table.npz")
+            table = TravelTimeTable.load("table.npz")
+        self.assertEqual(table.phases, self.table.phases)
+        self.assertEqual(table.model_name, self.table.model_name)
+        self.assertEqual(table.model_hash, self.table.model_hash)
+        for key in ("depths", "distances", "time", "ray_param",
+                    "takeoff_angle", "error"):
+            np.testing.assert_array_equal(getattr(table, key),
+                                          getattr(self.table, key))
+
+    def test_cached(self):
+        kwargs = dict(phase_list=["P"], max_depth=20.0, depth_step=10.0,
+                      max_distance=10.0, distance_step=5.0)
+        with TemporaryWorkingDirectory():
+            table = TravelTimeTable.cached(self.model, cache_dir="cache",
+                                           **kwargs)
+            files = os.listdir("cache")
+            self.assertEqual(len(files), 1)
+            self.assertTrue(files[0].startswith("iasp91_"))
+            cached = TravelTimeTable.cached(self.model, cache_dir="cache",
+                                            **kwargs)
+            np.testing.assert_array_equal(cached.time, table.time)
+            self.assertEqual(os.listdir("cache"), files)
+
+            # Different parameters or models are different files.
+            kwargs["distance_step"] = 2.5
+            TravelTimeTable.cached(self.model, cache_dir="cache", **kwargs)
+            TravelTimeTable.cached("ak135", cache_dir="cache", **kwargs)
+            self.assertEqual(len(os.listdir("cache")), 3)
+
+
+def suite():
+    return unittest.makeSuite(TravelTimeTableTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Precomputed travel time tables.
+
+For tasks like phase association or event location often only the first
+arrivals of a few phases are needed, but for very many source depths and
+distances. A :class:`TravelTimeTable` samples the first arrival of each
+phase on a regular grid of source depths and distances once and then
+interpolates bilinearly in that grid, which is orders of magnitude faster
+than calculating the arrivals with :class:`~obspy.taup.tau.TauPyModel`.
+
+>>> from obspy.taup import TauPyModel
+>>> from obspy.taup.travel_time_table import TravelTimeTable
+>>> model = TauPyModel("iasp91")
+>>> table = TravelTimeTable.from_model(
+...     model, phase_list=["P"], max_depth=100.0, depth_step=10.0,
+...     max_distance=40.0, distance_step=1.0)
+>>> result = table.interpolate("P", [15.0, 85.0], [12.3, 34.2])
+>>> print(result["time"].round(1))
+[ 174.6  397.2]
+
+Building a table takes a while, :meth:`TravelTimeTable.cached` stores the
+tables in a cache directory (see
+:func:`~obspy.taup.utils.get_cache_directory`) and reuses them.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .utils import get_cache_directory, parse_phase_list
+
+
+INTERPOLATION_DTYPE = np.dtype([
+    (native_str('time'), np.float64),
+    (native_str('ray_param'), np.float64),
+    (native_str('takeoff_angle'), np.float64),
+    (native_str('error'), np.float64),
+])
+
+
+class TravelTimeTable(object):
+    """
+    First arrival times of seismic phases sampled on a depth/distance grid.
+
+    Usually created with :meth:`from_model`, :meth:`load` or
+    :meth:`cached`.
+
+    :type phases: list of str
+    :param phases: The phase names.
+    :type depths: :class:`numpy.ndarray`
+    :param depths: Increasing source depths of the grid in km.
+    :type distances: :class:`numpy.ndarray`
+    :param distances: Increasing epicentral distances of the grid in
+        degrees.
+    :type time: :class:`numpy.ndarray`
+    :param time: Travel times in seconds with shape ``(number of phases,
+        number of depths, number of distances)``, NaN where a phase does not
+        exist.
+    :type ray_param: :class:`numpy.ndarray`
+    :param ray_param: Ray parameters in seconds per radian, same shape as
+        ``time``.
+    :type takeoff_angle: :class:`numpy.ndarray`
+    :param takeoff_angle: Takeoff angles in degrees, same shape as ``time``.
+    :type model_name: str
+    :param model_name: Name of the model the table was calculated with.
+    :type model_hash: str
+    :param model_hash: Hash of the model, see
+        :meth:`~obspy.taup.tau_model.TauModel.get_hash`.
+    :type receiver_depth: float
+    :param receiver_depth: Receiver depth in km.
+    """
+    def __init__(self, phases, depths, distances, time, ray_param,
+                 takeoff_angle, model_name="", model_hash="",
+                 receiver_depth=0.0):
+        self.phases = list(phases)
+        self.depths = np.asarray(depths, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        shape = (len(self.phases), len(self.depths), len(self.distances))
+        self.time = np.asarray(time, dtype=np.float64).reshape(shape)
+        self.ray_param = np.asarray(ray_param,
+                                    dtype=np.float64).reshape(shape)
+        self.takeoff_angle = np.asarray(takeoff_angle,
+                                        dtype=np.float64).reshape(shape)
+        self.model_name = model_name
+        self.model_hash = model_hash
+        self.receiver_depth = receiver_depth
+        if len(self.depths) < 2 or len(self.distances) < 2:
+            msg = "The grid needs at least two depths and two distances."
+            raise ValueError(msg)
+        self.error = self._estimate_error()
+
+    def __str__(self):
+        return ("Travel time table of model '%s' for %s: %i depths "
+                "(%g - %g km), %i distances (%g - %g deg)" % (
+                    self.model_name, ", ".join(self.phases),
+                    len(self.depths), self.depths[0], self.depths[-1],
+                    len(self.distances), self.distances[0],
+                    self.distances[-1]))
+
+    def _estimate_error(self):
+        """
+        Estimate the maximum error of the bilinear interpolation per cell.
+
+        The interpolation error of a cell is bounded by ``h**2 / 8`` times
+        the second derivative along each axis for smooth travel time curves.
+        The second derivatives are estimated with second differences of the
+        grid values at the corners of a cell.
+        """
+        time = self.time
+        d2x = np.full(time.shape, np.nan) if hasattr(np, "full") else \
+            np.nan * np.ones(time.shape)
+        d2z = d2x.copy()
+        d2x[:, :, 1:-1] = np.abs(time[:, :, :-2] - 2 * time[:, :, 1:-1] +
+                                 time[:, :, 2:])
+        d2z[:, 1:-1, :] = np.abs(time[:, :-2, :] - 2 * time[:, 1:-1, :] +
+                                 time[:, 2:, :])
+        # Use the neighbours at the edges of the grid.
+        d2x[:, :, 0] = d2x[:, :, 1]
+        d2x[:, :, -1] = d2x[:, :, -2]
+        d2z[:, 0, :] = d2z[:, 1, :]
+        d2z[:, -1, :] = d2z[:, -2, :]
+        # The second differences already include the squared step width.
+        corners_x = np.fmax(np.fmax(d2x[:, :-1, :-1], d2x[:, :-1, 1:]),
+                            np.fmax(d2x[:, 1:, :-1], d2x[:, 1:, 1:]))
+        corners_z = np.fmax(np.fmax(d2z[:, :-1, :-1], d2z[:, :-1, 1:]),
+                            np.fmax(d2z[:, 1:, :-1], d2z[:, 1:, 1:]))
+        # Travel time curves have kinks where the first arrival switches to
+        # another branch. For a kink within a cell the error is bounded by
+        # half of the larger second difference of its corners instead of
+        # an eighth for smooth curves, so use that everywhere.
+        return (np.where(np.isnan(corners_x), 0.0, corners_x) +
+                np.where(np.isnan(corners_z), 0.0, corners_z)) / 2.0
+
+    @classmethod
+    def from_model(cls, model, phase_list=("P", "S"), max_depth=700.0,
+                   depth_step=5.0, max_distance=180.0, distance_step=0.5,
+                   receiver_depth_in_km=0.0, refine=False):
+        """
+        Calculate a travel time table.
+
+        :type model: :class:`~obspy.taup.tau.TauPyModel` or str
+        :param model: The model or the name of a model.
+        :type phase_list: list of str
+        :param phase_list: The phases to tabulate. Only the first arrival of
+            each phase is stored.
+        :type max_depth: float
+        :param max_depth: Maximum source depth in km.
+        :type depth_step: float
+        :param depth_step: Depth increment of the grid in km.
+        :type max_distance: float
+        :param max_distance: Maximum distance in degrees.
+        :type distance_step: float
+        :param distance_step: Distance increment of the grid in degrees.
+        :type receiver_depth_in_km: float
+        :param receiver_depth_in_km: Receiver depth in km.
+        :type refine: bool
+        :param refine: Refine the arrivals, see
+            :meth:`~obspy.taup.tau.TauPyModel.get_travel_times_many`.
+        :rtype: :class:`TravelTimeTable`
+        """
+        if not hasattr(model, "get_travel_times_many"):
+            from .tau import TauPyModel
+            model = TauPyModel(model)
+        phases = sorted(parse_phase_list(phase_list))
+        depths = np.arange(0.0, max_depth + depth_step / 2.0, depth_step)
+        distances = np.arange(0.0, max_distance + distance_step / 2.0,
+                              distance_step)
+        shape = (len(phases), len(depths), len(distances))
+        time = np.empty(shape)
+        time.fill(np.nan)
+        ray_param = time.copy()
+        takeoff_angle = time.copy()
+
+        grid_depths = np.repeat(depths, len(distances))
+        grid_distances = np.tile(distances, len(depths))
+        arrivals = model.get_travel_times_many(
+            grid_depths, grid_distances, phase_list=phases,
+            receiver_depth_in_km=receiver_depth_in_km, refine=refine)
+        # The arrivals are sorted by time for each point so the first
+        # occurrence of every phase is its first arrival.
+        phase_index = np.searchsorted(phases, arrivals["name"])
+        key = phase_index * len(grid_depths) + arrivals["index"]
+        _, first = np.unique(key, return_index=True)
+        arrivals = arrivals[first]
+        phase_index = phase_index[first]
+        depth_index = arrivals["index"] // len(distances)
+        distance_index = arrivals["index"] % len(distances)
+        time[phase_index, depth_index, distance_index] = arrivals["time"]
+        ray_param[phase_index, depth_index, distance_index] = \
+            arrivals["ray_param"]
+        takeoff_angle[phase_index, depth_index, distance_index] = \
+            arrivals["takeoff_angle"]
+        return cls(phases, depths, distances, time, ray_param,
+                   takeoff_angle,
+                   model_name=model.model.s_mod.v_mod.model_name,
+                   model_hash=model.model.get_hash(),
+                   receiver_depth=receiver_depth_in_km)
+
+    @classmethod
+    def cached(cls, model, phase_list=("P", "S"), max_depth=700.0,
+               depth_step=5.0, max_distance=180.0, distance_step=0.5,
+               receiver_depth_in_km=0.0, refine=False, cache_dir=None):
+        """
+        Load a travel time table from the cache or calculate and cache it.
+
+        The tables are stored per model hash and table parameters so
+        changed models are never served from the cache. See
+        :meth:`from_model` for the parameters.
+
+        :type cache_dir: str
+        :param cache_dir: Directory to cache the tables in. Defaults to the
+            ``tables`` subdirectory of
+            :func:`~obspy.taup.utils.get_cache_directory`.
+        :rtype: :class:`TravelTimeTable`
+        """
+        if not hasattr(model, "get_travel_times_many"):
+            from .tau import TauPyModel
+            model = TauPyModel(model)
+        if cache_dir is None:
+            cache_dir = get_cache_directory("tables")
+        elif not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        phases = sorted(parse_phase_list(phase_list))
+        parameters = json.dumps(
+            [phases, float(max_depth), float(depth_step),
+             float(max_distance), float(distance_step),
+             float(receiver_depth_in_km), bool(refine)])
+        key = hashlib.sha1(parameters.encode("utf-8")).hexdigest()
+        model_name = model.model.s_mod.v_mod.model_name
+        filename = os.path.join(cache_dir, "%s_%s_%s.npz" % (
+            os.path.basename(model_name), model.model.get_hash()[:16],
+            key[:16]))
+        if os.path.exists(filename):
+            try:
+                return cls.load(filename)
+            except Exception:
+                # Corrupt file, calculate again.
+                pass
+        table = cls.from_model(
+            model, phase_list=phases, max_depth=max_depth,
+            depth_step=depth_step, max_distance=max_distance,
+            distance_step=distance_step,
+            receiver_depth_in_km=receiver_depth_in_km, refine=refine)
+        # Write to a temporary file and rename it so concurrent processes
+        # never read incomplete files.
+        fd, temp = tempfile.mkstemp(dir=cache_dir, suffix=".npz")
+        os.close(fd)
+        try:
+            table.save(temp)
+            if os.path.exists(filename):
+                os.remove(filename)
+            os.rename(temp, filename)
+        except OSError:
+            # Another process stored the same table in the meantime.
+            if os.path.exists(temp):
+                os.remove(temp)
+        return table
+
+    def save(self, filename):
+        """
+        Save the table to a NumPy npz file.
+
+        :type filename: str
+        :param filename: Name of the file.
+        """
+        with open(filename, "wb") as fh:
+            np.savez(
+                fh, phases=np.array(self.phases, dtype=np.unicode_),
+                depths=self.depths, distances=self.distances,
+                time=self.time, ray_param=self.ray_param,
+                takeoff_angle=self.takeoff_angle,
+                model_name=np.array(self.model_name, dtype=np.unicode_),
+                model_hash=np.array(self.model_hash, dtype=np.unicode_),
+                receiver_depth=np.array(self.receiver_depth))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a table saved with :meth:`save`.
+
+        :type filename: str
+        :param filename: Name of the file.
+        :rtype: :class:`TravelTimeTable`
+        """
+        npz = np.load(filename)
+        try:
+            return cls([str(_i) for _i in npz["phases"]], npz["depths"],
+                       npz["distances"], npz["time"], npz["ray_param"],
+                       npz["takeoff_angle"],
+                       model_name=str(npz["model_name"]),
+                       model_hash=str(npz["model_hash"]),
+                       receiver_depth=float(npz["receiver_depth"]))
+        finally:
+            if hasattr(npz, 'close'):
+                npz.close()
+            else:
+                del npz
+
+    def interpolate(self, phase, source_depths_in_km, distances_in_degree):
+        """
+        Interpolate the first arrival of a phase.
+
+        Points outside the grid and points in cells in which the phase does
+        not exist at all corners (e.g. at the edge of a shadow zone) are
+        NaN.
+
+        :type phase: str
+        :param phase: The phase name.
+        :type source_depths_in_km: float or array_like
+        :param source_depths_in_km: Source depths in km.
+        :type distances_in_degree: float or array_like
+        :param distances_in_degree: Epicentral distances in degrees, must
+            broadcast against the source depths.
+        :rtype: :class:`numpy.ndarray`
+        :return: Structured array with the fields ``time``, ``ray_param``,
+            ``takeoff_angle`` and ``error``, an estimate of the maximum
+            interpolation error of the travel time in seconds (without the
+            error of the tabulated times themselves).
+        """
+        try:
+            phase_index = self.phases.index(phase)
+        except ValueError:
+            msg = "Phase '%s' is not part of the table." % phase
+            raise ValueError(msg)
+        depths, distances = np.broadcast_arrays(
+            np.asarray(source_depths_in_km, dtype=np.float64),
+            np.asarray(distances_in_degree, dtype=np.float64))
+
+        iz, wz, valid_z = self._locate(self.depths, depths)
+        ix, wx, valid_x = self._locate(self.distances, distances)
+        result = np.empty(depths.shape, dtype=INTERPOLATION_DTYPE)
+        for key in ("time", "ray_param", "takeoff_angle"):
+            grid = getattr(self, key)[phase_index]
+            result[key] = (
+                (1.0 - wz) * ((1.0 - wx) * grid[iz, ix] +
+                              wx * grid[iz, ix + 1]) +
+                wz * ((1.0 - wx) * grid[iz + 1, ix] +
+                      wx * grid[iz + 1, ix + 1]))
+        result["error"] = self.error[phase_index][iz, ix]
+        outside = ~(valid_z & valid_x)
+        if outside.any():
+            for key in INTERPOLATION_DTYPE.names:
+                result[key][outside] = np.nan
+        result["error"][np.isnan(result["time"])] = np.nan
+        return result
+
+    @staticmethod
+    def _locate(grid, values):
+        """
+        Index of the grid cell and the weight of the upper grid point.
+        """
+        index = np.searchsorted(grid, values, side="right") - 1
+        index = np.clip(index, 0, len(grid) - 2)
+        weight = (values - grid[index]) / (grid[index + 1] - grid[index])
+        valid = (values >= grid[0]) & (values <= grid[-1])
+        return index, weight, valid
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -9,12 +9,47 @@ from future.builtins import *  # NOQA
 
 import inspect
 import os
+import sys
 
 
 ROOT = os.path.dirname(os.path.abspath(inspect.getfile(
     inspect.currentframe())))
 
 
+def get_cache_directory(*subdirectories):
+    """
+    Returns the directory TauPy caches precomputed data in.
+
+    This is ``$OBSPY_TAUP_CACHE`` if set, otherwise ``obspy/taup`` in the
+    user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache`` on Linux,
+    ``~/Library/Caches`` on macOS and ``%LOCALAPPDATA%`` on Windows). The
+    directory is created if necessary.
+
+    :param subdirectories: Optional names of subdirectories to append.
+    :rtype: str
+    """
+    directory = os.environ.get("OBSPY_TAUP_CACHE")
+    if not directory:
+        if sys.platform.startswith("win"):
+            base = os.environ.get("LOCALAPPDATA") or \
+                os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        elif sys.platform == "darwin":
+            base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or \
+                os.path.join(os.path.expanduser("~"), ".cache")
+        directory = os.path.join(base, "obspy", "taup")
+    directory = os.path.join(directory, *subdirectories)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Created in the meantime by another process.
+            if not os.path.isdir(directory):
+                raise
+    return directory
+
+
 def parse_phase_list(phase_list):
     """
     Takes a list of phases, returns a list of individual phases. Performs e.g.